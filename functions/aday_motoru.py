@@ -0,0 +1,173 @@
+"""
+Aday motoru — "kim hangi gün hangi rolü alabilir?" sorusunun rol × gün × kişi
+bitmap'i. Solver teşhisi (_build_feasibility_diagnostics) ve hazırlık analizi
+(analyze_preflight) aday sayılarını, sıfır adaylı slotları ve ara günlü üst
+kapasiteyi bu bitmap'ten vektörel olarak okur.
+
+Hazırlık analizi bitmap'i girdi parmak izine göre süreç içi LRU'da tutulur;
+aynı istek için tekrar eden analizler yeniden hesaplamaz.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from solver_models import SolverGorev, SolverPersonel
+from utils import normalize_id
+
+_LRU_KAPASITE = 16
+
+_lru: "OrderedDict[str, AdayBitmapi]" = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+@dataclass
+class AdayBitmapi:
+    roller: List[str]
+    role_slots: Dict[str, List[int]]
+    gun_sayisi: int
+    # bitmap[r, g-1, i]: i. kişi g. gün r. rolün en az bir slotuna aday mı
+    bitmap: np.ndarray
+
+    @classmethod
+    def slot_tensorunden(cls, aday: np.ndarray, slot_rolleri: Sequence[str]) -> "AdayBitmapi":
+        """Kişi × gün × slot aday tensöründen (bkz. UygunlukTensoru.aday) rol bitmap'i."""
+        role_slots: Dict[str, List[int]] = {}
+        for s, rol in enumerate(slot_rolleri):
+            role_slots.setdefault(rol, []).append(s)
+        roller = list(role_slots.keys())
+        bitmap = np.stack([aday[:, :, slotlar].any(axis=2).T for slotlar in role_slots.values()]) if roller \
+            else np.zeros((0, aday.shape[1], aday.shape[0]), dtype=bool)
+        return cls(roller=roller, role_slots=role_slots, gun_sayisi=aday.shape[1], bitmap=bitmap)
+
+    def gunluk_aday_sayilari(self) -> np.ndarray:
+        """[r, g-1] rol-gün başına aday kişi sayısı."""
+        return self.bitmap.sum(axis=2)
+
+    def slot_aday_var(self, slot_sayisi: int) -> np.ndarray:
+        """[g-1, s] slotun o gün en az bir adayı var mı."""
+        rol_var = self.bitmap.any(axis=2)
+        sonuc = np.zeros((self.gun_sayisi, slot_sayisi), dtype=bool)
+        for r, rol in enumerate(self.roller):
+            sonuc[:, self.role_slots[rol]] = rol_var[r][:, None]
+        return sonuc
+
+    def ust_kapasite(self, ara_gun: int) -> np.ndarray:
+        """[r] ara gün kısıtı altında rol başına kişi bazlı atanabilir gün üst sınırı toplamı.
+
+        Her kişi için aday günler soldan açgözlü seçilir (iki seçim arası > ara_gun);
+        tüm rol × kişi çiftleri gün ekseninde birlikte ilerletilir.
+        """
+        R, D, P = self.bitmap.shape
+        secilen = np.zeros((R, P), dtype=np.int64)
+        son_gun = np.full((R, P), -10_000, dtype=np.int64)
+        for g0 in range(D):
+            al = self.bitmap[:, g0, :] & (g0 - son_gun > ara_gun)
+            secilen += al
+            son_gun[al] = g0
+        return secilen.sum(axis=1)
+
+
+def _parmak_izi(gun_sayisi: int, personeller: List[SolverPersonel], roller: List[str],
+                exclusive_roles: Set[str], gorev_havuzlari: Dict[str, Set[int]],
+                kisitlama_istisna_map: Dict[Tuple[int, int], Set[str]]) -> str:
+    payload = {
+        "gun": gun_sayisi,
+        "personel": [
+            [normalize_id(p.id), sorted(p.mazeret_gunleri or ()), p.kisitli_gorev, p.tasma_gorevi]
+            for p in personeller
+        ],
+        "roller": roller,
+        "exclusive": sorted(exclusive_roles),
+        "havuz": {rol: sorted(ids, key=str) for rol, ids in gorev_havuzlari.items() if ids is not None},
+        "havuz_yok": sorted(rol for rol, ids in gorev_havuzlari.items() if ids is None),
+        "istisna": sorted([str(pid), gun, sorted(r)] for (pid, gun), r in kisitlama_istisna_map.items()),
+    }
+    ham = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(ham.encode("utf-8")).hexdigest()
+
+
+def _rol_maskeleri(p: SolverPersonel, roller: List[str], exclusive_roles: Set[str],
+                   gorev_havuzlari: Dict[str, Set[int]]) -> Tuple[List[bool], List[bool]]:
+    """Gün bağımsız (normal, istisna günü) rol uygunlukları — _person_can_take_role_day sırası."""
+    pid = normalize_id(p.id)
+    kisitli = getattr(p, 'kisitli_gorev', None)
+    tasma = getattr(p, 'tasma_gorevi', None)
+    normal, istisna = [], []
+    for role in roller:
+        kendi_rolu = kisitli == role or tasma == role
+        hav = gorev_havuzlari.get(role)
+        havuzda = hav is not None and pid in hav
+        # H8: exclusive + havuz (istisna günü de deldirmez)
+        h8 = not (role in exclusive_roles and not kendi_rolu and not havuzda)
+        # H10: genel havuz
+        h10 = hav is None or havuzda or kendi_rolu
+        # H7: kisitli_gorev / tasma_gorevi
+        h7 = not kisitli or role == kisitli or (bool(tasma) and role == tasma)
+        normal.append(h7 and h8 and h10)
+        istisna.append(h8)
+    return normal, istisna
+
+
+def preflight_aday_bitmapi(
+    gun_sayisi: int,
+    personeller: List[SolverPersonel],
+    gorevler: List[SolverGorev],
+    gorev_havuzlari: Dict[str, Set[int]],
+    kisitlama_istisna_map: Dict[Tuple[int, int], Set[str]],
+) -> AdayBitmapi:
+    """Hazırlık analizi semantiğiyle (mazeret, H7 + istisna, H8, H10) rol bitmap'i; parmak izi ile cache'li."""
+    role_slots: Dict[str, List[int]] = {}
+    exclusive_roles: Set[str] = set()
+    for idx, g in enumerate(gorevler or []):
+        base = g.base_name if getattr(g, 'base_name', None) else g.ad
+        role_slots.setdefault(base, []).append(idx)
+        if getattr(g, 'exclusive', False):
+            exclusive_roles.add(base)
+    roller = list(role_slots.keys())
+    gorev_havuzlari = gorev_havuzlari or {}
+
+    anahtar = _parmak_izi(gun_sayisi, personeller, roller, exclusive_roles, gorev_havuzlari, kisitlama_istisna_map)
+    with _lru_lock:
+        if anahtar in _lru:
+            _lru.move_to_end(anahtar)
+            return _lru[anahtar]
+
+    P, D, R = len(personeller), gun_sayisi, len(roller)
+    normal = np.zeros((P, R), dtype=bool)
+    istisna = np.zeros((P, R), dtype=bool)
+    mazeret = np.zeros((P, D), dtype=bool)
+    pid_index: Dict = {}
+    for i, p in enumerate(personeller):
+        normal[i], istisna[i] = _rol_maskeleri(p, roller, exclusive_roles, gorev_havuzlari)
+        for gun in getattr(p, 'mazeret_gunleri', set()):
+            if 1 <= gun <= D:
+                mazeret[i, gun - 1] = True
+        pid_index.setdefault(normalize_id(p.id), []).append(i)
+
+    # [i, g-1, r]: önce gün bağımsız maske, istisna günlerinde H7 kalkar
+    hucre = np.repeat(normal[:, None, :], D, axis=1)
+    rol_index = {rol: r for r, rol in enumerate(roller)}
+    for (pid, gun), istisna_rolleri in kisitlama_istisna_map.items():
+        if not (1 <= gun <= D):
+            continue
+        for i in pid_index.get(normalize_id(pid), []):
+            for rol in istisna_rolleri:
+                r = rol_index.get(rol)
+                if r is not None:
+                    hucre[i, gun - 1, r] = istisna[i, r]
+    hucre &= ~mazeret[:, :, None]
+
+    sonuc = AdayBitmapi(roller=roller, role_slots=role_slots, gun_sayisi=D,
+                        bitmap=np.ascontiguousarray(hucre.transpose(2, 1, 0)))
+    with _lru_lock:
+        _lru[anahtar] = sonuc
+        _lru.move_to_end(anahtar)
+        while len(_lru) > _LRU_KAPASITE:
+            _lru.popitem(last=False)
+    return sonuc
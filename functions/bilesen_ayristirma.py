@@ -0,0 +1,276 @@
+"""
+Bagimsiz bilesen ayristirmasi — kisi–rol etkilesim grafigi birden fazla bagli
+bilesene ayriliyorsa her bilesen ayri bir CP-SAT modeli olarak surec havuzunda
+paralel cozulur ve atamalar birlestirilir.
+
+Graf dugumleri kisiler ve rollerdir (base_name). Kenarlar:
+  - kisi–rol: uygunluk tensorunde (mazeret, kisitli_gorev/tasma_gorevi, exclusive,
+    gorev havuzu, kisitlama istisnalari sonrasi) kisinin rolun herhangi bir slotuna
+    herhangi bir gun aday olmasi; manuel atama, gorev kotasi (> 0) ve plan
+    iskeletinde onerilen rol de kenar sayilir.
+  - kisi–kisi: birlikte ve ayri kurallarinin uyeleri.
+
+Baglasim stratejisi: gunluk tek slot (H3), ara gun (H4) ve kisi bazli tum sert/yumusak
+kisitlar kisi uzerinden tanimlidir; iki rol grubunu sadece ortak bir kisinin gunluk
+limiti bagliyorsa o kisi iki gruba da kenarla baglandigi icin gruplar ayni bilesende
+birlikte cozulur — bilesenler arasinda hicbir kisit bolunmez. Modelde kalan tek kuresel
+baglar sabitlerdir ve alt cozuculere tum personelinkiyle aktarilir: slot kitlik
+agirliklari (slot_agirliklari) ve S6/S6b yillik denge ortalamalari
+(yillik_denge_referansi). Boylece birlesik sonuc tek parca modelin optimumuyla aynidir
+(amac bilesenlerin toplamidir). Hic kenari olmayan kisi ve roller en buyuk bilesene katilir.
+
+Bir bilesen cozulemezse sonuc basarisiz doner; cagiran tek parca modele gecer.
+"""
+
+import dataclasses
+import logging
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional
+
+from ortools_solver import NobetSolver
+from solver_models import SolverSonuc
+
+logger = logging.getLogger(__name__)
+
+
+def _bilesen_coz(solver_kwargs: Dict, slot_agirliklari: Dict, yillik_denge_referansi: Dict,
+                 arama_isci_sayisi: int) -> SolverSonuc:
+    """Bilesen iscisi (ayri surec): alt modeli kur, kuresel sabitleri uygula ve coz."""
+    solver = NobetSolver(**solver_kwargs)
+    solver.arama_isci_sayisi = arama_isci_sayisi
+    solver.slot_agirliklari = {rol: slot_agirliklari.get(rol, 1) for rol in solver.role_slots}
+    solver.yillik_denge_referansi = yillik_denge_referansi
+    return solver.coz()
+
+
+class _BirlesimKumesi:
+    def __init__(self, n: int):
+        self.ebeveyn = list(range(n))
+
+    def bul(self, a: int) -> int:
+        while self.ebeveyn[a] != a:
+            self.ebeveyn[a] = self.ebeveyn[self.ebeveyn[a]]
+            a = self.ebeveyn[a]
+        return a
+
+    def birlestir(self, a: int, b: int) -> None:
+        ka, kb = self.bul(a), self.bul(b)
+        if ka != kb:
+            self.ebeveyn[kb] = ka
+
+
+class BilesenAyristirici:
+    """NobetSolver girdilerini bagimsiz kisi–rol bilesenlerine ayirip paralel cozer.
+
+    solver_kwargs NobetSolver(**solver_kwargs) ile ayni girdilerdir; tam cozucu
+    uygunluk, kural eslestirme ve sonuc istatistikleri icin bir kez kurulur.
+    coz() sonrasi bilgi, cozum donmese de (tek bilesen) bilesen ozetini tutar.
+    """
+
+    def __init__(self, solver_kwargs: Dict, max_sure: float = None, isci_sayisi: int = None):
+        self.solver_kwargs = dict(solver_kwargs)
+        self.solver = NobetSolver(**self.solver_kwargs)
+        self.max_sure = float(max_sure if max_sure is not None else self.solver.max_sure)
+        self.isci_sayisi = isci_sayisi or (os.cpu_count() or 1)
+        self.bilgi: Optional[Dict] = None
+
+    # ------------------------------------------------------------------
+    # Graf
+    # ------------------------------------------------------------------
+
+    def bilesenler(self) -> List[Dict]:
+        """Bagli bilesenler: [{'kisiler': [pid], 'roller': [rol]}], buyukten kucuge."""
+        solver = self.solver
+        kisiler = solver.personel_listesi
+        roller = list(solver.role_slots.keys())
+        P = len(kisiler)
+        rol_dugumu = {rol: P + r for r, rol in enumerate(roller)}
+        pid_sira = {p.id: i for i, p in enumerate(kisiler)}
+        kume = _BirlesimKumesi(P + len(roller))
+        kenarli = [False] * (P + len(roller))
+
+        def bagla(a: int, b: int) -> None:
+            kume.birlestir(a, b)
+            kenarli[a] = kenarli[b] = True
+
+        uygun = solver._uygunluk().uygun
+        kisi_rol = uygun.any(axis=1)  # [i, s]
+        for rol, slotlar in solver.role_slots.items():
+            for i in kisi_rol[:, slotlar].any(axis=1).nonzero()[0].tolist():
+                bagla(i, rol_dugumu[rol])
+        for pid, _, s in solver.manuel_slot_set:
+            bagla(pid_sira[pid], rol_dugumu[solver._role_name_by_slot(s)])
+        for p in kisiler:
+            kotalar = dict(getattr(p, 'gorev_kotalari', None) or {})
+            kotalar.update(solver.hedefler.get(p.id, {}).get('gorev_kotalari', {}) or {})
+            for rol, kota in kotalar.items():
+                if rol in rol_dugumu and (kota or 0) > 0:
+                    bagla(pid_sira[p.id], rol_dugumu[rol])
+        for pid, rol_gunleri in solver._planlanan_rol_gunleri_map().items():
+            for rol in rol_gunleri.values():
+                if rol in rol_dugumu:
+                    bagla(pid_sira[pid], rol_dugumu[rol])
+        for kural in solver.kurallar:
+            if kural.tur not in ('birlikte', 'ayri'):
+                continue
+            uyeler = [pid_sira[pid] for pid in solver._birlikte_gecerli_ids(kural)]
+            for i in uyeler[1:]:
+                bagla(uyeler[0], i)
+
+        gruplar: Dict[int, Dict] = {}
+        kenarsiz = []
+        for d in range(P + len(roller)):
+            if not kenarli[d]:
+                kenarsiz.append(d)
+                continue
+            grup = gruplar.setdefault(kume.bul(d), {'kisiler': [], 'roller': []})
+            if d < P:
+                grup['kisiler'].append(kisiler[d].id)
+            else:
+                grup['roller'].append(roller[d - P])
+        # Sadece kişi (ör. uygun rolü olmayan ayrı kuralı üyeleri) ya da sadece rol içeren
+        # gruplar ayrı model gerektirmez; kenarsız düğümlerle birlikte en büyük bileşene katılır.
+        sonuc = sorted((g for g in gruplar.values() if g['kisiler'] and g['roller']),
+                       key=lambda g: -(len(g['kisiler']) * len(g['roller'])))
+        if not sonuc:
+            sonuc = [{'kisiler': [], 'roller': []}]
+        for grup in gruplar.values():
+            if not (grup['kisiler'] and grup['roller']):
+                sonuc[0]['kisiler'].extend(grup['kisiler'])
+                sonuc[0]['roller'].extend(grup['roller'])
+        for d in kenarsiz:
+            if d < P:
+                sonuc[0]['kisiler'].append(kisiler[d].id)
+            else:
+                sonuc[0]['roller'].append(roller[d - P])
+        return sonuc
+
+    # ------------------------------------------------------------------
+    # Alt modeller
+    # ------------------------------------------------------------------
+
+    def _alt_girdiler(self, bilesen: Dict) -> tuple:
+        """Bilesenin NobetSolver girdileri ve alt slot -> tam slot eslemesi."""
+        solver = self.solver
+        kisi_kumesi = set(bilesen['kisiler'])
+        rol_kumesi = set(bilesen['roller'])
+        slot_eslemesi = [s for s in range(solver.slot_sayisi) if solver._role_name_by_slot(s) in rol_kumesi]
+        yeni_slot = {s: k for k, s in enumerate(slot_eslemesi)}
+
+        manuel = []
+        for m in solver.manuel_atamalar:
+            pid = solver._eslestir(m.personel_id)
+            if pid in kisi_kumesi and m.slot_idx in yeni_slot:
+                manuel.append(dataclasses.replace(m, slot_idx=yeni_slot[m.slot_idx]))
+        kurallar = [
+            k for k in solver.kurallar
+            if any(solver._eslestir(pid) in kisi_kumesi for pid in (k.kisiler or []))
+        ]
+        kwargs = {
+            **self.solver_kwargs,
+            'personeller': [p for p in solver.personel_listesi if p.id in kisi_kumesi],
+            'gorevler': [solver.gorevler[s] for s in slot_eslemesi],
+            'kurallar': kurallar,
+            'manuel_atamalar': manuel,
+            'max_sure_saniye': self.max_sure,
+        }
+        return kwargs, slot_eslemesi
+
+    def _basarisiz(self, baslangic: float, status: str, mesaj: str, bilgi: Dict) -> SolverSonuc:
+        return SolverSonuc(
+            basarili=False, atamalar=[],
+            istatistikler={'status': status, 'ara_gun': self.solver.ara_gun, 'bilesen_ayristirma': bilgi},
+            sure_ms=int((time.time() - baslangic) * 1000), mesaj=mesaj,
+        )
+
+    def coz(self) -> Optional[SolverSonuc]:
+        """Bilesenleri paralel coz ve birlestir; tek bilesen varsa None (ayristirma anlamsiz)."""
+        baslangic = time.time()
+        solver = self.solver
+        bilesenler = self.bilesenler()
+        bilgi = {
+            'bilesen_sayisi': len(bilesenler),
+            'bilesenler': [
+                {'kisi_sayisi': len(b['kisiler']), 'roller': b['roller']} for b in bilesenler
+            ],
+        }
+        self.bilgi = bilgi
+        if len(bilesenler) < 2:
+            return None
+
+        manual_conflicts = solver._manual_hard_conflict_diagnostics()
+        if manual_conflicts and not solver.ignore_manual_conflicts:
+            return self._basarisiz(baslangic, 'MANUAL_CONFLICT',
+                                   f"Manuel atamalarda hard kisit cakismasi var ({len(manual_conflicts)} adet)", bilgi)
+
+        is_tanimlari = [self._alt_girdiler(b) for b in bilesenler]
+        arama_isci_sayisi = max(1, self.isci_sayisi // len(is_tanimlari))
+        denge_referansi = solver._yillik_denge_referansi()
+        sonuclar: List[Optional[SolverSonuc]] = [None] * len(is_tanimlari)
+        # Süreç başlatma + model kurulumu için ek pay
+        son_an = time.time() + self.max_sure + 15
+        havuz = multiprocessing.get_context("spawn").Pool(processes=min(len(is_tanimlari), self.isci_sayisi))
+        try:
+            isler = [
+                havuz.apply_async(_bilesen_coz, (kwargs, solver.slot_agirliklari, denge_referansi, arama_isci_sayisi))
+                for kwargs, _ in is_tanimlari
+            ]
+            while True:
+                for i, is_ in enumerate(isler):
+                    if sonuclar[i] is None and is_.ready():
+                        try:
+                            sonuclar[i] = is_.get()
+                        except Exception as exc:
+                            logger.warning("Bilesen %d hata verdi: %s", i, exc)
+                            sonuclar[i] = SolverSonuc(
+                                basarili=False, atamalar=[],
+                                istatistikler={'status': 'BILESEN_HATASI', 'hata': str(exc)[:200]},
+                                sure_ms=0, mesaj=f"Bilesen hata verdi: {str(exc)[:120]}"
+                            )
+                bitti = all(s is not None for s in sonuclar)
+                basarisiz_var = any(s is not None and not s.basarili for s in sonuclar)
+                iptal = solver.iptal_olayi is not None and solver.iptal_olayi.is_set()
+                if bitti or basarisiz_var or iptal or time.time() > son_an:
+                    break
+                time.sleep(0.05)
+        finally:
+            havuz.terminate()
+            havuz.join()
+
+        bilgi['bilesen_durumlari'] = [
+            s.istatistikler.get('status') if s is not None else 'UNKNOWN' for s in sonuclar
+        ]
+        bilgi['bilesen_sure_ms'] = [s.sure_ms if s is not None else None for s in sonuclar]
+        basarisiz = [i for i, s in enumerate(sonuclar) if s is None or not s.basarili]
+        if basarisiz:
+            ilk = sonuclar[basarisiz[0]]
+            status = ilk.istatistikler.get('status', 'UNKNOWN') if ilk is not None else 'UNKNOWN'
+            return self._basarisiz(
+                baslangic, status,
+                f"Bilesen ayristirmasi: {len(basarisiz)}/{len(sonuclar)} bilesen cozulemedi ({status})", bilgi)
+
+        atama_kumesi = set()
+        for (_, slot_eslemesi), sonuc in zip(is_tanimlari, sonuclar):
+            for a in sonuc.atamalar:
+                atama_kumesi.add((a['personel_id'], a['gun'], slot_eslemesi[a['slot_idx']]))
+        pid_sira = {p.id: i for i, p in enumerate(solver.personel_listesi)}
+        atamalar = [
+            solver._atama_kaydi(solver.personeller[pid], g, s)
+            for pid, g, s in sorted(atama_kumesi, key=lambda a: (a[1], a[2], pid_sira[a[0]]))
+        ]
+        solver.onceki_cozum = atama_kumesi or None
+        tum_optimal = all(s.istatistikler.get('status') == 'OPTIMAL' for s in sonuclar)
+        bos_slot_sayisi = solver.gun_sayisi * solver.slot_sayisi - len(atamalar)
+        istatistikler = {
+            'status': 'OPTIMAL' if tum_optimal else 'FEASIBLE',
+            'objective': sum(s.istatistikler.get('objective', 0) or 0 for s in sonuclar),
+            'solver_status_name': 'BILESEN_AYRISTIRMA',
+            'bilesen_ayristirma': bilgi,
+            **solver._cozum_istatistikleri(atamalar, bos_slot_sayisi),
+        }
+        mesaj = 'OPTIMAL' if tum_optimal else 'FEASIBLE'
+        return SolverSonuc(basarili=True, atamalar=atamalar, istatistikler=istatistikler,
+                           sure_ms=int((time.time() - baslangic) * 1000),
+                           mesaj=f"{mesaj} ({len(bilesenler)} bilesen)")
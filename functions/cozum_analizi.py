@@ -0,0 +1,253 @@
+"""
+Çözüm analizi — kişi × gün atama matrisi bir kez kurulur; kalite skoru, plan sapmaları,
+birlikte grup günleri ve kişi özetleri bu matristen vektörel olarak türetilir.
+Çıktı formatları NobetSolver / main.py'deki eski döngülerle aynıdır.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Set
+
+import numpy as np
+
+from utils import GUN_TIPLERI, SAAT_DEGERLERI
+
+_TIP_SAATLERI = np.array([SAAT_DEGERLERI.get(tip, 8) for tip in GUN_TIPLERI], dtype=np.float64)
+
+
+@dataclass
+class CozumMatrisi:
+    """Bir çözümün yoğun gösterimi (kişi başına gün başına en fazla bir slot, H3).
+
+    Eksen sıraları: kişi = personel listesi, gün = 1..gun_sayisi, tip = GUN_TIPLERI,
+    rol = rol_adlari.
+    """
+    kisi_gun_slot: Any              # [i, g-1] atanan slot_idx, boşsa -1
+    gun_tip: Any                    # [g-1] GUN_TIPLERI indeksi
+    slot_rol: Any                   # [s] rol indeksi
+    rol_adlari: List[str]
+    kisi_gun: Any = field(init=False)      # [i, g-1] bool
+    kisi_toplam: Any = field(init=False)   # [i]
+    kisi_tip: Any = field(init=False)      # [i, tip]
+    kisi_rol: Any = field(init=False)      # [i, rol]
+
+    def __post_init__(self):
+        kisi_sayisi = self.kisi_gun_slot.shape[0]
+        self.kisi_gun = self.kisi_gun_slot >= 0
+        self.kisi_toplam = self.kisi_gun.sum(axis=1)
+        tip_birebir = np.eye(len(GUN_TIPLERI), dtype=np.int64)[self.gun_tip]
+        self.kisi_tip = self.kisi_gun.astype(np.int64) @ tip_birebir
+        i_dizi, g0_dizi = self.kisi_gun.nonzero()
+        self.kisi_rol = np.zeros((kisi_sayisi, len(self.rol_adlari)), dtype=np.int64)
+        np.add.at(self.kisi_rol, (i_dizi, self.slot_rol[self.kisi_gun_slot[i_dizi, g0_dizi]]), 1)
+
+    @property
+    def toplam_atama(self) -> int:
+        return int(self.kisi_toplam.sum())
+
+
+def cozum_matrisi_olustur(kisi_sayisi: int, gun_tipi_adlari: Sequence[str],
+                          slot_rol_adlari: Sequence[str], hucreler: tuple,
+                          rol_adlari: Sequence[str] = None) -> CozumMatrisi:
+    """Atanan hücrelerden (i, g0, s dizileri) matrisi kur.
+
+    gun_tipi_adlari[g-1]: günün tipi; slot_rol_adlari[s]: slotun rolü (base_name).
+    rol_adlari verilmezse slot sırasıyla ilk görülen roller kullanılır.
+    """
+    rol_adlari = list(rol_adlari) if rol_adlari is not None else list(dict.fromkeys(slot_rol_adlari))
+    rol_index = {rol: r for r, rol in enumerate(rol_adlari)}
+    kisi_gun_slot = np.full((kisi_sayisi, len(gun_tipi_adlari)), -1, dtype=np.int64)
+    i_dizi, g0_dizi, s_dizi = (np.asarray(d, dtype=np.int64) for d in hucreler)
+    kisi_gun_slot[i_dizi, g0_dizi] = s_dizi
+    return CozumMatrisi(
+        kisi_gun_slot=kisi_gun_slot,
+        gun_tip=np.array([GUN_TIPLERI.index(t) for t in gun_tipi_adlari], dtype=np.int64),
+        slot_rol=np.array([rol_index[r] for r in slot_rol_adlari], dtype=np.int64),
+        rol_adlari=rol_adlari,
+    )
+
+
+def atamalardan_matris(atamalar: List[Dict], personel_ids: Sequence, gun_tipi_adlari: Sequence[str],
+                       slot_rol_adlari: Sequence[str], rol_adlari: Sequence[str] = None) -> CozumMatrisi:
+    """Sonuç atama dict'lerinden matris; listede olmayan kişiler atlanır."""
+    pid_index = {pid: i for i, pid in enumerate(personel_ids)}
+    gecerli = [a for a in atamalar if a.get('personel_id') in pid_index]
+    return cozum_matrisi_olustur(len(personel_ids), gun_tipi_adlari, slot_rol_adlari, (
+        [pid_index[a['personel_id']] for a in gecerli],
+        [int(a['gun']) - 1 for a in gecerli],
+        [int(a['slot_idx']) for a in gecerli],
+    ), rol_adlari)
+
+
+def kisi_sayaclari(m: CozumMatrisi, personel_ids: Sequence) -> Dict:
+    """{pid: {'toplam', 'tipler', 'gorevler'}} — gorevler sadece atanan rolleri içerir."""
+    sayac = {}
+    for i, pid in enumerate(personel_ids):
+        sayac[pid] = {
+            'toplam': int(m.kisi_toplam[i]),
+            'tipler': dict(zip(GUN_TIPLERI, m.kisi_tip[i].tolist())),
+            'gorevler': {rol: adet for rol, adet in zip(m.rol_adlari, m.kisi_rol[i].tolist()) if adet},
+        }
+    return sayac
+
+
+def _std(degerler) -> float:
+    return float(np.sqrt(np.mean((degerler - degerler.mean()) ** 2))) if len(degerler) else 0.0
+
+
+def kalite_skoru(m: CozumMatrisi, hedef_toplamlari: Sequence[int], toplam_slot: int) -> Dict:
+    """Çözüm kalitesi metrikleri (denge, saat adaleti, homojenlik, doluluk, hedef uyumu)."""
+    nobet = m.kisi_toplam.astype(np.float64)
+    ortalama = float(nobet.mean()) if len(nobet) else 0
+    # 1. Denge puanı: max-min farkının ortalamaya oranı (düşük = iyi)
+    denge_puani = round(float((nobet.max() - nobet.min()) / ortalama * 100), 1) if ortalama > 0 else 0
+
+    # 2. Saat adaleti: saat dağılımının standart sapması
+    saatler = m.kisi_tip @ _TIP_SAATLERI
+    ortalama_saat = float(saatler.mean()) if len(saatler) else 0
+    saat_adaleti = round(_std(saatler) / ortalama_saat * 100, 1) if ortalama_saat > 0 else 0
+
+    # 3. Homojenlik: aynı kişinin ardışık nöbet günleri arasındaki aralıkların standart sapması
+    i_dizi, g0_dizi = m.kisi_gun.nonzero()
+    ayni_kisi = i_dizi[1:] == i_dizi[:-1]
+    araliklar = np.diff(g0_dizi)[ayni_kisi].astype(np.float64)
+    homojenlik = round(_std(araliklar), 2) if len(araliklar) else 0
+
+    # 4. Doluluk yüzdesi
+    toplam_atama = m.toplam_atama
+    doluluk = round(100 * toplam_atama / toplam_slot, 1) if toplam_slot > 0 else 0
+
+    # 5. Hedef uyumu: hedeften sapma yüzdesi
+    hedef = np.asarray(hedef_toplamlari, dtype=np.float64)
+    hedefli = hedef > 0
+    if hedefli.any():
+        sapma = np.abs(nobet[hedefli] - hedef[hedefli]) / hedef[hedefli]
+        kural_uyumu = round(float((1 - sapma.mean()) * 100), 1)
+    else:
+        kural_uyumu = 100
+
+    return {
+        'denge_puani': denge_puani,
+        'saat_adaleti': saat_adaleti,
+        'homojenlik': homojenlik,
+        'doluluk': doluluk,
+        'kural_uyumu': kural_uyumu
+    }
+
+
+def plan_sapmalari(m: CozumMatrisi, personel_listesi: Sequence, hedefler: Dict,
+                   planlanan_gunler_map: Dict[Any, Set[int]], plan_kontrati: Dict) -> Dict:
+    """Plan kontratına göre kişi bazlı toplam / gün tipi / görev / gün sapmaları."""
+    rol_index = {rol: r for r, rol in enumerate(m.rol_adlari)}
+    hedef_tip = np.array([
+        [(hedefler.get(p.id, {}).get('hedef_tipler', {}) or {}).get(tip, 0) for tip in GUN_TIPLERI]
+        for p in personel_listesi
+    ], dtype=np.int64).reshape(len(personel_listesi), len(GUN_TIPLERI))
+    tip_fark = m.kisi_tip - hedef_tip
+
+    detay = []
+    tam_uyumlu = 0
+    toplam_sapma = 0
+    tip_sapma_toplami = 0
+    gorev_sapma_toplami = 0
+    gun_sapma_toplami = 0
+    for i, p in enumerate(personel_listesi):
+        hedef = hedefler.get(p.id, {})
+        if not hedef:
+            continue
+        tip_sapmalari = {tip: int(fark) for tip, fark in zip(GUN_TIPLERI, tip_fark[i].tolist()) if fark != 0}
+        tip_sapma_toplami += sum(abs(fark) for fark in tip_sapmalari.values())
+
+        gorev_sapmalari = {}
+        for gorev_adi, kota in (hedef.get('gorev_kotalari', {}) or {}).items():
+            r = rol_index.get(gorev_adi)
+            fark = (int(m.kisi_rol[i, r]) if r is not None else 0) - kota
+            if fark != 0:
+                gorev_sapmalari[gorev_adi] = fark
+                gorev_sapma_toplami += abs(fark)
+
+        gercek_toplam = int(m.kisi_toplam[i])
+        toplam_fark = gercek_toplam - hedef.get('hedef_toplam', 0)
+        toplam_sapma += abs(toplam_fark)
+        planlanan_gunler = set(planlanan_gunler_map.get(p.id, set()))
+        gercek_gunler = set((m.kisi_gun[i].nonzero()[0] + 1).tolist())
+        eksik_gunler = sorted(planlanan_gunler - gercek_gunler)
+        ekstra_gunler = sorted(gercek_gunler - planlanan_gunler)
+        gun_sapma_toplami += len(eksik_gunler) + len(ekstra_gunler)
+
+        if toplam_fark == 0 and not tip_sapmalari and not gorev_sapmalari and not eksik_gunler and not ekstra_gunler:
+            tam_uyumlu += 1
+
+        detay.append({
+            'personel_id': p.id,
+            'personel_ad': p.ad,
+            'hedef_toplam': hedef.get('hedef_toplam', 0),
+            'gercek_toplam': gercek_toplam,
+            'toplam_fark': toplam_fark,
+            'tip_sapmalari': tip_sapmalari,
+            'gorev_sapmalari': gorev_sapmalari,
+            'planlanan_gunler': sorted(planlanan_gunler),
+            'gercek_gunler': sorted(gercek_gunler),
+            'eksik_gunler': eksik_gunler,
+            'ekstra_gunler': ekstra_gunler,
+        })
+
+    return {
+        'plan_hash': plan_kontrati.get('plan_hash'),
+        'kaynak': plan_kontrati.get('kaynak'),
+        'tam_uyumlu_personel': tam_uyumlu,
+        'personel_sayisi': len(detay),
+        'toplam_sapma': toplam_sapma,
+        'tip_sapma_toplami': tip_sapma_toplami,
+        'gorev_sapma_toplami': gorev_sapma_toplami,
+        'gun_sapma_toplami': gun_sapma_toplami,
+        'detay': detay,
+    }
+
+
+def birlikte_uyumlu_gunler(m: CozumMatrisi, uye_indeksleri: Sequence[int], slot_aile: Sequence[int]) -> List[tuple]:
+    """Grubun en az iki üyesinin aynı görev ailesinde çalıştığı günler.
+
+    Birden fazla aile uyarsa üye sırasında ilk görülen aile seçilir.
+    Returns: [(gun, aile_idx, [grup içi üye sırası])]
+    """
+    if len(uye_indeksleri) < 2:
+        return []
+    slot_aile = np.asarray(slot_aile, dtype=np.int64)
+    alt = m.kisi_gun_slot[np.asarray(uye_indeksleri, dtype=np.int64)]          # [k, D]
+    aile = np.where(alt >= 0, slot_aile[np.maximum(alt, 0)], -1)               # [k, D]
+    aile_sayisi = int(slot_aile.max()) + 1 if len(slot_aile) else 0
+    birebir = aile[:, :, None] == np.arange(aile_sayisi)[None, None, :]        # [k, D, F]
+    sayi = birebir.sum(axis=0)                                                  # [D, F]
+    k = alt.shape[0]
+    ilk_uye = np.where(birebir, np.arange(k)[:, None, None], k).min(axis=0)    # [D, F]
+    ilk_uye = np.where(sayi >= 2, ilk_uye, k)
+    secilen = ilk_uye.argmin(axis=1)                                            # [D]
+    sonuc = []
+    for g0 in np.nonzero(ilk_uye.min(axis=1) < k)[0].tolist():
+        f = int(secilen[g0])
+        sonuc.append((g0 + 1, f, np.nonzero(aile[:, g0] == f)[0].tolist()))
+    return sonuc
+
+
+def kisi_ozeti(m: CozumMatrisi, personel_adlari: Sequence[str], hedef_listesi: Sequence[Dict]) -> tuple:
+    """nobet_dagit çıktısı için (kisi_ozet, eksik_atamalar)."""
+    kisi_ozet = []
+    eksik_atamalar = []
+    for ad, h, gerceklesen in zip(personel_adlari, hedef_listesi, m.kisi_toplam.tolist()):
+        hedef_toplam = h.get('hedef_toplam', 0)
+        fark = hedef_toplam - gerceklesen
+        hedef_tipler = h.get('hedef_tipler', {})
+        kisi_ozet.append({
+            "ad": ad, "hedef": hedef_toplam, "gerceklesen": gerceklesen, "fark": fark,
+            "kalanHici": hedef_tipler.get('hici', 0),
+            "kalanPrs": hedef_tipler.get('prs', 0),
+            "kalanCum": hedef_tipler.get('cum', 0),
+            "kalanCmt": hedef_tipler.get('cmt', 0),
+            "kalanPzr": hedef_tipler.get('pzr', 0),
+        })
+        if fark > 0:
+            eksik_atamalar.append({
+                "personel": ad, "eksik": fark,
+                "detay": {tip: hedef_tipler.get(tip, 0) for tip in ("hici", "prs", "cum", "cmt", "pzr")},
+            })
+    return kisi_ozet, eksik_atamalar
@@ -18,8 +18,7 @@ from utils import (
     ESDEGER_TIP_GRUPLARI,
     GUN_TIPLERI,
     SAAT_DEGERLERI,
-    birlikte_aile_anahtari,
-    find_matching_id,
+    IdRegistry,
     normalize_id,
 )
 
@@ -37,10 +36,12 @@ class GunIskeletPlanlayici:
         ara_gun: int = 2,
         gorev_kisitlamalari: Optional[Dict[int, dict]] = None,
         gorev_havuzlari: Optional[Dict[str, Set[int]]] = None,
+        kayit: Optional[IdRegistry] = None,
     ):
         self.gun_sayisi = gun_sayisi
         self.gun_tipleri = gun_tipleri
         self.personeller = {normalize_id(p.id): p for p in personeller}
+        self.kayit = kayit if kayit is not None else IdRegistry(personeller)
         self.personel_listesi = personeller
         self.gorevler = gorevler
         self.hedefler_map = hedefler_map or {}
@@ -71,7 +72,7 @@ class GunIskeletPlanlayici:
             base = gorev.base_name if gorev.base_name else gorev.ad
             self.role_slots.setdefault(base, []).append(idx)
         self.role_families: Dict[str, str] = {
-            role: birlikte_aile_anahtari(role)
+            role: self.kayit.aile_anahtari(role)
             for role in self.role_slots.keys()
         }
         self.personel_rol_gunleri: Dict[int, Dict[int, str]] = {
@@ -91,6 +92,10 @@ class GunIskeletPlanlayici:
         self._manuel_gunleri_uygula()
         self._hedef_kalanlarini_hazirla()
 
+    def _eslestir(self, raw_pid) -> Optional[int]:
+        norm = self.kayit.normalize(raw_pid)
+        return norm if norm in self.personeller else None
+
     def _ayri_ciftleri_hazirla(self) -> Set[Tuple[int, int]]:
         ciftler: Set[Tuple[int, int]] = set()
         for kural in self.kurallar:
@@ -98,7 +103,7 @@ class GunIskeletPlanlayici:
                 continue
             valid_ids = []
             for raw_pid in kural.kisiler:
-                matched = find_matching_id(raw_pid, self.personeller.keys())
+                matched = self._eslestir(raw_pid)
                 if matched is not None and matched not in valid_ids:
                     valid_ids.append(matched)
             for p1, p2 in combinations(sorted(valid_ids), 2):
@@ -112,7 +117,7 @@ class GunIskeletPlanlayici:
                 continue
             valid_ids = []
             for raw_pid in kural.kisiler:
-                matched = find_matching_id(raw_pid, self.personeller.keys())
+                matched = self._eslestir(raw_pid)
                 if matched is not None and matched not in valid_ids:
                     valid_ids.append(matched)
             if len(valid_ids) >= 2:
@@ -129,7 +134,7 @@ class GunIskeletPlanlayici:
             g: {} for g in range(1, self.gun_sayisi + 1)
         }
         for atama in self.manuel_atamalar:
-            pid = find_matching_id(atama.personel_id, self.personeller.keys())
+            pid = self._eslestir(atama.personel_id)
             gun = int(getattr(atama, "gun", 0) or 0)
             if pid is None or gun < 1 or gun > self.gun_sayisi:
                 continue
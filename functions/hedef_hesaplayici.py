@@ -8,9 +8,8 @@ from typing import List, Dict
 
 from utils import (
     GUN_TIPLERI, SAAT_DEGERLERI,
-    find_matching_id,
-    birlikte_aile_anahtari,
     BIRLIKTE_ESDEGER_GOREV_AILE_ADI,
+    IdRegistry, id_indeksi,
 )
 from solver_models import (
     SolverPersonel, SolverGorev, SolverKural, SolverAtama,
@@ -40,10 +39,12 @@ class HedefHesaplayici:
                  gorev_kisitlamalari: Dict[int, str] = None,
                  manuel_atamalar: List[SolverAtama] = None,
                  ara_gun: int = 2, saat_degerleri: Dict[str, int] = None,
-                 kilitli_hedefler: Dict[int, Dict[str, int]] = None):
+                 kilitli_hedefler: Dict[int, Dict[str, int]] = None,
+                 kayit: IdRegistry = None):
         self.gun_sayisi = gun_sayisi
         self.gun_tipleri = gun_tipleri
         self.personeller = {p.id: p for p in personeller}
+        self.kayit = kayit if kayit is not None else IdRegistry(personeller)
         self.personel_listesi = personeller
         self.gorevler = gorevler
         self.birlikte_kurallar = birlikte_kurallar or []
@@ -53,6 +54,7 @@ class HedefHesaplayici:
         self.saat = saat_degerleri or SAAT_DEGERLERI
         self.slot_sayisi = len(gorevler) if gorevler else 6
         self.kilitli_hedefler = kilitli_hedefler or {}
+        self._kilitli_indeks = id_indeksi(self.kilitli_hedefler.keys())
 
         self.tip_sayilari = {t: 0 for t in GUN_TIPLERI}
         for g, tip in gun_tipleri.items():
@@ -62,6 +64,14 @@ class HedefHesaplayici:
         self.toplam_slot = sum(self.tip_slotlari.values())
         self._hesapla_kapasiteler()
 
+    def _eslestir(self, raw_pid):
+        """Ham personel ID'sini personel ID'sine eşle (kayıt üzerinden O(1))."""
+        pid = self.kayit.eslestir(raw_pid)
+        return pid if pid in self.personeller else None
+
+    def _kilitli_eslestir(self, pid):
+        return self._kilitli_indeks.get(self.kayit.normalize(pid))
+
     def _hesapla_kapasiteler(self):
         for p in self.personel_listesi:
             p.musait_tipler = {t: 0 for t in GUN_TIPLERI}
@@ -323,6 +333,7 @@ class HedefHesaplayici:
                 slot_sayisi += sum(1 for g in self.gorevler if g.base_name == tasma or g.ad == tasma)
             if slot_sayisi > 0:
                 kisitli_kapasite[pid] = slot_sayisi * self.gun_sayisi
+        kisitli_indeks = id_indeksi(kisitli_kapasite.keys())
 
         # Manuel atama sayacı
         manuel_sayac = {p.id: {tip: 0 for tip in GUN_TIPLERI} for p in self.personel_listesi}
@@ -330,7 +341,7 @@ class HedefHesaplayici:
             if m.personel_id is None:
                 continue
             tip = self.gun_tipleri.get(m.gun, 'hici')
-            matched_id = find_matching_id(m.personel_id, manuel_sayac.keys())
+            matched_id = self._eslestir(m.personel_id)
             if matched_id is not None:
                 manuel_sayac[matched_id][tip] += 1
 
@@ -339,7 +350,7 @@ class HedefHesaplayici:
         kilitli_toplam_slot = 0  # Kilitli kişilerin kapladığı toplam slot
         for p in self.personel_listesi:
             pid = p.id
-            matched_kilitli = find_matching_id(pid, self.kilitli_hedefler.keys())
+            matched_kilitli = self._kilitli_eslestir(pid)
             if matched_kilitli is not None:
                 # Kilitli kişi: hedefi frontend'den gelen sabit değere ayarla
                 kilitli = self.kilitli_hedefler[matched_kilitli]
@@ -378,7 +389,7 @@ class HedefHesaplayici:
             max_kapasite = sum(p.musait_tipler.get(tip, 0) for tip in GUN_TIPLERI)
 
             # Görev kısıtlaması varsa kapasiteyi sınırla
-            matched_kisitli = find_matching_id(pid, kisitli_kapasite.keys())
+            matched_kisitli = kisitli_indeks.get(self.kayit.normalize(pid))
             if matched_kisitli is not None:
                 max_kapasite = min(max_kapasite, kisitli_kapasite[matched_kisitli])
 
@@ -496,7 +507,7 @@ class HedefHesaplayici:
             grup = []
             grup_adlar = []
             for pid in kural.kisiler:
-                matched_id = find_matching_id(pid, self.personeller.keys())
+                matched_id = self._eslestir(pid)
                 if matched_id is not None:
                     grup.append(matched_id)
                     grup_adlar.append(self.personeller[matched_id].ad)
@@ -559,7 +570,7 @@ class HedefHesaplayici:
             for tip in GUN_TIPLERI:
                 ihtiyac = self.tip_slotlari[tip]
                 toplam_musait = sum(p.musait_tipler.get(tip, 0) for p in self.personel_listesi if p.id not in kilitli_ids)
-                kilitli_tip = sum(self.kilitli_hedefler.get(find_matching_id(pid, self.kilitli_hedefler.keys()) or -1, {}).get(tip, 0) for pid in kilitli_ids)
+                kilitli_tip = sum(self.kilitli_hedefler.get(self._kilitli_eslestir(pid) or -1, {}).get(tip, 0) for pid in kilitli_ids)
                 kalan_ihtiyac = ihtiyac - kilitli_tip
                 debug_info.append(f"  {tip}: ihtiyac={ihtiyac}, kilitli={kilitli_tip}, kalan={kalan_ihtiyac}, musait={toplam_musait}")
 
@@ -572,7 +583,7 @@ class HedefHesaplayici:
                     toplam_upper += sum(p.hedef_tipler.values())
                     continue
                 mk = sum(p.musait_tipler.get(tip, 0) for tip in GUN_TIPLERI)
-                matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                 if matched_k is not None:
                     mk = min(mk, kisitli_kapasite[matched_k])
                 ub = min(mk, HARD_CAP)
@@ -600,7 +611,7 @@ class HedefHesaplayici:
                     t1[pid] = m1.NewIntVar(kv, kv, f't1_{pid}')
                 else:
                     mk = sum(p.musait_tipler.get(tp, 0) for tp in GUN_TIPLERI)
-                    matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                    matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                     if matched_k is not None:
                         mk = min(mk, kisitli_kapasite[matched_k])
                     ub = min(mk, HARD_CAP)
@@ -645,7 +656,7 @@ class HedefHesaplayici:
                     for tip in GUN_TIPLERI:
                         h3[pid, tip] = m3.NewIntVar(0, p.musait_tipler.get(tip, 0), f'h3_{pid}_{tip}')
                     mk = sum(p.musait_tipler.get(tp, 0) for tp in GUN_TIPLERI)
-                    matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                    matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                     if matched_k is not None:
                         mk = min(mk, kisitli_kapasite[matched_k])
                     ub = min(mk, HARD_CAP)
@@ -676,7 +687,7 @@ class HedefHesaplayici:
                     for tip in GUN_TIPLERI:
                         h4[pid, tip] = m4.NewIntVar(0, p.musait_tipler.get(tip, 0), f'h4_{pid}_{tip}')
                     mk = sum(p.musait_tipler.get(tp, 0) for tp in GUN_TIPLERI)
-                    matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                    matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                     if matched_k is not None:
                         mk = min(mk, kisitli_kapasite[matched_k])
                     ub = min(mk, HARD_CAP)
@@ -714,7 +725,7 @@ class HedefHesaplayici:
                     for tip in GUN_TIPLERI:
                         h5[pid, tip] = m5.NewIntVar(0, p.musait_tipler.get(tip, 0), f'h5_{pid}_{tip}')
                     mk = sum(p.musait_tipler.get(tp, 0) for tp in GUN_TIPLERI)
-                    matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                    matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                     if matched_k is not None:
                         mk = min(mk, kisitli_kapasite[matched_k])
                     ub = min(mk, HARD_CAP)
@@ -751,7 +762,7 @@ class HedefHesaplayici:
                     for tip in GUN_TIPLERI:
                         h6[pid, tip] = m6.NewIntVar(0, p.musait_tipler.get(tip, 0), f'h6_{pid}_{tip}')
                     mk = sum(p.musait_tipler.get(tp, 0) for tp in GUN_TIPLERI)
-                    matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                    matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                     if matched_k is not None:
                         mk = min(mk, kisitli_kapasite[matched_k])
                     ub = min(mk, HARD_CAP)
@@ -783,7 +794,7 @@ class HedefHesaplayici:
                     continue
                 h_sum_ub = sum(p.musait_tipler.get(tip, 0) for tip in GUN_TIPLERI)
                 mk = h_sum_ub
-                matched_k = find_matching_id(pid, kisitli_kapasite.keys())
+                matched_k = kisitli_indeks.get(self.kayit.normalize(pid))
                 if matched_k is not None:
                     mk = min(mk, kisitli_kapasite[matched_k])
                 ub = min(mk, HARD_CAP)
@@ -841,7 +852,7 @@ class HedefHesaplayici:
                 grup_adlar = []
                 gecerli_pids = []
                 for pid in kural.kisiler:
-                    matched_id = find_matching_id(pid, self.personeller.keys())
+                    matched_id = self._eslestir(pid)
                     if matched_id is not None:
                         p = self.personeller[matched_id]
                         grup_adlar.append(p.ad)
@@ -855,7 +866,7 @@ class HedefHesaplayici:
                             continue
                         esdeger_aile_toplamlari[p.ad] = sum(
                             kota for gorev, kota in (p.gorev_kotalari or {}).items()
-                            if birlikte_aile_anahtari(gorev) == BIRLIKTE_ESDEGER_GOREV_AILE_ADI
+                            if self.kayit.aile_anahtari(gorev) == BIRLIKTE_ESDEGER_GOREV_AILE_ADI
                         )
                     birlikte_bilgi.append({
                         'kisiler': grup_adlar,
@@ -875,7 +886,7 @@ class HedefHesaplayici:
             else:
                 ana_gorev = kisit_bilgi
                 tasma = None
-            matched_id = find_matching_id(pid, self.personeller.keys())
+            matched_id = self._eslestir(pid)
             if matched_id is not None:
                 p = self.personeller[matched_id]
                 kisitlama_bilgi.append({
@@ -933,7 +944,7 @@ class HedefHesaplayici:
                 tasma = None
             if not ana_gorev:
                 continue
-            matched_pid = find_matching_id(pid, {p.id: p for p in self.personel_listesi})
+            matched_pid = self._eslestir(pid)
             if matched_pid is None:
                 continue
             gorev_kisitli.setdefault(ana_gorev, []).append(matched_pid)
@@ -0,0 +1,529 @@
+"""
+Iki asamali nobet cozucu — buyuk cizelgeler icin P×D×S modeli yerine:
+Asama 1: kisi-gun "calisiyor" modeli (ara gun, gun tipi kotalari, haftalik yayilim,
+         birlikte ayni gun, toplam hedef, gun iskeleti)
+Asama 2: her gunun rol/slot atamasi ayri ve paralel (exclusive/havuz uygunlugu,
+         rol bazli ayri tutma, gorev kotalari)
+Bir gun asama 2'de cozulemezse o gunun calisan kumesi asama 1'e kesim olarak
+eklenir ve asama 1 yeniden cozulur. Sonuc NobetSolver.coz() ile ayni formattadir;
+basarisizsa cagiran tek parca modele gecer.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ortools_solver import NobetSolver, _ara_gun_pencereleri, _get_cp_model
+from solver_models import (
+    SolverSonuc,
+    WEIGHT_GUN_TIPI, WEIGHT_HOMOJEN, WEIGHT_TOPLAM, WEIGHT_BIRLIKTE,
+)
+from utils import GUN_TIPLERI
+
+logger = logging.getLogger(__name__)
+
+# Bu hücre sayısının (personel × gün × slot) altında tek parça model tercih edilir
+IKI_ASAMA_ESIGI = 20000
+_MAX_TUR = 6
+_WEIGHT_BOS_SLOT = 100000          # ortools_solver S0 ile aynı
+_WEIGHT_ROL_SAPMA = 10             # asama 2: planlanan rol dışına çıkma
+_WEIGHT_BIRLIKTE_AILE = 2000       # asama 2: birlikte üyeleri farklı ailede
+
+
+def iki_asama_uygun_mu(personel_sayisi: int, gun_sayisi: int, slot_sayisi: int,
+                       esik: int = IKI_ASAMA_ESIGI) -> bool:
+    """Cizelge boyutu iki asamali motor icin esigi asiyor mu."""
+    return personel_sayisi * gun_sayisi * slot_sayisi >= esik
+
+
+class IkiAsamaliCozucu:
+    """NobetSolver'in durumunu (uygunluk, kurallar, hedefler, plan) kullanan iki asamali motor.
+
+    Asama 2'nin rol secimi GunIskeletPlanlayici._rol_dagitimi_yap ile ayni fikri izler:
+    kotali roller, gunluk rol kapasitesine uyularak kisi-gunlere once dagitilir;
+    kotali bir role kisi sadece bu dagitimin verdigi gunde yazilabilir (ust sinir
+    boylece paralel gunlerde de asilmaz). Ayri binaya birlikte uyeleri yazilmaz
+    (H9'un siki hali).
+    """
+
+    def __init__(self, solver: NobetSolver, max_sure: float = None, isci_sayisi: int = None):
+        self.solver = solver
+        self.max_sure = float(max_sure if max_sure is not None else solver.max_sure)
+        self.isci_sayisi = isci_sayisi or min(8, os.cpu_count() or 1)
+        self.gun_sayisi = solver.gun_sayisi
+        self.slot_sayisi = solver.slot_sayisi
+        self.slot_rolleri = [solver._role_name_by_slot(s) for s in range(self.slot_sayisi)]
+        self.pid_index = {p.id: i for i, p in enumerate(solver.personel_listesi)}
+        self.uygun = self._uygun_maske()
+        self.manuel_slotlari = {(pid, g): s for pid, g, s in solver.manuel_slot_set}
+
+    # ------------------------------------------------------------------
+    # Ortak hazırlık
+    # ------------------------------------------------------------------
+
+    def _uygun_maske(self):
+        """Normal moddaki (gevşetme durumuyla) uygunluk maskesi + H9 siki hali."""
+        solver = self.solver
+        uygun = solver._uygunluk(gevsek=not solver.exclusive_aktif).uygun.copy()
+        if solver.exclusive_aktif and solver.gevsek_eleme:
+            eleme_hucreleri = solver._eleme_hucreleri()
+            for anahtar in solver.gevsek_eleme:
+                if anahtar in eleme_hucreleri:
+                    uygun[eleme_hucreleri[anahtar]] = True
+        if solver._plan_aktif_mi():
+            # Plan aktifken kotası 0 olan role yazılamaz
+            for pid, i in self.pid_index.items():
+                for rol, kota in self._kotalar(pid).items():
+                    if kota <= 0:
+                        for s in solver.role_slots[rol]:
+                            uygun[i, :, s] = False
+                for g, s in ((g, s) for p2, g, s in solver.manuel_slot_set if p2 == pid):
+                    uygun[i, g - 1, s] = True
+        ayri_bina_slotlar = [s for s, gorev in enumerate(solver.gorevler) if getattr(gorev, 'ayri_bina', False)]
+        if ayri_bina_slotlar:
+            for pid in solver._birlikte_uye_ids():
+                i = self.pid_index[pid]
+                for g in range(1, self.gun_sayisi + 1):
+                    if (pid, g) in solver.birlikte_istisna_set:
+                        continue
+                    for s in ayri_bina_slotlar:
+                        if (pid, g, s) not in solver.manuel_slot_set:
+                            uygun[i, g - 1, s] = False
+        return uygun
+
+    def _kotalar(self, pid: int) -> Dict[str, int]:
+        kotalar = self.solver.hedefler.get(pid, {}).get('gorev_kotalari', {}) or {}
+        return {rol: int(kota or 0) for rol, kota in kotalar.items() if rol in self.solver.role_slots}
+
+    # ------------------------------------------------------------------
+    # Aşama 1: kişi-gün modeli
+    # ------------------------------------------------------------------
+
+    def _asama1_kur(self, cp):
+        solver = self.solver
+        model = cp.CpModel()
+        w = {}
+        for i, p in enumerate(solver.personel_listesi):
+            aday_gun = self.uygun[i].any(axis=1)
+            for g in range(1, self.gun_sayisi + 1):
+                if aday_gun[g - 1]:
+                    w[p.id, g] = model.NewBoolVar(f'w_{p.id}_{g}')
+
+        penalties = []
+        plan_carpani = solver._plan_penalty_multiplier()
+
+        # Gün kapasitesi + aynı uygun slot kümesine sıkışan kişiler için Hall koşulu
+        for g in range(1, self.gun_sayisi + 1):
+            gun_kisileri = [p.id for p in solver.personel_listesi if (p.id, g) in w]
+            imzalar = {}
+            for pid in gun_kisileri:
+                imza = frozenset(self.uygun[self.pid_index[pid], g - 1].nonzero()[0].tolist())
+                imzalar.setdefault(imza, []).append(pid)
+            for imza in imzalar:
+                if len(imza) >= self.slot_sayisi:
+                    continue
+                kapsanan = [pid for alt, kisiler in imzalar.items() if alt <= imza for pid in kisiler]
+                if len(kapsanan) > len(imza):
+                    model.Add(sum(w[pid, g] for pid in kapsanan) <= len(imza))
+            calisan = sum(w[pid, g] for pid in gun_kisileri)
+            model.Add(calisan <= self.slot_sayisi)
+            bos = model.NewIntVar(0, self.slot_sayisi, f'bos_{g}')
+            model.Add(bos == self.slot_sayisi - calisan)
+            penalties.append(bos * _WEIGHT_BOS_SLOT)
+
+        # H6. Manuel atamalar
+        for pid, g in self.manuel_slotlari:
+            if (pid, g) in w:
+                model.Add(w[pid, g] == 1)
+
+        # H4. Ara gün — kayan pencere klikleri (kişi bazlı gevşetme dahil)
+        istisnalar_by_pid = {}
+        for pid, g1, g2 in solver.aragun_istisna_set:
+            istisnalar_by_pid.setdefault(pid, set()).add((g1, g2))
+        for p in solver.personel_listesi:
+            gunler = [g for g in range(1, self.gun_sayisi + 1) if (p.id, g) in w]
+            klikler = _ara_gun_pencereleri(gunler, solver._kisi_ara_gunu(p.id), istisnalar_by_pid.get(p.id, set()))
+            for klik in klikler:
+                model.AddAtMostOne(w[p.id, g] for g in klik)
+
+        def _toplam(pid, gunler):
+            return sum(w[pid, g] for g in gunler if (pid, g) in w)
+
+        # H5. Ayrı tutma: o gün ikisi de aynı tek role sıkışmışsa ikisi birden çalışamaz
+        for kural in solver.kurallar:
+            if kural.tur != 'ayri':
+                continue
+            valid_ids = solver._birlikte_gecerli_ids(kural)
+            for g in range(1, self.gun_sayisi + 1):
+                tek_rol = {}
+                for pid in valid_ids:
+                    if (pid, g) not in w:
+                        continue
+                    roller = {self.slot_rolleri[s] for s in self.uygun[self.pid_index[pid], g - 1].nonzero()[0].tolist()}
+                    if len(roller) == 1:
+                        tek_rol.setdefault(roller.pop(), []).append(pid)
+                for kisiler in tek_rol.values():
+                    serbest = [pid for pid in kisiler if (pid, g) not in solver.manuel_kisi_gunleri]
+                    if len(kisiler) >= 2 and len(serbest) >= len(kisiler) - 1:
+                        model.AddAtMostOne(w[pid, g] for pid in kisiler)
+
+        # Sadece kotalı rollere uygun olunan günler kota toplamını aşamaz
+        # (aşama 2'de kotalı role sadece rol dağıtımının verdiği gün yazılabilir)
+        for p in solver.personel_listesi:
+            kotalar = self._kotalar(p.id)
+            if not kotalar:
+                continue
+            i = self.pid_index[p.id]
+            serbest_slotlar = [s for s in range(self.slot_sayisi) if self.slot_rolleri[s] not in kotalar]
+            kotali_gunler = [
+                g for g in range(1, self.gun_sayisi + 1)
+                if (p.id, g) in w and (p.id, g) not in self.manuel_slotlari
+                and not self.uygun[i, g - 1, serbest_slotlar].any()
+            ]
+            kota_toplami = sum(kota for kota in kotalar.values() if kota > 0)
+            if len(kotali_gunler) > kota_toplami:
+                model.Add(_toplam(p.id, kotali_gunler) <= kota_toplami)
+
+        for p in solver.personel_listesi:
+            hedef = solver.hedefler.get(p.id, {})
+            # S2. Gün tipi kotaları (plan aktifse toleranslı sert sınırlar)
+            hedef_tipler = hedef.get('hedef_tipler', {})
+            for tip in GUN_TIPLERI:
+                tip_gunleri = solver.gunler_by_tip.get(tip, [])
+                if not tip_gunleri:
+                    continue
+                tip_hedef = hedef_tipler.get(tip, 0)
+                tip_atama = _toplam(p.id, tip_gunleri)
+                if solver._plan_aktif_mi():
+                    tol = solver._plan_gun_tipi_toleransi()
+                    model.Add(tip_atama <= tip_hedef + tol)
+                    model.Add(tip_atama >= max(0, tip_hedef - tol))
+                fazla = model.NewIntVar(0, len(tip_gunleri), f'tip_fazla_{p.id}_{tip}')
+                eksik = model.NewIntVar(0, len(tip_gunleri), f'tip_eksik_{p.id}_{tip}')
+                model.Add(tip_atama - tip_hedef == fazla - eksik)
+                penalties.append((fazla + eksik) * WEIGHT_GUN_TIPI * plan_carpani)
+
+            # S3. Toplam hedef
+            hedef_toplam = hedef.get('hedef_toplam', 3)
+            toplam_atama = _toplam(p.id, range(1, self.gun_sayisi + 1))
+            if solver._plan_toplam_hard_mi():
+                model.Add(toplam_atama == hedef_toplam)
+            else:
+                model.Add(toplam_atama <= hedef_toplam)
+            eksik = model.NewIntVar(0, self.gun_sayisi, f'toplam_eksik_{p.id}')
+            model.Add(eksik >= hedef_toplam - toplam_atama)
+            penalties.append(eksik * WEIGHT_TOPLAM * plan_carpani)
+
+            # S5. Haftalık yayılım — haftada 1'den fazla nöbet cezası
+            if hedef_toplam >= 2:
+                for hafta_baslangic in range(1, self.gun_sayisi + 1, 7):
+                    hafta_gunleri = range(hafta_baslangic, min(hafta_baslangic + 6, self.gun_sayisi) + 1)
+                    fazla = model.NewIntVar(0, 7, f'hafta_fazla_{p.id}_{hafta_baslangic}')
+                    model.Add(fazla >= _toplam(p.id, hafta_gunleri) - 1)
+                    penalties.append(fazla * WEIGHT_HOMOJEN)
+
+        # H10b. Gün iskeleti alt sınırı
+        if solver._gun_iskeleti_aktif_mi():
+            planlanan_gunler_map = solver._planlanan_gunler_map()
+            for pid in solver._gun_iskeleti_uygulanabilir_ids():
+                planlanan = sorted(planlanan_gunler_map.get(pid, set()))
+                if not planlanan:
+                    continue
+                hedef_toplam = int(solver.hedefler.get(pid, {}).get('hedef_toplam', len(planlanan)) or 0)
+                alt_sinir = max(0, min(len(planlanan), hedef_toplam) - solver._gun_iskeleti_toleransi())
+                model.Add(_toplam(pid, planlanan) >= alt_sinir)
+                for g in planlanan:
+                    if (pid, g) in w:
+                        model.AddHint(w[pid, g], 1)
+
+        # S4. Birlikte — aynı gün: biri çalışıp diğeri boşsa çift başına ceza (tek yönlü doğrusal)
+        for kural in solver.kurallar:
+            if kural.tur != 'birlikte':
+                continue
+            valid_ids = solver._birlikte_gecerli_ids(kural)
+            for i, p1_id in enumerate(valid_ids):
+                for p2_id in valid_ids[i + 1:]:
+                    for g in range(1, self.gun_sayisi + 1):
+                        if (p1_id, g) not in w or (p2_id, g) not in w:
+                            continue
+                        fark = model.NewBoolVar(f'birlikte_fark_{p1_id}_{p2_id}_{g}')
+                        model.Add(w[p1_id, g] - w[p2_id, g] <= fark)
+                        model.Add(w[p2_id, g] - w[p1_id, g] <= fark)
+                        penalties.append(fark * WEIGHT_BIRLIKTE)
+
+        if penalties:
+            model.Minimize(sum(penalties))
+        return model, w
+
+    # ------------------------------------------------------------------
+    # Rol dağıtımı (kotalı roller) ve aşama 2: gün bazlı slot ataması
+    # ------------------------------------------------------------------
+
+    def _rol_dagitimi(self, calisanlar: Dict[int, List[int]]) -> Dict[tuple, Optional[str]]:
+        """Kotalı kişilerin her çalışma gününe bir kotalı rol (veya None) dağıt.
+
+        Manuel atamalar önce işlenir; kalan günler en az seçeneği olandan başlayarak
+        kalan kotası en yüksek, o gün kapasitesi dolmamış ve kişiye uygun role verilir.
+        """
+        solver = self.solver
+        gun_rol_sayac: Dict[int, Dict[str, int]] = {}
+        for (pid, g), s in self.manuel_slotlari.items():
+            sayac = gun_rol_sayac.setdefault(g, {})
+            sayac[self.slot_rolleri[s]] = sayac.get(self.slot_rolleri[s], 0) + 1
+
+        dagitim = {}
+        kotali_kisiler = []
+        for pid in calisanlar:
+            kalan = {rol: kota for rol, kota in self._kotalar(pid).items() if kota > 0}
+            if not kalan:
+                continue
+            for g in calisanlar[pid]:
+                if (pid, g) in self.manuel_slotlari:
+                    rol = self.slot_rolleri[self.manuel_slotlari[pid, g]]
+                    dagitim[pid, g] = rol
+                    if rol in kalan:
+                        kalan[rol] -= 1
+            kotali_kisiler.append((pid, kalan))
+
+        def _uygun_roller(pid, g, kalan):
+            i = self.pid_index[pid]
+            return [
+                rol for rol, adet in kalan.items()
+                if adet > 0
+                and gun_rol_sayac.get(g, {}).get(rol, 0) < len(solver.role_slots[rol])
+                and self.uygun[i, g - 1, solver.role_slots[rol]].any()
+            ]
+
+        kotali_kisiler.sort(key=lambda item: (sum(item[1].values()) - len(calisanlar[item[0]]), item[0]))
+        for pid, kalan in kotali_kisiler:
+            gunler = [g for g in calisanlar[pid] if (pid, g) not in dagitim]
+            gunler.sort(key=lambda g: (len(_uygun_roller(pid, g, kalan)), g))
+            for g in gunler:
+                roller = _uygun_roller(pid, g, kalan)
+                if not roller:
+                    dagitim[pid, g] = None
+                    continue
+                rol = max(roller, key=lambda r: (kalan[r], -len(solver.role_slots[r])))
+                dagitim[pid, g] = rol
+                kalan[rol] -= 1
+                sayac = gun_rol_sayac.setdefault(g, {})
+                sayac[rol] = sayac.get(rol, 0) + 1
+        return dagitim
+
+    def _gun_izinli_slotlari(self, pid: int, g: int, dagitim: Dict[tuple, Optional[str]]) -> List[int]:
+        """Kişinin o gün yazılabileceği slotlar: uygunluk + kotalı rol dağıtımı."""
+        solver = self.solver
+        if (pid, g) in self.manuel_slotlari:
+            return [self.manuel_slotlari[pid, g]]
+        kotalar = self._kotalar(pid)
+        plan_aktif = solver._plan_aktif_mi()
+        i = self.pid_index[pid]
+        izinli = []
+        for s in self.uygun[i, g - 1].nonzero()[0].tolist():
+            rol = self.slot_rolleri[s]
+            if rol in kotalar:
+                if kotalar[rol] <= 0:
+                    if plan_aktif:
+                        continue
+                elif dagitim.get((pid, g)) != rol:
+                    continue
+            izinli.append(s)
+        return izinli
+
+    def _gunu_coz(self, g: int, calisan: List[int], dagitim: Dict[tuple, Optional[str]],
+                  tercih: Dict[tuple, str], sure: float) -> Optional[Dict[int, int]]:
+        """Bir günün slot ataması; çözülemezse None. Returns: {pid: slot_idx}"""
+        solver = self.solver
+        cp = _get_cp_model()
+        model = cp.CpModel()
+        a = {}
+        for pid in calisan:
+            izinli = self._gun_izinli_slotlari(pid, g, dagitim)
+            if not izinli:
+                return None
+            for s in izinli:
+                a[pid, s] = model.NewBoolVar(f'a_{pid}_{s}')
+            model.AddExactlyOne(a[pid, s] for s in izinli)
+        for s in range(self.slot_sayisi):
+            slot_atamalari = [a[pid, s] for pid in calisan if (pid, s) in a]
+            if len(slot_atamalari) > 1:
+                model.AddAtMostOne(slot_atamalari)
+
+        def _rol_toplami(pid, slotlar):
+            return sum(a[pid, s] for s in slotlar if (pid, s) in a)
+
+        penalties = []
+        calisan_kume = set(calisan)
+        for kural in solver.kurallar:
+            uyeler = [pid for pid in solver._birlikte_gecerli_ids(kural) if pid in calisan_kume]
+            if len(uyeler) < 2:
+                continue
+            for i, p1 in enumerate(uyeler):
+                for p2 in uyeler[i + 1:]:
+                    if kural.tur == 'ayri':
+                        # H5: aynı gün aynı rolde olamazlar (ikisi de manuel ise kullanıcı onayı)
+                        if (p1, g) in solver.manuel_kisi_gunleri and (p2, g) in solver.manuel_kisi_gunleri:
+                            continue
+                        for slot_list in solver.role_slots.values():
+                            model.Add(_rol_toplami(p1, slot_list) + _rol_toplami(p2, slot_list) <= 1)
+                    elif kural.tur == 'birlikte':
+                        for f_idx, slot_list in enumerate(solver.birlikte_family_slots.values()):
+                            uyumsuz = model.NewBoolVar(f'birlikte_uyumsuz_{p1}_{p2}_{f_idx}')
+                            model.Add(uyumsuz >= _rol_toplami(p1, slot_list) - _rol_toplami(p2, slot_list))
+                            penalties.append(uyumsuz * _WEIGHT_BIRLIKTE_AILE)
+
+        for pid in calisan:
+            rol = dagitim.get((pid, g)) or tercih.get((pid, g))
+            if rol in solver.role_slots:
+                rol_disi = [s for s in range(self.slot_sayisi) if s not in solver.role_slots[rol]]
+                penalties.append(_rol_toplami(pid, rol_disi) * _WEIGHT_ROL_SAPMA)
+        if penalties:
+            model.Minimize(sum(penalties))
+
+        cozucu = cp.CpSolver()
+        cozucu.parameters.max_time_in_seconds = max(0.5, sure)
+        cozucu.parameters.num_search_workers = 1
+        status = cozucu.Solve(model)
+        if status not in (cp.OPTIMAL, cp.FEASIBLE):
+            return None
+        return {pid: s for (pid, s), var in a.items() if cozucu.Value(var)}
+
+    # ------------------------------------------------------------------
+
+    def _gorev_alt_sinir_ihlalleri(self, atamalar: List[Dict]) -> List[Dict]:
+        """Plan aktifken toleranslı görev kotası alt sınırını karşılamayan kişi-roller."""
+        solver = self.solver
+        if not solver._plan_aktif_mi():
+            return []
+        tol = solver._plan_gorev_kota_toleransi()
+        sayac = {}
+        for a in atamalar:
+            anahtar = (a['personel_id'], a['gorev_base'])
+            sayac[anahtar] = sayac.get(anahtar, 0) + 1
+        ihlaller = []
+        for p in solver.personel_listesi:
+            for rol, kota in self._kotalar(p.id).items():
+                if kota > 0 and sayac.get((p.id, rol), 0) < kota - tol:
+                    ihlaller.append({'personel_id': p.id, 'rol': rol, 'kota': kota,
+                                     'atanan': sayac.get((p.id, rol), 0)})
+        return ihlaller
+
+    def _basarisiz(self, baslangic: float, status: str, mesaj: str, bilgi: Dict) -> SolverSonuc:
+        return SolverSonuc(
+            basarili=False, atamalar=[],
+            istatistikler={'status': status, 'ara_gun': self.solver.ara_gun, 'iki_asama': bilgi},
+            sure_ms=int((time.time() - baslangic) * 1000), mesaj=mesaj,
+        )
+
+    def coz(self) -> SolverSonuc:
+        baslangic = time.time()
+        solver = self.solver
+        cp = _get_cp_model()
+        bilgi = {'tur_sayisi': 0, 'kesim_sayisi': 0, 'asama1_ms': 0, 'asama2_ms': 0,
+                 'gun_cozumu': 0, 'basarisiz_gunler': []}
+
+        manual_conflicts = solver._manual_hard_conflict_diagnostics()
+        if manual_conflicts and not solver.ignore_manual_conflicts:
+            return self._basarisiz(baslangic, 'MANUAL_CONFLICT',
+                                   f"Manuel atamalarda hard kisit cakismasi var ({len(manual_conflicts)} adet)", bilgi)
+
+        model, w = self._asama1_kur(cp)
+        tercih = {
+            (pid, g): rol
+            for pid, rol_gunleri in solver._planlanan_rol_gunleri_map().items()
+            for g, rol in rol_gunleri.items()
+        }
+        gun_onbellegi: Dict[tuple, Optional[Dict[int, int]]] = {}
+        havuz = ThreadPoolExecutor(max_workers=self.isci_sayisi, thread_name_prefix="iki_asama")
+        try:
+            for tur in range(1, _MAX_TUR + 1):
+                kalan = self.max_sure - (time.time() - baslangic)
+                if kalan < 1 or (solver.iptal_olayi is not None and solver.iptal_olayi.is_set()):
+                    return self._basarisiz(baslangic, 'UNKNOWN', "Iki asamali cozum sure doldu", bilgi)
+                bilgi['tur_sayisi'] = tur
+
+                # Aşama 1
+                t1 = time.time()
+                cozucu = cp.CpSolver()
+                cozucu.parameters.max_time_in_seconds = kalan * (0.5 if tur == 1 else 0.2)
+                cozucu.parameters.num_search_workers = solver.arama_isci_sayisi
+                status = cozucu.Solve(model)
+                bilgi['asama1_ms'] += int((time.time() - t1) * 1000)
+                if status not in (cp.OPTIMAL, cp.FEASIBLE):
+                    return self._basarisiz(
+                        baslangic, 'INFEASIBLE' if status == cp.INFEASIBLE else 'UNKNOWN',
+                        f"Iki asamali cozum: asama 1 {cozucu.StatusName(status)} (tur {tur})", bilgi)
+                bilgi['asama1_objective'] = cozucu.ObjectiveValue()
+                calisanlar: Dict[int, List[int]] = {}
+                for (pid, g), var in w.items():
+                    if cozucu.Value(var):
+                        calisanlar.setdefault(pid, []).append(g)
+                # Sonraki tur bu çözümden başlar (kesimler sadece birkaç günü değiştirir)
+                model.ClearHints()
+                for (pid, g), var in w.items():
+                    model.AddHint(var, cozucu.Value(var))
+
+                # Aşama 2 — sadece çalışan kümesi / rol dağıtımı değişen günler yeniden çözülür
+                t2 = time.time()
+                dagitim = self._rol_dagitimi(calisanlar)
+                gun_calisanlari: Dict[int, List[int]] = {}
+                for pid, gunler in calisanlar.items():
+                    for g in gunler:
+                        gun_calisanlari.setdefault(g, []).append(pid)
+                gun_anahtarlari = {
+                    g: (g, tuple((pid, dagitim.get((pid, g))) for pid in sorted(kisiler)))
+                    for g, kisiler in gun_calisanlari.items()
+                }
+                yeni = [g for g, anahtar in gun_anahtarlari.items() if anahtar not in gun_onbellegi]
+                gun_suresi = max(1.0, (self.max_sure - (time.time() - baslangic)) * 0.2)
+                isler = {
+                    g: havuz.submit(self._gunu_coz, g, sorted(gun_calisanlari[g]), dagitim, tercih, gun_suresi)
+                    for g in yeni
+                }
+                for g, is_ in isler.items():
+                    gun_onbellegi[gun_anahtarlari[g]] = is_.result()
+                bilgi['gun_cozumu'] += len(yeni)
+                bilgi['asama2_ms'] += int((time.time() - t2) * 1000)
+
+                basarisiz = [g for g, anahtar in gun_anahtarlari.items() if gun_onbellegi[anahtar] is None]
+                if not basarisiz:
+                    break
+                # Geri besleme: başarısız günün çalışan kümesi aynen tekrar seçilemez
+                bilgi['basarisiz_gunler'].extend(basarisiz)
+                for g in basarisiz:
+                    kisiler = gun_calisanlari[g]
+                    model.Add(sum(w[pid, g] for pid in kisiler) <= len(kisiler) - 1)
+                    bilgi['kesim_sayisi'] += 1
+            else:
+                return self._basarisiz(baslangic, 'INFEASIBLE',
+                                       f"Iki asamali cozum: {_MAX_TUR} turda gunler atanamadi", bilgi)
+        finally:
+            havuz.shutdown(wait=False)
+
+        atama_kumesi = set()
+        for g, anahtar in gun_anahtarlari.items():
+            for pid, s in gun_onbellegi[anahtar].items():
+                atama_kumesi.add((pid, g, s))
+        atamalar = [
+            solver._atama_kaydi(solver.personeller[pid], g, s)
+            for pid, g, s in sorted(atama_kumesi, key=lambda a: (a[1], a[2], self.pid_index[a[0]]))
+        ]
+        ihlaller = self._gorev_alt_sinir_ihlalleri(atamalar)
+        if ihlaller:
+            bilgi['gorev_alt_sinir_ihlalleri'] = ihlaller[:20]
+            return self._basarisiz(baslangic, 'INFEASIBLE',
+                                   f"Iki asamali cozum plan gorev kotalarini karsilamadi ({len(ihlaller)} ihlal)", bilgi)
+
+        solver.onceki_cozum = atama_kumesi or None
+        bos_slot_sayisi = self.gun_sayisi * self.slot_sayisi - len(atamalar)
+        istatistikler = {
+            'status': 'FEASIBLE',
+            'objective': bilgi.get('asama1_objective', 0),
+            'solver_status_name': 'IKI_ASAMA',
+            'iki_asama': bilgi,
+            **solver._cozum_istatistikleri(atamalar, bos_slot_sayisi),
+        }
+        return SolverSonuc(basarili=True, atamalar=atamalar, istatistikler=istatistikler,
+                           sure_ms=int((time.time() - baslangic) * 1000), mesaj='FEASIBLE (iki asama)')
@@ -0,0 +1,115 @@
+"""
+Çözüm ilerleme yazıcısı — ara çözümleri Firestore nobet_ilerleme/{istekId} dokümanına yazar.
+İstemci dokümanı dinleyerek iyileşen çizelgeyi görür; 'kabulEdildi': true yazarsa
+arama mevcut çözümle durdurulur. Hata olursa sadece uyarı yazar, çözümü engellemez.
+
+Firestore yazma/okumaları CP-SAT geri çağırım iş parçacığında yapılmaz: geri çağırım
+yalnızca son özeti bırakır, arka plan iş parçacığı en yenisini yazar ve kabulü
+_KABUL_KONTROL_SN aralıkla okur. Kabul durdurma_olayi ile çözücünün izleyicisine iletilir.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+_KOLEKSIYON = "nobet_ilerleme"
+_KABUL_KONTROL_SN = 2.0
+# bitir() hiç çağrılmazsa (ör. çözüm istisnayla biterse) arka plan iş parçacığı bu kadar
+# hareketsizlikten sonra kendiliğinden kapanır
+_AZAMI_BOSTA_SN = 900.0
+_BITIR_BEKLEME_SN = 10.0
+
+
+class IlerlemeYazici:
+    """NobetSolver.ilerleme_dinleyici olarak kullanılır: f(ozet) -> erken durdurulsun mu.
+
+    durdurma_olayi: istemci kabul edince set edilir; çözücü izleyicisi bunu görünce
+    yeni ara çözüm beklemeden aramayı durdurur.
+    """
+
+    def __init__(self, istek_id: str, endpoint: str, koleksiyon: str = _KOLEKSIYON,
+                 durum_alani: str = "durum"):
+        self.istek_id = str(istek_id)
+        self.endpoint = endpoint
+        self.koleksiyon = koleksiyon
+        # İş dokümanlarında "durum" iş kuyruğuna aittir; çözüm durumu ayrı alana yazılır
+        self.durum_alani = durum_alani
+        self.durdurma_olayi = threading.Event()
+        self._doc_ref = None
+        self._sayac = 0
+        self._kilit = threading.Lock()
+        self._bekleyen = None
+        self._yeni_ozet = threading.Event()
+        self._kapat = threading.Event()
+        self._son_etkinlik = time.time()
+        # Aynı istekId yeniden kullanılırsa önceki kabul ve çizelge yeni çözümü etkilemesin
+        self._yaz({
+            self.durum_alani: "basladi",
+            "endpoint": endpoint,
+            "ara_cozum_sayisi": 0,
+            "son_cozum": None,
+            "kabulEdildi": False,
+        })
+        self._is_parcacigi = threading.Thread(target=self._dongu, daemon=True)
+        self._is_parcacigi.start()
+
+    def _ref(self):
+        if self._doc_ref is None:
+            from firebase_admin import firestore as fs
+            self._doc_ref = fs.client().collection(self.koleksiyon).document(self.istek_id)
+        return self._doc_ref
+
+    def _yaz(self, alanlar: dict):
+        try:
+            self._ref().set({**alanlar, "guncelleme": datetime.now(timezone.utc)}, merge=True)
+        except Exception as err:
+            logger.warning("Ilerleme yazilamadi (%s): %s", self.istek_id, err)
+
+    def _bekleyeni_yaz(self):
+        with self._kilit:
+            ozet, sayac = self._bekleyen, self._sayac
+            self._bekleyen = None
+        if ozet is not None:
+            self._yaz({
+                self.durum_alani: "cozuluyor",
+                "ara_cozum_sayisi": sayac,
+                "son_cozum": ozet,
+            })
+
+    def _kabul_kontrol(self):
+        try:
+            doc = self._ref().get()
+            if doc.exists and (doc.to_dict() or {}).get("kabulEdildi", False):
+                self.durdurma_olayi.set()
+        except Exception as err:
+            logger.warning("Ilerleme okunamadi (%s): %s", self.istek_id, err)
+
+    def _dongu(self):
+        """Bekleyen özeti yaz, kabulü oku; bitir() ya da uzun hareketsizlikte çık."""
+        while True:
+            self._yeni_ozet.wait(_KABUL_KONTROL_SN)
+            self._yeni_ozet.clear()
+            self._bekleyeni_yaz()
+            if self._kapat.is_set() or time.time() - self._son_etkinlik > _AZAMI_BOSTA_SN:
+                return
+            if not self.durdurma_olayi.is_set():
+                self._kabul_kontrol()
+
+    def __call__(self, ozet: dict) -> bool:
+        with self._kilit:
+            self._sayac += 1
+            self._bekleyen = ozet
+            self._son_etkinlik = time.time()
+        self._yeni_ozet.set()
+        return self.durdurma_olayi.is_set()
+
+    def bitir(self, basarili: bool, mesaj: str = ""):
+        # Son ara çözüm (aralık nedeniyle bekleyen) "bitti"den önce yazılsın
+        self._kapat.set()
+        self._yeni_ozet.set()
+        self._is_parcacigi.join(_BITIR_BEKLEME_SN)
+        self._bekleyeni_yaz()
+        self._yaz({self.durum_alani: "bitti", "basarili": bool(basarili), "mesaj": str(mesaj)[:300]})
@@ -0,0 +1,259 @@
+"""
+İş kuyruğu — nobet_coz için asenkron iş modu (gönder / durum / sonuç / iptal).
+İş dokümanı: nobet_isleri/{isId}. İşler Cloud Tasks kuyruğu (nobet_is_calistir görev
+fonksiyonu) ile çalıştırılır; kuyruk kullanılamıyorsa (emülatör, NOBET_IS_KUYRUGU=yerel)
+süreç içi iş parçacığı havuzu yedek olarak kullanılır.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from ilerleme_yazici import IlerlemeYazici
+
+logger = logging.getLogger(__name__)
+
+_KOLEKSIYON = "nobet_isleri"
+_GOREV_KUYRUGU = "nobet_is_calistir"
+_MAX_BELGE_BYTES = 900_000        # Firestore 1MiB doküman sınırının altı
+_IPTAL_KONTROL_SN = 2.0
+_YEREL_ISCI_SAYISI = 1
+# Çalışma kirası: nobet_is_calistir timeout_sec ile aynı; bu süre dolunca yürütme platform
+# tarafından öldürülmüş sayılır ve "calisiyor" iş tekrar teslimde devralınabilir
+_KIRA_SN = 540
+
+# İş durumları: kuyrukta -> calisiyor -> bitti | iptal | hata
+_BITMIS_DURUMLAR = ("bitti", "iptal", "hata")
+
+_yerel_havuz = None
+_yerel_havuz_lock = threading.Lock()
+
+
+def _db():
+    from firebase_admin import firestore as fs
+    return fs.client()
+
+
+def _simdi():
+    return datetime.now(timezone.utc)
+
+
+def _paketle(obj) -> bytes:
+    return zlib.compress(json.dumps(obj, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def _paketi_ac(veri: bytes):
+    return json.loads(zlib.decompress(veri).decode("utf-8"))
+
+
+def _yerel_havuz_al() -> ThreadPoolExecutor:
+    global _yerel_havuz
+    with _yerel_havuz_lock:
+        if _yerel_havuz is None:
+            _yerel_havuz = ThreadPoolExecutor(max_workers=_YEREL_ISCI_SAYISI, thread_name_prefix="nobet_is")
+        return _yerel_havuz
+
+
+def _kuyruga_al(is_id: str, calistir):
+    if os.environ.get("NOBET_IS_KUYRUGU", "").lower() != "yerel":
+        try:
+            from firebase_admin import functions as fa_functions
+            fa_functions.task_queue(_GOREV_KUYRUGU).enqueue({"isId": is_id})
+            return "cloud_tasks"
+        except Exception as err:
+            logger.warning("Is Cloud Tasks kuyruguna eklenemedi, yerel kuyruk kullaniliyor: %s", err)
+    _yerel_havuz_al().submit(is_calistir, is_id, calistir)
+    return "yerel"
+
+
+def is_gonder(girdi: dict, calistir) -> dict:
+    """İş dokümanını oluşturup kuyruğa al; hemen döner.
+
+    calistir(data, t0, ilerleme_dinleyici, iptal_olayi) -> (cikti, http_durumu)
+    """
+    paket = _paketle(girdi)
+    if len(paket) > _MAX_BELGE_BYTES:
+        raise ValueError(f"Girdi is kuyrugu icin cok buyuk ({len(paket)} byte)")
+    is_id = uuid.uuid4().hex
+    _db().collection(_KOLEKSIYON).document(is_id).set({
+        "durum": "kuyrukta",
+        "endpoint": "nobet_coz",
+        "olusturma": _simdi(),
+        "iptalIstendi": False,
+        "girdi": paket,
+    })
+    kuyruk = _kuyruga_al(is_id, calistir)
+    return {"isId": is_id, "durum": "kuyrukta", "kuyruk": kuyruk}
+
+
+def _isi_al(db, ref, sahip: str):
+    """İşi transaction içinde sahiplen: (belge, durum). belge None ise çalıştırılmaz.
+
+    Kuyruktaki iş ya da kirası dolmuş "calisiyor" iş (ölen yürütme) alınır; aynı anda gelen
+    tekrar teslimlerden yalnızca biri kazanır.
+    """
+    from firebase_admin import firestore as fs
+
+    @fs.transactional
+    def _al(islem):
+        doc = ref.get(transaction=islem)
+        if not doc.exists:
+            return None, None
+        belge = doc.to_dict() or {}
+        durum = belge.get("durum")
+        simdi = _simdi()
+        if durum == "calisiyor":
+            kira_bitis = belge.get("kiraBitis")
+            if kira_bitis is not None and kira_bitis > simdi:
+                return None, durum
+            logger.warning("Kirasi dolmus is devraliniyor: %s", ref.id)
+        elif durum != "kuyrukta":
+            return None, durum
+        if belge.get("iptalIstendi"):
+            islem.update(ref, {"durum": "iptal", "bitis": simdi})
+            return None, "iptal"
+        islem.update(ref, {
+            "durum": "calisiyor",
+            "baslangic": simdi,
+            "kiraBitis": simdi + timedelta(seconds=_KIRA_SN),
+            "calistiran": sahip,
+            "denemeSayisi": int(belge.get("denemeSayisi") or 0) + 1,
+        })
+        return belge, "calisiyor"
+
+    return _al(db.transaction())
+
+
+def _sahipse_guncelle(db, ref, sahip: str, alanlar: dict) -> bool:
+    """İş hâlâ bu yürütmeye aitse güncelle (devralınmış işin sonucu ezilmesin)."""
+    from firebase_admin import firestore as fs
+
+    @fs.transactional
+    def _guncelle(islem):
+        doc = ref.get(transaction=islem)
+        if not doc.exists or (doc.to_dict() or {}).get("calistiran") != sahip:
+            return False
+        islem.update(ref, alanlar)
+        return True
+
+    if not _guncelle(db.transaction()):
+        logger.warning("Is baska bir yurutmeye gecmis, sonuc yazilmadi: %s", ref.id)
+        return False
+    return True
+
+
+def is_calistir(is_id: str, calistir):
+    """Kuyruktaki işi çalıştır; iptal isteği dokümandan izlenir ve iptal_olayi ile iletilir."""
+    db = _db()
+    ref = db.collection(_KOLEKSIYON).document(str(is_id))
+    sahip = uuid.uuid4().hex
+    belge, durum = _isi_al(db, ref, sahip)
+    if belge is None:
+        if durum is None:
+            logger.warning("Is bulunamadi: %s", is_id)
+        # Aksi hâlde tekrar teslim (iş başka yürütmede/bitmiş) veya kuyruktayken iptal
+        return
+
+    iptal_olayi = threading.Event()
+    izleme_bitti = threading.Event()
+
+    def _iptal_izle():
+        while not izleme_bitti.wait(_IPTAL_KONTROL_SN):
+            try:
+                if (ref.get().to_dict() or {}).get("iptalIstendi"):
+                    iptal_olayi.set()
+                    return
+            except Exception as err:
+                logger.warning("Is iptal durumu okunamadi (%s): %s", is_id, err)
+
+    threading.Thread(target=_iptal_izle, daemon=True).start()
+    ilerleme = IlerlemeYazici(is_id, "nobet_coz", koleksiyon=_KOLEKSIYON, durum_alani="cozum_durumu")
+    try:
+        cikti, http_durumu = calistir(_paketi_ac(belge["girdi"]), time.time(), ilerleme, iptal_olayi)
+    except Exception as err:
+        logger.exception("Is calistirilamadi: %s", is_id)
+        _sahipse_guncelle(db, ref, sahip, {"durum": "hata", "hata": str(err)[:300], "bitis": _simdi()})
+        return
+    finally:
+        izleme_bitti.set()
+
+    alanlar = {
+        "durum": "iptal" if iptal_olayi.is_set() else "bitti",
+        "httpDurumu": http_durumu,
+        "basari": bool(cikti.get("basari", False)),
+        "bitis": _simdi(),
+    }
+    paket = _paketle(cikti)
+    if len(paket) <= _MAX_BELGE_BYTES:
+        alanlar["sonuc"] = paket
+    else:
+        # Büyük sonuç Storage'a yazılır
+        from firebase_admin import storage
+        dosya_adi = f"isler/{is_id}.json.z"
+        storage.bucket().blob(dosya_adi).upload_from_string(paket, content_type="application/octet-stream")
+        alanlar["sonucDosya"] = dosya_adi
+    _sahipse_guncelle(db, ref, sahip, alanlar)
+
+
+def _json_uyumlu(deger):
+    if isinstance(deger, datetime):
+        return deger.isoformat()
+    if isinstance(deger, dict):
+        return {k: _json_uyumlu(v) for k, v in deger.items()}
+    if isinstance(deger, list):
+        return [_json_uyumlu(v) for v in deger]
+    return deger
+
+
+def is_durumu(is_id: str) -> dict | None:
+    """İş dokümanının özeti (girdi/sonuç gövdeleri hariç); iş yoksa None."""
+    doc = _db().collection(_KOLEKSIYON).document(str(is_id)).get()
+    if not doc.exists:
+        return None
+    belge = doc.to_dict() or {}
+    ozet = {k: v for k, v in belge.items() if k not in ("girdi", "sonuc", "sonucDosya")}
+    ozet["isId"] = str(is_id)
+    ozet["sonucHazir"] = belge.get("durum") in ("bitti", "iptal")
+    return _json_uyumlu(ozet)
+
+
+def is_sonucu(is_id: str):
+    """(cikti, http_durumu, is_durumu). İş bitmemişse cikti None."""
+    doc = _db().collection(_KOLEKSIYON).document(str(is_id)).get()
+    if not doc.exists:
+        return None, 404, None
+    belge = doc.to_dict() or {}
+    durum = belge.get("durum")
+    if durum not in ("bitti", "iptal"):
+        return None, 409, durum
+    if belge.get("sonuc") is not None:
+        cikti = _paketi_ac(belge["sonuc"])
+    elif not belge.get("sonucDosya"):
+        cikti = {"basari": False, "mesaj": "Is calismadan iptal edildi"}
+    else:
+        from firebase_admin import storage
+        cikti = _paketi_ac(storage.bucket().blob(belge["sonucDosya"]).download_as_bytes())
+    return {**cikti, "isId": str(is_id), "isDurumu": durum}, belge.get("httpDurumu", 200), durum
+
+
+def is_iptal(is_id: str) -> str | None:
+    """İptal iste. Kuyruktaki iş hemen iptal edilir; çalışan iş bir sonraki kontrolde durur."""
+    ref = _db().collection(_KOLEKSIYON).document(str(is_id))
+    doc = ref.get()
+    if not doc.exists:
+        return None
+    durum = (doc.to_dict() or {}).get("durum")
+    if durum in _BITMIS_DURUMLAR:
+        return durum
+    alanlar = {"iptalIstendi": True, "iptalZamani": _simdi()}
+    if durum == "kuyrukta":
+        alanlar.update({"durum": "iptal", "bitis": _simdi()})
+        durum = "iptal"
+    ref.update(alanlar)
+    return durum
@@ -1,9 +1,11 @@
 ﻿"""
 NÃ¶bet Yapma â€” Firebase Cloud Functions giriÅŸ noktasÄ±.
-5 endpoint: nobet_dagit, nobet_kapasite, nobet_hedef_hesapla, nobet_coz, debug_event_log
+7 endpoint: nobet_dagit, nobet_kapasite, nobet_hedef_hesapla, nobet_coz, nobet_is,
+nobet_is_calistir (görev kuyruğu), debug_event_log
 """
 
-from firebase_functions import https_fn
+from firebase_functions import https_fn, tasks_fn
+from firebase_functions.options import RetryConfig, RateLimits
 from firebase_admin import initialize_app
 from datetime import datetime, timedelta
 import logging
@@ -13,12 +15,20 @@ from utils import (
     _safe_int, get_days_in_month,
     normalize_id,
     _find_duplicate_personel_ids,
+    IdRegistry,
 )
 from kapasite import kapasite_hesapla
 from http_helpers import _cors_preflight, _json_response, _error_response
 from solve_strategy import solve_with_diagnostics
 from preflight_analyzer import analyze_preflight
 from firestore_logger import log_session
+from ilerleme_yazici import IlerlemeYazici
+from cozum_analizi import atamalardan_matris, kisi_ozeti
+from is_kuyrugu import is_gonder, is_calistir, is_durumu, is_sonucu, is_iptal
+from sonuc_onbellegi import (
+    girdi_parmak_izi, onbellek_aktif_mi,
+    onbellekten_getir, onbellege_yaz,
+)
 from planlayici import (
     frontend_gorev_kota_override_topla,
     frontend_kilitli_hedefleri_topla,
@@ -33,6 +43,9 @@ from parsers import (
     parse_gorev_kisitlamalari, parse_manuel_atamalar, parse_gorev_havuzlari,
     parse_kisitlama_istisnalari,
     parse_birlikte_istisnalari, parse_aragun_istisnalari,
+    parse_solver_secenekleri,
+    parse_strateji_secenekleri,
+    parse_yeniden_coz,
 )
 
 initialize_app()
@@ -55,6 +68,24 @@ def nobet_dagit(req: https_fn.Request) -> https_fn.Response:
         if not data:
             return _json_response({"error": "Veri gÃ¶nderilmedi"}, status=400)
 
+        # Önbellek: aynı istek gövdesi için son çizelge; Excel yeniden yüklenmez, sadece URL imzalanır
+        parmak_izi = girdi_parmak_izi("nobet_dagit", data) if onbellek_aktif_mi(data) else None
+        onbellek_kaydi = onbellekten_getir(parmak_izi) if parmak_izi else None
+        if onbellek_kaydi is not None:
+            try:
+                from firebase_admin import storage
+                blob = storage.bucket().blob(onbellek_kaydi["excel_dosya"])
+                cikti = {
+                    **onbellek_kaydi["cikti"], "cacheHit": True,
+                    "excelUrl": blob.generate_signed_url(version="v4", expiration=timedelta(hours=1), method="GET"),
+                    "sureMs": int((time.time() - t0) * 1000),
+                }
+                log_session("nobet_dagit", data, cikti, cikti["sureMs"],
+                            frontend_loglar=data.get("frontendLoglar"))
+                return _json_response(cikti)
+            except Exception as onbellek_err:
+                logger.warning("Onbellek kaydi kullanilamadi: %s", onbellek_err)
+
         try:
             yil = _safe_int(data.get("yil", 2025), 2025)
             ay = _safe_int(data.get("ay", 1), 1)
@@ -86,15 +117,18 @@ def nobet_dagit(req: https_fn.Request) -> https_fn.Response:
         if duplicate_ids:
             return _json_response({"error": "Duplicate personel ID", "duplicateIds": duplicate_ids}, status=400)
 
-        gorev_havuzlari = parse_gorev_havuzlari(data, gorevler, personeller)
-        kisitlama_istisnalari = parse_kisitlama_istisnalari(data, personeller, gorevler)
-        birlikte_istisnalari = parse_birlikte_istisnalari(data, personeller)
-        aragun_istisnalari = parse_aragun_istisnalari(data, personeller)
-        kurallar = parse_kurallar(data, personeller)
-        manuel_atamalar = parse_manuel_atamalar(data, personeller, gorevler, gun_sayisi)
+        # İstek başına kimlik kaydı: parser → planlayıcı → solver → preflight
+        kayit = IdRegistry(personeller)
+
+        gorev_havuzlari = parse_gorev_havuzlari(data, gorevler, personeller, kayit=kayit)
+        kisitlama_istisnalari = parse_kisitlama_istisnalari(data, personeller, gorevler, kayit=kayit)
+        birlikte_istisnalari = parse_birlikte_istisnalari(data, personeller, kayit=kayit)
+        aragun_istisnalari = parse_aragun_istisnalari(data, personeller, kayit=kayit)
+        kurallar = parse_kurallar(data, personeller, kayit=kayit)
+        manuel_atamalar = parse_manuel_atamalar(data, personeller, gorevler, gun_sayisi, kayit=kayit)
 
         birlikte_kurallar = [k for k in kurallar if k.tur == 'birlikte']
-        gorev_kisitlamalari_dict = parse_gorev_kisitlamalari(data, personeller)
+        gorev_kisitlamalari_dict = parse_gorev_kisitlamalari(data, personeller, kayit=kayit)
         kilitli_hedefler = frontend_kilitli_hedefleri_topla(personeller)
         gorev_kota_overrides = frontend_gorev_kota_override_topla(personeller)
 
@@ -113,12 +147,17 @@ def nobet_dagit(req: https_fn.Request) -> https_fn.Response:
             gorev_kota_overrides=gorev_kota_overrides,
             kaynak="nobet_dagit_ortak_plan",
             gorev_havuzlari=gorev_havuzlari,
+            kayit=kayit,
         )
         hedefler = planlama.get("hedefler_map", {})
         plan_kontrati = planlama.get("plan_kontrati")
 
         max_sure = min(_safe_int(data.get("maxSure", 120), 120), 300)
 
+        # istekId verilirse ara çözümler nobet_ilerleme/{istekId} dokümanına yazılır
+        istek_id = data.get("istekId")
+        ilerleme = IlerlemeYazici(istek_id, "nobet_dagit") if istek_id else None
+
         sonuc, gevsetme_bilgisi, teshis_bilgisi, kullanilan_ara_gun = solve_with_diagnostics(
             gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
             personeller=personeller, gorevler=gorevler,
@@ -131,7 +170,13 @@ def nobet_dagit(req: https_fn.Request) -> https_fn.Response:
             yil=yil, ay=ay, resmi_tatiller=resmi_tatiller, data=data,
             ignore_manual_conflicts=ignore_manual_conflicts,
             plan_kontrati=plan_kontrati.to_dict() if plan_kontrati else None,
+            kayit=kayit,
+            solver_secenekleri=parse_solver_secenekleri(data),
+            strateji_secenekleri=parse_strateji_secenekleri(data),
+            ilerleme_dinleyici=ilerleme,
         )
+        if ilerleme is not None:
+            ilerleme.bitir(sonuc.basarili, sonuc.mesaj)
 
         cizelge = {}
         for g in range(1, gun_sayisi + 1):
@@ -139,37 +184,15 @@ def nobet_dagit(req: https_fn.Request) -> https_fn.Response:
         for atama in sonuc.atamalar:
             cizelge[str(atama['gun'])][atama['slot_idx']] = atama['personel_ad']
 
-        kisi_ozet = []
-        eksik_atamalar = []
-        kisi_sayac = {}
-        for atama in sonuc.atamalar:
-            pid = atama.get('personel_id')
-            kisi_sayac[pid] = kisi_sayac.get(pid, 0) + 1
-        for p in personeller:
-            h = hedefler.get(p.id) or hedefler.get(normalize_id(p.id)) or {}
-            hedef_toplam = h.get('hedef_toplam', 0)
-            gerceklesen = kisi_sayac.get(p.id, 0)
-            fark = hedef_toplam - gerceklesen
-            hedef_tipler = h.get('hedef_tipler', {})
-            kisi_ozet.append({
-                "ad": p.ad, "hedef": hedef_toplam, "gerceklesen": gerceklesen, "fark": fark,
-                "kalanHici": hedef_tipler.get('hici', 0),
-                "kalanPrs": hedef_tipler.get('prs', 0),
-                "kalanCum": hedef_tipler.get('cum', 0),
-                "kalanCmt": hedef_tipler.get('cmt', 0),
-                "kalanPzr": hedef_tipler.get('pzr', 0),
-            })
-            if fark > 0:
-                eksik_atamalar.append({
-                    "personel": p.ad, "eksik": fark,
-                    "detay": {
-                        "hici": hedef_tipler.get('hici', 0),
-                        "prs": hedef_tipler.get('prs', 0),
-                        "cum": hedef_tipler.get('cum', 0),
-                        "cmt": hedef_tipler.get('cmt', 0),
-                        "pzr": hedef_tipler.get('pzr', 0),
-                    }
-                })
+        matris = atamalardan_matris(
+            sonuc.atamalar, [p.id for p in personeller],
+            [gun_tipleri.get(g, 'hici') for g in range(1, gun_sayisi + 1)],
+            [g.base_name or g.ad for g in gorevler],
+        )
+        kisi_ozet, eksik_atamalar = kisi_ozeti(
+            matris, [p.ad for p in personeller],
+            [hedefler.get(p.id) or hedefler.get(normalize_id(p.id)) or {} for p in personeller],
+        )
 
         from excel_export import create_excel
         from firebase_admin import storage
@@ -201,11 +224,15 @@ def nobet_dagit(req: https_fn.Request) -> https_fn.Response:
                 gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri, personeller=personeller,
                 gorevler=gorevler, kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
                 manuel_atamalar=manuel_atamalar, ara_gun=ara_gun, plan_kontrati=_plan_dict,
-                kisitlama_istisnalari=kisitlama_istisnalari, max_preview=30
+                kisitlama_istisnalari=kisitlama_istisnalari, max_preview=30,
+                kayit=kayit,
             )
             cikti['hazirlikAnalizi'] = _haz
         except Exception as _e:
             cikti['hazirlikAnalizi'] = {'skor': 0, 'sorunlar': [{'kod':'ANALIZ_HATA','oneri': str(_e)[:120]}]}
+        cikti["cacheHit"] = False
+        if parmak_izi and cikti.get("basari"):
+            onbellege_yaz(parmak_izi, "nobet_dagit", {"cikti": cikti, "excel_dosya": dosya_adi})
         return _json_response(cikti)
 
     except Exception as e:
@@ -312,12 +339,15 @@ def nobet_hedef_hesapla(req: https_fn.Request) -> https_fn.Response:
         if duplicate_ids:
             return _json_response({"error": "Duplicate personel ID", "duplicateIds": duplicate_ids}, status=400)
 
+        # İstek başına kimlik kaydı: parser → planlayıcı → solver → preflight
+        kayit = IdRegistry(personeller)
+
         gorevler = parse_solver_gorevler(data)
-        kurallar = parse_kurallar(data, personeller)
+        kurallar = parse_kurallar(data, personeller, kayit=kayit)
         birlikte_kurallar = [k for k in kurallar if k.tur == 'birlikte']
-        gorev_kisitlamalari = parse_gorev_kisitlamalari(data, personeller)
-        manuel_atamalar = parse_manuel_atamalar(data, personeller, gorevler, gun_sayisi)
-        gorev_havuzlari = parse_gorev_havuzlari(data, gorevler, personeller)
+        gorev_kisitlamalari = parse_gorev_kisitlamalari(data, personeller, kayit=kayit)
+        manuel_atamalar = parse_manuel_atamalar(data, personeller, gorevler, gun_sayisi, kayit=kayit)
+        gorev_havuzlari = parse_gorev_havuzlari(data, gorevler, personeller, kayit=kayit)
 
         planlama = ortak_plan_uret(
             gun_sayisi=gun_sayisi,
@@ -333,6 +363,7 @@ def nobet_hedef_hesapla(req: https_fn.Request) -> https_fn.Response:
             kilitli_hedefler=kilitli_hedefler,
             kaynak="nobet_hedef_hesapla_ortak_plan",
             gorev_havuzlari=gorev_havuzlari,
+            kayit=kayit,
         )
         sonuc = planlama.get("hedef_sonuc")
         plan_kontrati = planlama.get("plan_kontrati")
@@ -357,6 +388,250 @@ def nobet_hedef_hesapla(req: https_fn.Request) -> https_fn.Response:
         return _error_response(e, "nobet_hedef_hesapla")
 
 
+# ============================================
+# YARDIMCI: nobet_coz hesaplaması
+# ============================================
+
+def _nobet_coz_hesapla(data: dict, t0: float, ilerleme=None, iptal_olayi=None):
+    """nobet_coz hesaplaması: (yanıt gövdesi, HTTP durumu).
+    Senkron endpoint ve asenkron iş kuyruğu (nobet_is) ortak kullanır."""
+    # Önbellek: aynı istek gövdesi için son çizelge
+    parmak_izi = girdi_parmak_izi("nobet_coz", data) if onbellek_aktif_mi(data) else None
+    onbellek_kaydi = onbellekten_getir(parmak_izi) if parmak_izi else None
+    if onbellek_kaydi is not None:
+        cikti = {**onbellek_kaydi["cikti"], "cacheHit": True, "sureMs": int((time.time() - t0) * 1000)}
+        log_session("nobet_coz", data, cikti, cikti["sureMs"],
+                    frontend_loglar=data.get("frontendLoglar"))
+        return cikti, 200
+
+    try:
+        yil = _safe_int(data.get("yil", 2025), 2025)
+        ay = _safe_int(data.get("ay", 1), 1)
+        slot_sayisi = _safe_int(data.get("slotSayisi", 6), 6)
+        ara_gun = _safe_int(data.get("araGun", 2), 2)
+        max_sure = _safe_int(data.get("maxSure", 300), 300)
+    except (ValueError, TypeError) as ve:
+        return {"error": f"GeÃ§ersiz parametre deÄŸeri: {ve}", "error_type": "ValueError"}, 400
+
+    if not (1 <= ay <= 12):
+        return {"error": f"GeÃ§ersiz ay deÄŸeri: {ay}"}, 400
+    if not (2000 <= yil <= 2100):
+        return {"error": f"GeÃ§ersiz yÄ±l deÄŸeri: {yil}"}, 400
+    if slot_sayisi < 1:
+        return {"error": f"GeÃ§ersiz slot sayÄ±sÄ±: {slot_sayisi}"}, 400
+    if ara_gun < 0:
+        return {"error": f"GeÃ§ersiz ara gÃ¼n deÄŸeri: {ara_gun}"}, 400
+
+    resmi_tatiller = data.get("resmiTatiller", [])
+    saat_degerleri = data.get("saatDegerleri", None)
+    ignore_manual_conflicts = bool(data.get("ignoreManualConflicts", False))
+
+    gun_sayisi = get_days_in_month(yil, ay)
+    gun_tipleri = build_gun_tipleri(yil, ay, gun_sayisi, resmi_tatiller)
+    gorevler = parse_solver_gorevler_nobet_coz(data, slot_sayisi)
+    personeller = parse_solver_personeller_coz(data, gorevler)
+
+    logger.info("nobet_coz baslatildi: yil=%d, ay=%d, slot=%d, ara_gun=%d, personel=%d, gorev=%d",
+                 yil, ay, slot_sayisi, ara_gun, len(personeller) if personeller else 0,
+                 len(gorevler) if gorevler else 0)
+
+    if not personeller:
+        return {"error": "Personel listesi boÅŸ. En az 1 personel gereklidir."}, 400
+    if not gorevler:
+        return {"error": "GÃ¶rev listesi boÅŸ. En az 1 gÃ¶rev tanÄ±mÄ± gereklidir."}, 400
+    if len(personeller) < slot_sayisi:
+        logger.warning("Personel sayÄ±sÄ± (%d) slot sayÄ±sÄ±ndan (%d) az â€” boÅŸ slotlar olabilir.",
+                       len(personeller), slot_sayisi)
+
+    duplicate_ids = _find_duplicate_personel_ids(personeller)
+    if duplicate_ids:
+        return {"error": "Duplicate personel ID", "duplicateIds": duplicate_ids}, 400
+
+    # İstek başına kimlik kaydı: parser → planlayıcı → solver → preflight
+    kayit = IdRegistry(personeller)
+
+    gorev_havuzlari = parse_gorev_havuzlari(data, gorevler, personeller, kayit=kayit)
+    kisitlama_istisnalari = parse_kisitlama_istisnalari(data, personeller, gorevler, kayit=kayit)
+    birlikte_istisnalari = parse_birlikte_istisnalari(data, personeller, kayit=kayit)
+    aragun_istisnalari = parse_aragun_istisnalari(data, personeller, kayit=kayit)
+    kurallar = parse_kurallar(data, personeller, kayit=kayit)
+    manuel_atamalar = parse_manuel_atamalar(data, personeller, gorevler, gun_sayisi, kayit=kayit)
+
+    # Ortak planlayici: preview ve final ayni plani kullansin
+    birlikte_kurallar = [k for k in kurallar if k.tur == 'birlikte']
+    gorev_kisitlamalari_dict = parse_gorev_kisitlamalari(data, personeller, kayit=kayit)
+    kilitli_hedefler = frontend_kilitli_hedefleri_topla(personeller)
+    gorev_kota_overrides = frontend_gorev_kota_override_topla(personeller)
+
+    try:
+        planlama = ortak_plan_uret(
+            gun_sayisi=gun_sayisi,
+            gun_tipleri=gun_tipleri,
+            personeller=personeller,
+            gorevler=gorevler,
+            birlikte_kurallar=birlikte_kurallar,
+            kurallar=kurallar,
+            gorev_kisitlamalari=gorev_kisitlamalari_dict,
+            manuel_atamalar=manuel_atamalar,
+            ara_gun=ara_gun,
+            saat_degerleri=saat_degerleri,
+            kilitli_hedefler=kilitli_hedefler,
+            gorev_kota_overrides=gorev_kota_overrides,
+            gorev_havuzlari=gorev_havuzlari,
+            kayit=kayit,
+        )
+    except Exception as hedef_err:
+        logger.exception("Ortak planlama basarisiz: %s", hedef_err)
+        sure_ms = int((time.time() - t0) * 1000)
+        log_session("nobet_coz", data, None, sure_ms, hata=hedef_err,
+                    frontend_loglar=data.get("frontendLoglar"))
+        return {
+            "error": f"Planlama sirasinda hata olustu: {str(hedef_err)[:200]}",
+            "error_type": "PlanlamaHatasi"
+        }, 500
+
+    hesap_sonuc = planlama.get("hedef_sonuc")
+    plan_kontrati = planlama.get("plan_kontrati")
+    hedefler = planlama.get("hedefler_map", {})
+    if not hesap_sonuc or not hedefler:
+        logger.error("Ortak planlama sonucu bos dondu")
+        return {
+            "error": "Planlama sonucu bos. Personel ve gorev verilerini kontrol edin.",
+            "error_type": "PlanBos"
+        }, 400
+
+    def _plan_yenileyici(yeni_ara_gun: int):
+        return ortak_plan_uret(
+            gun_sayisi=gun_sayisi,
+            gun_tipleri=gun_tipleri,
+            personeller=personeller,
+            gorevler=gorevler,
+            birlikte_kurallar=birlikte_kurallar,
+            kurallar=kurallar,
+            gorev_kisitlamalari=gorev_kisitlamalari_dict,
+            manuel_atamalar=manuel_atamalar,
+            ara_gun=yeni_ara_gun,
+            saat_degerleri=saat_degerleri,
+            kilitli_hedefler=kilitli_hedefler,
+            gorev_kota_overrides=gorev_kota_overrides,
+            kaynak=(plan_kontrati.kaynak if plan_kontrati else None),
+            gorev_havuzlari=gorev_havuzlari,
+            kayit=kayit,
+        )
+
+    # istekId verilirse ara çözümler nobet_ilerleme/{istekId} dokümanına yazılır
+    istek_id = data.get("istekId")
+    if ilerleme is None and istek_id:
+        ilerleme = IlerlemeYazici(istek_id, "nobet_coz")
+
+    sonuc, gevsetme_bilgisi, teshis_bilgisi, kullanilan_ara_gun = solve_with_diagnostics(
+        gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
+        personeller=personeller, gorevler=gorevler,
+        kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
+        kisitlama_istisnalari=kisitlama_istisnalari,
+        birlikte_istisnalari=birlikte_istisnalari,
+        aragun_istisnalari=aragun_istisnalari,
+        manuel_atamalar=manuel_atamalar, hedefler=hedefler,
+        ara_gun=ara_gun, max_sure=max_sure,
+        yil=yil, ay=ay, resmi_tatiller=resmi_tatiller, data=data,
+        ignore_manual_conflicts=ignore_manual_conflicts,
+        plan_kontrati=plan_kontrati.to_dict() if plan_kontrati else None,
+        plan_yenileyici=_plan_yenileyici,
+        kayit=kayit,
+        solver_secenekleri=parse_solver_secenekleri(data),
+        strateji_secenekleri=parse_strateji_secenekleri(data),
+        ilerleme_dinleyici=ilerleme,
+        iptal_olayi=iptal_olayi,
+        yeniden_coz=parse_yeniden_coz(data, personeller, gun_sayisi, kayit=kayit),
+    )
+    if ilerleme is not None:
+        ilerleme.bitir(sonuc.basarili, sonuc.mesaj)
+
+    # Ã‡izelge formatÄ±na dÃ¶nÃ¼ÅŸtÃ¼r
+    cizelge = {}
+    for g in range(1, gun_sayisi + 1):
+        cizelge[str(g)] = [None] * len(gorevler)
+
+    for atama in sonuc.atamalar:
+        cizelge[str(atama['gun'])][atama['slot_idx']] = atama['personel_ad']
+
+    hedef_debug = []
+    for p in personeller:
+        h = hedefler.get(p.id) or hedefler.get(normalize_id(p.id)) or {}
+        hedef_debug.append({
+            'id': p.id, 'ad': p.ad,
+            'hedef_toplam': h.get('hedef_toplam', 0),
+            'hedef_tipler': h.get('hedef_tipler', {}),
+            'mazeret_sayisi': len(p.mazeret_gunleri)
+        })
+
+    # Kalite uyarÄ±larÄ± oluÅŸtur
+    kalite_uyarilari = []
+    kalite_skoru = sonuc.istatistikler.get('kalite_skoru', {})
+    if kalite_skoru:
+        if kalite_skoru.get('denge_puani', 0) > 50:
+            kalite_uyarilari.append(
+                f"Denge uyarisi: Nobet sayisi farki yuksek (%{kalite_skoru['denge_puani']}). "
+                "Personeller arasi nobet sayisi dengesi bozuk."
+            )
+        if kalite_skoru.get('doluluk', 100) < 95:
+            kalite_uyarilari.append(
+                f"Doluluk uyarisi: Slotlarin %{kalite_skoru['doluluk']}'i dolu. "
+                "Bos kalan slotlar var."
+            )
+        if kalite_skoru.get('kural_uyumu', 100) < 80:
+            kalite_uyarilari.append(
+                f"Hedef uyumu uyarisi: Hedeflerden sapma yuksek (%{kalite_skoru['kural_uyumu']} uyum). "
+                "Personellerin hedeflerine ulasilamamis olabilir."
+            )
+        if kalite_skoru.get('saat_adaleti', 0) > 30:
+            kalite_uyarilari.append(
+                f"Saat adaleti uyarisi: Saat dagilimi dengesiz (%{kalite_skoru['saat_adaleti']} sapma). "
+                "Bazi personeller daha fazla saat calisiyor."
+            )
+
+    cikti = {
+        "basari": sonuc.basarili, "mesaj": sonuc.mesaj, "sureMs": sonuc.sure_ms,
+        "cizelge": cizelge, "atamalar": sonuc.atamalar,
+        "istatistikler": sonuc.istatistikler,
+        "kaliteUyarilari": kalite_uyarilari,
+        "teshis": teshis_bilgisi,
+        "gorevler": [g.ad for g in gorevler], "hedefDebug": hedef_debug,
+        "planKontrati": (
+            (sonuc.istatistikler.get("plan", {}) or {}).get("kontrat")
+            if isinstance(sonuc.istatistikler, dict) else None
+        ) or (plan_kontrati.to_dict() if plan_kontrati else None),
+        "planHash": (
+            (sonuc.istatistikler.get("plan", {}) or {}).get("plan_hash")
+            if isinstance(sonuc.istatistikler, dict) else None
+        ) or (plan_kontrati.plan_hash if plan_kontrati else None),
+    }
+    sure_ms = int((time.time() - t0) * 1000)
+    log_session("nobet_coz", data, cikti, sure_ms,
+                frontend_loglar=data.get("frontendLoglar"))
+    # Hazırlık Analizi ekle
+    try:
+        _plan_dict = plan_kontrati.to_dict() if plan_kontrati else (cikti.get('planKontrati') or {})
+        _haz = analyze_preflight(
+            gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri, personeller=personeller,
+            gorevler=gorevler, kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
+            manuel_atamalar=manuel_atamalar, ara_gun=ara_gun, plan_kontrati=_plan_dict,
+            kisitlama_istisnalari=kisitlama_istisnalari, max_preview=30,
+            kayit=kayit,
+        )
+        cikti['hazirlikAnalizi'] = _haz
+    except Exception as _e:
+        cikti['hazirlikAnalizi'] = {'skor': 0, 'sorunlar': [{'kod':'ANALIZ_HATA','oneri': str(_e)[:120]}]}
+    cikti["cacheHit"] = False
+    # Erken kabul edilen / iptal edilen ara çözümler önbelleğe yazılmaz
+    erken_bitti = bool(sonuc.istatistikler.get("erken_durduruldu")) or (
+        iptal_olayi is not None and iptal_olayi.is_set()
+    )
+    if parmak_izi and cikti.get("basari") and not erken_bitti:
+        onbellege_yaz(parmak_izi, "nobet_coz", {"cikti": cikti})
+    return cikti, 200
+
+
 # ============================================
 # ENDPOINT: nobet_coz
 # ============================================
@@ -373,212 +648,71 @@ def nobet_coz(req: https_fn.Request) -> https_fn.Response:
         if not data:
             return _json_response({"error": "Veri gÃ¶nderilmedi"}, status=400)
 
-        try:
-            yil = _safe_int(data.get("yil", 2025), 2025)
-            ay = _safe_int(data.get("ay", 1), 1)
-            slot_sayisi = _safe_int(data.get("slotSayisi", 6), 6)
-            ara_gun = _safe_int(data.get("araGun", 2), 2)
-            max_sure = _safe_int(data.get("maxSure", 300), 300)
-        except (ValueError, TypeError) as ve:
-            return _json_response({"error": f"GeÃ§ersiz parametre deÄŸeri: {ve}", "error_type": "ValueError"}, status=400)
-
-        if not (1 <= ay <= 12):
-            return _json_response({"error": f"GeÃ§ersiz ay deÄŸeri: {ay}"}, status=400)
-        if not (2000 <= yil <= 2100):
-            return _json_response({"error": f"GeÃ§ersiz yÄ±l deÄŸeri: {yil}"}, status=400)
-        if slot_sayisi < 1:
-            return _json_response({"error": f"GeÃ§ersiz slot sayÄ±sÄ±: {slot_sayisi}"}, status=400)
-        if ara_gun < 0:
-            return _json_response({"error": f"GeÃ§ersiz ara gÃ¼n deÄŸeri: {ara_gun}"}, status=400)
-
-        resmi_tatiller = data.get("resmiTatiller", [])
-        saat_degerleri = data.get("saatDegerleri", None)
-        ignore_manual_conflicts = bool(data.get("ignoreManualConflicts", False))
-
-        gun_sayisi = get_days_in_month(yil, ay)
-        gun_tipleri = build_gun_tipleri(yil, ay, gun_sayisi, resmi_tatiller)
-        gorevler = parse_solver_gorevler_nobet_coz(data, slot_sayisi)
-        personeller = parse_solver_personeller_coz(data, gorevler)
-
-        logger.info("nobet_coz baslatildi: yil=%d, ay=%d, slot=%d, ara_gun=%d, personel=%d, gorev=%d",
-                     yil, ay, slot_sayisi, ara_gun, len(personeller) if personeller else 0,
-                     len(gorevler) if gorevler else 0)
-
-        if not personeller:
-            return _json_response({"error": "Personel listesi boÅŸ. En az 1 personel gereklidir."}, status=400)
-        if not gorevler:
-            return _json_response({"error": "GÃ¶rev listesi boÅŸ. En az 1 gÃ¶rev tanÄ±mÄ± gereklidir."}, status=400)
-        if len(personeller) < slot_sayisi:
-            logger.warning("Personel sayÄ±sÄ± (%d) slot sayÄ±sÄ±ndan (%d) az â€” boÅŸ slotlar olabilir.",
-                           len(personeller), slot_sayisi)
-
-        duplicate_ids = _find_duplicate_personel_ids(personeller)
-        if duplicate_ids:
-            return _json_response({"error": "Duplicate personel ID", "duplicateIds": duplicate_ids}, status=400)
+        cikti, durum = _nobet_coz_hesapla(data, t0)
+        return _json_response(cikti, status=durum)
 
-        gorev_havuzlari = parse_gorev_havuzlari(data, gorevler, personeller)
-        kisitlama_istisnalari = parse_kisitlama_istisnalari(data, personeller, gorevler)
-        birlikte_istisnalari = parse_birlikte_istisnalari(data, personeller)
-        aragun_istisnalari = parse_aragun_istisnalari(data, personeller)
-        kurallar = parse_kurallar(data, personeller)
-        manuel_atamalar = parse_manuel_atamalar(data, personeller, gorevler, gun_sayisi)
+    except Exception as e:
+        sure_ms = int((time.time() - t0) * 1000)
+        log_session("nobet_coz", data or {}, None, sure_ms, hata=e,
+                    frontend_loglar=(data or {}).get("frontendLoglar"))
+        return _error_response(e, "nobet_coz")
 
-        # Ortak planlayici: preview ve final ayni plani kullansin
-        birlikte_kurallar = [k for k in kurallar if k.tur == 'birlikte']
-        gorev_kisitlamalari_dict = parse_gorev_kisitlamalari(data, personeller)
-        kilitli_hedefler = frontend_kilitli_hedefleri_topla(personeller)
-        gorev_kota_overrides = frontend_gorev_kota_override_topla(personeller)
 
-        try:
-            planlama = ortak_plan_uret(
-                gun_sayisi=gun_sayisi,
-                gun_tipleri=gun_tipleri,
-                personeller=personeller,
-                gorevler=gorevler,
-                birlikte_kurallar=birlikte_kurallar,
-                kurallar=kurallar,
-                gorev_kisitlamalari=gorev_kisitlamalari_dict,
-                manuel_atamalar=manuel_atamalar,
-                ara_gun=ara_gun,
-                saat_degerleri=saat_degerleri,
-                kilitli_hedefler=kilitli_hedefler,
-                gorev_kota_overrides=gorev_kota_overrides,
-                gorev_havuzlari=gorev_havuzlari,
-            )
-        except Exception as hedef_err:
-            logger.exception("Ortak planlama basarisiz: %s", hedef_err)
-            sure_ms = int((time.time() - t0) * 1000)
-            log_session("nobet_coz", data, None, sure_ms, hata=hedef_err,
-                        frontend_loglar=data.get("frontendLoglar"))
-            return _json_response({
-                "error": f"Planlama sirasinda hata olustu: {str(hedef_err)[:200]}",
-                "error_type": "PlanlamaHatasi"
-            }, status=500)
-
-        hesap_sonuc = planlama.get("hedef_sonuc")
-        plan_kontrati = planlama.get("plan_kontrati")
-        hedefler = planlama.get("hedefler_map", {})
-        if not hesap_sonuc or not hedefler:
-            logger.error("Ortak planlama sonucu bos dondu")
-            return _json_response({
-                "error": "Planlama sonucu bos. Personel ve gorev verilerini kontrol edin.",
-                "error_type": "PlanBos"
-            }, status=400)
-
-        def _plan_yenileyici(yeni_ara_gun: int):
-            return ortak_plan_uret(
-                gun_sayisi=gun_sayisi,
-                gun_tipleri=gun_tipleri,
-                personeller=personeller,
-                gorevler=gorevler,
-                birlikte_kurallar=birlikte_kurallar,
-                kurallar=kurallar,
-                gorev_kisitlamalari=gorev_kisitlamalari_dict,
-                manuel_atamalar=manuel_atamalar,
-                ara_gun=yeni_ara_gun,
-                saat_degerleri=saat_degerleri,
-                kilitli_hedefler=kilitli_hedefler,
-                gorev_kota_overrides=gorev_kota_overrides,
-                kaynak=(plan_kontrati.kaynak if plan_kontrati else None),
-                gorev_havuzlari=gorev_havuzlari,
-            )
-
-        sonuc, gevsetme_bilgisi, teshis_bilgisi, kullanilan_ara_gun = solve_with_diagnostics(
-            gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-            personeller=personeller, gorevler=gorevler,
-            kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
-            kisitlama_istisnalari=kisitlama_istisnalari,
-            birlikte_istisnalari=birlikte_istisnalari,
-            aragun_istisnalari=aragun_istisnalari,
-            manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-            ara_gun=ara_gun, max_sure=max_sure,
-            yil=yil, ay=ay, resmi_tatiller=resmi_tatiller, data=data,
-            ignore_manual_conflicts=ignore_manual_conflicts,
-            plan_kontrati=plan_kontrati.to_dict() if plan_kontrati else None,
-            plan_yenileyici=_plan_yenileyici,
-        )
+# ============================================
+# ENDPOINT: nobet_is (asenkron nobet_coz: gonder / durum / sonuc / iptal)
+# ============================================
 
-        # Ã‡izelge formatÄ±na dÃ¶nÃ¼ÅŸtÃ¼r
-        cizelge = {}
-        for g in range(1, gun_sayisi + 1):
-            cizelge[str(g)] = [None] * len(gorevler)
+@https_fn.on_request(min_instances=0, max_instances=20, timeout_sec=60, memory=512)
+def nobet_is(req: https_fn.Request) -> https_fn.Response:
+    if req.method == 'OPTIONS':
+        return _cors_preflight()
 
-        for atama in sonuc.atamalar:
-            cizelge[str(atama['gun'])][atama['slot_idx']] = atama['personel_ad']
+    try:
+        data = req.get_json(silent=True)
+        if not data:
+            return _json_response({"error": "Veri gÃ¶nderilmedi"}, status=400)
 
-        hedef_debug = []
-        for p in personeller:
-            h = hedefler.get(p.id) or hedefler.get(normalize_id(p.id)) or {}
-            hedef_debug.append({
-                'id': p.id, 'ad': p.ad,
-                'hedef_toplam': h.get('hedef_toplam', 0),
-                'hedef_tipler': h.get('hedef_tipler', {}),
-                'mazeret_sayisi': len(p.mazeret_gunleri)
-            })
-
-        # Kalite uyarÄ±larÄ± oluÅŸtur
-        kalite_uyarilari = []
-        kalite_skoru = sonuc.istatistikler.get('kalite_skoru', {})
-        if kalite_skoru:
-            if kalite_skoru.get('denge_puani', 0) > 50:
-                kalite_uyarilari.append(
-                    f"Denge uyarisi: Nobet sayisi farki yuksek (%{kalite_skoru['denge_puani']}). "
-                    "Personeller arasi nobet sayisi dengesi bozuk."
+        islem = data.get("islem", "gonder")
+        if islem == "gonder":
+            girdi = {k: v for k, v in data.items() if k != "islem"}
+            return _json_response(is_gonder(girdi, _nobet_coz_hesapla), status=202)
+
+        is_id = data.get("isId")
+        if not is_id:
+            return _json_response({"error": "isId gerekli"}, status=400)
+        if islem == "durum":
+            durum = is_durumu(is_id)
+            if durum is None:
+                return _json_response({"error": "Is bulunamadi", "isId": is_id}, status=404)
+            return _json_response(durum)
+        if islem == "sonuc":
+            cikti, http_durumu, durum = is_sonucu(is_id)
+            if cikti is None:
+                return _json_response(
+                    {"error": "Is sonucu hazir degil", "isId": is_id, "durum": durum}, status=http_durumu
                 )
-            if kalite_skoru.get('doluluk', 100) < 95:
-                kalite_uyarilari.append(
-                    f"Doluluk uyarisi: Slotlarin %{kalite_skoru['doluluk']}'i dolu. "
-                    "Bos kalan slotlar var."
-                )
-            if kalite_skoru.get('kural_uyumu', 100) < 80:
-                kalite_uyarilari.append(
-                    f"Hedef uyumu uyarisi: Hedeflerden sapma yuksek (%{kalite_skoru['kural_uyumu']} uyum). "
-                    "Personellerin hedeflerine ulasilamamis olabilir."
-                )
-            if kalite_skoru.get('saat_adaleti', 0) > 30:
-                kalite_uyarilari.append(
-                    f"Saat adaleti uyarisi: Saat dagilimi dengesiz (%{kalite_skoru['saat_adaleti']} sapma). "
-                    "Bazi personeller daha fazla saat calisiyor."
-                )
-
-        cikti = {
-            "basari": sonuc.basarili, "mesaj": sonuc.mesaj, "sureMs": sonuc.sure_ms,
-            "cizelge": cizelge, "atamalar": sonuc.atamalar,
-            "istatistikler": sonuc.istatistikler,
-            "kaliteUyarilari": kalite_uyarilari,
-            "teshis": teshis_bilgisi,
-            "gorevler": [g.ad for g in gorevler], "hedefDebug": hedef_debug,
-            "planKontrati": (
-                (sonuc.istatistikler.get("plan", {}) or {}).get("kontrat")
-                if isinstance(sonuc.istatistikler, dict) else None
-            ) or (plan_kontrati.to_dict() if plan_kontrati else None),
-            "planHash": (
-                (sonuc.istatistikler.get("plan", {}) or {}).get("plan_hash")
-                if isinstance(sonuc.istatistikler, dict) else None
-            ) or (plan_kontrati.plan_hash if plan_kontrati else None),
-        }
-        sure_ms = int((time.time() - t0) * 1000)
-        log_session("nobet_coz", data, cikti, sure_ms,
-                    frontend_loglar=data.get("frontendLoglar"))
-        # Hazırlık Analizi ekle
-        try:
-            _plan_dict = plan_kontrati.to_dict() if plan_kontrati else (cikti.get('planKontrati') or {})
-            _haz = analyze_preflight(
-                gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri, personeller=personeller,
-                gorevler=gorevler, kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
-                manuel_atamalar=manuel_atamalar, ara_gun=ara_gun, plan_kontrati=_plan_dict,
-                kisitlama_istisnalari=kisitlama_istisnalari, max_preview=30
-            )
-            cikti['hazirlikAnalizi'] = _haz
-        except Exception as _e:
-            cikti['hazirlikAnalizi'] = {'skor': 0, 'sorunlar': [{'kod':'ANALIZ_HATA','oneri': str(_e)[:120]}]}
-        return _json_response(cikti)
+            return _json_response(cikti, status=http_durumu)
+        if islem == "iptal":
+            durum = is_iptal(is_id)
+            if durum is None:
+                return _json_response({"error": "Is bulunamadi", "isId": is_id}, status=404)
+            return _json_response({"isId": is_id, "durum": durum})
+        return _json_response({"error": f"Gecersiz islem: {islem}"}, status=400)
 
     except Exception as e:
-        sure_ms = int((time.time() - t0) * 1000)
-        log_session("nobet_coz", data or {}, None, sure_ms, hata=e,
-                    frontend_loglar=(data or {}).get("frontendLoglar"))
-        return _error_response(e, "nobet_coz")
+        return _error_response(e, "nobet_is")
+
+
+@tasks_fn.on_task_dispatched(
+    # Yürütme ölürse (bellek, örnek kapanması) kira (_KIRA_SN=540) dolduktan sonra bir kez
+    # yeniden denenir; tekrar teslim kirası dolmamış işi devralmaz
+    retry_config=RetryConfig(max_attempts=2, min_backoff_seconds=600),
+    rate_limits=RateLimits(max_concurrent_dispatches=5),
+    timeout_sec=540, memory=2048,
+)
+def nobet_is_calistir(req: tasks_fn.CallableRequest) -> None:
+    """nobet_is kuyruğundaki işi çalıştır (çözüm eşzamanlılığı max_concurrent_dispatches ile sınırlı)."""
+    is_calistir((req.data or {}).get("isId"), _nobet_coz_hesapla)
 
 
 # ============================================
@@ -3,16 +3,19 @@ OR-Tools CP-SAT Nobet Cozucu v4.2
 Gorev kotalari + Gun tipi kotalari dahil
 """
 
-from typing import List, Dict, Set
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Set
+import json
+import logging
 import time
-import math
+
+import numpy as np
 
 from utils import (
-    GUN_TIPLERI, SAAT_DEGERLERI,
+    GUN_TIPLERI,
     ESDEGER_TIP_GRUPLARI,
-    find_matching_id,
-    birlikte_aile_anahtari,
     BIRLIKTE_ESDEGER_GOREV_AILE_ADI,
+    IdRegistry,
 )
 from solver_models import (
     SolverPersonel, SolverGorev, SolverKural, SolverAtama,
@@ -20,6 +23,14 @@ from solver_models import (
     WEIGHT_GOREV_KOTA, WEIGHT_GUN_TIPI, WEIGHT_YILLIK,
     WEIGHT_HOMOJEN, WEIGHT_PANIK, WEIGHT_TOPLAM, WEIGHT_BIRLIKTE,
 )
+from uygunluk import RED_EXCLUSIVE, UygunlukTensoru, uygunluk_tensoru_olustur
+from aday_motoru import AdayBitmapi
+from cozum_analizi import (
+    CozumMatrisi, atamalardan_matris, birlikte_uyumlu_gunler, cozum_matrisi_olustur,
+    kalite_skoru, kisi_sayaclari, plan_sapmalari,
+)
+
+logger = logging.getLogger(__name__)
 
 # Lazy import for ortools (Firebase deploy timeout fix) — thread-safe
 import threading
@@ -37,6 +48,304 @@ def _get_cp_model():
     return _cp_model_module
 
 
+# H4 ara gün kodlamaları:
+#   "ikili"   — her (g1, g2) gün çifti için sum(x[g1,*]) + sum(x[g2,*]) <= 1
+#   "pencere" — kişi-gün çalışma literali + ara_gun+1 uzunluklu kayan pencerede AddAtMostOne
+ARA_GUN_KODLAMALARI = ("ikili", "pencere")
+ARA_GUN_KODLAMA_VARSAYILAN = "ikili"
+
+# S5 uzun boşluk kodlamaları:
+#   "pencere" — her pencere başlangıcı için reified bos_pencere / buyuk_bosluk bool'u
+#   "sayac"   — kişi-gün başına süregelen boş gün sayacı + eşik başına tek asim literali
+HOMOJEN_KODLAMALARI = ("pencere", "sayac")
+HOMOJEN_KODLAMA_VARSAYILAN = "pencere"
+
+# Amaç modları:
+#   "agirlikli" — tüm cezalar tek ağırlıklı toplamda
+#   "sozluksel" — seviyeler sırayla minimize edilir; her seviyenin değeri sonrakiler için sabitlenir
+AMAC_MODLARI = ("agirlikli", "sozluksel")
+AMAC_MODU_VARSAYILAN = "agirlikli"
+# Sözlüksel seviyeler ve süre payları: boş slot (S0) → kota/tip sapmaları (S0b-S3) → denge/yayılım (S4-S7)
+AMAC_SEVIYELERI = ("bos_slot", "kota_sapma", "denge")
+_SEVIYE_SURE_PAYLARI = (0.4, 0.35, 0.25)
+
+
+def _ara_gun_pencereleri(gunler: List[int], ara_gun: int, istisna_ciftleri: Set[tuple]) -> List[List[int]]:
+    """Sıralı aday günlerden ara gün kliklerini üret.
+
+    Her kayan pencere [g, g+ara_gun] bir kliktir; istisna çifti (g1, g2) içeren
+    pencereler g1'siz ve g2'siz iki parçaya bölünür. Başka bir kliğin alt kümesi
+    olan ve 2'den küçük klikler atılır.
+    """
+    adaylar = []
+    for i, g in enumerate(gunler):
+        pencere = [h for h in gunler[i:] if h - g <= ara_gun]
+        parcalar = [pencere]
+        for g1, g2 in istisna_ciftleri:
+            if g1 not in pencere or g2 not in pencere:
+                continue
+            yeni = []
+            for parca in parcalar:
+                if g1 in parca and g2 in parca:
+                    yeni.append([h for h in parca if h != g1])
+                    yeni.append([h for h in parca if h != g2])
+                else:
+                    yeni.append(parca)
+            parcalar = yeni
+        adaylar.extend(frozenset(parca) for parca in parcalar if len(parca) >= 2)
+
+    klikler = []
+    for klik in sorted(set(adaylar), key=len, reverse=True):
+        if not any(klik <= diger for diger in klikler):
+            klikler.append(klik)
+    return [sorted(klik) for klik in klikler]
+
+
+def _ara_gunlu_kapasite(gunler: List[int], ara_gun: int) -> int:
+    """Sıralı aday günlerden aralarında ara_gun'den fazla gün olacak şekilde seçilebilecek en fazla gün.
+
+    Erken bitenden seçen açgözlü yöntem birim aralıklarda en iyidir.
+    """
+    secilen, son = 0, None
+    for g in gunler:
+        if son is None or g - son > ara_gun:
+            secilen += 1
+            son = g
+    return secilen
+
+
+def plan_uygulamasini_gevset(uygulama: Dict) -> Dict:
+    """Plan kontratı uygulamasının gevşek hali: toplam eşitliği kalkar, toleranslar en az 2."""
+    gevsek = dict(uygulama or {})
+    gevsek["toplam_hard"] = False
+    for anahtar in ("gun_tipi_toleransi", "gorev_kota_toleransi", "gun_iskeleti_toleransi"):
+        try:
+            gevsek[anahtar] = max(int(gevsek.get(anahtar, 0)), 2)
+        except (TypeError, ValueError):
+            gevsek[anahtar] = 2
+    return gevsek
+
+
+# Çekirdekten gevşetilecek öge seçimi: en az gevşek olan önce (teşhis kademesiyle aynı sıra)
+_GEVSETME_SIRASI = {'ara_gun': 0, 'exclusive': 1, 'havuz': 2, 'ayri': 3, 'birlikte': 4, 'plan': 5}
+
+
+def _gevsetme_maliyeti(oge: Dict) -> tuple:
+    """Çekirdek ögesinin gevşetme maliyeti; ara günde uzak mesafe (küçük iniş) daha ucuzdur."""
+    tur = oge.get('kural_tur') if oge['tur'] == 'kural' else oge['tur']
+    return _GEVSETME_SIRASI.get(tur, len(_GEVSETME_SIRASI)), -oge.get('mesafe', 0)
+
+
+def _kosullu(kisit, literal):
+    """literal verilmişse kısıtı ona bağla (OnlyEnforceIf); None ise kısıt koşulsuz kalır."""
+    if literal is not None:
+        kisit.OnlyEnforceIf(literal)
+    return kisit
+
+
+@dataclass
+class _KuruluModel:
+    """Kurulmuş CP-SAT modeli ve gevşetme denemelerinde sabitlenen etkinlik literalleri.
+
+    ara_gun_literalleri[pid, d]: kişi için "ara_gun >= d" (d >= 2; d = 1 her zaman uygulanır)
+    eleme_literalleri[tur, rol]: rolün exclusive (H8) / havuz (H10) elemesi aktif mi
+    kural_literalleri[kural_idx]: ayrı/birlikte kuralı aktif mi
+    manuel_literalleri[pid, gun, slot_idx]: manuel atama (H6) zorunlu mu
+    plan_literali: plan kontratının sert (gevşetilmemiş) sınırları aktif mi
+
+    Aynı literaller INFEASIBLE sonrası varsayım (assumption) olarak da kullanılır
+    (bkz. NobetSolver.cekirdek_bul).
+    """
+    model: Any
+    x: Dict
+    bos_slotlar: List
+    amac_var: bool
+    eliminated_vars: int
+    ara_gun_literalleri: Dict[tuple, Any] = field(default_factory=dict)
+    eleme_literalleri: Dict[tuple, Any] = field(default_factory=dict)
+    kural_literalleri: Dict[int, Any] = field(default_factory=dict)
+    manuel_literalleri: Dict[tuple, Any] = field(default_factory=dict)
+    plan_literali: Any = None
+    # uygun[i, g-1, s]: x[pid, g, s] serbest değişken mi (False ise sabit 0)
+    uygun: Any = None
+    # Sözlüksel amaç: [(seviye_adi, ceza_ifadesi)] öncelik sırasıyla (bkz. AMAC_SEVIYELERI)
+    amac_seviyeleri: List = field(default_factory=list)
+    # Serbest hücrelerin (uygun.nonzero() sırasıyla) proto değişken indeksleri; çözüm okuma için
+    x_indeksleri: Any = None
+    # Ön çözümleme raporu: sabitlenen / elenen değişkenler ve atlanan kısıtlar (bkz. _on_cozumle)
+    on_cozum_raporu: Dict = field(default_factory=dict)
+    # Simetri kırma: eşdeğer personel sınıfları ve eklenen sıralama kısıtları (bkz. _simetri_siniflari)
+    simetri_raporu: Dict = field(default_factory=dict)
+    # Rol düzeyi değişkenler (bkz. NobetSolver.rol_degiskenleri): rol_slotlari[temsilci] = rolün
+    # slotları; x[pid, g, temsilci] kişinin o gün rolü alıp almadığıdır, diğer slotlar sabit 0.
+    # Boşsa her slotun kendi değişkeni vardır.
+    rol_slotlari: Dict[int, List[int]] = field(default_factory=dict)
+    # Türetilmiş kesimler: aileye göre eklenen gereksiz toplu kısıt sayıları (bkz. _kesimleri_ekle)
+    kesim_raporu: Dict = field(default_factory=dict)
+    # Somut slot dağıtımında önce yerleşen (i, g-1) -> slot (manuel / artımlı sabit atama)
+    sabit_slotlar: Dict[tuple, int] = field(default_factory=dict)
+
+    def temsilci(self, anahtar: tuple) -> tuple:
+        """(pid, gun, slot) hücresinin modeldeki değişken anahtarı."""
+        pid, g, s = anahtar
+        for temsilci, slotlar in self.rol_slotlari.items():
+            if s in slotlar:
+                return pid, g, temsilci
+        return anahtar
+
+    def slot_maskesi(self, uygun: np.ndarray) -> np.ndarray:
+        """Model maskesini slot düzeyine aç: temsilci sütunu rolün tüm slotlarına kopyalanır."""
+        if not self.rol_slotlari:
+            return uygun
+        acik = uygun.copy()
+        for temsilci, slotlar in self.rol_slotlari.items():
+            acik[:, :, slotlar] = uygun[:, :, temsilci][:, :, None]
+        return acik
+
+    def somut_hucreler(self, i_dizi, g0_dizi, s_dizi) -> tuple:
+        """Seçili model hücrelerini somut (i, g-1, slot) hücrelerine çevir.
+
+        Rol düzeyi hücrelerde önce sabit slotu olan kişiler kendi slotuna yerleşir;
+        kalanlar kişi sırasıyla rolün boş slotlarına artan indeksle yazılır.
+        """
+        if not self.rol_slotlari:
+            return i_dizi, g0_dizi, s_dizi
+        hucreler, gruplar = [], {}
+        for i, g0, s in zip(np.asarray(i_dizi).tolist(), np.asarray(g0_dizi).tolist(), np.asarray(s_dizi).tolist()):
+            if s in self.rol_slotlari:
+                gruplar.setdefault((g0, s), []).append(i)
+            else:
+                hucreler.append((i, g0, s))
+        for (g0, temsilci), kisiler in gruplar.items():
+            bos = list(self.rol_slotlari[temsilci])
+            kalan = []
+            for i in sorted(kisiler):
+                sabit = self.sabit_slotlar.get((i, g0))
+                if sabit in bos:
+                    bos.remove(sabit)
+                    hucreler.append((i, g0, sabit))
+                else:
+                    kalan.append(i)
+            hucreler.extend((i, g0, s) for i, s in zip(kalan, bos))
+        if not hucreler:
+            return (np.zeros(0, dtype=np.int64),) * 3
+        return tuple(np.array(d, dtype=np.int64) for d in zip(*hucreler))
+
+
+def _pozitif_sayi(deger):
+    """Erken durdurma sınırları: pozitif sayı değilse None (sınır yok)."""
+    try:
+        deger = float(deger)
+    except (TypeError, ValueError):
+        return None
+    return deger if deger > 0 else None
+
+
+def _ara_cozum_ozeti(kurulu: _KuruluModel, personel_listesi, secili: tuple, cozum_no: int,
+                     sure_s: float, amac, sinir) -> Dict:
+    """Ara çözüm özeti: secili = uygun.nonzero() hücrelerinden çözümde 1 olanlar (i, g0, s dizileri)."""
+    gun_sayisi, slot_sayisi = kurulu.uygun.shape[1], kurulu.uygun.shape[2]
+    cizelge = {str(g): [None] * slot_sayisi for g in range(1, gun_sayisi + 1)}
+    atama_sayisi = 0
+    for i, g0, s in zip(*kurulu.somut_hucreler(*secili)):
+        cizelge[str(int(g0) + 1)][int(s)] = personel_listesi[i].id
+        atama_sayisi += 1
+    return {
+        'cozum_no': cozum_no,
+        'sure_s': round(sure_s, 2),
+        'objective': amac,
+        'bound': sinir,
+        'bos_slot_sayisi': gun_sayisi * slot_sayisi - atama_sayisi,
+        'cizelge': cizelge,
+    }
+
+
+_ara_cozum_sinifi = None
+
+
+def _ara_cozum_geri_cagirimi(cp):
+    """Ara çözüm geri çağırım sınıfı; ortools lazy import edildiği için ilk kullanımda tanımlanır."""
+    global _ara_cozum_sinifi
+    if _ara_cozum_sinifi is None:
+        class _AraCozumGeriCagirimi(cp.CpSolverSolutionCallback):
+            """Her iyileşen çözümü özetleyip dinleyiciye ver (en sık `aralik` saniyede bir).
+
+            Dinleyici True dönerse arama durdurulur (StopSearch) ve mevcut çözüm sonuç olur.
+            Dinleyici None ise yalnızca son iyileşme anı tutulur (iyileşmesiz süre durdurması için).
+            Aralık nedeniyle bildirilmeyen son çözüm arama bitince son_cozumu_bildir ile iletilir.
+            """
+
+            def __init__(self, personel_listesi, kurulu: _KuruluModel, dinleyici, aralik: float):
+                super().__init__()
+                self._personel_listesi = personel_listesi
+                self._kurulu = kurulu
+                self._dinleyici = dinleyici
+                self._aralik = aralik
+                self._son_bildirim = None
+                self._bildirilen_cozum = 0
+                self.cozum_sayisi = 0
+                self.bildirim_sayisi = 0
+                self.erken_durduruldu = False
+                self.son_amac = None
+                self.son_iyilesme = None
+
+            def seviye_baslat(self):
+                """Yeni Solve (sözlüksel seviye) öncesi iyileşme takibini sıfırla."""
+                self.son_amac = None
+                self.son_iyilesme = None
+
+            def on_solution_callback(self):
+                self.cozum_sayisi += 1
+                simdi = time.time()
+                amac = self.ObjectiveValue() if self._kurulu.amac_var else 0
+                if self.son_amac is None or amac < self.son_amac:
+                    self.son_amac = amac
+                    self.son_iyilesme = simdi
+                if self._dinleyici is None:
+                    return
+                if self._son_bildirim is not None and simdi - self._son_bildirim < self._aralik:
+                    return
+                self._son_bildirim = simdi
+                kurulu = self._kurulu
+                secili = [
+                    (i, g0, s) for i, g0, s in zip(*kurulu.uygun.nonzero())
+                    if self.Value(kurulu.x[self._personel_listesi[i].id, int(g0) + 1, int(s)])
+                ]
+                ozet = _ara_cozum_ozeti(
+                    kurulu, self._personel_listesi, tuple(zip(*secili)) if secili else ((), (), ()),
+                    self.cozum_sayisi, self.WallTime(),
+                    amac, self.BestObjectiveBound() if kurulu.amac_var else 0,
+                )
+                if self._bildir(ozet):
+                    self.erken_durduruldu = True
+                    self.StopSearch()
+
+            def _bildir(self, ozet: Dict) -> bool:
+                self._bildirilen_cozum = self.cozum_sayisi
+                self.bildirim_sayisi += 1
+                try:
+                    return bool(self._dinleyici(ozet))
+                except Exception:
+                    logger.warning("Ara cozum dinleyicisi hata verdi", exc_info=True)
+                    return False
+
+            def son_cozumu_bildir(self, solver):
+                """Aralık nedeniyle bildirilmemiş son çözümü aramanın sonucundan (tek sefer) ilet."""
+                if self._dinleyici is None or self.cozum_sayisi <= self._bildirilen_cozum:
+                    return
+                kurulu = self._kurulu
+                cozum = np.asarray(solver.ResponseProto().solution)
+                secili = tuple(d[cozum[kurulu.x_indeksleri] == 1] for d in kurulu.uygun.nonzero())
+                self._bildir(_ara_cozum_ozeti(
+                    kurulu, self._personel_listesi, secili, self.cozum_sayisi, solver.WallTime(),
+                    self.son_amac if kurulu.amac_var and self.son_amac is not None else 0,
+                    solver.BestObjectiveBound() if kurulu.amac_var else 0,
+                ))
+
+        _ara_cozum_sinifi = _AraCozumGeriCagirimi
+    return _ara_cozum_sinifi
+
+
 class NobetSolver:
     def __init__(self, gun_sayisi: int, gun_tipleri: Dict[int, str],
                  personeller: List[SolverPersonel], gorevler: List[SolverGorev],
@@ -49,13 +358,27 @@ class NobetSolver:
                  hedefler: Dict[int, Dict] = None,
                  plan_kontrati: Dict = None,
                  ara_gun: int = 2, max_sure_saniye: int = 300,
-                 ignore_manual_conflicts: bool = False):
+                 ignore_manual_conflicts: bool = False,
+                 kayit: IdRegistry = None,
+                 ara_gun_kodlama: str = ARA_GUN_KODLAMA_VARSAYILAN,
+                 homojen_kodlama: str = HOMOJEN_KODLAMA_VARSAYILAN,
+                 amac_modu: str = AMAC_MODU_VARSAYILAN,
+                 yeniden_kullanilabilir: bool = False,
+                 on_cozumleme: bool = True,
+                 simetri_kirma: bool = False,
+                 rol_degiskenleri: bool = False,
+                 ek_kesimler: bool = False,
+                 goreli_bosluk: float = None,
+                 mutlak_bosluk: float = None,
+                 iyilesmesiz_sure: float = None):
         self.gun_sayisi = gun_sayisi
         self.gun_tipleri = gun_tipleri
         self.personeller = {p.id: p for p in personeller}
+        self.kayit = kayit if kayit is not None else IdRegistry(personeller)
         self.personel_listesi = personeller
         self.gorevler = gorevler
         self.kurallar = kurallar or []
+        self.tum_kurallar = list(self.kurallar)
         self.gorev_havuzlari = gorev_havuzlari or {}
         self.kisitlama_istisnalari = kisitlama_istisnalari or []
         self.manuel_atamalar = manuel_atamalar or []
@@ -68,6 +391,41 @@ class NobetSolver:
         self.manual_mazeret_override_days = set()
         self.manual_mazeret_override_slots = set()
         self.ignore_manual_conflicts = ignore_manual_conflicts
+        self.ara_gun_kodlama = ara_gun_kodlama if ara_gun_kodlama in ARA_GUN_KODLAMALARI else ARA_GUN_KODLAMA_VARSAYILAN
+        self.homojen_kodlama = homojen_kodlama if homojen_kodlama in HOMOJEN_KODLAMALARI else HOMOJEN_KODLAMA_VARSAYILAN
+        self.amac_modu = amac_modu if amac_modu in AMAC_MODLARI else AMAC_MODU_VARSAYILAN
+        # Model kurulmadan önce sert kısıtları hücre maskesinde yay (bkz. _on_cozumle)
+        self.on_cozumleme = bool(on_cozumleme)
+        # Birbirinin yerine geçebilen personel için çalışma günü vektörlerinde sözlüksel sıra.
+        # Varsayılan kapalı: CP-SAT'in kendi simetri tespiti (symmetry_level) aynı yörüngeleri
+        # çoğu çizelgede zaten kullanır; statik sıra kısıtları onu bozup aramayı yavaşlatabilir.
+        # Eşdeğer sınıflar her durumda istatistiklerde raporlanır.
+        self.simetri_kirma = bool(simetri_kirma)
+        # Aynı base_name'li birbirinin yerine geçebilen slotlar için kişi × gün × rol değişkeni
+        # ve günlük rol kapasitesi; somut slotlar çözümden sonra dağıtılır (bkz. _rol_temsilcileri)
+        self.rol_degiskenleri = bool(rol_degiskenleri)
+        # Sert kısıtlardan türeyen gereksiz toplu kısıtlar (kesimler); çözüm kümesini değiştirmez
+        self.ek_kesimler = bool(ek_kesimler)
+        # Erken durdurma: amaç-sınır boşluğu (göreli / mutlak) ve son iyileşmeden beri geçen
+        # süre (saniye) sınırları; None = sınır yok, arama max_sure'ye kadar sürer
+        self.goreli_bosluk = _pozitif_sayi(goreli_bosluk)
+        self.mutlak_bosluk = _pozitif_sayi(mutlak_bosluk)
+        self.iyilesmesiz_sure = _pozitif_sayi(iyilesmesiz_sure)
+
+        # Gevşetme durumu (bkz. gevset). yeniden_kullanilabilir modda model bir kez,
+        # en sıkı parametrelerle kurulur; denemeler sadece etkinlik literallerini sabitler.
+        self.yeniden_kullanilabilir = yeniden_kullanilabilir
+        self.ara_gun_ust = ara_gun
+        self.exclusive_aktif = True
+        # Kısmi gevşetmeler (çelişki çekirdeğinden): kişi bazlı ara gün ve rol bazlı eleme
+        self.kisi_ara_gun: Dict[int, int] = {}
+        self.gevsek_eleme: Set[tuple] = set()
+        self.plan_gevsek = False
+        self._sert_plan_uygulama = self.plan_uygulama
+        self._kurulu_model = None
+        self.model_kurulum_ms = 0
+        # CP-SAT paralel arama işçisi; portföy modunda süreç başına düşürülür
+        self.arama_isci_sayisi = 4
         
         self.gunler_by_tip = {t: [] for t in GUN_TIPLERI}
         for g, tip in gun_tipleri.items():
@@ -84,7 +442,7 @@ class NobetSolver:
         self.birlikte_family_slots = {}
         for s, gorev in enumerate(gorevler):
             role_name = gorev.base_name if gorev.base_name else gorev.ad
-            family_key = birlikte_aile_anahtari(role_name)
+            family_key = self.kayit.aile_anahtari(role_name)
             if family_key not in self.birlikte_family_slots:
                 self.birlikte_family_slots[family_key] = []
             self.birlikte_family_slots[family_key].append(s)
@@ -94,7 +452,7 @@ class NobetSolver:
         for role, raw_ids in self.gorev_havuzlari.items():
             matched_ids = set()
             for pid in raw_ids or []:
-                matched_id = find_matching_id(pid, self.personeller.keys())
+                matched_id = self._eslestir(pid)
                 if matched_id is not None:
                     matched_ids.add(matched_id)
             if matched_ids:
@@ -108,7 +466,7 @@ class NobetSolver:
             raw_pid = raw.get("personel_id")
             gun = int(raw.get("gun", 0) or 0)
             istisna_gorev = raw.get("istisna_gorev")
-            matched_id = find_matching_id(raw_pid, self.personeller.keys())
+            matched_id = self._eslestir(raw_pid)
             if matched_id is None or gun < 1 or gun > self.gun_sayisi or not istisna_gorev:
                 continue
             key = (matched_id, gun)
@@ -124,7 +482,7 @@ class NobetSolver:
         for raw in (birlikte_istisnalari or []):
             raw_pid = raw.get("personel_id")
             gun = int(raw.get("gun", 0) or 0)
-            matched_id = find_matching_id(raw_pid, self.personeller.keys())
+            matched_id = self._eslestir(raw_pid)
             if matched_id is not None and 1 <= gun <= self.gun_sayisi:
                 self.birlikte_istisna_set.add((matched_id, gun))
 
@@ -134,20 +492,38 @@ class NobetSolver:
             raw_pid = raw.get("personel_id")
             gun1 = int(raw.get("gun1", 0) or 0)
             gun2 = int(raw.get("gun2", 0) or 0)
-            matched_id = find_matching_id(raw_pid, self.personeller.keys())
+            matched_id = self._eslestir(raw_pid)
             if matched_id is not None and gun1 >= 1 and gun2 >= 1:
                 g1, g2 = min(gun1, gun2), max(gun1, gun2)
                 self.aragun_istisna_set.add((matched_id, g1, g2))
 
+        # Manuel atamalar: (personel_id, gun, slot_idx) set — eşleşen ve aralık içi olanlar
+        self.manuel_slot_set = set()
+        self.manuel_kisi_gunleri = set()
         for m in self.manuel_atamalar:
-            if not getattr(m, "mazeret_onayli", False):
-                continue
-            matched_id = find_matching_id(m.personel_id, self.personeller.keys())
+            matched_id = self._eslestir(m.personel_id)
             if matched_id is None:
                 continue
+            self.manuel_kisi_gunleri.add((matched_id, m.gun))
             if 1 <= m.gun <= self.gun_sayisi and 0 <= m.slot_idx < self.slot_sayisi:
-                self.manual_mazeret_override_days.add((matched_id, m.gun))
-                self.manual_mazeret_override_slots.add((matched_id, m.gun, m.slot_idx))
+                self.manuel_slot_set.add((matched_id, m.gun, m.slot_idx))
+                if getattr(m, "mazeret_onayli", False):
+                    self.manual_mazeret_override_days.add((matched_id, m.gun))
+                    self.manual_mazeret_override_slots.add((matched_id, m.gun, m.slot_idx))
+        self._uygunluk_cache = None
+        self._gevsek_uygunluk_cache = None
+        self._aday_bitmapi_cache = None
+        # S6/S6b ortalamaları; bileşen alt çözücülerine tüm personelinki aktarılır (bkz. bilesen_ayristirma.py)
+        self.yillik_denge_referansi: Dict = None
+        # Son bulunan çözüm (veya dışarıdan verilen ipucu): sonraki coz() için ipucu
+        self.onceki_cozum: Set[tuple] = None
+        # Artımlı yeniden çözüm komşuluğu (bkz. komsulugu_sabitle); None = tüm model serbest
+        self.komsuluk: Dict = None
+        # Ara çözüm dinleyicisi: f(ozet) -> True ise arama erken durdurulur
+        self.ilerleme_dinleyici = None
+        self.ilerleme_araligi = 2.0
+        # threading.Event: set edilince süren arama durdurulur (StopSearch), yeni coz() başlamaz
+        self.iptal_olayi = None
         
         # Slot kıtlık ağırlığı: Az slotlu görevler daha önemli
         # max_slot / slot_sayisi formülü ile hesapla
@@ -165,6 +541,11 @@ class NobetSolver:
                     p.musait_tipler[tip] += 1
                     p.musait_gunler.add(g)
 
+    def _eslestir(self, raw_pid):
+        """Ham personel ID'sini bu çözücünün personel ID'sine eşle (kayıt üzerinden O(1))."""
+        pid = self.kayit.eslestir(raw_pid)
+        return pid if pid in self.personeller else None
+
     def _plan_aktif_mi(self) -> bool:
         if not isinstance(self.plan_kontrati, dict) or not self.plan_kontrati:
             return False
@@ -178,22 +559,25 @@ class NobetSolver:
         except (TypeError, ValueError):
             return 1
 
-    def _plan_toplam_hard_mi(self) -> bool:
-        return self._plan_aktif_mi() and bool(self.plan_uygulama.get("toplam_hard", True))
+    def _plan_toplam_hard_mi(self, uygulama: Dict = None) -> bool:
+        uygulama = self.plan_uygulama if uygulama is None else uygulama
+        return self._plan_aktif_mi() and bool(uygulama.get("toplam_hard", True))
 
-    def _plan_gun_tipi_toleransi(self) -> int:
+    def _plan_gun_tipi_toleransi(self, uygulama: Dict = None) -> int:
         if not self._plan_aktif_mi():
             return 0
+        uygulama = self.plan_uygulama if uygulama is None else uygulama
         try:
-            return max(0, int(self.plan_uygulama.get("gun_tipi_toleransi", 0)))
+            return max(0, int(uygulama.get("gun_tipi_toleransi", 0)))
         except (TypeError, ValueError):
             return 0
 
-    def _plan_gorev_kota_toleransi(self) -> int:
+    def _plan_gorev_kota_toleransi(self, uygulama: Dict = None) -> int:
         if not self._plan_aktif_mi():
             return 0
+        uygulama = self.plan_uygulama if uygulama is None else uygulama
         try:
-            return max(0, int(self.plan_uygulama.get("gorev_kota_toleransi", 0)))
+            return max(0, int(uygulama.get("gorev_kota_toleransi", 0)))
         except (TypeError, ValueError):
             return 0
 
@@ -203,11 +587,12 @@ class NobetSolver:
         gun_iskeleti = self.plan_kontrati.get("gun_iskeleti", {}) if isinstance(self.plan_kontrati, dict) else {}
         return bool(self.plan_uygulama.get("gun_iskeleti_kullan", False) and gun_iskeleti.get("aktif"))
 
-    def _gun_iskeleti_toleransi(self) -> int:
+    def _gun_iskeleti_toleransi(self, uygulama: Dict = None) -> int:
         if not self._gun_iskeleti_aktif_mi():
             return 999999
+        uygulama = self.plan_uygulama if uygulama is None else uygulama
         try:
-            return max(0, int(self.plan_uygulama.get("gun_iskeleti_toleransi", 0)))
+            return max(0, int(uygulama.get("gun_iskeleti_toleransi", 0)))
         except (TypeError, ValueError):
             return 0
 
@@ -227,7 +612,7 @@ class NobetSolver:
         raw = gun_iskeleti.get("personel_gunleri", {})
         normalized = {}
         for raw_pid, gunler in (raw or {}).items():
-            pid = find_matching_id(raw_pid, self.personeller.keys())
+            pid = self._eslestir(raw_pid)
             if pid is None:
                 continue
             normalized[pid] = {
@@ -239,7 +624,7 @@ class NobetSolver:
     def _birlikte_gecerli_ids(self, kural: SolverKural) -> List[int]:
         valid_ids = []
         for raw_pid in getattr(kural, "kisiler", []) or []:
-            matched_id = find_matching_id(raw_pid, self.personeller.keys())
+            matched_id = self._eslestir(raw_pid)
             if matched_id is not None and matched_id not in valid_ids:
                 valid_ids.append(matched_id)
         return valid_ids
@@ -291,7 +676,7 @@ class NobetSolver:
                 rol_gunleri = getattr(pp, "onerilen_rol_gunleri", {})
             if not rol_gunleri:
                 continue
-            pid = find_matching_id(raw_pid, self.personeller.keys())
+            pid = self._eslestir(raw_pid)
             if pid is None:
                 continue
             gun_rol_map: Dict[int, str] = {}
@@ -310,86 +695,16 @@ class NobetSolver:
         gun_iskeleti = self.plan_kontrati.get("gun_iskeleti", {})
         ids = set()
         for raw_pid in gun_iskeleti.get("uygulanabilir_personeller", []) or []:
-            pid = find_matching_id(raw_pid, self.personeller.keys())
+            pid = self._eslestir(raw_pid)
             if pid is not None:
                 ids.add(pid)
         return ids
 
-    def _hesapla_plan_sapmalari(self, kisi_sayac: Dict[int, Dict], atamalar: List[Dict]) -> Dict:
+    def _hesapla_plan_sapmalari(self, matris: CozumMatrisi) -> Dict:
         if not self._plan_aktif_mi():
             return {}
-
-        detay = []
-        tam_uyumlu = 0
-        toplam_sapma = 0
-        tip_sapma_toplami = 0
-        gorev_sapma_toplami = 0
-        gun_sapma_toplami = 0
-        planlanan_gunler_map = self._planlanan_gunler_map()
-        actual_days_map: Dict[int, Set[int]] = {p.id: set() for p in self.personel_listesi}
-        for atama in atamalar or []:
-            pid = atama.get('personel_id')
-            gun = atama.get('gun')
-            if pid in actual_days_map and gun is not None:
-                actual_days_map[pid].add(int(gun))
-        for p in self.personel_listesi:
-            hedef = self.hedefler.get(p.id, {})
-            if not hedef:
-                continue
-            gercek = kisi_sayac.get(p.id, {'toplam': 0, 'tipler': {}, 'gorevler': {}})
-            hedef_tipler = hedef.get('hedef_tipler', {}) or {}
-            hedef_gorevler = hedef.get('gorev_kotalari', {}) or {}
-
-            tip_sapmalari = {}
-            for tip in GUN_TIPLERI:
-                fark = gercek['tipler'].get(tip, 0) - hedef_tipler.get(tip, 0)
-                if fark != 0:
-                    tip_sapmalari[tip] = fark
-                    tip_sapma_toplami += abs(fark)
-
-            gorev_sapmalari = {}
-            for gorev_adi in set(hedef_gorevler.keys()):
-                fark = gercek['gorevler'].get(gorev_adi, 0) - hedef_gorevler.get(gorev_adi, 0)
-                if fark != 0:
-                    gorev_sapmalari[gorev_adi] = fark
-                    gorev_sapma_toplami += abs(fark)
-
-            toplam_fark = gercek['toplam'] - hedef.get('hedef_toplam', 0)
-            toplam_sapma += abs(toplam_fark)
-            planlanan_gunler = set(planlanan_gunler_map.get(p.id, set()))
-            gercek_gunler = set(actual_days_map.get(p.id, set()))
-            eksik_gunler = sorted(planlanan_gunler - gercek_gunler)
-            ekstra_gunler = sorted(gercek_gunler - planlanan_gunler)
-            gun_sapma_toplami += len(eksik_gunler) + len(ekstra_gunler)
-
-            if toplam_fark == 0 and not tip_sapmalari and not gorev_sapmalari and not eksik_gunler and not ekstra_gunler:
-                tam_uyumlu += 1
-
-            detay.append({
-                'personel_id': p.id,
-                'personel_ad': p.ad,
-                'hedef_toplam': hedef.get('hedef_toplam', 0),
-                'gercek_toplam': gercek['toplam'],
-                'toplam_fark': toplam_fark,
-                'tip_sapmalari': tip_sapmalari,
-                'gorev_sapmalari': gorev_sapmalari,
-                'planlanan_gunler': sorted(planlanan_gunler),
-                'gercek_gunler': sorted(gercek_gunler),
-                'eksik_gunler': eksik_gunler,
-                'ekstra_gunler': ekstra_gunler,
-            })
-
-        return {
-            'plan_hash': self.plan_kontrati.get('plan_hash'),
-            'kaynak': self.plan_kontrati.get('kaynak'),
-            'tam_uyumlu_personel': tam_uyumlu,
-            'personel_sayisi': len(detay),
-            'toplam_sapma': toplam_sapma,
-            'tip_sapma_toplami': tip_sapma_toplami,
-            'gorev_sapma_toplami': gorev_sapma_toplami,
-            'gun_sapma_toplami': gun_sapma_toplami,
-            'detay': detay,
-        }
+        return plan_sapmalari(matris, self.personel_listesi, self.hedefler,
+                              self._planlanan_gunler_map(), self.plan_kontrati)
 
     def _role_name_by_slot(self, slot_idx: int) -> str:
         if slot_idx < 0 or slot_idx >= len(self.gorevler):
@@ -397,18 +712,12 @@ class NobetSolver:
         gorev = self.gorevler[slot_idx]
         return gorev.base_name if gorev.base_name else gorev.ad
 
-    def _hesapla_birlikte_grup_istatistikleri(self, atamalar: List[Dict]) -> List[Dict]:
-        daily_assignments = {}
-        for atama in atamalar:
-            gun = atama.get('gun')
-            pid = atama.get('personel_id')
-            role = atama.get('gorev_base') or atama.get('gorev_ad') or ''
-            if gun is None or pid is None:
-                continue
-            daily_assignments.setdefault(gun, {})[pid] = {
-                'role': role,
-                'family': birlikte_aile_anahtari(role),
-            }
+    def _hesapla_birlikte_grup_istatistikleri(self, matris: CozumMatrisi) -> List[Dict]:
+        slot_rolleri = [self._role_name_by_slot(s) for s in range(self.slot_sayisi)]
+        aile_adlari = list(dict.fromkeys(self.kayit.aile_anahtari(rol) for rol in slot_rolleri))
+        aile_index = {aile: f for f, aile in enumerate(aile_adlari)}
+        slot_aile = [aile_index[self.kayit.aile_anahtari(rol)] for rol in slot_rolleri]
+        pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
 
         birlikte_gruplar = []
         for kural in self.kurallar:
@@ -420,43 +729,21 @@ class NobetSolver:
             if len(valid_ids) < 2:
                 continue
 
+            uye_indeksleri = [pid_index[pid] for pid in valid_ids]
             uyumlu_gunler = []
             gun_detaylari = []
-            for g in range(1, self.gun_sayisi + 1):
-                gun_atamalari = daily_assignments.get(g, {})
-                entries = []
-                for pid in valid_ids:
-                    info = gun_atamalari.get(pid)
-                    if info:
-                        entries.append({
-                            'personel_id': pid,
-                            'personel_ad': self.personeller[pid].ad,
-                            'role': info['role'],
-                            'family': info['family'],
-                        })
-
-                if len(entries) < 2:
-                    continue
-
-                family_groups = {}
-                for entry in entries:
-                    family_groups.setdefault(entry['family'], []).append(entry)
-
-                matched_family = next((family for family, members in family_groups.items() if len(members) >= 2), None)
-                if matched_family is None:
-                    continue
-
+            for g, f, uyeler in birlikte_uyumlu_gunler(matris, uye_indeksleri, slot_aile):
                 uyumlu_gunler.append(g)
                 gun_detaylari.append({
                     'gun': g,
-                    'aile': matched_family,
+                    'aile': aile_adlari[f],
                     'atamalar': [
                         {
-                            'personel_id': entry['personel_id'],
-                            'personel_ad': entry['personel_ad'],
-                            'gorev': entry['role'],
+                            'personel_id': valid_ids[k],
+                            'personel_ad': self.personeller[valid_ids[k]].ad,
+                            'gorev': slot_rolleri[matris.kisi_gun_slot[uye_indeksleri[k], g - 1]],
                         }
-                        for entry in family_groups[matched_family]
+                        for k in uyeler
                     ]
                 })
 
@@ -482,7 +769,7 @@ class NobetSolver:
                 continue
             valid_ids = []
             for pid in kural.kisiler:
-                matched = find_matching_id(pid, self.personeller.keys())
+                matched = self._eslestir(pid)
                 if matched is not None:
                     valid_ids.append(matched)
             if len(valid_ids) >= 2:
@@ -495,7 +782,7 @@ class NobetSolver:
             if kural.tur != 'birlikte':
                 continue
             for pid in kural.kisiler:
-                matched = find_matching_id(pid, self.personeller.keys())
+                matched = self._eslestir(pid)
                 if matched is not None:
                     birlikte_uye_ids.add(matched)
 
@@ -505,7 +792,7 @@ class NobetSolver:
         )
 
         exclusive_gorevler = set()
-        for gorev in self.gorevler:
+        for gorev in (self.gorevler if self.exclusive_aktif else []):
             if gorev.exclusive:
                 base = gorev.base_name if gorev.base_name else gorev.ad
                 exclusive_gorevler.add(base)
@@ -515,7 +802,7 @@ class NobetSolver:
         manual_days = {}
 
         for m in self.manuel_atamalar:
-            pid = find_matching_id(m.personel_id, self.personeller.keys())
+            pid = self._eslestir(m.personel_id)
             if pid is None:
                 conflicts.append({
                     "code": "MANUEL_KISI_YOK",
@@ -576,7 +863,8 @@ class NobetSolver:
                     "gorev": role
                 })
 
-            if role in exclusive_gorevler and p.kisitli_gorev != role and p.tasma_gorevi != role:
+            if (role in exclusive_gorevler and ('exclusive', role) not in self.gevsek_eleme
+                    and p.kisitli_gorev != role and p.tasma_gorevi != role):
                 # Havuz üyesi ise exclusive ihlali değil
                 havuz_ids = self.gorev_havuzlari.get(role)
                 if havuz_ids is not None and pid in havuz_ids:
@@ -595,7 +883,8 @@ class NobetSolver:
                             "gorev": role
                         })
 
-            if role in self.gorev_havuzlari and pid not in self.gorev_havuzlari[role]:
+            if (self.exclusive_aktif and ('havuz', role) not in self.gevsek_eleme
+                    and role in self.gorev_havuzlari and pid not in self.gorev_havuzlari[role]):
                 # Bug fix: kısıtlı kişiler veya taşma görevi olan kişiler havuz dışı sayılmaz
                 if p.kisitli_gorev != role and (not p.tasma_gorevi or p.tasma_gorevi != role):
                     # YENI KURAL: Eger bu kisiye bu gorev icin hedef kota verilmisse havuz bloklamasini gec
@@ -642,7 +931,8 @@ class NobetSolver:
             gunler = sorted(gunler)
             for i in range(len(gunler) - 1):
                 g1, g2 = gunler[i], gunler[i + 1]
-                if g2 - g1 <= self.ara_gun:
+                # Yeniden kullanılabilir modelde kurulumdaki (en sıkı) ara gün esas alınır
+                if g2 - g1 <= max(self.ara_gun, self.ara_gun_ust):
                     if (pid, g1, g2) not in self.aragun_istisna_set:
                         # YENI KURAL: Manuel atamalarda ara gun ihlali otomatik olarak kullanicinin onayi sayilsin
                         self.aragun_istisna_set.add((pid, g1, g2))
@@ -678,84 +968,473 @@ class NobetSolver:
                 roles.add(base)
         return roles
 
+    def _homojen_bosluk_sayaci(self, model, kisi_gun_atama: Dict, pid: int, max_aralik: int,
+                               sert_ust_sinir: int, penalties: List) -> None:
+        """S5 uzun boşluk cezalarını boş gün sayacıyla kodla (pencere kodlamasıyla aynı ceza).
+
+        seri[g], g'de biten süregelen boş gün sayısıdır: çalışılan günde 0, boş günde
+        seri[g-1] + 1. Pencere kodlamasındaki [b, b+L] penceresi ancak seri[b+L] >= L+1
+        iken boştur. Bu yüzden her gün ve her eşik için tek bir asim literali yeter.
+        Kısıtlar 2-3 terimlidir (pencere toplamı yok); asim katsayısı WEIGHT_HOMOJEN
+        için 1, sert sınır için 5.
+        """
+        esikler = []  # (boş gün eşiği, katsayı)
+        if max_aralik < self.gun_sayisi:
+            esikler.append((max_aralik + 1, 1))
+        if sert_ust_sinir < self.gun_sayisi:
+            esikler.append((sert_ust_sinir + 1, 5))
+        if not esikler:
+            return
+        onceki = None
+        for g in range(1, self.gun_sayisi + 1):
+            seri = model.NewIntVar(0, g, f'bos_seri_{pid}_{g}')
+            calisti = kisi_gun_atama[pid, g]
+            model.Add(seri <= g * (1 - calisti))
+            if onceki is None:
+                model.Add(seri >= 1 - calisti)
+            else:
+                model.Add(seri >= onceki + 1 - (g + 1) * calisti)
+                model.Add(seri <= onceki + 1)
+            onceki = seri
+            for esik, katsayi in esikler:
+                if g < esik:
+                    continue
+                asim = model.NewBoolVar(f'bos_seri_asim_{pid}_{g}_{esik}')
+                model.Add(seri <= esik - 1 + g * asim)
+                model.Add(seri >= esik).OnlyEnforceIf(asim)
+                penalties.append(asim * WEIGHT_HOMOJEN * katsayi)
+
     def _birlikte_uye_ids(self) -> Set[int]:
         ids = set()
         for kural in self.kurallar:
             if kural.tur != 'birlikte':
                 continue
             for raw_pid in kural.kisiler:
-                matched_pid = find_matching_id(raw_pid, self.personeller.keys())
+                matched_pid = self._eslestir(raw_pid)
                 if matched_pid is not None:
                     ids.add(matched_pid)
         return ids
 
-    def _person_can_take_slot_on_day(self, pid: int, slot_idx: int, gun: int,
-                                     exclusive_roles: Set[str],
-                                     birlikte_uye_ids: Set[int]) -> bool:
-        p = self.personeller.get(pid)
-        if p is None:
-            return False
-        if gun in p.mazeret_gunleri and (pid, gun, slot_idx) not in self.manual_mazeret_override_slots:
-            return False
-        if slot_idx < 0 or slot_idx >= self.slot_sayisi:
-            return False
+    def _sifir_hedef_ids(self) -> Set[int]:
+        """Hedef toplamı 0 olan kişiler hiçbir yere atanamaz."""
+        ids = set()
+        for p in self.personel_listesi:
+            hedef = self.hedefler.get(p.id, {})
+            if hedef.get('hedef_toplam', 0) == 0:
+                ids.add(p.id)
+        return ids
 
-        role = self._role_name_by_slot(slot_idx)
-        allowed_exception_roles = self.kisitlama_istisna_map.get((pid, gun), set())
-        # Manuel atama varsa rol/havuz/exclusive engellerini bu slot icin gorme (bos birakmayi tercih edelim)
-        is_manual_slot = any(
-            (find_matching_id(m.personel_id, self.personeller.keys()) == pid) and m.slot_idx == slot_idx and m.gun == gun
-            for m in self.manuel_atamalar
-        )
-        if is_manual_slot:
-            return True
-
-        # H7: Kısıtlı görev kuralı (taşma görevi de izinli)
-        if p.kisitli_gorev and role != p.kisitli_gorev and role not in allowed_exception_roles:
-            if not (p.tasma_gorevi and role == p.tasma_gorevi):
-                # ignore_manual_conflicts: manuel atanan slotları engelleme
-                if self.ignore_manual_conflicts:
-                    is_manual_slot = any(
-                        find_matching_id(m.personel_id, self.personeller.keys()) == pid
-                        and m.slot_idx == slot_idx and m.gun == gun
-                        for m in self.manuel_atamalar
-                    )
-                    if not is_manual_slot:
-                        return False
-                else:
-                    return False
+    def _uygunluk(self, gevsek: bool = False) -> UygunlukTensoru:
+        """Kişi × gün × slot uygunluk tensörü (tek geçiş, cache'li).
 
-        # H8: Exclusive görevler - taşma görevi veya havuz üyesi olan kişi de girebilir
-        if role in exclusive_roles and p.kisitli_gorev != role and p.tasma_gorevi != role:
-            havuz_ids = self.gorev_havuzlari.get(role)
-            if havuz_ids is None or pid not in havuz_ids:
-                return False
-
-        # H10: Görev havuzu
-        allowed_ids = self.gorev_havuzlari.get(role)
-        if allowed_ids is not None and pid not in allowed_ids:
-            # Bug fix: kısıtlı veya taşma görevi olan kişiler havuz dışı sayılmaz
-            if not (p.kisitli_gorev and p.kisitli_gorev == role):
-                if not (p.tasma_gorevi and p.tasma_gorevi == role):
-                    return False
+        gevsek=True: exclusive (H8) ve havuz (H10) elemesi olmadan.
+        """
+        if gevsek:
+            if self._gevsek_uygunluk_cache is None:
+                self._gevsek_uygunluk_cache = self._uygunluk_olustur(set(), {})
+            return self._gevsek_uygunluk_cache
+        if self._uygunluk_cache is None:
+            self._uygunluk_cache = self._uygunluk_olustur(
+                self._exclusive_roles_without_pool(), self.gorev_havuzlari
+            )
+        return self._uygunluk_cache
+
+    def _eleme_hucreleri(self) -> Dict[tuple, tuple]:
+        """Sadece exclusive (H8) / havuz (H10) elemesiyle kapanan hücreler, (tur, rol) bazında.
+
+        Returns: {('exclusive' | 'havuz', rol): (i_dizisi, g0_dizisi, s_dizisi)}
+        """
+        sert = self._uygunluk()
+        kilitli = self._uygunluk(gevsek=True).uygun & ~sert.uygun
+        roller = [self._role_name_by_slot(s) for s in range(self.slot_sayisi)]
+        gruplar = {}
+        for i, g0, s in zip(*kilitli.nonzero()):
+            tur = 'exclusive' if sert.neden[i, g0, s] == RED_EXCLUSIVE else 'havuz'
+            gruplar.setdefault((tur, roller[s]), []).append((int(i), int(g0), int(s)))
+        return {anahtar: tuple(zip(*hucreler)) for anahtar, hucreler in gruplar.items()}
+
+    def _yillik_denge_referansi(self) -> Dict:
+        """S6 yıllık ve S6b görev bazlı geçmiş ortalamaları: {'yillik': ort|None, 'gorev': {gorev_adi: ort}}."""
+        if self.yillik_denge_referansi is not None:
+            return self.yillik_denge_referansi
+        tum_yillik = [sum(p.yillik_gerceklesen.values()) for p in self.personel_listesi
+                      if hasattr(p, 'yillik_gerceklesen') and p.yillik_gerceklesen]
+        gorev_ortalamalari = {}
+        gecmis_gorev_olan = [p for p in self.personel_listesi
+                             if hasattr(p, 'gecmis_gorevler') and p.gecmis_gorevler]
+        if len(gecmis_gorev_olan) >= 2:
+            tum_gorev_isimleri = set()
+            for p in gecmis_gorev_olan:
+                tum_gorev_isimleri.update(p.gecmis_gorevler.keys())
+            for gorev_adi in tum_gorev_isimleri:
+                gecmisler = [p.gecmis_gorevler.get(gorev_adi, 0) for p in gecmis_gorev_olan
+                             if p.gecmis_gorevler.get(gorev_adi, 0) > 0 or
+                             p.gorev_kotalari.get(gorev_adi, 0) > 0]
+                if len(gecmisler) >= 2:
+                    gorev_ortalamalari[gorev_adi] = sum(gecmisler) / len(gecmisler)
+        self.yillik_denge_referansi = {
+            'yillik': sum(tum_yillik) / len(tum_yillik) if tum_yillik else None,
+            'gorev': gorev_ortalamalari,
+        }
+        return self.yillik_denge_referansi
 
-        # H9: Ayrı bina + birlikte üyesi → eliminasyon KALDIRILDI
-        # Birlikte üyeleri artık ayrı bina slotları için aday olabilir.
-        # Limit kontrolü H9 hard constraint'inde yapılır:
-        # ayri_bina_max = hedef - ceil(hedef/2)
+    def _simetri_siniflari(self, x_uygun: np.ndarray, zorunlu: np.ndarray = None) -> List[List[int]]:
+        """Modelde birbirinin yerine geçebilen personelin (indeks) sınıfları; sadece 2+ kişilik olanlar.
 
-        return True
+        İki kişi; uygunluk satırları (sıkı ve model maskesi), zorunlu hücreleri, mazeret ve
+        rol kısıtları, hedefleri, geçmiş/yıllık sayaçları, ara günü, istisnaları ve plan
+        iskeleti aynıysa eşdeğerdir. Kuralı, manuel ataması ya da artımlı çözümde sabit
+        ataması olan kişiler sınıflanmaz.
+        """
+        kural_uyeleri = set()
+        for kural in self.tum_kurallar:
+            kural_uyeleri.update(self._birlikte_gecerli_ids(kural))
+        ozel = kural_uyeleri | {pid for pid, _ in self.manuel_kisi_gunleri}
+        if self.komsuluk is not None:
+            ozel |= {pid for pid, _, _ in self.komsuluk['sabit_atamalar']}
+        sifir_hedef_ids = self._sifir_hedef_ids()
+        sert_uygun = self._uygunluk().uygun
+        aragun_istisnalari, birlikte_istisnalari, kisitlama_istisnalari = {}, {}, {}
+        for pid, g1, g2 in self.aragun_istisna_set:
+            aragun_istisnalari.setdefault(pid, []).append((g1, g2))
+        for pid, g in self.birlikte_istisna_set:
+            birlikte_istisnalari.setdefault(pid, []).append(g)
+        for (pid, g), roller in self.kisitlama_istisna_map.items():
+            kisitlama_istisnalari.setdefault(pid, []).append((g, sorted(roller)))
+        planlanan_gunler = self._planlanan_gunler_map() if self.plan_kontrati else {}
+        planlanan_roller = self._planlanan_rol_gunleri_map() if self.plan_kontrati else {}
+        iskelet_ids = self._gun_iskeleti_uygulanabilir_ids() if self._gun_iskeleti_aktif_mi() else set()
+
+        siniflar: Dict[tuple, List[int]] = {}
+        for i, p in enumerate(self.personel_listesi):
+            if p.id in ozel or p.id in sifir_hedef_ids or not x_uygun[i].any():
+                continue
+            imza = (
+                x_uygun[i].tobytes(), sert_uygun[i].tobytes(),
+                zorunlu[i].tobytes() if zorunlu is not None else b'',
+                json.dumps([
+                    sorted(p.mazeret_gunleri), p.kisitli_gorev, p.tasma_gorevi,
+                    p.hedef_tipler, p.gorev_kotalari, p.yillik_gerceklesen, p.gecmis_gorevler,
+                    self.hedefler.get(p.id, {}), self._kisi_ara_gunu(p.id),
+                    sorted(aragun_istisnalari.get(p.id, [])), sorted(birlikte_istisnalari.get(p.id, [])),
+                    sorted(kisitlama_istisnalari.get(p.id, [])),
+                    sorted(planlanan_gunler.get(p.id, set())), sorted(planlanan_roller.get(p.id, {}).items()),
+                    p.id in iskelet_ids,
+                ], sort_keys=True, default=str),
+            )
+            siniflar.setdefault(imza, []).append(i)
+        return [sinif for sinif in siniflar.values() if len(sinif) >= 2]
 
-    def _max_assignable_with_ara_gun(self, gunler: List[int]) -> int:
-        if not gunler:
-            return 0
-        secilen = 0
-        son_gun = -10_000
-        for g in sorted(gunler):
-            if g - son_gun > self.ara_gun:
-                secilen += 1
-                son_gun = g
-        return secilen
+    def _rol_temsilcileri(self, maskeler: List[np.ndarray], sabit_hucreler: Set[tuple]) -> Dict[int, List[int]]:
+        """Rol düzeyi değişkenle modellenebilecek roller: {temsilci slot: rolün slotları}.
+
+        Bir rolün slotları; exclusive / ayrı bina bayrakları aynıysa, verilen uygunluk
+        maskelerinde sabit hücreler (manuel / artımlı sabit; kişi o gün rolde zaten sabit)
+        dışında aynı sütunlara sahipse ve S6b geçmişi tek bir slotun adına bağlı değilse
+        birbirinin yerine geçer.
+        """
+        slot_adlari = set()
+        for p in self.personel_listesi:
+            slot_adlari.update((getattr(p, 'gecmis_gorevler', None) or {}).keys())
+        pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+        sonuc = {}
+        for rol, slotlar in self.role_slots.items():
+            if len(slotlar) < 2:
+                continue
+            gorevler = [self.gorevler[s] for s in slotlar]
+            if len({(bool(g.exclusive), bool(getattr(g, 'ayri_bina', False))) for g in gorevler}) > 1:
+                continue
+            if any(g.ad != rol and g.ad in slot_adlari for g in gorevler):
+                continue
+            sabit_maske = np.zeros(maskeler[0].shape[:2], dtype=bool)
+            for pid, g, s in sabit_hucreler:
+                if s in slotlar and pid in pid_index and 1 <= g <= self.gun_sayisi:
+                    sabit_maske[pid_index[pid], g - 1] = True
+            if all(
+                ((maske[:, :, slotlar] == maske[:, :, slotlar[:1]]).all(axis=2) | sabit_maske).all()
+                for maske in maskeler
+            ):
+                sonuc[slotlar[0]] = list(slotlar)
+        return sonuc
+
+    def _kesimleri_ekle(self, model, x, x_uygun: np.ndarray, kisi_gun_atama: Dict, bos_slotlar: List,
+                        plan_uygulamasi: Dict, ara_gun_literalleri: Dict, ara_gun_model: int) -> Dict:
+        """Sert kısıtlardan türeyen gereksiz toplu kısıtları modele ekle; çözüm kümesi değişmez.
+
+        K1: toplam boş slot + toplam atama = gün × slot; toplam atama ≤ Σ kişi üst sınırı
+            (S3 hedef_toplam ve ara günlü kapasite); sert toplamlı planda = Σ hedef_toplam.
+        K2: kişi başına takvim haftası ve ay için ara günün izin verdiği en fazla nöbet.
+        K3: gün tipi başına toplam ≤ min(tip slotları, Σ kişi tip üst sınırı); planda ≥ Σ alt sınır.
+        K4: rol başına aylık toplam ≤ min(rol kapasitesi, Σ kişi rol üst sınırı); planda ≥ Σ alt sınır.
+        plan_uygulamasi koşulsuz (en gevşek) plan varyantıdır. yeniden_kullanilabilir modda
+        ara gün seviyesi d >= 2 olan K2 sınırları "ara_gun >= d" literaline bağlanır.
+        Returns: {aile: eklenen kısıt sayısı}
+        """
+        rapor = {'toplam': 0, 'kisi_donem': 0, 'gun_tipi': 0, 'rol': 0}
+        plan_aktif = self._plan_aktif_mi()
+        tip_tol = self._plan_gun_tipi_toleransi(plan_uygulamasi)
+        kota_tol = self._plan_gorev_kota_toleransi(plan_uygulamasi)
+        istisnali_kisiler = {pid for pid, _, _ in self.aragun_istisna_set}
+        gun_tipi = {g: self.gun_tipleri.get(g) for g in range(1, self.gun_sayisi + 1)}
+        kisi_gun_serbest = x_uygun.any(axis=2)
+
+        toplamlar, ust_sinirlar = [], []
+        tip_toplamlari = {tip: ([], [], []) for tip, gunler in self.gunler_by_tip.items() if gunler}
+        rol_toplamlari = {rol: ([], [], []) for rol in self.role_slots}
+        for i, p in enumerate(self.personel_listesi):
+            aday_gunler = (np.flatnonzero(kisi_gun_serbest[i]) + 1).tolist()
+            if not aday_gunler:
+                continue
+            hedef = self.hedefler.get(p.id, {})
+            hedef_toplam = hedef.get('hedef_toplam', 3)
+            if p.id in istisnali_kisiler:
+                seviyeler, kosulsuz_ara = [], 0
+            elif self.yeniden_kullanilabilir:
+                seviyeler = [(d, ara_gun_literalleri.get((p.id, d))) for d in range(1, ara_gun_model + 1)]
+                seviyeler = [(d, lit) for d, lit in seviyeler if d == 1 or lit is not None]
+                kosulsuz_ara = 1
+            else:
+                kosulsuz_ara = self._kisi_ara_gunu(p.id)
+                seviyeler = [(kosulsuz_ara, None)]
+
+            def kapasite(gunler):
+                return min(len(gunler), hedef_toplam, _ara_gunlu_kapasite(gunler, kosulsuz_ara))
+
+            toplam = sum(kisi_gun_atama[p.id, g] for g in aday_gunler)
+            ust = kapasite(aday_gunler)
+            toplamlar.append(toplam)
+            ust_sinirlar.append(ust)
+
+            # K2. Ay ve takvim haftaları: ara gün kapasitesi hedef ve aday gün sayısından sıkıysa
+            for d, literal in seviyeler:
+                donemler = [aday_gunler] + [
+                    [g for g in aday_gunler if h <= g < h + 7] for h in range(1, self.gun_sayisi + 1, 7)
+                ]
+                for donem in donemler:
+                    sinir = _ara_gunlu_kapasite(donem, d)
+                    if sinir < min(len(donem), hedef_toplam):
+                        _kosullu(model.Add(sum(kisi_gun_atama[p.id, g] for g in donem) <= sinir), literal)
+                        rapor['kisi_donem'] += 1
+
+            # K3 katkısı: kişinin gün tipi toplamı ve sınırları
+            hedef_tipler = hedef.get('hedef_tipler', {}) or {}
+            for tip, (ifadeler, ustler, altlar) in tip_toplamlari.items():
+                tip_gunleri = [g for g in aday_gunler if gun_tipi[g] == tip]
+                if not tip_gunleri:
+                    continue
+                tip_ust = kapasite(tip_gunleri)
+                tip_hedef = hedef_tipler.get(tip, 0)
+                if plan_aktif:
+                    tip_ust = min(tip_ust, tip_hedef + tip_tol)
+                    altlar.append(max(0, tip_hedef - tip_tol))
+                ifadeler.append(sum(kisi_gun_atama[p.id, g] for g in tip_gunleri))
+                ustler.append(max(0, tip_ust))
+
+            # K4 katkısı: kişinin rol toplamı ve sınırları
+            gorev_kotalari = hedef.get('gorev_kotalari', {}) or {}
+            for rol, (ifadeler, ustler, altlar) in rol_toplamlari.items():
+                slotlar = self.role_slots[rol]
+                rol_gunleri = (np.flatnonzero(x_uygun[i][:, slotlar].any(axis=1)) + 1).tolist()
+                if not rol_gunleri:
+                    continue
+                rol_ust = kapasite(rol_gunleri)
+                if rol in gorev_kotalari:
+                    kota = gorev_kotalari.get(rol, 0)
+                    if plan_aktif:
+                        rol_ust = min(rol_ust, kota if kota <= 0 else kota + kota_tol)
+                        if kota > 0:
+                            altlar.append(max(0, kota - kota_tol))
+                    elif kota > 0:
+                        rol_ust = min(rol_ust, kota)
+                ifadeler.append(sum(x[p.id, g, s] for g in rol_gunleri for s in slotlar))
+                ustler.append(max(0, rol_ust))
+
+        # K1. Toplam: boş slotlarla bağ, kişi üst sınırları ve sert toplamlı planda Σ hedef
+        toplam_slot = self.gun_sayisi * self.slot_sayisi
+        tum_atama = sum(toplamlar)
+        model.Add(sum(bos_slotlar) + tum_atama == toplam_slot)
+        model.Add(tum_atama <= min(toplam_slot, sum(ust_sinirlar)))
+        rapor['toplam'] += 2
+        if self._plan_toplam_hard_mi(plan_uygulamasi):
+            model.Add(tum_atama == sum(
+                self.hedefler.get(p.id, {}).get('hedef_toplam', 3) for p in self.personel_listesi
+            ))
+            rapor['toplam'] += 1
+
+        # K3. Gün tipi arz / talep
+        for tip, (ifadeler, ustler, altlar) in tip_toplamlari.items():
+            if not ifadeler:
+                continue
+            tip_toplami = sum(ifadeler)
+            model.Add(tip_toplami <= min(len(self.gunler_by_tip[tip]) * self.slot_sayisi, sum(ustler)))
+            rapor['gun_tipi'] += 1
+            if sum(altlar) > 0:
+                model.Add(tip_toplami >= sum(altlar))
+                rapor['gun_tipi'] += 1
+
+        # K4. Rol kapasitesi / görev kotaları
+        for rol, (ifadeler, ustler, altlar) in rol_toplamlari.items():
+            if not ifadeler:
+                continue
+            rol_toplami = sum(ifadeler)
+            model.Add(rol_toplami <= min(len(self.role_slots[rol]) * self.gun_sayisi, sum(ustler)))
+            rapor['rol'] += 1
+            if sum(altlar) > 0:
+                model.Add(rol_toplami >= sum(altlar))
+                rapor['rol'] += 1
+        return rapor
+
+    def _kisi_ara_gunu(self, pid: int) -> int:
+        """Kişiye uygulanan ara gün: genel değer veya çekirdekten gelen kişi bazlı gevşetme."""
+        return min(self.kisi_ara_gun.get(pid, self.ara_gun), self.ara_gun)
+
+    def _uygunluk_olustur(self, exclusive_roles: Set[str], gorev_havuzlari: Dict[str, Set[int]]) -> UygunlukTensoru:
+        return uygunluk_tensoru_olustur(
+            gun_sayisi=self.gun_sayisi,
+            personel_listesi=self.personel_listesi,
+            gorevler=self.gorevler,
+            exclusive_roles=exclusive_roles,
+            gorev_havuzlari=gorev_havuzlari,
+            kisitlama_istisna_map=self.kisitlama_istisna_map,
+            manual_mazeret_override_slots=self.manual_mazeret_override_slots,
+            manuel_slotlar=self.manuel_slot_set,
+            sifir_hedef_ids=self._sifir_hedef_ids(),
+        )
+
+    def _on_cozumle(self, x_uygun: np.ndarray) -> tuple:
+        """Model kurulmadan önce koşulsuz sert kısıtları hücre maskesi üzerinde sabit noktaya kadar yay.
+
+        Zorunlu hücreler (manuel atamalar, komşuluk dışı sabit atamalar) slotun diğer
+        adaylarını, kişinin o günkü diğer slotlarını, ara gün penceresini ve ayrı kuralı
+        ortağının aynı roldeki hücrelerini kapatır. Üst sınırı dolan kota (rol, plan gün
+        tipi, toplam) kişinin kalan hücrelerini kapatır; alt sınırı ancak kalan aday
+        günlerin tamamıyla karşılanabilen kotada tek hücreli günler zorunlu olur.
+        Boş slot soft olduğundan tek adaylı slotlar sabitlenmez, sadece raporlanır.
+        yeniden_kullanilabilir modda (literalli kısıtlar) çağrılmaz.
+
+        Returns: (x_uygun, zorunlu [i, g-1, s], rapor)
+        """
+        P, D, S = x_uygun.shape
+        pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+        uygun = x_uygun.copy()
+        zorunlu = np.zeros_like(uygun)
+        kaynaklar = set(self.manuel_slot_set)
+        if self.komsuluk is not None:
+            kaynaklar |= set(self.komsuluk['sabit_atamalar'])
+        for pid, g, s in kaynaklar:
+            i = pid_index.get(pid)
+            if i is not None and 1 <= g <= D and 0 <= s < S and uygun[i, g - 1, s]:
+                zorunlu[i, g - 1, s] = True
+        baslangic_zorunlu = int(zorunlu.sum())
+
+        slot_rol = [self._role_name_by_slot(s) for s in range(S)]
+        rol_maskeleri = {}
+        for rol, slot_list in self.role_slots.items():
+            rol_maskeleri[rol] = np.zeros(S, dtype=bool)
+            rol_maskeleri[rol][slot_list] = True
+        ayri_ortaklar: Dict[int, Set[int]] = {}
+        for kural in self.kurallar:
+            if kural.tur != 'ayri':
+                continue
+            uyeler = [pid_index[m] for m in (self._eslestir(k) for k in kural.kisiler) if m in pid_index]
+            for a in uyeler:
+                ayri_ortaklar.setdefault(a, set()).update(b for b in uyeler if b != a)
+        manuel_kisi_gunleri = {(pid_index[pid], g - 1) for pid, g in self.manuel_kisi_gunleri if pid in pid_index}
+
+        # Kişi bazlı sayım kısıtları: (i, hücre maskesi [g-1, s], üst sınır, alt sınır)
+        plan_aktif = self._plan_aktif_mi()
+        tip_tol = self._plan_gun_tipi_toleransi(self.plan_uygulama)
+        kota_tol = self._plan_gorev_kota_toleransi(self.plan_uygulama)
+        tum_gunler = np.ones(D, dtype=bool)
+        tip_maskeleri = {}
+        for tip, gunler in self.gunler_by_tip.items():
+            gunler = [g - 1 for g in gunler if 1 <= g <= D]
+            if gunler:
+                tip_maskeleri[tip] = np.zeros(D, dtype=bool)
+                tip_maskeleri[tip][gunler] = True
+        sayimlar = []
+        for i, p in enumerate(self.personel_listesi):
+            hedef = self.hedefler.get(p.id, {})
+            hedef_toplam = hedef.get('hedef_toplam', 3)
+            toplam_alt = hedef_toplam if self._plan_toplam_hard_mi(self.plan_uygulama) else None
+            sayimlar.append((i, np.ones((D, S), dtype=bool), hedef_toplam, toplam_alt))
+            gorev_kotalari = hedef.get('gorev_kotalari', {})
+            for rol, maske in rol_maskeleri.items():
+                if rol not in gorev_kotalari:
+                    continue
+                kota = gorev_kotalari.get(rol, 0)
+                if plan_aktif:
+                    ust = kota if kota <= 0 else kota + kota_tol
+                    alt = max(0, kota - kota_tol) if kota > 0 else None
+                elif kota > 0:
+                    ust, alt = kota, None
+                else:
+                    continue
+                sayimlar.append((i, tum_gunler[:, None] & maske[None, :], ust, alt))
+            if plan_aktif:
+                hedef_tipler = hedef.get('hedef_tipler', {})
+                for tip, gun_maskesi in tip_maskeleri.items():
+                    tip_hedef = hedef_tipler.get(tip, 0)
+                    sayimlar.append((i, np.repeat(gun_maskesi[:, None], S, axis=1),
+                                     tip_hedef + tip_tol, max(0, tip_hedef - tip_tol) or None))
+
+        islenen = np.zeros_like(zorunlu)
+        tur = 0
+        while True:
+            tur += 1
+            onceki = (int(uygun.sum()), int(zorunlu.sum()))
+            for i, g0, s in zip(*(zorunlu & ~islenen).nonzero()):
+                islenen[i, g0, s] = True
+                pid = self.personel_listesi[i].id
+                uygun[:, g0, s] &= zorunlu[:, g0, s]          # H1: slotun diğer adayları
+                uygun[i, g0, :] &= zorunlu[i, g0, :]          # H3: kişinin o günkü diğer slotları
+                for d in range(1, self._kisi_ara_gunu(pid) + 1):  # H4: ara gün penceresi
+                    for h0 in (g0 - d, g0 + d):
+                        if 0 <= h0 < D and (pid, min(g0, h0) + 1, max(g0, h0) + 1) not in self.aragun_istisna_set:
+                            uygun[i, h0, :] &= zorunlu[i, h0, :]
+                maske = rol_maskeleri[slot_rol[s]]
+                for j in ayri_ortaklar.get(i, ()):               # H5: ayrı ortağı aynı rolde olamaz
+                    if (i, g0) in manuel_kisi_gunleri and (j, g0) in manuel_kisi_gunleri:
+                        continue
+                    uygun[j, g0, maske] &= zorunlu[j, g0, maske]
+            for i, hucre, ust, alt in sayimlar:
+                sayi = int((zorunlu[i] & hucre).sum())
+                if ust is not None and sayi >= ust:
+                    uygun[i] &= ~hucre | zorunlu[i]
+                elif alt is not None and alt > sayi:
+                    aday = uygun[i] & hucre & ~zorunlu[i]
+                    aday_gun = aday.any(axis=1) & ~zorunlu[i].any(axis=1)
+                    if int(aday_gun.sum()) == alt - sayi:
+                        for g0 in (aday_gun & (aday.sum(axis=1) == 1)).nonzero()[0]:
+                            zorunlu[i, g0, aday[g0].argmax()] = True
+            if (int(uygun.sum()), int(zorunlu.sum())) == onceki:
+                break
+
+        aday_sayisi = uygun.sum(axis=0)
+        rapor = {
+            'tur': tur,
+            'zorunlu_hucre': baslangic_zorunlu,
+            'sabitlenen_atama': int(zorunlu.sum()) - baslangic_zorunlu,
+            'elenen_degisken': int((x_uygun & ~uygun).sum()),
+            'serbest_gunu_olmayan_kisi': int((~(uygun & ~zorunlu).any(axis=(1, 2))).sum()),
+            'adaysiz_slot': int((aday_sayisi == 0).sum()),
+            'tek_adayli_slot': int((aday_sayisi == 1).sum()),
+        }
+        return uygun, zorunlu, rapor
+
+    def _person_can_take_slot_on_day(self, pid: int, slot_idx: int, gun: int) -> bool:
+        # Mazeret, H7 kısıtlı/taşma, H8 exclusive, H10 havuz ve manuel override
+        # uygunluk tensöründe tek geçişte hesaplandı.
+        # H9: Ayrı bina + birlikte üyesi → eliminasyon yok, limit H9 hard constraint'inde.
+        return self._uygunluk().aday_mi(pid, gun, slot_idx)
+
+    def _aday_bitmapi(self) -> AdayBitmapi:
+        """Rol × gün × kişi aday bitmap'i (uygunluk tensörünün aday katmanından, cache'li)."""
+        if self._aday_bitmapi_cache is None:
+            self._aday_bitmapi_cache = AdayBitmapi.slot_tensorunden(
+                self._uygunluk().aday, [self._role_name_by_slot(s) for s in range(self.slot_sayisi)]
+            )
+        return self._aday_bitmapi_cache
 
     def _build_feasibility_diagnostics(self, limit_preview: int = 60) -> Dict:
         """Hard kısıtlara göre hızlı feasibility ipuçları üret. Sonucu cache'ler."""
@@ -763,51 +1442,40 @@ class NobetSolver:
         if hasattr(self, cache_key):
             return getattr(self, cache_key)
 
-        exclusive_roles = self._exclusive_roles_without_pool()
-        birlikte_uye_ids = self._birlikte_uye_ids()
+        adaylar = self._aday_bitmapi()
 
         zero_slot_days = []
         role_summaries = []
 
-        # slot/day bazlı adaylar
-        slot_day_candidates = {}
-        for s in range(self.slot_sayisi):
-            for g in range(1, self.gun_sayisi + 1):
-                cands = [
-                    p.id for p in self.personel_listesi
-                    if self._person_can_take_slot_on_day(p.id, s, g, exclusive_roles, birlikte_uye_ids)
-                ]
-                slot_day_candidates[(s, g)] = cands
-                if len(cands) == 0 and len(zero_slot_days) < limit_preview:
-                    zero_slot_days.append({
-                        "gun": g,
-                        "slot_idx": s,
-                        "gorev": self._role_name_by_slot(s)
-                    })
+        # slot/day bazlı aday var mı (manuel override slot bazında olduğundan slot tensöründen)
+        slot_aday_var = self._uygunluk().aday.any(axis=0)  # (gun, slot)
+        for s, g0 in zip(*np.nonzero(~slot_aday_var.T)):
+            if len(zero_slot_days) >= limit_preview:
+                break
+            zero_slot_days.append({
+                "gun": int(g0) + 1,
+                "slot_idx": int(s),
+                "gorev": self._role_name_by_slot(int(s))
+            })
 
-        # role bazlı özet
+        # role bazlı özet; ara-gün etkili üst kapasite (kişi bazlı üst sınır toplamı) bitmap'ten
+        gunluk_aday = adaylar.gunluk_aday_sayilari()  # (rol, gun)
+        ust_kapasiteler = adaylar.ust_kapasite(self.ara_gun)
+        rol_index = {rol: r for r, rol in enumerate(adaylar.roller)}
         for role, slot_list in self.role_slots.items():
             demand = self.gun_sayisi * len(slot_list)
-            role_daily_union = {}
+            r = rol_index[role]
+            union_sayilari = gunluk_aday[r]
             role_daily_short = []
 
-            for g in range(1, self.gun_sayisi + 1):
-                union_ids = set()
-                for s in slot_list:
-                    union_ids.update(slot_day_candidates.get((s, g), []))
-                role_daily_union[g] = union_ids
-                if len(union_ids) < len(slot_list) and len(role_daily_short) < limit_preview:
-                    role_daily_short.append({
-                        "gun": g,
-                        "gerekli_kisi": len(slot_list),
-                        "aday_kisi": len(union_ids)
-                    })
+            for g0 in np.nonzero(union_sayilari < len(slot_list))[0][:limit_preview].tolist():
+                role_daily_short.append({
+                    "gun": g0 + 1,
+                    "gerekli_kisi": len(slot_list),
+                    "aday_kisi": int(union_sayilari[g0])
+                })
 
-            # Ara-gün etkili üst kapasite (kişi bazlı üst sınır toplamı)
-            ara_gun_upper_capacity = 0
-            for p in self.personel_listesi:
-                uygun_gunler = [g for g in range(1, self.gun_sayisi + 1) if p.id in role_daily_union[g]]
-                ara_gun_upper_capacity += self._max_assignable_with_ara_gun(uygun_gunler)
+            ara_gun_upper_capacity = int(ust_kapasiteler[r])
 
             if demand > ara_gun_upper_capacity:
                 role_summaries.append({
@@ -820,9 +1488,7 @@ class NobetSolver:
                 })
 
         result = {
-            "slot_day_zero_candidate_count": sum(
-                1 for (_, _), cands in slot_day_candidates.items() if len(cands) == 0
-            ),
+            "slot_day_zero_candidate_count": int((~slot_aday_var).sum()),
             "slot_day_zero_candidate_preview": zero_slot_days,
             "role_ara_gun_capacity_issues": role_summaries[:limit_preview]
         }
@@ -920,7 +1586,7 @@ class NobetSolver:
             ayri_kisi_ids = set()
             for k in ayri_kurallari:
                 for pid in k.kisiler:
-                    matched = find_matching_id(pid, self.personeller.keys())
+                    matched = self._eslestir(pid)
                     if matched is not None:
                         ayri_kisi_ids.add(matched)
 
@@ -1030,182 +1696,251 @@ class NobetSolver:
 
         return aksiyonlar
 
-    def _hesapla_kalite_skoru(self, kisi_sayac: Dict, atamalar: List[Dict],
-                              toplam_atama: int, toplam_slot: int) -> Dict:
-        """Çözüm kalitesi metrikleri hesapla"""
-        nobet_sayilari = [k['toplam'] for k in kisi_sayac.values()]
-        ortalama = sum(nobet_sayilari) / len(nobet_sayilari) if nobet_sayilari else 0
-        max_nobet = max(nobet_sayilari) if nobet_sayilari else 0
-        min_nobet = min(nobet_sayilari) if nobet_sayilari else 0
-
-        # 1. Denge puanı: max-min farkının ortalamaya oranı (düşük = iyi)
-        denge_puani = round(
-            (max_nobet - min_nobet) / ortalama * 100, 1
-        ) if ortalama > 0 else 0
-
-        # 2. Saat adaleti: saat dağılımının standart sapması
-        saat_listesi = []
-        for pid, sayac in kisi_sayac.items():
-            toplam_saat = sum(
-                sayac['tipler'].get(tip, 0) * SAAT_DEGERLERI.get(tip, 8)
-                for tip in GUN_TIPLERI
-            )
-            saat_listesi.append(toplam_saat)
-        ortalama_saat = sum(saat_listesi) / len(saat_listesi) if saat_listesi else 0
-        saat_varyans = sum((s - ortalama_saat) ** 2 for s in saat_listesi) / len(saat_listesi) if saat_listesi else 0
-        saat_std = math.sqrt(saat_varyans)
-        saat_adaleti = round(
-            saat_std / ortalama_saat * 100, 1
-        ) if ortalama_saat > 0 else 0
-
-        # 3. Homojenlik: nöbet aralıklarının standart sapması
-        aralik_listesi = []
-        for pid, sayac in kisi_sayac.items():
-            kisi_gunleri = sorted(
-                a['gun'] for a in atamalar if a['personel_id'] == pid
-            )
-            if len(kisi_gunleri) >= 2:
-                araliklar = [kisi_gunleri[i+1] - kisi_gunleri[i]
-                             for i in range(len(kisi_gunleri) - 1)]
-                aralik_listesi.extend(araliklar)
-        if aralik_listesi:
-            aralik_ort = sum(aralik_listesi) / len(aralik_listesi)
-            aralik_var = sum((a - aralik_ort) ** 2 for a in aralik_listesi) / len(aralik_listesi)
-            homojenlik = round(math.sqrt(aralik_var), 2)
-        else:
-            homojenlik = 0
-
-        # 4. Doluluk yüzdesi
-        doluluk = round(100 * toplam_atama / toplam_slot, 1) if toplam_slot > 0 else 0
+    def _hesapla_kalite_skoru(self, matris: CozumMatrisi, toplam_slot: int) -> Dict:
+        """Çözüm kalitesi metrikleri hesapla (bkz. cozum_analizi.kalite_skoru)"""
+        hedef_toplamlari = [self.hedefler.get(p.id, {}).get('hedef_toplam', 0) for p in self.personel_listesi]
+        return kalite_skoru(matris, hedef_toplamlari, toplam_slot)
 
-        # 5. Hedef uyumu: hedeften sapma yüzdesi
-        hedef_sapmalar = []
-        for p in self.personel_listesi:
-            hedef = self.hedefler.get(p.id, {})
-            hedef_toplam = hedef.get('hedef_toplam', 0)
-            gerceklesen = kisi_sayac.get(p.id, {}).get('toplam', 0)
-            if hedef_toplam > 0:
-                sapma = abs(gerceklesen - hedef_toplam) / hedef_toplam
-                hedef_sapmalar.append(sapma)
-        kural_uyumu = round(
-            (1 - sum(hedef_sapmalar) / len(hedef_sapmalar)) * 100, 1
-        ) if hedef_sapmalar else 100
+    def _modeli_kur(self, cp) -> _KuruluModel:
+        """CP-SAT modelini kur.
 
-        return {
-            'denge_puani': denge_puani,
-            'saat_adaleti': saat_adaleti,
-            'homojenlik': homojenlik,
-            'doluluk': doluluk,
-            'kural_uyumu': kural_uyumu
-        }
-
-    def coz(self) -> SolverSonuc:
-        baslangic = time.time()
-        cp = _get_cp_model()
+        yeniden_kullanilabilir modda gevşetilebilir kısıt aileleri (kişi bazlı ara
+        gün mesafeleri, rol bazlı exclusive/havuz eleme, ayrı/birlikte kuralları,
+        manuel atamalar) birer etkinlik literaline bağlanır; gevşetme denemeleri
+        modeli yeniden kurmadan sadece bu literalleri sabitler (bkz. gevset).
+        """
         model = cp.CpModel()
-
-        manual_conflicts = self._manual_hard_conflict_diagnostics()
-        if manual_conflicts and not self.ignore_manual_conflicts:
-            sure_ms = int((time.time() - baslangic) * 1000)
-            preview = manual_conflicts[:50]
-            return SolverSonuc(
-                basarili=False,
-                atamalar=[],
-                istatistikler={
-                    'status': 'MANUAL_CONFLICT',
-                    'manual_conflict_count': len(manual_conflicts),
-                    'manual_conflicts': preview,
-                    'ara_gun': self.ara_gun,
-                    'ara_gun_1_dene': False,
-                    'kisitlama_istisna_debug': self.kisitlama_istisna_debug,
-                    'feasibility_debug': self._build_feasibility_diagnostics(limit_preview=40)
-                },
-                sure_ms=sure_ms,
-                mesaj=f"Manuel atamalarda hard kisit cakismasi var ({len(manual_conflicts)} adet)"
-            )
-        
-        # Pre-compute impossible slot assignments for each person
-        exclusive_roles = self._exclusive_roles_without_pool()
-        birlikte_uye_ids = self._birlikte_uye_ids()
-
-        # Pre-compute: hedef toplam 0 olan kişiler hiçbir yere atanamaz
-        sifir_hedef_ids = set()
-        for p in self.personel_listesi:
-            hedef = self.hedefler.get(p.id, {})
-            if hedef.get('hedef_toplam', 0) == 0:
-                sifir_hedef_ids.add(p.id)
+        yeniden = self.yeniden_kullanilabilir
+
+        # Uygunluk tensörü: sıfır hedef, mazeret (H2), kısıtlı (H7), exclusive (H8),
+        # havuz (H10) ve manuel override tek geçişte hesaplanır. Uygun olmayan
+        # hücreler tek bir sabit 0'a bağlanır; bu tekli kısıtlar modele ayrıca eklenmez.
+        # yeniden_kullanilabilir modda H8/H10 elemesi rol bazlı eleme literallerine bağlanır.
+        uygunluk = self._uygunluk(gevsek=yeniden or not self.exclusive_aktif)
+        sifir_hedef_ids = uygunluk.sifir_hedef_ids
+        sifir = model.NewConstant(0)
+        eleme_hucreleri = self._eleme_hucreleri() if yeniden or self.gevsek_eleme else {}
+
+        # Artımlı yeniden çözüm: komşuluk dışındaki hücreler önceki atamaya sabitlenir
+        # (atanmamışlar sabit 0'a bağlanır, atanmışlar == 1 kısıtı alır).
+        komsuluk = self.komsuluk
+        x_uygun = uygunluk.uygun.copy() if komsuluk is not None else uygunluk.uygun
+        if not yeniden and self.exclusive_aktif and self.gevsek_eleme:
+            # Normal modda kısmi eleme gevşetmesi: gevşetilen rollerin hücreleri açılır
+            x_uygun = x_uygun.copy()
+            for anahtar in self.gevsek_eleme:
+                if anahtar in eleme_hucreleri:
+                    x_uygun[eleme_hucreleri[anahtar]] = True
+
+        if komsuluk is not None:
+            pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+            kisi_serbest = np.array([p.id in komsuluk['serbest_kisiler'] for p in self.personel_listesi], dtype=bool)
+            gun_serbest = np.array([g in komsuluk['serbest_gunler'] for g in range(1, self.gun_sayisi + 1)], dtype=bool)
+            serbest = np.repeat((kisi_serbest[:, None] | gun_serbest[None, :])[:, :, None], self.slot_sayisi, axis=2)
+            for pid, g, s in komsuluk['sabit_atamalar']:
+                if pid in pid_index:
+                    serbest[pid_index[pid], g - 1, s] = True
+            x_uygun &= serbest
+
+        # Ön çözümleme: zorunlu hücrelerden ve dolan kotalardan sabit 0'lar, alt sınırlardan zorunlu atamalar
+        zorunlu = None
+        on_cozum_raporu = {}
+        if self.on_cozumleme and not yeniden:
+            x_uygun, zorunlu, on_cozum_raporu = self._on_cozumle(x_uygun)
+
+        # Rol düzeyi değişkenler: birbirinin yerine geçen slotlar temsilci slotta toplanır
+        rol_slotlari, sabit_slotlar, temsil = {}, {}, {}
+        if self.rol_degiskenleri:
+            sabit_hucreler = set(self.manuel_slot_set)
+            if komsuluk is not None:
+                sabit_hucreler |= set(komsuluk['sabit_atamalar'])
+            rol_slotlari = self._rol_temsilcileri([uygunluk.uygun, self._uygunluk().uygun], sabit_hucreler)
+            if rol_slotlari:
+                x_uygun = x_uygun.copy()
+                for temsilci, slotlar in rol_slotlari.items():
+                    x_uygun[:, :, temsilci] = x_uygun[:, :, slotlar].any(axis=2)
+                    x_uygun[:, :, slotlar[1:]] = False
+                    temsil.update({s: temsilci for s in slotlar})
+                pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+                for pid, g, s in sorted(sabit_hucreler):
+                    if s in temsil and pid in pid_index:
+                        sabit_slotlar.setdefault((pid_index[pid], g - 1), s)
+
+        def _anahtar(pid, g, s):
+            return pid, g, temsil.get(s, s)
 
         x = {}
-        eliminated_vars = 0
-        for p in self.personel_listesi:
+        for i, p in enumerate(self.personel_listesi):
+            uygun_p = x_uygun[i]
             for g in range(1, self.gun_sayisi + 1):
+                uygun_pg = uygun_p[g - 1]
                 for s in range(self.slot_sayisi):
-                    has_manual_mazeret_override = (p.id, g, s) in self.manual_mazeret_override_slots
-
-                    if p.id in sifir_hedef_ids:
-                        x[p.id, g, s] = model.NewConstant(0)
-                        eliminated_vars += 1
-                        continue
-
-                    if g in p.mazeret_gunleri and not has_manual_mazeret_override:
-                        x[p.id, g, s] = model.NewConstant(0)
-                        eliminated_vars += 1
-                        continue
-
-                    # Role-based elimination: impossible by role constraints
-                    if not self._person_can_take_slot_on_day(p.id, s, g, exclusive_roles, birlikte_uye_ids):
-                        x[p.id, g, s] = model.NewConstant(0)
-                        eliminated_vars += 1
-                    else:
+                    if uygun_pg[s]:
                         x[p.id, g, s] = model.NewBoolVar(f'x_{p.id}_{g}_{s}')
+                    else:
+                        x[p.id, g, s] = sifir
+        eliminated_vars = int((~x_uygun).sum())
+        if zorunlu is not None:
+            # Ön çözümlemenin zorunlu kıldığı (manuel/sabit dışı) hücreler sabit 1 literalleri
+            for i, g0, s in zip(*zorunlu.nonzero()):
+                anahtar = (self.personel_listesi[i].id, int(g0) + 1, int(s))
+                if anahtar not in self.manuel_slot_set and (komsuluk is None or anahtar not in komsuluk['sabit_atamalar']):
+                    model.Add(x[_anahtar(*anahtar)] == 1)
+        # Sabit hücrelerle zaten sağlanan kısıtlar eklenmez: (kişi, gün) ve (gün, slot) serbestliği
+        kisi_gun_serbest = x_uygun.any(axis=2)
+        slot_serbest = x_uygun.any(axis=0)
+        elenen_kisitlar = {'slot': 0, 'kisi_gun': 0, 'ara_gun': 0, 'ayri': 0}
+        x_indeksleri = np.fromiter(
+            (x[self.personel_listesi[i].id, g0 + 1, s].Index() for i, g0, s in zip(*x_uygun.nonzero())),
+            dtype=np.int64, count=int(x_uygun.sum()),
+        )
+        if komsuluk is not None:
+            for anahtar in komsuluk['sabit_atamalar']:
+                model.Add(x[_anahtar(*anahtar)] == 1)
+
+        eleme_literalleri = {}
+        if yeniden:
+            for (tur, rol), (i_dizi, g0_dizi, s_dizi) in eleme_hucreleri.items():
+                hucreler = list(dict.fromkeys(
+                    _anahtar(self.personel_listesi[i].id, g0 + 1, s)
+                    for i, g0, s in zip(i_dizi, g0_dizi, s_dizi) if x_uygun[i, g0, temsil.get(s, s)]
+                ))
+                if not hucreler:
+                    continue
+                literal = model.NewBoolVar(f'{tur}_aktif_{len(eleme_literalleri)}')
+                eleme_literalleri[tur, rol] = literal
+                for anahtar in hucreler:
+                    model.AddImplication(literal, x[anahtar].Not())
+
+        # Gevşetilebilir aileler: model kuralları, ara gün üst değeri ve plan varyantları.
+        # Normal modda literal yoktur; kısıtlar mevcut gevşetme durumuyla koşulsuz eklenir.
+        model_kurallari = list(enumerate(self.tum_kurallar if yeniden else self.kurallar))
+        kural_literalleri = {}
+        ara_gun_literalleri = {}
+        ara_gun_model = self.ara_gun_ust if yeniden else self.ara_gun
+        plan_varyantlari = [(self.plan_uygulama, None)]
+        if yeniden:
+            for kural_idx, kural in model_kurallari:
+                if kural.tur in ('ayri', 'birlikte'):
+                    kural_literalleri[kural_idx] = model.NewBoolVar(f'kural_aktif_{kural_idx}')
+            for p in self.personel_listesi:
+                if p.id in sifir_hedef_ids:
+                    continue
+                for d in range(2, ara_gun_model + 1):
+                    ara_gun_literalleri[p.id, d] = model.NewBoolVar(f'ara_gun_en_az_{p.id}_{d}')
+                    # "ara_gun >= d" => "ara_gun >= d-1": K2 satırları tek literale bağlı olsa
+                    # da serbest literallerde (çekirdek teşhisi) merdiven tutarlı kalır
+                    if d >= 3:
+                        model.AddImplication(ara_gun_literalleri[p.id, d], ara_gun_literalleri[p.id, d - 1])
+            gevsek_uygulama = plan_uygulamasini_gevset(self._sert_plan_uygulama)
+            if self._plan_aktif_mi() and gevsek_uygulama != self._sert_plan_uygulama:
+                plan_literali = model.NewBoolVar('plan_sert')
+                plan_varyantlari = [(self._sert_plan_uygulama, plan_literali), (gevsek_uygulama, None)]
+        plan_literali = plan_varyantlari[0][1]
 
         # H1. Her slot EN FAZLA 1 kişi olsun, boş kalırsa ceza (SOFT)
         bos_slotlar = []
+        slot_zorunlu = zorunlu.any(axis=0) if zorunlu is not None else np.zeros_like(slot_serbest)
         for g in range(1, self.gun_sayisi + 1):
             for s in range(self.slot_sayisi):
+                if s in temsil:
+                    if s in rol_slotlari:
+                        # Rol kapasitesi: o gün rolü alan kişi sayısı + boş slot sayısı = slot sayısı
+                        kapasite = len(rol_slotlari[s])
+                        atama_toplami = sum(x[p.id, g, s] for p in self.personel_listesi)
+                        bos_sayisi = model.NewIntVar(0, kapasite, f'bos_{g}_{s}')
+                        model.Add(atama_toplami + bos_sayisi == kapasite)
+                        bos_slotlar.append(bos_sayisi)
+                    continue
+                if not slot_serbest[g - 1, s]:
+                    # Adayı kalmayan slot kesin boş
+                    bos_slotlar.append(model.NewConstant(1))
+                    elenen_kisitlar['slot'] += 3
+                    continue
                 atama_toplami = sum(x[p.id, g, s] for p in self.personel_listesi)
                 model.Add(atama_toplami <= 1)  # 1'den fazla olamaz
-                
+                if slot_zorunlu[g - 1, s]:
+                    # Zorunlu atamalı slot kesin dolu
+                    bos_slotlar.append(model.NewConstant(0))
+                    elenen_kisitlar['slot'] += 2
+                    continue
+
                 # Boş kalırsa ceza
                 bos_mu = model.NewBoolVar(f'bos_{g}_{s}')
                 model.Add(atama_toplami == 0).OnlyEnforceIf(bos_mu)
                 model.Add(atama_toplami == 1).OnlyEnforceIf(bos_mu.Not())
                 bos_slotlar.append(bos_mu)
         
-        # H2. Mazeret — eliminasyonda zaten 0'a sabitlendi, ek constraint gereksiz
-        # (Değişken eliminasyonu aşamasında mazeret günleri NewConstant(0) yapıldı)
+        # H2. Mazeret — uygunluk tensöründe (RED_MAZERET) 0'a sabitlendi, ek constraint gereksiz
         
         # H3. Ayni gun tek slot
+        # "pencere" kodlamasında aday günler için calisiyor[p, g] == sum(x[p, g, *])
+        # literali de burada kurulur (sum <= 1 garantisi literalin 0/1 olmasından gelir).
+        pencere_kodlama = self.ara_gun_kodlama == "pencere"
         kisi_gun_atama = {}
-        for p in self.personel_listesi:
+        calisiyor = {}
+        for i, p in enumerate(self.personel_listesi):
+            aday_gun = x_uygun[i].any(axis=1)
             for g in range(1, self.gun_sayisi + 1):
                 kisi_gun_atama[p.id, g] = sum(x[p.id, g, s] for s in range(self.slot_sayisi))
-                model.Add(kisi_gun_atama[p.id, g] <= 1)
+                if pencere_kodlama and aday_gun[g - 1]:
+                    calisiyor[p.id, g] = model.NewBoolVar(f'calisiyor_{p.id}_{g}')
+                    model.Add(kisi_gun_atama[p.id, g] == calisiyor[p.id, g])
+                elif kisi_gun_serbest[i, g - 1]:
+                    model.Add(kisi_gun_atama[p.id, g] <= 1)
+                else:
+                    elenen_kisitlar['kisi_gun'] += 1
         
         # H4. Ara gun - Herkes icin minimum ara gun (HARD)
         # Temel kural: En az 1 gun ara (ayni gun veya ardisik gun olmaz)
-        for p in self.personel_listesi:
-            if p.id in sifir_hedef_ids:
-                continue  # Hedefi 0 olan kisiler zaten eliminate edildi
-            for g1 in range(1, self.gun_sayisi + 1):
-                if g1 in p.mazeret_gunleri and (p.id, g1) not in self.manual_mazeret_override_days:
-                    continue  # Mazeret gunu zaten 0, constraint gereksiz
-                for g2 in range(g1 + 1, min(g1 + self.ara_gun + 1, self.gun_sayisi + 1)):
-                    if g2 in p.mazeret_gunleri and (p.id, g2) not in self.manual_mazeret_override_days:
-                        continue  # Mazeret gunu zaten 0, constraint gereksiz
-                    if (p.id, g1, g2) not in self.aragun_istisna_set:
-                        model.Add(
-                            sum(x[p.id, g1, s] for s in range(self.slot_sayisi)) +
-                            sum(x[p.id, g2, s] for s in range(self.slot_sayisi)) <= 1
+        # yeniden_kullanilabilir modda d >= 2 mesafeli kısıtlar kişinin "ara_gun >= d" literaline bağlanır;
+        # normal modda kişi bazlı gevşetme (kisi_ara_gun) doğrudan mesafeyi kısaltır.
+        if pencere_kodlama:
+            # Kayan pencere: [g, g+ara_gun] içinde en fazla 1 çalışma günü.
+            # Ara gün istisnaları pencereyi böler; sadece aday günler pencereye girer.
+            istisnalar_by_pid = {}
+            for pid, g1, g2 in self.aragun_istisna_set:
+                istisnalar_by_pid.setdefault(pid, set()).add((g1, g2))
+            for p in self.personel_listesi:
+                if p.id in sifir_hedef_ids:
+                    continue  # Hedefi 0 olan kisiler zaten eliminate edildi
+                gunler = [g for g in range(1, self.gun_sayisi + 1) if (p.id, g) in calisiyor]
+                seviyeler = range(1, ara_gun_model + 1) if yeniden else [self._kisi_ara_gunu(p.id)]
+                for seviye in seviyeler:
+                    for klik in _ara_gun_pencereleri(gunler, seviye, istisnalar_by_pid.get(p.id, set())):
+                        _kosullu(
+                            model.AddAtMostOne(calisiyor[p.id, g] for g in klik),
+                            ara_gun_literalleri.get((p.id, seviye))
                         )
+        else:
+            for i, p in enumerate(self.personel_listesi):
+                if p.id in sifir_hedef_ids:
+                    continue  # Hedefi 0 olan kisiler zaten eliminate edildi
+                kisi_ara_gun = ara_gun_model if yeniden else self._kisi_ara_gunu(p.id)
+                for g1 in range(1, self.gun_sayisi + 1):
+                    if g1 in p.mazeret_gunleri and (p.id, g1) not in self.manual_mazeret_override_days:
+                        continue  # Mazeret gunu zaten 0, constraint gereksiz
+                    for g2 in range(g1 + 1, min(g1 + kisi_ara_gun + 1, self.gun_sayisi + 1)):
+                        if g2 in p.mazeret_gunleri and (p.id, g2) not in self.manual_mazeret_override_days:
+                            continue  # Mazeret gunu zaten 0, constraint gereksiz
+                        if not (kisi_gun_serbest[i, g1 - 1] and kisi_gun_serbest[i, g2 - 1]):
+                            elenen_kisitlar['ara_gun'] += 1
+                            continue  # Günlerden biri sabit 0
+                        if (p.id, g1, g2) not in self.aragun_istisna_set:
+                            _kosullu(model.Add(
+                                sum(x[p.id, g1, s] for s in range(self.slot_sayisi)) +
+                                sum(x[p.id, g2, s] for s in range(self.slot_sayisi)) <= 1
+                            ), ara_gun_literalleri.get((p.id, g2 - g1)))
 
         # H5. Ayri tutma
-        for kural in self.kurallar:
+        pid_sira = {p.id: i for i, p in enumerate(self.personel_listesi)}
+        for kural_idx, kural in model_kurallari:
             if kural.tur == 'ayri':
+                kural_literali = kural_literalleri.get(kural_idx)
                 # Normalize edilmiş ID eşleştirme
                 valid_ids = []
                 for pid in kural.kisiler:
-                    matched_id = find_matching_id(pid, self.personeller.keys())
+                    matched_id = self._eslestir(pid)
                     if matched_id is not None:
                         valid_ids.append(matched_id)
                 
@@ -1214,82 +1949,31 @@ class NobetSolver:
                         for i, p1_id in enumerate(valid_ids):
                             for p2_id in valid_ids[i+1:]:
                                 # Kural esnetme: Eger iki kisi de bu gune manuel atanmissa kurali ekleme (kullanici onayi)
-                                m_p1 = any(m.gun == g and find_matching_id(m.personel_id, self.personeller.keys()) == p1_id for m in self.manuel_atamalar)
-                                m_p2 = any(m.gun == g and find_matching_id(m.personel_id, self.personeller.keys()) == p2_id for m in self.manuel_atamalar)
-                                if m_p1 and m_p2:
+                                if (p1_id, g) in self.manuel_kisi_gunleri and (p2_id, g) in self.manuel_kisi_gunleri:
                                     continue
                                 # H5: Ayni gun AYNI GOREV TIPI (base_name) icinde birlikte olamazlar
                                 # Farkli gorev tiplerine (orn: Mavi Kod vs Ameliyathane) atanabilirler
                                 for base_name, slot_list in self.role_slots.items():
-                                    model.Add(
+                                    if not (x_uygun[pid_sira[p1_id], g - 1, slot_list].any()
+                                            and x_uygun[pid_sira[p2_id], g - 1, slot_list].any()):
+                                        # Bir taraf sabit 0: kısıt H3 ile zaten sağlanır
+                                        elenen_kisitlar['ayri'] += 1
+                                        continue
+                                    _kosullu(model.Add(
                                         sum(x[p1_id, g, s] for s in slot_list) +
                                         sum(x[p2_id, g, s] for s in slot_list) <= 1
-                                    )
+                                    ), kural_literali)
         
-        # H6. Manuel atamalar
-        for m in self.manuel_atamalar:
-            matched_pid = find_matching_id(m.personel_id, self.personeller.keys())
-            if matched_pid is not None and 0 <= m.slot_idx < self.slot_sayisi:
-                if 1 <= m.gun <= self.gun_sayisi:
-                    model.Add(x[matched_pid, m.gun, m.slot_idx] == 1)
-        
-        # H7. Kisitli gorev - kısıtlı kişi sadece kendi görevine (+ taşma görevine) gidebilir
-        for p in self.personel_listesi:
-            if p.kisitli_gorev:
-                # Önce base_name ile dene, sonra ad ile dene (frontend her iki formatı gönderebilir)
-                izinli_slotlar = list(self.role_slots.get(p.kisitli_gorev, []))
-                if not izinli_slotlar:
-                    # Slot adıyla da dene: "AMELIYATHANE #1" -> slot index'i bul
-                    for s, gorev in enumerate(self.gorevler):
-                        if gorev.ad == p.kisitli_gorev or gorev.base_name == p.kisitli_gorev:
-                            izinli_slotlar.append(s)
-                # Taşma görevi varsa onun slotlarını da izinli yap
-                if p.tasma_gorevi:
-                    tasma_slotlar = list(self.role_slots.get(p.tasma_gorevi, []))
-                    if not tasma_slotlar:
-                        for s, gorev in enumerate(self.gorevler):
-                            if gorev.ad == p.tasma_gorevi or gorev.base_name == p.tasma_gorevi:
-                                tasma_slotlar.append(s)
-                    izinli_slotlar = list(set(izinli_slotlar + tasma_slotlar))
-                # ignore_manual_conflicts: manuel atanan görevlerin slotlarını da izinli yap
-                if self.ignore_manual_conflicts:
-                    for m in self.manuel_atamalar:
-                        matched_pid = find_matching_id(m.personel_id, self.personeller.keys())
-                        if matched_pid == p.id and 0 <= m.slot_idx < self.slot_sayisi:
-                            if m.slot_idx not in izinli_slotlar:
-                                izinli_slotlar.append(m.slot_idx)
-                for g in range(1, self.gun_sayisi + 1):
-                    allowed_exception_roles = self.kisitlama_istisna_map.get((p.id, g), set())
-                    for s in range(self.slot_sayisi):
-                        role = self._role_name_by_slot(s)
-                        if s not in izinli_slotlar and role not in allowed_exception_roles:
-                            model.Add(x[p.id, g, s] == 0)
-        
-        # H8. Exclusive görevler - kısıtlı OLMAYAN kişi exclusive slotlara gidemez
-        # Havuzlu görevlerde havuz üyeleri de girebilir
-        exclusive_gorevler = set()
-        for gorev in self.gorevler:
-            if gorev.exclusive:
-                base = gorev.base_name if gorev.base_name else gorev.ad
-                exclusive_gorevler.add(base)
+        # H6. Manuel atamalar (yeniden_kullanilabilir modda çekirdek teşhisi için literalli)
+        manuel_literalleri = {}
+        for pid, gun, slot_idx in sorted(self.manuel_slot_set):
+            if yeniden:
+                manuel_literalleri[pid, gun, slot_idx] = model.NewBoolVar(f'manuel_{pid}_{gun}_{slot_idx}')
+            _kosullu(model.Add(x[_anahtar(pid, gun, slot_idx)] == 1), manuel_literalleri.get((pid, gun, slot_idx)))
 
-        # Kısıtlı olmayan kişiler exclusive slotlara gidemez
-        # Veya farklı bir göreve kısıtlı kişiler de exclusive slotlara gidemez
-        # Taşma görevi olarak bu göreve atanmış kişiler de girebilir
-        # Havuz üyeleri de girebilir
-        for p in self.personel_listesi:
-            for exclusive_gorev in exclusive_gorevler:
-                # Bu kişi bu exclusive göreve kısıtlı mı veya taşma görevi mi?
-                if p.kisitli_gorev != exclusive_gorev and p.tasma_gorevi != exclusive_gorev:
-                    # Havuz üyesi mi?
-                    havuz_ids = self.gorev_havuzlari.get(exclusive_gorev)
-                    if havuz_ids is not None and p.id in havuz_ids:
-                        continue  # Havuz üyesi — girebilir
-                    # Hayır - bu exclusive göreve gidemez
-                    exclusive_slotlar = self.role_slots.get(exclusive_gorev, [])
-                    for g in range(1, self.gun_sayisi + 1):
-                        for s in exclusive_slotlar:
-                            model.Add(x[p.id, g, s] == 0)
+        # H7. Kisitli gorev, H8. Exclusive görevler — uygunluk tensöründe
+        # (RED_KISITLI / RED_EXCLUSIVE) elendi; taşma görevi, havuz üyeliği,
+        # kısıtlama istisnası ve manuel atama override'ları orada uygulanır.
 
         # H9. Ayrı bina slotları + birlikte kuralı üyeleri
         #     Birlikte üyeleri en fazla 1 nöbet ayrı binaya yazılabilir
@@ -1301,16 +1985,17 @@ class NobetSolver:
             if getattr(gorev, 'ayri_bina', False)
         ]
         if ayri_bina_slotlar:
-            birlikte_uye_ids = set()
-            for kural in self.kurallar:
+            # Üye -> bu üyeyi içeren kuralların literalleri (None: koşulsuz)
+            birlikte_uye_kosullari = {}
+            for kural_idx, kural in model_kurallari:
                 if kural.tur != 'birlikte':
                     continue
                 for raw_pid in kural.kisiler:
-                    matched_pid = find_matching_id(raw_pid, self.personeller.keys())
+                    matched_pid = self._eslestir(raw_pid)
                     if matched_pid is not None:
-                        birlikte_uye_ids.add(matched_pid)
+                        birlikte_uye_kosullari.setdefault(matched_pid, []).append(kural_literalleri.get(kural_idx))
 
-            for pid in birlikte_uye_ids:
+            for pid, kosullar in birlikte_uye_kosullari.items():
                 # Kişinin hedef nöbet sayısını al
                 hedef = self.hedefler.get(pid, {})
                 hedef_toplam = hedef.get('hedef_toplam', 3)
@@ -1326,28 +2011,18 @@ class NobetSolver:
                         toplam_ayri_bina_atamasi.append(x[pid, g, s])
 
                 if toplam_ayri_bina_atamasi:
-                    model.Add(sum(toplam_ayri_bina_atamasi) <= ayri_bina_max)
+                    if any(kosul is None for kosul in kosullar):
+                        kosullar = [None]
+                    for kosul in kosullar:
+                        _kosullu(model.Add(sum(toplam_ayri_bina_atamasi) <= ayri_bina_max), kosul)
 
-        # H10. Non-exclusive görev havuzu varsa sadece o havuzdan seçim yap
-        for role, allowed_ids in self.gorev_havuzlari.items():
-            role_slotlari = self.role_slots.get(role, [])
-            if not role_slotlari or not allowed_ids:
-                continue
-            for p in self.personel_listesi:
-                if p.id in allowed_ids:
-                    continue
-                # Bug fix: kısıtlı veya taşma görevi olan kişiler havuz dışı sayılmaz
-                if p.kisitli_gorev == role or p.tasma_gorevi == role:
-                    continue
-                for g in range(1, self.gun_sayisi + 1):
-                    for s in role_slotlari:
-                        model.Add(x[p.id, g, s] == 0)
+        # H10. Görev havuzu — uygunluk tensöründe (RED_HAVUZ) elendi;
+        # kısıtlı veya taşma görevi olan kişiler havuz dışı sayılmaz.
 
         # H10b. Kişi-gün iskeleti — ön planlı günlere sadakat
         if self._gun_iskeleti_aktif_mi():
             planlanan_gunler_map = self._planlanan_gunler_map()
             uygulanabilir_ids = self._gun_iskeleti_uygulanabilir_ids()
-            gun_tol = self._gun_iskeleti_toleransi()
             for p in self.personel_listesi:
                 if p.id not in uygulanabilir_ids:
                     continue
@@ -1357,9 +2032,66 @@ class NobetSolver:
                 hedef = self.hedefler.get(p.id, {})
                 hedef_toplam = int(hedef.get('hedef_toplam', len(planlanan_gunler)) or 0)
                 planlanan_hesap = sum(kisi_gun_atama[p.id, g] for g in planlanan_gunler)
-                alt_sinir = max(0, min(len(planlanan_gunler), hedef_toplam) - gun_tol)
-                model.Add(planlanan_hesap >= alt_sinir)
+                for uygulama, literal in plan_varyantlari:
+                    gun_tol = self._gun_iskeleti_toleransi(uygulama)
+                    alt_sinir = max(0, min(len(planlanan_gunler), hedef_toplam) - gun_tol)
+                    _kosullu(model.Add(planlanan_hesap >= alt_sinir), literal)
         
+        # H11. Simetri kırma — eşdeğer personelin çalışma günü vektörleri sözlüksel azalan sırada.
+        # Herhangi bir çözümde sınıf içi kişilerin atamaları yer değiştirilerek bu sıra
+        # sağlanabildiğinden amaç değeri değişmez; sadece permütasyon araması kesilir.
+        # yeniden_kullanilabilir modda kişi bazlı ara gün gevşetmesi simetriyi bozabildiğinden
+        # sıra, çiftin ara gün literalleri eşitken uygulanır.
+        siniflar = self._simetri_siniflari(x_uygun, zorunlu)
+        simetri_kisit = 0
+        if self.simetri_kirma:
+            for sinif in siniflar:
+                for i, j in zip(sinif, sinif[1:]):
+                    pid_i, pid_j = self.personel_listesi[i].id, self.personel_listesi[j].id
+                    kosul = []
+                    esitlikler = []
+                    for d in range(2, ara_gun_model + 1):
+                        lit_i, lit_j = ara_gun_literalleri.get((pid_i, d)), ara_gun_literalleri.get((pid_j, d))
+                        if lit_i is None or lit_j is None:
+                            continue
+                        esit = model.NewBoolVar(f'simetri_ara_gun_esit_{pid_i}_{pid_j}_{d}')
+                        model.Add(lit_i == lit_j).OnlyEnforceIf(esit)
+                        model.Add(lit_i != lit_j).OnlyEnforceIf(esit.Not())
+                        esitlikler.append(esit)
+                    if esitlikler:
+                        ciftte_simetri = model.NewBoolVar(f'simetri_aktif_{pid_i}_{pid_j}')
+                        model.AddMinEquality(ciftte_simetri, esitlikler)
+                        kosul.append(ciftte_simetri)
+                    # onek_esit: şimdiye kadarki günlerde iki vektör eşit (None = koşulsuz doğru)
+                    onek_esit = None
+                    for g0 in np.flatnonzero(kisi_gun_serbest[i]).tolist():
+                        g = g0 + 1
+                        w_i, w_j = kisi_gun_atama[pid_i, g], kisi_gun_atama[pid_j, g]
+                        kosullar = kosul + ([onek_esit] if onek_esit is not None else [])
+                        kisit = model.Add(w_i >= w_j)
+                        if kosullar:
+                            kisit.OnlyEnforceIf(kosullar)
+                        yeni_onek = model.NewBoolVar(f'simetri_onek_{pid_i}_{pid_j}_{g}')
+                        # Önek eşitse ve bu gün de eşitse sonraki önek eşit kalır
+                        model.Add(yeni_onek >= (onek_esit if onek_esit is not None else 1) + w_j - w_i)
+                        onek_esit = yeni_onek
+                        simetri_kisit += 1
+        simetri_raporu = {
+            'aktif': self.simetri_kirma,
+            'sinif_sayisi': len(siniflar),
+            'sinif_boyutlari': sorted((len(sinif) for sinif in siniflar), reverse=True),
+            'siniflar': [[self.personel_listesi[i].id for i in sinif] for sinif in siniflar],
+            'sira_kisiti': simetri_kisit,
+        }
+
+        # K. Türetilmiş kesimler (isteğe bağlı) — sert kısıtlardan çıkan toplu sınırlar
+        kesim_raporu = {}
+        if self.ek_kesimler:
+            kesim_raporu = self._kesimleri_ekle(
+                model, x, x_uygun, kisi_gun_atama, bos_slotlar,
+                plan_varyantlari[-1][0], ara_gun_literalleri, ara_gun_model,
+            )
+
         # SOFT CONSTRAINTS
         penalties = []
 
@@ -1368,11 +2100,13 @@ class NobetSolver:
         for bos_mu in bos_slotlar:
             penalties.append(bos_mu * WEIGHT_BOS_SLOT)
 
+        # Sözlüksel amaç seviyeleri: cezalar bölüm sırasıyla eklenir, seviye sınırları indekslenir
+        seviye_sinirlari = [len(penalties)]
+
         # S0b. Gün iskeleti sadakati
         if self._gun_iskeleti_aktif_mi():
             planlanan_gunler_map = self._planlanan_gunler_map()
             uygulanabilir_ids = self._gun_iskeleti_uygulanabilir_ids()
-            gun_tol = self._gun_iskeleti_toleransi()
             gun_iskeleti_agirligi = self._gun_iskeleti_agirligi()
             for p in self.personel_listesi:
                 if p.id not in uygulanabilir_ids:
@@ -1386,7 +2120,8 @@ class NobetSolver:
                 eksik_plan = model.NewIntVar(0, hedef_toplam, f'gun_iskeleti_eksik_{p.id}')
                 model.Add(eksik_plan >= hedef_toplam - planlanan_hesap)
                 if self._gun_iskeleti_hard_mi():
-                    model.Add(eksik_plan <= gun_tol)
+                    for uygulama, literal in plan_varyantlari:
+                        _kosullu(model.Add(eksik_plan <= self._gun_iskeleti_toleransi(uygulama)), literal)
                 penalties.append(eksik_plan * gun_iskeleti_agirligi)
 
         # S0c. Rol iskeleti sadakati — planlanan role uygun slot'a atama tercih edilir
@@ -1420,8 +2155,6 @@ class NobetSolver:
                     penalties.append(sapma * WEIGHT_ROL_ISKELET)
 
         plan_penalty_multiplier = self._plan_penalty_multiplier()
-        plan_gun_tipi_tol = self._plan_gun_tipi_toleransi()
-        plan_gorev_tol = self._plan_gorev_kota_toleransi()
         
         # S1. Gorev kotalari ? HARD ust sinir + SOFT eksik cezasi
         for p in self.personel_listesi:
@@ -1434,10 +2167,12 @@ class NobetSolver:
 
                 kota = gorev_kotalari.get(role, 0)
                 if self._plan_aktif_mi():
-                    ust_sinir = kota if kota <= 0 else kota + plan_gorev_tol
-                    model.Add(role_atama <= ust_sinir)
-                    if kota > 0:
-                        model.Add(role_atama >= max(0, kota - plan_gorev_tol))
+                    for uygulama, literal in plan_varyantlari:
+                        plan_gorev_tol = self._plan_gorev_kota_toleransi(uygulama)
+                        ust_sinir = kota if kota <= 0 else kota + plan_gorev_tol
+                        _kosullu(model.Add(role_atama <= ust_sinir), literal)
+                        if kota > 0:
+                            _kosullu(model.Add(role_atama >= max(0, kota - plan_gorev_tol)), literal)
                 elif kota > 0:
                     model.Add(role_atama <= kota)
 
@@ -1456,8 +2191,10 @@ class NobetSolver:
                 if tip_gunleri:
                     tip_atama = sum(x[p.id, g, s] for g in tip_gunleri for s in range(self.slot_sayisi))
                     if self._plan_aktif_mi():
-                        model.Add(tip_atama <= tip_hedef + plan_gun_tipi_tol)
-                        model.Add(tip_atama >= max(0, tip_hedef - plan_gun_tipi_tol))
+                        for uygulama, literal in plan_varyantlari:
+                            plan_gun_tipi_tol = self._plan_gun_tipi_toleransi(uygulama)
+                            _kosullu(model.Add(tip_atama <= tip_hedef + plan_gun_tipi_tol), literal)
+                            _kosullu(model.Add(tip_atama >= max(0, tip_hedef - plan_gun_tipi_tol)), literal)
                     fazla = model.NewIntVar(0, len(tip_gunleri) * self.slot_sayisi, f'tip_fazla_{p.id}_{tip}')
                     eksik = model.NewIntVar(0, len(tip_gunleri) * self.slot_sayisi, f'tip_eksik_{p.id}_{tip}')
                     model.Add(tip_atama - tip_hedef == fazla - eksik)
@@ -1517,84 +2254,85 @@ class NobetSolver:
             hedef = self.hedefler.get(p.id, {})
             hedef_toplam = hedef.get('hedef_toplam', 3)
             toplam_atama = sum(x[p.id, g, s] for g in range(1, self.gun_sayisi + 1) for s in range(self.slot_sayisi))
-            if self._plan_toplam_hard_mi():
-                model.Add(toplam_atama == hedef_toplam)
-            else:
-                model.Add(toplam_atama <= hedef_toplam)
+            for uygulama, literal in plan_varyantlari:
+                if self._plan_toplam_hard_mi(uygulama):
+                    _kosullu(model.Add(toplam_atama == hedef_toplam), literal)
+                else:
+                    _kosullu(model.Add(toplam_atama <= hedef_toplam), literal)
             eksik = model.NewIntVar(0, self.gun_sayisi, f'toplam_eksik_{p.id}')
             model.Add(eksik >= hedef_toplam - toplam_atama)
             penalties.append(eksik * WEIGHT_TOPLAM * plan_penalty_multiplier)
 
+        seviye_sinirlari.append(len(penalties))
+
         # S4. Birlikte tutma (SOFT CONSTRAINT)
         # 1) Biri atanıp diğeri boş kalmasın (eski aynı-gün tercihi korunur)
         # 2) Aynı gün çalışıyorlarsa aynı/eşdeğer görev ailesinde olsunlar.
         #    AMELİYATHANE / MAVİ KOD / KVC birlikte üyeleri için tek aile kabul edilir.
+        # Çift-gün ceza değişkenleri yalnızca amaçta (minimize) yer aldığından reified
+        # eşitlik gerekmez: tek yönlü doğrusal alt/üst sınırlar cezayı tam verir.
+        # Aileler tüm slotları böldüğü için "ikisi de çalışıyor ve aileleri farklı"
+        # aile başına tek kısıtla yazılır: p1 f ailesinde, p2 f dışında çalışıyorsa uyumsuz.
         WEIGHT_BIRLIKTE_AILE = 2000
         WEIGHT_BIRLIKTE_HEDEF = 6000
-        for kural in self.kurallar:
-            if kural.tur == 'birlikte':
-                valid_ids = self._birlikte_gecerli_ids(kural)
-                
-                if len(valid_ids) >= 2:
-                    birlikte_tercih_hedefi = self._birlikte_tercih_hedefi(valid_ids)
-                    # SOFT: Birlikte çalışma tercihi - all-pairs karşılaştırma
-                    for i in range(len(valid_ids)):
-                        for j in range(i + 1, len(valid_ids)):
-                            p1_id = valid_ids[i]
-                            p2_id = valid_ids[j]
-                            p1_obj = self.personeller[p1_id]
-                            p2_obj = self.personeller[p2_id]
-                            # Her iki kişinin de müsait olduğu günleri bul
-                            ortak_gunler = p1_obj.musait_gunler & p2_obj.musait_gunler
-                            uyumlu_gunler = []
-
-                            for g in ortak_gunler:
-                                p1_atama = sum(x[p1_id, g, s] for s in range(self.slot_sayisi))
-                                p2_atama = sum(x[p2_id, g, s] for s in range(self.slot_sayisi))
-
-                                # Eski davranışı koru: biri atanıp diğeri boş kalıyorsa ceza
-                                fark = model.NewIntVar(0, 1, f'birlikte_fark_{p1_id}_{p2_id}_{g}')
-                                model.Add(p1_atama - p2_atama <= fark)
-                                model.Add(p2_atama - p1_atama <= fark)
-                                penalties.append(fark * WEIGHT_BIRLIKTE)
-
-                                same_day = model.NewBoolVar(f'birlikte_same_day_{p1_id}_{p2_id}_{g}')
-                                model.Add(p1_atama + p2_atama == 2).OnlyEnforceIf(same_day)
-                                model.Add(p1_atama + p2_atama <= 1).OnlyEnforceIf(same_day.Not())
-
-                                same_family_vars = []
-                                for family_idx, slot_list in enumerate(self.birlikte_family_slots.values()):
-                                    p1_family_atama = sum(x[p1_id, g, s] for s in slot_list)
-                                    p2_family_atama = sum(x[p2_id, g, s] for s in slot_list)
-                                    same_family = model.NewBoolVar(
-                                        f'birlikte_aile_{p1_id}_{p2_id}_{g}_{family_idx}'
-                                    )
-                                    model.Add(p1_family_atama + p2_family_atama == 2).OnlyEnforceIf(same_family)
-                                    model.Add(p1_family_atama + p2_family_atama <= 1).OnlyEnforceIf(same_family.Not())
-                                    same_family_vars.append(same_family)
-
-                                birlikte_uyumlu = model.NewBoolVar(f'birlikte_uyumlu_{p1_id}_{p2_id}_{g}')
-                                if same_family_vars:
-                                    model.Add(sum(same_family_vars) == birlikte_uyumlu)
-                                else:
-                                    model.Add(birlikte_uyumlu == 0)
-
-                                # Aynı gün çalışıp farklı aileye düşerlerse ekstra ceza
-                                uyumsuz_ayni_gun = model.NewBoolVar(f'birlikte_uyumsuz_{p1_id}_{p2_id}_{g}')
-                                model.Add(birlikte_uyumlu <= same_day)
-                                model.Add(uyumsuz_ayni_gun >= same_day - birlikte_uyumlu)
-                                model.Add(uyumsuz_ayni_gun <= same_day)
-                                model.Add(uyumsuz_ayni_gun + birlikte_uyumlu <= 1)
-                                penalties.append(uyumsuz_ayni_gun * WEIGHT_BIRLIKTE_AILE)
-                                uyumlu_gunler.append(birlikte_uyumlu)
-
-                            if birlikte_tercih_hedefi > 0 and uyumlu_gunler:
-                                birlikte_eksik = model.NewIntVar(
-                                    0, birlikte_tercih_hedefi,
-                                    f'birlikte_hedef_eksik_{p1_id}_{p2_id}'
-                                )
-                                model.Add(birlikte_eksik >= birlikte_tercih_hedefi - sum(uyumlu_gunler))
-                                penalties.append(birlikte_eksik * WEIGHT_BIRLIKTE_HEDEF)
+        aile_slot_listeleri = list(self.birlikte_family_slots.values())
+        for kural_idx, kural in model_kurallari:
+            if kural.tur != 'birlikte':
+                continue
+            valid_ids = self._birlikte_gecerli_ids(kural)
+            if len(valid_ids) < 2:
+                continue
+            # Kural kapalıyken ceza değişkenleri serbest kalır; minimizasyon onları 0'a çeker.
+            kural_literali = kural_literalleri.get(kural_idx)
+            birlikte_tercih_hedefi = self._birlikte_tercih_hedefi(valid_ids)
+
+            for i in range(len(valid_ids)):
+                for j in range(i + 1, len(valid_ids)):
+                    p1_id = valid_ids[i]
+                    p2_id = valid_ids[j]
+                    ortak_gunler = self.personeller[p1_id].musait_gunler & self.personeller[p2_id].musait_gunler
+                    uyumlu_gunler = []
+                    for g in sorted(ortak_gunler):
+                        p1_atama = kisi_gun_atama[p1_id, g]
+                        p2_atama = kisi_gun_atama[p2_id, g]
+
+                        fark = model.NewBoolVar(f'birlikte_fark_{p1_id}_{p2_id}_{g}')
+                        _kosullu(model.Add(p1_atama - p2_atama <= fark), kural_literali)
+                        _kosullu(model.Add(p2_atama - p1_atama <= fark), kural_literali)
+                        penalties.append(fark * WEIGHT_BIRLIKTE)
+
+                        uyumsuz_ayni_gun = model.NewBoolVar(f'birlikte_uyumsuz_{p1_id}_{p2_id}_{g}')
+                        for slot_list in aile_slot_listeleri:
+                            p1_aile = sum(x[p1_id, g, s] for s in slot_list)
+                            p2_aile = sum(x[p2_id, g, s] for s in slot_list)
+                            _kosullu(
+                                model.Add(uyumsuz_ayni_gun >= p1_aile + p2_atama - p2_aile - 1),
+                                kural_literali
+                            )
+                        penalties.append(uyumsuz_ayni_gun * WEIGHT_BIRLIKTE_AILE)
+
+                        if birlikte_tercih_hedefi <= 0:
+                            continue
+                        # Uyumlu gün sayısı yalnızca eksik cezasında kullanılır: üst sınırlar yeterli
+                        birlikte_uyumlu = model.NewBoolVar(f'birlikte_uyumlu_{p1_id}_{p2_id}_{g}')
+                        model.Add(birlikte_uyumlu <= p1_atama)
+                        for slot_list in aile_slot_listeleri:
+                            model.Add(
+                                birlikte_uyumlu
+                                <= 1 - sum(x[p1_id, g, s] for s in slot_list) + sum(x[p2_id, g, s] for s in slot_list)
+                            )
+                        uyumlu_gunler.append(birlikte_uyumlu)
+
+                    if uyumlu_gunler:
+                        birlikte_eksik = model.NewIntVar(
+                            0, birlikte_tercih_hedefi,
+                            f'birlikte_hedef_eksik_{p1_id}_{p2_id}'
+                        )
+                        _kosullu(
+                            model.Add(birlikte_eksik >= birlikte_tercih_hedefi - sum(uyumlu_gunler)),
+                            kural_literali
+                        )
+                        penalties.append(birlikte_eksik * WEIGHT_BIRLIKTE_HEDEF)
         
         # S5. Homojen dağılım - Nöbetleri ay geneline yay (haftada ~1 nöbet hedefi)
         # Mazeretler izin veriyorsa yay, vermiyorsa sıkışık tutulabilir
@@ -1634,6 +2372,9 @@ class NobetSolver:
                 max_aralik = ideal_aralik + tolerans
                 # Sert üst sınır: ideal_aralik * 2'den büyük boşluklar için 5x ceza
                 sert_ust_sinir = ideal_aralik * 2
+                if self.homojen_kodlama == "sayac":
+                    self._homojen_bosluk_sayaci(model, kisi_gun_atama, p.id, max_aralik, sert_ust_sinir, penalties)
+                    continue
                 if max_aralik < self.gun_sayisi:
                     for baslangic in range(1, self.gun_sayisi - max_aralik + 1):
                         pencere_gunleri = list(range(baslangic, baslangic + max_aralik + 1))
@@ -1665,18 +2406,15 @@ class NobetSolver:
         if not self._plan_aktif_mi():
             # S6. Yıllık dengeleme - Geçmiş ay eksiklerini bu ay tamamla
             # yillik_gerceklesen: {'hici': 10, 'cmt': 5, ...} şeklinde geçmiş ayların toplamı
+            denge_referansi = self._yillik_denge_referansi()
             for p in self.personel_listesi:
                 if hasattr(p, 'yillik_gerceklesen') and p.yillik_gerceklesen:
                     # Yıllık ortalamayı hesapla
                     yillik_toplam = sum(p.yillik_gerceklesen.values())
                     
                     # Tüm personelin yıllık ortalaması
-                    tum_yillik = [sum(pp.yillik_gerceklesen.values()) 
-                                  for pp in self.personel_listesi 
-                                  if hasattr(pp, 'yillik_gerceklesen') and pp.yillik_gerceklesen]
-                    
-                    if tum_yillik:
-                        ortalama = sum(tum_yillik) / len(tum_yillik)
+                    ortalama = denge_referansi['yillik']
+                    if ortalama is not None:
                         fark = yillik_toplam - ortalama
                         
                         # Ortalamanın altındaysa daha fazla nöbet alsın
@@ -1705,23 +2443,16 @@ class NobetSolver:
             # S6b. Özel görev yıllık dengeleme - Geçmiş görev dağılımını eşitle
             gecmis_gorev_olan = [p for p in self.personel_listesi
                                 if hasattr(p, 'gecmis_gorevler') and p.gecmis_gorevler]
-            if len(gecmis_gorev_olan) >= 2:
-                # Tüm özel görev isimlerini topla
-                tum_gorev_isimleri = set()
-                for p in gecmis_gorev_olan:
-                    tum_gorev_isimleri.update(p.gecmis_gorevler.keys())
-
-                for gorev_adi in tum_gorev_isimleri:
+            if gecmis_gorev_olan:
+                for gorev_adi, ort in denge_referansi['gorev'].items():
                     # Bu görev için geçmişi olan personelleri bul
                     gecmis_list = [(p, p.gecmis_gorevler.get(gorev_adi, 0))
                                    for p in gecmis_gorev_olan
                                    if p.gecmis_gorevler.get(gorev_adi, 0) > 0 or
                                    p.gorev_kotalari.get(gorev_adi, 0) > 0]
-                    if len(gecmis_list) < 2:
+                    if not gecmis_list:
                         continue
 
-                    ort = sum(g for _, g in gecmis_list) / len(gecmis_list)
-
                     # Görev slotlarını bul
                     gorev_slotlari = [s for s, g in enumerate(self.gorevler)
                                       if g.base_name == gorev_adi or g.ad == gorev_adi]
@@ -1775,101 +2506,840 @@ class NobetSolver:
         
         if penalties:
             model.Minimize(sum(penalties))
+        seviye_sinirlari.append(len(penalties))
+        amac_seviyeleri = []
+        onceki_sinir = 0
+        for ad, sinir in zip(AMAC_SEVIYELERI, seviye_sinirlari):
+            if sinir > onceki_sinir:
+                amac_seviyeleri.append((ad, sum(penalties[onceki_sinir:sinir])))
+            onceki_sinir = sinir
+
+        return _KuruluModel(
+            model=model, x=x, bos_slotlar=bos_slotlar,
+            amac_var=bool(penalties), eliminated_vars=eliminated_vars,
+            amac_seviyeleri=amac_seviyeleri,
+            x_indeksleri=x_indeksleri,
+            uygun=x_uygun,
+            on_cozum_raporu={**on_cozum_raporu, 'elenen_kisit': elenen_kisitlar},
+            simetri_raporu=simetri_raporu,
+            rol_slotlari=rol_slotlari, sabit_slotlar=sabit_slotlar,
+            kesim_raporu=kesim_raporu,
+            ara_gun_literalleri=ara_gun_literalleri,
+            eleme_literalleri=eleme_literalleri,
+            kural_literalleri=kural_literalleri,
+            manuel_literalleri=manuel_literalleri,
+            plan_literali=plan_literali,
+        )
+
+    def gevset(self, ara_gun: int = None, exclusive_aktif: bool = None,
+               kurallar: List[SolverKural] = None, plan_gevsek: bool = None,
+               kisi_ara_gun: Dict[int, int] = None, gevsek_eleme: Set[tuple] = None) -> None:
+        """Sonraki coz() çağrısı için gevşetme durumunu ayarla.
+
+        yeniden_kullanilabilir modda kurulu model korunur; sadece etkinlik literalleri
+        yeniden sabitlenir. Bu yüzden ara_gun kurulumdaki değeri aşamaz ve kurallar
+        kurulumdaki kural nesnelerinin alt kümesi olmalıdır. Normal modda bir
+        sonraki coz() modeli yeni durumla baştan kurar.
+
+        kisi_ara_gun: {pid: ara_gun} kişi bazlı (genel değerden küçük) ara gün;
+        gevsek_eleme: {('exclusive' | 'havuz', rol)} elemesi kaldırılan roller.
+        """
+        if ara_gun is not None:
+            if ara_gun < 1 or (self.yeniden_kullanilabilir and ara_gun > self.ara_gun_ust):
+                raise ValueError(f"ara_gun 1..{self.ara_gun_ust} araliginda olmali: {ara_gun}")
+            self.ara_gun = ara_gun
+        if exclusive_aktif is not None:
+            self.exclusive_aktif = bool(exclusive_aktif)
+        if kurallar is not None:
+            kural_kimlikleri = {id(k) for k in self.tum_kurallar}
+            if self.yeniden_kullanilabilir and any(id(k) not in kural_kimlikleri for k in kurallar):
+                raise ValueError("Yeniden kullanilabilir modelde yeni kural eklenemez")
+            self.kurallar = list(kurallar)
+        if kisi_ara_gun is not None:
+            self.kisi_ara_gun = {pid: max(1, int(d)) for pid, d in kisi_ara_gun.items()}
+        if gevsek_eleme is not None:
+            self.gevsek_eleme = set(gevsek_eleme)
+        if plan_gevsek is not None and bool(plan_gevsek) != self.plan_gevsek:
+            self.plan_gevsek = bool(plan_gevsek)
+            self.plan_uygulama = (
+                plan_uygulamasini_gevset(self._sert_plan_uygulama) if self.plan_gevsek
+                else self._sert_plan_uygulama
+            )
+        if not self.yeniden_kullanilabilir:
+            self._kurulu_model = None
+        # Teşhis cache'leri ara gün / exclusive durumuna bağlı
+        for anahtar in [a for a in vars(self) if a.startswith('_feasibility_cache_')]:
+            delattr(self, anahtar)
+
+    def komsulugu_sabitle(self, onceki_atamalar, kisiler=(), gunler=()) -> Dict:
+        """Artımlı yeniden çözüm: değişiklikten etkilenmeyen hücreleri önceki atamaya sabitle.
+
+        Serbest bölge, etkilenen kişilerin tüm günleri ile etkilenen her günün ara gün
+        penceresi ve haftasıdır (S5 ile aynı 7 günlük bloklar). Artık uygun olmayan ya da
+        yeni manuel atamalarla çakışan önceki atamalar da etkilenmiş sayılır.
+        Önceki atamalar ayrıca ipucu olarak verilir.
+        Returns: komşuluk özeti
+        """
+        self.ipucu_ver(onceki_atamalar)
+        onceki = self.onceki_cozum or set()
+        serbest_kisiler = {pid for pid in (self._eslestir(k) for k in kisiler or []) if pid is not None}
+        duzenlenen_gunler = {int(g) for g in gunler or [] if 1 <= int(g) <= self.gun_sayisi}
+
+        pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+        uygun = self._uygunluk().uygun
+        gecerli = set()
+        dolu_slotlar = set()
+        for pid, g, s in sorted(onceki):
+            i = pid_index.get(pid)
+            if i is None or not (1 <= g <= self.gun_sayisi) or not (0 <= s < self.slot_sayisi):
+                if 1 <= g <= self.gun_sayisi:
+                    duzenlenen_gunler.add(g)
+                continue
+            if not uygun[i, g - 1, s] or (g, s) in dolu_slotlar:
+                serbest_kisiler.add(pid)
+                duzenlenen_gunler.add(g)
+                continue
+            gecerli.add((pid, g, s))
+            dolu_slotlar.add((g, s))
+        for pid, g, s in self.manuel_slot_set - gecerli:
+            serbest_kisiler.add(pid)
+            duzenlenen_gunler.add(g)
+
+        pencere = max(self.ara_gun, self.ara_gun_ust)
+        serbest_gunler = set()
+        for g in duzenlenen_gunler:
+            hafta_baslangic = ((g - 1) // 7) * 7 + 1
+            serbest_gunler.update(range(max(1, g - pencere), min(self.gun_sayisi, g + pencere) + 1))
+            serbest_gunler.update(range(hafta_baslangic, min(self.gun_sayisi, hafta_baslangic + 6) + 1))
+
+        sabit_atamalar = {
+            (pid, g, s) for pid, g, s in gecerli
+            if pid not in serbest_kisiler and g not in serbest_gunler
+        }
+        self.komsuluk = {
+            'serbest_kisiler': serbest_kisiler,
+            'serbest_gunler': serbest_gunler,
+            'sabit_atamalar': sabit_atamalar,
+        }
+        self._kurulu_model = None
+        serbest_hucre = sum(
+            self.slot_sayisi for p in self.personel_listesi for g in range(1, self.gun_sayisi + 1)
+            if p.id in serbest_kisiler or g in serbest_gunler
+        )
+        return {
+            'serbest_kisi_sayisi': len(serbest_kisiler),
+            'serbest_gunler': sorted(serbest_gunler),
+            'sabit_atama_sayisi': len(sabit_atamalar),
+            'serbest_hucre_orani': round(
+                100 * serbest_hucre / max(len(self.personel_listesi) * self.gun_sayisi * self.slot_sayisi, 1), 1
+            ),
+        }
+
+    def ipucu_ver(self, atamalar) -> None:
+        """Sonraki coz() için çözüm ipucu ver.
+
+        atamalar: (pid, gun, slot_idx) demetleri veya sonuç atama dict'leri.
+        Uygun olmayan atamalar coz() sırasında uygunluk maskesiyle elenir.
+        """
+        ipucu = set()
+        for atama in atamalar or []:
+            if isinstance(atama, dict):
+                raw_pid, g, s = atama.get('personel_id'), atama.get('gun'), atama.get('slot_idx')
+            else:
+                raw_pid, g, s = atama
+            pid = self._eslestir(raw_pid)
+            if pid is not None and g is not None and s is not None:
+                ipucu.add((pid, int(g), int(s)))
+        self.onceki_cozum = ipucu or None
+
+    def _ipucu_filtrele(self, adaylar, uygun) -> Set[tuple]:
+        """Manuel atamaları ve aday (pid, gun, slot) atamalarını uygunluk, slot ve kişi-gün
+        çakışmalarına göre süz. Manuel atamalar önceliklidir."""
+        pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+        atamalar = set()
+        dolu_slotlar = set()
+        dolu_kisi_gunler = set()
+        for pid, g, s in sorted(self.manuel_slot_set) + sorted(adaylar):
+            i = pid_index.get(pid)
+            if i is None or not (1 <= g <= self.gun_sayisi) or not (0 <= s < self.slot_sayisi):
+                continue
+            if not uygun[i, g - 1, s] or (g, s) in dolu_slotlar or (pid, g) in dolu_kisi_gunler:
+                continue
+            atamalar.add((pid, g, s))
+            dolu_slotlar.add((g, s))
+            dolu_kisi_gunler.add((pid, g))
+        return atamalar
+
+    def _iskelet_ipucu_atamalari(self, uygun) -> Set[tuple]:
+        """Gün iskeletini somut (pid, gun, slot) atamalarına çevir.
+
+        Manuel atamalar önce yerleşir. Her planlanan kişi-gün için önce planlanan
+        rolün boş ve uygun slotu, yoksa günün herhangi bir boş uygun slotu seçilir.
+        """
+        gun_iskeleti = self.plan_kontrati.get("gun_iskeleti", {}) if isinstance(self.plan_kontrati, dict) else {}
+        if not isinstance(gun_iskeleti, dict) or not gun_iskeleti.get("aktif"):
+            return set()
+        pid_index = {p.id: i for i, p in enumerate(self.personel_listesi)}
+        atamalar = self._ipucu_filtrele((), uygun)
+        dolu_slotlar = {(g, s) for _, g, s in atamalar}
+        dolu_kisi_gunler = {(pid, g) for pid, g, _ in atamalar}
+
+        planlanan_gunler_map = self._planlanan_gunler_map()
+        rol_gunleri_map = self._planlanan_rol_gunleri_map()
+        for p in self.personel_listesi:
+            i = pid_index[p.id]
+            rol_gunleri = rol_gunleri_map.get(p.id, {})
+            for g in sorted(planlanan_gunler_map.get(p.id, set())):
+                if not (1 <= g <= self.gun_sayisi) or (p.id, g) in dolu_kisi_gunler:
+                    continue
+                rol_slotlari = self.role_slots.get(rol_gunleri.get(g), [])
+                sirali_slotlar = rol_slotlari + [s for s in range(self.slot_sayisi) if s not in rol_slotlari]
+                for s in sirali_slotlar:
+                    if (g, s) not in dolu_slotlar and uygun[i, g - 1, s]:
+                        atamalar.add((p.id, g, s))
+                        dolu_slotlar.add((g, s))
+                        dolu_kisi_gunler.add((p.id, g))
+                        break
+        return atamalar
+
+    def _ipucu_uygula(self, kurulu: _KuruluModel) -> tuple:
+        """Modeldeki ipuçlarını temizleyip tam x ipucu ver (AddHint).
+
+        Önceki çözüm (onceki_cozum) varsa o, yoksa gün iskeleti kullanılır.
+        Returns: (ipucu atamaları, kaynak)
+        """
+        model = kurulu.model
+        model.ClearHints()
+        # Gevşetme durumuna göre şu an atanabilir hücreler
+        uygun = kurulu.slot_maskesi(kurulu.uygun) & self._uygunluk(gevsek=not self.exclusive_aktif).uygun
+        atamalar, kaynak = set(), None
+        if self.onceki_cozum:
+            atamalar, kaynak = self._ipucu_filtrele(self.onceki_cozum, uygun), 'onceki_cozum'
+        if not atamalar:
+            atamalar, kaynak = self._iskelet_ipucu_atamalari(uygun), 'gun_iskeleti'
+        if not atamalar:
+            return atamalar, None
+        secili = {kurulu.temsilci(anahtar) for anahtar in atamalar}
+        for i, g0, s in zip(*(uygun & kurulu.uygun).nonzero()):
+            anahtar = (self.personel_listesi[i].id, int(g0) + 1, int(s))
+            model.AddHint(kurulu.x[anahtar], 1 if anahtar in secili else 0)
+        return atamalar, kaynak
+
+    def _ipucu_istatistigi(self, solver, kurulu: _KuruluModel, ipucu_atamalari: Set[tuple], kaynak: str) -> Dict:
+        if not ipucu_atamalari:
+            return {}
+        korunan = sum(1 for anahtar in ipucu_atamalari if solver.Value(kurulu.x[kurulu.temsilci(anahtar)]) == 1)
+        return {
+            'kaynak': kaynak,
+            'ipucu_degisken': len(kurulu.model.Proto().solution_hint.vars),
+            'ipucu_atama': len(ipucu_atamalari),
+            'korunan_atama': korunan,
+            'korunma_orani': round(100 * korunan / len(ipucu_atamalari), 1),
+        }
+
+    def _etkinlik_durumlari(self, kurulu: _KuruluModel) -> List[tuple]:
+        """Her etkinlik literali için (literal, mevcut gevşetme durumunda aktif mi, öge).
+
+        öge, literalin bağlı olduğu kısıtın çekirdek raporundaki tarifidir.
+        """
+        def ad(pid):
+            p = self.personeller.get(pid)
+            return p.ad if p else str(pid)
+
+        durumlar = []
+        for (pid, d), literal in kurulu.ara_gun_literalleri.items():
+            durumlar.append((literal, d <= self._kisi_ara_gunu(pid), {
+                'tur': 'ara_gun', 'personel_id': pid, 'personel_ad': ad(pid), 'mesafe': d,
+            }))
+        for (tur, rol), literal in kurulu.eleme_literalleri.items():
+            durumlar.append((literal, self.exclusive_aktif and (tur, rol) not in self.gevsek_eleme, {
+                'tur': tur, 'gorev': rol,
+            }))
+        aktif_kimlikler = {id(k) for k in self.kurallar}
+        for kural_idx, literal in kurulu.kural_literalleri.items():
+            kural = self.tum_kurallar[kural_idx]
+            durumlar.append((literal, id(kural) in aktif_kimlikler, {
+                'tur': 'kural', 'kural_idx': kural_idx, 'kural_tur': kural.tur,
+                'kisiler': [str(k) for k in kural.kisiler],
+            }))
+        for (pid, gun, slot_idx), literal in kurulu.manuel_literalleri.items():
+            durumlar.append((literal, True, {
+                'tur': 'manuel', 'personel_id': pid, 'personel_ad': ad(pid),
+                'gun': gun, 'slot_idx': slot_idx, 'gorev': self._role_name_by_slot(slot_idx),
+            }))
+        if kurulu.plan_literali is not None:
+            durumlar.append((kurulu.plan_literali, not self.plan_gevsek, {'tur': 'plan'}))
+        return durumlar
+
+    def _gevsetme_literallerini_sabitle(self, kurulu: _KuruluModel) -> None:
+        """Etkinlik literallerinin domain'ini mevcut gevşetme durumuna sabitle."""
+        proto = kurulu.model.Proto()
+        for literal, aktif, _ in self._etkinlik_durumlari(kurulu):
+            # Bool domain'i [0, 1]; iki ucu da aynı değere çekilir
+            domain = proto.variables[literal.Index()].domain
+            domain[0] = domain[1] = int(aktif)
+
+    def cekirdek_bul(self, sure: float = None) -> Dict:
+        """INFEASIBLE sonrası çelişki çekirdekleri ve yeterli gevşetme (sadece yeniden_kullanilabilir modda).
+
+        Mevcut gevşetme durumunda aktif olan etkinlik literalleri varsayım
+        (assumption) olarak verilir ve ilk çekirdek SufficientAssumptionsForInfeasibility
+        ile alınır. CP-SAT varsayımlı modelde presolve yapmadığı için bu çözüm kısa
+        tutulur; çekirdek, literalleri sabitleyen (presolve'lu) denemelerle
+        QuickXplain yöntemiyle minimale indirilir. Çekirdekten en ucuz gevşetilebilir
+        öge (_gevsetme_maliyeti) seçilip çıkarılır ve model olur hale gelene kadar
+        tekrarlanır. Çekirdek modelinde amaç ve ipuçları yoktur, sadece olurluk aranır.
+
+        Returns: {'durum', 'cekirdekler': [{'ogeler', 'minimal'}], 'gevsetilecek': [öge],
+                  'yeterli', 'varsayim_sayisi', 'cozum_sayisi', 'sure_ms'}
+        durum: CEKIRDEK | COZULEBILIR (zaten olur) | CEKIRDEK_YOK (gevşetilebilir kısıtların
+        hepsi kalksa da çözümsüz) | GEVSETILEMEZ (çekirdek sadece manuel atamalardan oluşuyor)
+        | BELIRSIZ (süre yetmedi). yeterli: gevsetilecek ögeler modeli olur kılıyor.
+        """
+        if not self.yeniden_kullanilabilir:
+            raise ValueError("Cekirdek teshisi yeniden kullanilabilir model gerektirir")
+        baslangic = time.time()
+        cp = _get_cp_model()
+        if self._kurulu_model is None:
+            self._kurulu_model = self._modeli_kur(cp)
+        kurulu = self._kurulu_model
+        self._gevsetme_literallerini_sabitle(kurulu)
+        ogeler = {
+            literal.Index(): oge
+            for literal, aktif, oge in self._etkinlik_durumlari(kurulu) if aktif
+        }
+
+        model = kurulu.model.Clone()
+        model.ClearObjective()
+        model.ClearHints()
+        proto = model.Proto()
+        sure = self.max_sure if sure is None else sure
+        son_an = baslangic + sure
+        # Tek deneme üst süresi; zor ispatlar çekirdeği minimal olmayan bırakır
+        deneme_suresi = max(1.0, sure * 0.1)
+        cozum_sayisi = 0
+        minimal = True
+        # Varsayımlı çözüm bir kez sonuçsuz kalırsa (presolve'suz ispat zor) tekrar denenmez
+        varsayim_kullan = True
+
+        def _sure_doldu():
+            return time.time() >= son_an or (self.iptal_olayi is not None and self.iptal_olayi.is_set())
+
+        def _solver(ust_sure):
+            solver = cp.CpSolver()
+            solver.parameters.max_time_in_seconds = max(min(son_an - time.time(), ust_sure), 0.1)
+            # Denemeler küçük ve çok sayıda; tek işçi başlatma yükünü azaltır
+            solver.parameters.num_search_workers = 1
+            return solver
+
+        def _olur_mu(etkin) -> str:
+            """Sadece etkin literaller 1, diğer aktif literaller 0 (kısıt kapalı) iken çöz."""
+            nonlocal cozum_sayisi, minimal
+            cozum_sayisi += 1
+            etkin = set(etkin)
+            for indeks in ogeler:
+                domain = proto.variables[indeks].domain
+                domain[0] = domain[1] = int(indeks in etkin)
+            status = _solver(deneme_suresi).Solve(model)
+            if status == cp.INFEASIBLE:
+                return 'INFEASIBLE'
+            if status in (cp.OPTIMAL, cp.FEASIBLE):
+                return 'FEASIBLE'
+            minimal = False
+            return 'UNKNOWN'
+
+        def _varsayim_cekirdegi(aktif) -> List[int]:
+            nonlocal cozum_sayisi, varsayim_kullan
+            if not varsayim_kullan:
+                return list(aktif)
+            cozum_sayisi += 1
+            for indeks in ogeler:
+                domain = proto.variables[indeks].domain
+                domain[0], domain[1] = 0, int(indeks in aktif)
+            model.ClearAssumptions()
+            model.AddAssumptions([model.GetBoolVarFromProtoIndex(i) for i in aktif])
+            solver = _solver(min(deneme_suresi, 1.0))
+            status = solver.Solve(model)
+            model.ClearAssumptions()
+            if status != cp.INFEASIBLE:
+                varsayim_kullan = False
+                return list(aktif)
+            return list(solver.SufficientAssumptionsForInfeasibility()) or list(aktif)
+
+        def _quickxplain(arka, yeni, adaylar) -> List[int]:
+            # arka ∪ adaylar çözümsüz; arka ∪ X çözümsüz kalan tercihli minimal X ⊆ adaylar.
+            # Adaylar ucuzdan pahalıya sıralı: çekirdek ucuz gevşetmelerden oluşmaya yönelir.
+            nonlocal minimal
+            if yeni and _olur_mu(arka) == 'INFEASIBLE':
+                return []
+            if len(adaylar) == 1:
+                return list(adaylar)
+            if _sure_doldu():
+                minimal = False
+                return list(adaylar)
+            orta = len(adaylar) // 2
+            a1, a2 = adaylar[:orta], adaylar[orta:]
+            x2 = _quickxplain(arka + a1, a1, a2)
+            x1 = _quickxplain(arka + x2, x2, a1)
+            return x1 + x2
+
+        def _sirala(indeksler):
+            return sorted(indeksler, key=lambda i: _gevsetme_maliyeti(ogeler[i]))
+
+        aktif = list(ogeler)
+        cekirdekler = []
+        gevsetilecek = []
+        if _olur_mu([]) == 'INFEASIBLE':
+            durum = 'CEKIRDEK_YOK'
+        else:
+            durum = _olur_mu(aktif)
+        while durum == 'INFEASIBLE':
+            if _sure_doldu():
+                durum = 'UNKNOWN'
+                break
+            minimal = True
+            cekirdek = _quickxplain([], [], _sirala(_varsayim_cekirdegi(aktif)))
+            cekirdekler.append({'ogeler': [ogeler[i] for i in cekirdek], 'minimal': minimal})
+            adaylar = [i for i in cekirdek if ogeler[i]['tur'] != 'manuel']
+            if not adaylar:
+                durum = 'GEVSETILEMEZ'
+                break
+            secilen = ogeler[min(adaylar, key=lambda i: _gevsetme_maliyeti(ogeler[i]))]
+            gevsetilecek.append(secilen)
+            # Kişinin ara günü mesafe - 1'e iner; daha uzak mesafeler de kalkar (bkz. cekirdegi_gevset)
+            aktif = [
+                i for i in aktif
+                if ogeler[i] is not secilen and not (
+                    secilen['tur'] == 'ara_gun' and ogeler[i]['tur'] == 'ara_gun'
+                    and ogeler[i]['personel_id'] == secilen['personel_id']
+                    and ogeler[i]['mesafe'] >= secilen['mesafe']
+                )
+            ]
+            durum = _olur_mu(aktif)
+
+        yeterli = durum == 'FEASIBLE'
+        if durum in ('FEASIBLE', 'UNKNOWN'):
+            durum = 'CEKIRDEK' if cekirdekler else ('COZULEBILIR' if yeterli else 'BELIRSIZ')
+        return {
+            'durum': durum,
+            'cekirdekler': cekirdekler,
+            'gevsetilecek': gevsetilecek,
+            'yeterli': yeterli,
+            'varsayim_sayisi': len(ogeler),
+            'cozum_sayisi': cozum_sayisi,
+            'sure_ms': int((time.time() - baslangic) * 1000),
+        }
+
+    def cekirdegi_gevset(self, cekirdek: List[Dict]) -> List[Dict]:
+        """Sadece çekirdekteki kısıtları gevşet (bkz. cekirdek_bul).
+
+        ara_gun ögesi o kişinin ara gününü mesafe - 1'e indirir; exclusive/havuz
+        ögesi o rolün elemesini, kural ögesi o kuralı, plan ögesi sert plan
+        sınırlarını kaldırır. Manuel atamalar kullanıcı kararıdır, gevşetilmez.
+        Returns: gevşetilen ögeler
+        """
+        gevsetilen = []
+        kisi_ara_gun = dict(self.kisi_ara_gun)
+        gevsek_eleme = set(self.gevsek_eleme)
+        kaldirilan_kurallar = set()
+        plan_gevsek = None
+        for oge in cekirdek:
+            tur = oge['tur']
+            if tur == 'ara_gun':
+                pid = oge['personel_id']
+                kisi_ara_gun[pid] = min(kisi_ara_gun.get(pid, self.ara_gun), oge['mesafe'] - 1)
+            elif tur in ('exclusive', 'havuz'):
+                gevsek_eleme.add((tur, oge['gorev']))
+            elif tur == 'kural':
+                kaldirilan_kurallar.add(id(self.tum_kurallar[oge['kural_idx']]))
+            elif tur == 'plan':
+                plan_gevsek = True
+            else:
+                continue
+            gevsetilen.append(oge)
+        if gevsetilen:
+            self.gevset(
+                kurallar=[k for k in self.kurallar if id(k) not in kaldirilan_kurallar],
+                plan_gevsek=plan_gevsek, kisi_ara_gun=kisi_ara_gun, gevsek_eleme=gevsek_eleme,
+            )
+        return gevsetilen
+
+    def _erken_durdurma_bilgisi(self, cp, status, solver, kurulu: _KuruluModel, geri_cagirim,
+                                durgunluk_durdurmasi: List[float], sozluksel_seviyeler) -> Dict:
+        """Aramanın neden bittiği ve son amaç-sınır boşluğu.
+
+        durma_nedeni önceliği: iptal > dinleyici > iyilesmesiz_sure > bosluk_siniri
+        > optimal / cozumsuz / sure_siniri. CP-SAT boşluk sınırına ulaşınca da OPTIMAL
+        döndüğü için amaç ile sınır farkı ayrıca kontrol edilir; optimal_kanitlandi yalnızca
+        fark kalmadığında True olur ve coz() sonucu aksi halde FEASIBLE raporlar.
+        """
+        bilgi = {
+            'goreli_bosluk_siniri': self.goreli_bosluk,
+            'mutlak_bosluk_siniri': self.mutlak_bosluk,
+            'iyilesmesiz_sure_s': self.iyilesmesiz_sure,
+        }
+        if sozluksel_seviyeler is not None:
+            bosluklar = [
+                (sev['objective'], sev['bound']) for sev in sozluksel_seviyeler if 'objective' in sev
+            ]
+        elif status in (cp.OPTIMAL, cp.FEASIBLE) and kurulu.amac_var:
+            bosluklar = [(solver.ObjectiveValue(), solver.BestObjectiveBound())]
+        else:
+            bosluklar = []
+        if bosluklar:
+            amac, sinir = bosluklar[-1]
+            bilgi['mutlak_bosluk'] = round(amac - sinir, 3)
+            bilgi['goreli_bosluk'] = round((amac - sinir) / max(abs(amac), 1.0), 6)
+        if durgunluk_durdurmasi:
+            bilgi['iyilesmesiz_durdurma_s'] = durgunluk_durdurmasi
+        bosluk_kaldi = any(amac - sinir >= 0.5 for amac, sinir in bosluklar)
+        bilgi['optimal_kanitlandi'] = status == cp.OPTIMAL and not bosluk_kaldi
+
+        if self.iptal_olayi is not None and self.iptal_olayi.is_set():
+            neden = 'iptal'
+        elif geri_cagirim is not None and geri_cagirim.erken_durduruldu:
+            neden = 'dinleyici'
+        elif durgunluk_durdurmasi:
+            neden = 'iyilesmesiz_sure'
+        elif status == cp.OPTIMAL and bosluk_kaldi:
+            neden = 'bosluk_siniri'
+        elif status == cp.OPTIMAL:
+            neden = 'optimal'
+        elif status == cp.INFEASIBLE:
+            neden = 'cozumsuz'
+        elif status == cp.MODEL_INVALID:
+            neden = 'model_gecersiz'
+        else:
+            neden = 'sure_siniri'
+        bilgi['durma_nedeni'] = neden
+        return bilgi
+
+    def _sozluksel_coz(self, cp, solver, kurulu: _KuruluModel, geri_cagirim) -> tuple:
+        """Amaç seviyelerini sırayla minimize et; her seviyenin değeri sonrakiler için üst sınır olur.
+
+        Seviyeler kurulu modelin bir kopyası üzerinde çözülür (yeniden kullanılabilir model
+        sonraki denemeler için bozulmaz). Her seviye önceki seviyenin tam çözümünü ipucu
+        olarak alır; kullanılmayan süre sonraki seviyelere devreder. Bir seviye çözüm
+        bulamazsa son iyi çözüm ipucuna sabitlenerek geri yüklenir.
+        Returns: (status, [{seviye, status, objective, bound, sure_s}])
+        """
+        model = kurulu.model.Clone()
+        baslangic = time.time()
+        paylar = dict(zip(AMAC_SEVIYELERI, _SEVIYE_SURE_PAYLARI))
+        seviyeler = []
+        son_cozum_var = False
+        son_basarili = True
+        tum_optimal = True
+        for idx, (ad, ifade) in enumerate(kurulu.amac_seviyeleri):
+            kalan_sure = self.max_sure - (time.time() - baslangic)
+            kalan_pay = sum(paylar[a] for a, _ in kurulu.amac_seviyeleri[idx:])
+            model.Minimize(ifade)
+            solver.parameters.max_time_in_seconds = max(0.5, kalan_sure * paylar[ad] / kalan_pay)
+            seviye_baslangic = time.time()
+            if geri_cagirim is not None:
+                geri_cagirim.seviye_baslat()
+            seviye_status = solver.Solve(model, geri_cagirim)
+            bilgi = {
+                'seviye': ad,
+                'status': solver.StatusName(seviye_status),
+                'sure_s': round(time.time() - seviye_baslangic, 3),
+            }
+            seviyeler.append(bilgi)
+            if seviye_status not in (cp.OPTIMAL, cp.FEASIBLE):
+                if not son_cozum_var:
+                    return seviye_status, seviyeler
+                son_basarili = False
+                tum_optimal = False
+                break
+            deger = int(round(solver.ObjectiveValue()))
+            bilgi['objective'] = deger
+            bilgi['bound'] = solver.BestObjectiveBound()
+            tum_optimal = tum_optimal and seviye_status == cp.OPTIMAL
+            son_cozum_var = True
+            # Seviyeyi sabitle, çözümü sonraki seviyeye ipucu ver
+            model.Add(ifade <= deger)
+            model.ClearHints()
+            for i, v in enumerate(solver.ResponseProto().solution):
+                model.AddHint(model.GetIntVarFromProtoIndex(i), v)
+            if (geri_cagirim is not None and geri_cagirim.erken_durduruldu) or (
+                    self.iptal_olayi is not None and self.iptal_olayi.is_set()):
+                tum_optimal = idx == len(kurulu.amac_seviyeleri) - 1 and tum_optimal
+                break
+
+        if not son_basarili:
+            # Son iyi çözüm (ipucu) aynen geri yüklenir
+            model.ClearObjective()
+            solver.parameters.fix_variables_to_their_hinted_value = True
+            solver.parameters.max_time_in_seconds = max(1.0, self.max_sure * 0.05)
+            geri_status = solver.Solve(model)
+            solver.parameters.fix_variables_to_their_hinted_value = False
+            if geri_status not in (cp.OPTIMAL, cp.FEASIBLE):
+                return geri_status, seviyeler
+        return (cp.OPTIMAL if tum_optimal else cp.FEASIBLE), seviyeler
+
+    def _slot_bilgisi(self, s: int) -> Dict:
+        gorev = self.gorevler[s] if s < len(self.gorevler) else None
+        gorev_ad = gorev.ad if gorev else f'Slot {s}'
+        base_name = gorev.base_name if gorev and gorev.base_name else gorev_ad
+        return {'slot_idx': s, 'gorev_ad': gorev_ad, 'gorev_base': base_name}
+
+    def _atama_kaydi(self, p: SolverPersonel, g: int, s: int) -> Dict:
+        """Sonuç atama dict'i (gun, slot_idx, gorev_ad, gorev_base, personel, gun_tipi)."""
+        return {
+            'gun': g, **self._slot_bilgisi(s), 'personel_id': p.id,
+            'personel_ad': p.ad, 'gun_tipi': self.gun_tipleri.get(g, 'hici')
+        }
+
+    def _cozumu_derle(self, hucreler: tuple) -> tuple:
+        """Atanan hücrelerden (i, g0, s dizileri) atama listesi ve çözüm matrisini tek geçişte üret.
+
+        Atamalar gün, slot, personel sırasıyla döner; görev/gün tipi bilgileri slot ve gün
+        başına bir kez hesaplanır.
+        Returns: (atamalar, CozumMatrisi)
+        """
+        i_dizi, g0_dizi, s_dizi = (np.asarray(d, dtype=np.int64) for d in hucreler)
+        sira = np.lexsort((i_dizi, s_dizi, g0_dizi))
+        i_dizi, g0_dizi, s_dizi = i_dizi[sira], g0_dizi[sira], s_dizi[sira]
+
+        gun_tipleri = [self.gun_tipleri.get(g, 'hici') for g in range(1, self.gun_sayisi + 1)]
+        slot_bilgileri = [self._slot_bilgisi(s) for s in range(self.slot_sayisi)]
+        atamalar = []
+        for i, g0, s in zip(i_dizi.tolist(), g0_dizi.tolist(), s_dizi.tolist()):
+            p = self.personel_listesi[i]
+            atamalar.append({
+                'gun': g0 + 1, **slot_bilgileri[s],
+                'personel_id': p.id, 'personel_ad': p.ad, 'gun_tipi': gun_tipleri[g0],
+            })
+
+        matris = cozum_matrisi_olustur(
+            len(self.personel_listesi), gun_tipleri,
+            [self._role_name_by_slot(s) for s in range(self.slot_sayisi)],
+            (i_dizi, g0_dizi, s_dizi), list(self.role_slots.keys()),
+        )
+        return atamalar, matris
+
+    def _cozum_istatistikleri(self, atamalar: List[Dict], bos_slot_sayisi: int,
+                              matris: CozumMatrisi = None) -> Dict:
+        """Başarılı çözümün çözücüden bağımsız istatistikleri (kişi sayaçları, kalite, plan sapmaları).
+
+        coz() ve iki aşamalı motor (bkz. iki_asamali.py) aynı çıktı formatını bununla üretir.
+        matris verilmezse atamalardan kurulur; tüm sayaç ve metrikler bu matristen türetilir.
+        """
+        if matris is None:
+            matris = atamalardan_matris(
+                atamalar, [p.id for p in self.personel_listesi],
+                [self.gun_tipleri.get(g, 'hici') for g in range(1, self.gun_sayisi + 1)],
+                [self._role_name_by_slot(s) for s in range(self.slot_sayisi)],
+                list(self.role_slots.keys()),
+            )
+        kisi_sayac = kisi_sayaclari(matris, [p.id for p in self.personel_listesi])
+
+        toplam_atama = len(atamalar)
+        toplam_slot = self.gun_sayisi * self.slot_sayisi
+        min_nobet = int(matris.kisi_toplam.min()) if kisi_sayac else 0
+        max_nobet = int(matris.kisi_toplam.max()) if kisi_sayac else 0
+        birlikte_grup_istatistikleri = self._hesapla_birlikte_grup_istatistikleri(matris)
+        plan_sapmalari = self._hesapla_plan_sapmalari(matris)
+
+        # DEBUG: Kısıtlamalı personel bilgileri
+        kisitli_debug = []
+        for p in self.personel_listesi:
+            if p.kisitli_gorev:
+                izinli = list(self.role_slots.get(p.kisitli_gorev, []))
+                if p.tasma_gorevi:
+                    tasma_slotlar = list(self.role_slots.get(p.tasma_gorevi, []))
+                    izinli = list(set(izinli + tasma_slotlar))
+                kisitli_debug.append({
+                    'personel_id': p.id,
+                    'personel_ad': p.ad,
+                    'kisitli_gorev': p.kisitli_gorev,
+                    'tasma_gorevi': p.tasma_gorevi,
+                    'izinli_slotlar': izinli,
+                    'gerceklesen_gorevler': kisi_sayac[p.id]['gorevler']
+                })
+
+        return {
+            'toplam_atama': toplam_atama, 'toplam_slot': toplam_slot,
+            'bos_slot_sayisi': bos_slot_sayisi,
+            'ara_gun': self.ara_gun,
+            'ara_gun_kodlama': self.ara_gun_kodlama,
+            'homojen_kodlama': self.homojen_kodlama,
+            'doluluk_yuzde': round(100 * toplam_atama / toplam_slot, 1) if toplam_slot > 0 else 0,
+            'min_nobet': min_nobet, 'max_nobet': max_nobet,
+            'denge_farki': max_nobet - min_nobet,
+            'kalite_skoru': self._hesapla_kalite_skoru(matris, toplam_slot),
+            'plan': {
+                'aktif': self._plan_aktif_mi(),
+                'plan_hash': self.plan_kontrati.get('plan_hash'),
+                'kaynak': self.plan_kontrati.get('kaynak'),
+                'olusturulan_ara_gun': self.plan_kontrati.get('olusturulan_ara_gun'),
+                'uygulama': self.plan_uygulama,
+                'gun_iskeleti_aktif': self._gun_iskeleti_aktif_mi(),
+                'gun_iskeleti_uygulanabilir_ids': sorted(self._gun_iskeleti_uygulanabilir_ids()),
+            } if self.plan_kontrati else {},
+            'plan_sapmalari': plan_sapmalari,
+            'birlikte_gruplar': birlikte_grup_istatistikleri,
+            'birlikte_esdeger_aile': BIRLIKTE_ESDEGER_GOREV_AILE_ADI,
+            'kisi_detay': [
+                {'personel_id': str(p.id), 'personel_ad': p.ad, 'toplam': kisi_sayac[p.id]['toplam'],
+                 'tipler': kisi_sayac[p.id]['tipler'], 'gorevler': kisi_sayac[p.id]['gorevler']}
+                for p in self.personel_listesi
+            ],
+            'role_slots': {k: v for k, v in self.role_slots.items()},
+            'kisitli_debug': kisitli_debug,
+            'kisitlama_istisna_debug': self.kisitlama_istisna_debug,
+            'feasibility_debug': self._build_feasibility_diagnostics(limit_preview=30) if bos_slot_sayisi > 0 else {},
+            'gorev_listesi': [{'idx': i, 'ad': g.ad, 'base_name': g.base_name} for i, g in enumerate(self.gorevler)]
+        }
+
+    def coz(self) -> SolverSonuc:
+        baslangic = time.time()
+        cp = _get_cp_model()
+
+        if self.iptal_olayi is not None and self.iptal_olayi.is_set():
+            return SolverSonuc(
+                basarili=False, atamalar=[],
+                istatistikler={'status': 'IPTAL', 'ara_gun': self.ara_gun},
+                sure_ms=0, mesaj='Cozum iptal edildi'
+            )
+
+        manual_conflicts = self._manual_hard_conflict_diagnostics()
+        if manual_conflicts and not self.ignore_manual_conflicts:
+            sure_ms = int((time.time() - baslangic) * 1000)
+            preview = manual_conflicts[:50]
+            return SolverSonuc(
+                basarili=False,
+                atamalar=[],
+                istatistikler={
+                    'status': 'MANUAL_CONFLICT',
+                    'manual_conflict_count': len(manual_conflicts),
+                    'manual_conflicts': preview,
+                    'ara_gun': self.ara_gun,
+                    'ara_gun_1_dene': False,
+                    'kisitlama_istisna_debug': self.kisitlama_istisna_debug,
+                    'feasibility_debug': self._build_feasibility_diagnostics(limit_preview=40)
+                },
+                sure_ms=sure_ms,
+                mesaj=f"Manuel atamalarda hard kisit cakismasi var ({len(manual_conflicts)} adet)"
+            )
+        
+        model_yeniden_kullanildi = self._kurulu_model is not None
+        if not model_yeniden_kullanildi:
+            kurulum_baslangic = time.time()
+            kurulu = self._modeli_kur(cp)
+            self.model_kurulum_ms = int((time.time() - kurulum_baslangic) * 1000)
+            if self.yeniden_kullanilabilir:
+                self._kurulu_model = kurulu
+        else:
+            kurulu = self._kurulu_model
+        self._gevsetme_literallerini_sabitle(kurulu)
+        ipucu_atamalari, ipucu_kaynagi = self._ipucu_uygula(kurulu)
+        model, x, bos_slotlar = kurulu.model, kurulu.x, kurulu.bos_slotlar
+        eliminated_vars = kurulu.eliminated_vars
         
         # COZUM
         solver = cp.CpSolver()
         solver.parameters.max_time_in_seconds = self.max_sure
-        solver.parameters.num_search_workers = 4
+        solver.parameters.num_search_workers = self.arama_isci_sayisi
+        if self.goreli_bosluk is not None:
+            solver.parameters.relative_gap_limit = self.goreli_bosluk
+        if self.mutlak_bosluk is not None:
+            solver.parameters.absolute_gap_limit = self.mutlak_bosluk
         
-        status = solver.Solve(model)
+        geri_cagirim = None
+        if self.ilerleme_dinleyici is not None or self.iyilesmesiz_sure is not None:
+            geri_cagirim = _ara_cozum_geri_cagirimi(cp)(
+                self.personel_listesi, kurulu, self.ilerleme_dinleyici, self.ilerleme_araligi
+            )
+        # İzleyici: iptal_olayi set edilince ya da son iyileşmeden beri iyilesmesiz_sure
+        # geçince süren arama durdurulur (sözlüksel modda yalnızca o seviye biter).
+        # Dinleyicinin durdurma_olayi (ör. istemci kabulü) set edilince mevcut çözümle durulur;
+        # böylece yeni ara çözüm gelmese de kabul aramayı durdurur.
+        izleme_bitti = None
+        durgunluk_durdurmasi = []
+        durdurma_olayi = getattr(self.ilerleme_dinleyici, 'durdurma_olayi', None)
+        if self.iptal_olayi is not None or self.iyilesmesiz_sure is not None or durdurma_olayi is not None:
+            izleme_bitti = threading.Event()
+
+            def _izle():
+                while not izleme_bitti.wait(0.25):
+                    if self.iptal_olayi is not None and self.iptal_olayi.is_set():
+                        solver.StopSearch()
+                        return
+                    if durdurma_olayi is not None and durdurma_olayi.is_set():
+                        geri_cagirim.erken_durduruldu = True
+                        solver.StopSearch()
+                        return
+                    son_iyilesme = geri_cagirim.son_iyilesme if geri_cagirim is not None else None
+                    if (self.iyilesmesiz_sure is not None and son_iyilesme is not None
+                            and time.time() - son_iyilesme >= self.iyilesmesiz_sure):
+                        geri_cagirim.son_iyilesme = None
+                        durgunluk_durdurmasi.append(round(time.time() - baslangic, 2))
+                        solver.StopSearch()
+
+            threading.Thread(target=_izle, daemon=True).start()
+        sozluksel_seviyeler = None
+        if self.amac_modu == "sozluksel" and len(kurulu.amac_seviyeleri) > 1:
+            status, sozluksel_seviyeler = self._sozluksel_coz(cp, solver, kurulu, geri_cagirim)
+        else:
+            status = solver.Solve(model, geri_cagirim)
+        if izleme_bitti is not None:
+            izleme_bitti.set()
+        if geri_cagirim is not None and status in (cp.OPTIMAL, cp.FEASIBLE):
+            geri_cagirim.son_cozumu_bildir(solver)
+        ara_cozum_bilgisi = {
+            'ara_cozum_sayisi': geri_cagirim.cozum_sayisi,
+            'ara_cozum_bildirimi': geri_cagirim.bildirim_sayisi,
+            'erken_durduruldu': geri_cagirim.erken_durduruldu,
+        } if geri_cagirim is not None else {}
+        if sozluksel_seviyeler is not None:
+            ara_cozum_bilgisi['amac_modu'] = self.amac_modu
+            ara_cozum_bilgisi['sozluksel_seviyeler'] = sozluksel_seviyeler
+        if self.iptal_olayi is not None and self.iptal_olayi.is_set():
+            ara_cozum_bilgisi['iptal_edildi'] = True
+        ara_cozum_bilgisi['erken_durdurma'] = self._erken_durdurma_bilgisi(
+            cp, status, solver, kurulu, geri_cagirim, durgunluk_durdurmasi, sozluksel_seviyeler
+        )
         sure_ms = int((time.time() - baslangic) * 1000)
         
         if status in [cp.OPTIMAL, cp.FEASIBLE]:
-            atamalar = []
-            kisi_sayac = {p.id: {'toplam': 0, 'tipler': {t: 0 for t in GUN_TIPLERI}, 'gorevler': {}} for p in self.personel_listesi}
-            bos_slot_sayisi = sum(1 for bos_mu in bos_slotlar if solver.Value(bos_mu) == 1)
-            
-            for g in range(1, self.gun_sayisi + 1):
-                gun_tipi = self.gun_tipleri.get(g, 'hici')
-                for s in range(self.slot_sayisi):
-                    for p in self.personel_listesi:
-                        if solver.Value(x[p.id, g, s]) == 1:
-                            gorev = self.gorevler[s] if s < len(self.gorevler) else None
-                            gorev_ad = gorev.ad if gorev else f'Slot {s}'
-                            base_name = gorev.base_name if gorev and gorev.base_name else gorev_ad
-                            atamalar.append({
-                                'gun': g, 'slot_idx': s, 'gorev_ad': gorev_ad,
-                                'gorev_base': base_name, 'personel_id': p.id,
-                                'personel_ad': p.ad, 'gun_tipi': gun_tipi
-                            })
-                            kisi_sayac[p.id]['toplam'] += 1
-                            kisi_sayac[p.id]['tipler'][gun_tipi] += 1
-                            kisi_sayac[p.id]['gorevler'][base_name] = kisi_sayac[p.id]['gorevler'].get(base_name, 0) + 1
-            
-            toplam_atama = len(atamalar)
-            toplam_slot = self.gun_sayisi * self.slot_sayisi
-            min_nobet = min(k['toplam'] for k in kisi_sayac.values()) if kisi_sayac else 0
-            max_nobet = max(k['toplam'] for k in kisi_sayac.values()) if kisi_sayac else 0
-            birlikte_grup_istatistikleri = self._hesapla_birlikte_grup_istatistikleri(atamalar)
-            plan_sapmalari = self._hesapla_plan_sapmalari(kisi_sayac, atamalar)
-            
-            # DEBUG: Kısıtlamalı personel bilgileri
-            kisitli_debug = []
-            for p in self.personel_listesi:
-                if p.kisitli_gorev:
-                    izinli = list(self.role_slots.get(p.kisitli_gorev, []))
-                    if p.tasma_gorevi:
-                        tasma_slotlar = list(self.role_slots.get(p.tasma_gorevi, []))
-                        izinli = list(set(izinli + tasma_slotlar))
-                    kisitli_debug.append({
-                        'personel_id': p.id,
-                        'personel_ad': p.ad,
-                        'kisitli_gorev': p.kisitli_gorev,
-                        'tasma_gorevi': p.tasma_gorevi,
-                        'izinli_slotlar': izinli,
-                        'gerceklesen_gorevler': kisi_sayac[p.id]['gorevler']
-                    })
-            
+            # Boşluk sınırıyla biten arama CP-SAT'te OPTIMAL döner; optimallik kanıtlanmadıysa FEASIBLE
+            durum = 'OPTIMAL' if ara_cozum_bilgisi['erken_durdurma']['optimal_kanitlandi'] else 'FEASIBLE'
+            # Sadece serbest literaller toplu okunur (sabit 0 hücreler atlanır)
+            cozum = np.asarray(solver.ResponseProto().solution)
+            secili = cozum[kurulu.x_indeksleri] == 1
+            atamalar, matris = self._cozumu_derle(kurulu.somut_hucreler(*(d[secili] for d in kurulu.uygun.nonzero())))
+            bos_slot_sayisi = self.gun_sayisi * self.slot_sayisi - len(atamalar)
+
+            # En iyi bulunan çözüm: sonraki (daha gevşek) denemeye ipucu olarak taşınır
+            self.onceki_cozum = {(a['personel_id'], a['gun'], a['slot_idx']) for a in atamalar} or None
             istatistikler = {
-                'status': 'OPTIMAL' if status == cp.OPTIMAL else 'FEASIBLE',
-                'objective': solver.ObjectiveValue() if penalties else 0,
-                'toplam_atama': toplam_atama, 'toplam_slot': toplam_slot,
-                'bos_slot_sayisi': bos_slot_sayisi,
-                'ara_gun': self.ara_gun,
+                'status': durum,
+                'objective': (
+                    sum(solver.Value(ifade) for _, ifade in kurulu.amac_seviyeleri)
+                    if sozluksel_seviyeler is not None else
+                    solver.ObjectiveValue() if kurulu.amac_var else 0
+                ),
+                'model_yeniden_kullanildi': model_yeniden_kullanildi,
+                'model_kurulum_ms': self.model_kurulum_ms,
                 'solver_status_name': solver.StatusName(status),
-                'doluluk_yuzde': round(100 * toplam_atama / toplam_slot, 1) if toplam_slot > 0 else 0,
-                'min_nobet': min_nobet, 'max_nobet': max_nobet,
-                'denge_farki': max_nobet - min_nobet,
                 'solver_num_conflicts': solver.NumConflicts(),
                 'solver_num_branches': solver.NumBranches(),
                 'solver_wall_time_s': round(solver.WallTime(), 3),
                 'eliminated_vars': eliminated_vars,
-                'kalite_skoru': self._hesapla_kalite_skoru(kisi_sayac, atamalar, toplam_atama, toplam_slot),
-                'plan': {
-                    'aktif': self._plan_aktif_mi(),
-                    'plan_hash': self.plan_kontrati.get('plan_hash'),
-                    'kaynak': self.plan_kontrati.get('kaynak'),
-                    'olusturulan_ara_gun': self.plan_kontrati.get('olusturulan_ara_gun'),
-                    'uygulama': self.plan_uygulama,
-                    'gun_iskeleti_aktif': self._gun_iskeleti_aktif_mi(),
-                    'gun_iskeleti_uygulanabilir_ids': sorted(self._gun_iskeleti_uygulanabilir_ids()),
-                } if self.plan_kontrati else {},
-                'plan_sapmalari': plan_sapmalari,
-                'birlikte_gruplar': birlikte_grup_istatistikleri,
-                'birlikte_esdeger_aile': BIRLIKTE_ESDEGER_GOREV_AILE_ADI,
-                'kisi_detay': [
-                    {'personel_id': str(p.id), 'personel_ad': p.ad, 'toplam': kisi_sayac[p.id]['toplam'],
-                     'tipler': kisi_sayac[p.id]['tipler'], 'gorevler': kisi_sayac[p.id]['gorevler']}
-                    for p in self.personel_listesi
-                ],
-                'role_slots': {k: v for k, v in self.role_slots.items()},
-                'kisitli_debug': kisitli_debug,
-                'kisitlama_istisna_debug': self.kisitlama_istisna_debug,
-                'feasibility_debug': self._build_feasibility_diagnostics(limit_preview=30) if bos_slot_sayisi > 0 else {},
-                'gorev_listesi': [{'idx': i, 'ad': g.ad, 'base_name': g.base_name} for i, g in enumerate(self.gorevler)]
+                'on_cozumleme': kurulu.on_cozum_raporu,
+                'simetri_kirma': kurulu.simetri_raporu,
+                'kesimler': kurulu.kesim_raporu,
+                'rol_degiskenleri': {
+                    self._role_name_by_slot(temsilci): len(slotlar)
+                    for temsilci, slotlar in kurulu.rol_slotlari.items()
+                },
+                'ipucu': self._ipucu_istatistigi(solver, kurulu, ipucu_atamalari, ipucu_kaynagi),
+                **ara_cozum_bilgisi,
+                **self._cozum_istatistikleri(atamalar, bos_slot_sayisi, matris),
             }
             return SolverSonuc(basarili=True, atamalar=atamalar, istatistikler=istatistikler,
-                              sure_ms=sure_ms, mesaj='OPTIMAL' if status == cp.OPTIMAL else 'FEASIBLE')
+                              sure_ms=sure_ms, mesaj=durum)
         else:
             # Çözüm bulunamadı - gerçek solver status bilgisini dön
             status_name = solver.StatusName(status)
@@ -1908,6 +3378,10 @@ class NobetSolver:
                                       'gun_iskeleti_uygulanabilir_ids': sorted(self._gun_iskeleti_uygulanabilir_ids()),
                                   } if self.plan_kontrati else {},
                                   'ara_gun_1_dene': ara_gun_1_dene,
+                                  'model_yeniden_kullanildi': model_yeniden_kullanildi,
+                                  'model_kurulum_ms': self.model_kurulum_ms,
+                                  'ipucu': {'kaynak': ipucu_kaynagi, 'ipucu_atama': len(ipucu_atamalari)},
+                                  **ara_cozum_bilgisi,
                                   'solver_num_conflicts': solver.NumConflicts(),
                                   'solver_num_branches': solver.NumBranches(),
                                   'solver_wall_time_s': round(solver.WallTime(), 3),
@@ -2,12 +2,12 @@
 Request verisi parse fonksiyonları — endpoint'ler arası tekrarı kaldırır.
 """
 
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
 from utils import (
     _safe_int, get_days_in_month, gun_adi_bul, gun_tipi_hesapla,
-    _extract_mazeret_gunleri, _resolve_personel_id, _find_duplicate_personel_ids,
-    normalize_id, ids_match, build_personel_lookup,
+    _extract_mazeret_gunleri, _find_duplicate_personel_ids,
+    normalize_id, ids_match, IdRegistry,
 )
 from solver_models import (
     SolverPersonel, SolverGorev, SolverKural, SolverAtama,
@@ -152,6 +152,18 @@ def parse_solver_personeller_coz(data: Dict, gorevler: List[SolverGorev]) -> Lis
                 return g.base_name if g.base_name else g.ad
         return raw_gorev_adi
 
+    # Görev kısıtlaması indeksi: normalize ID / ad -> ilk eşleşen kaydın sırası
+    gorev_kisitlamalari_raw = data.get("gorevKisitlamalari", [])
+    kisit_id_indeksi = {}
+    kisit_ad_indeksi = {}
+    for k_idx, k in enumerate(gorev_kisitlamalari_raw):
+        k_pid = k.get("personelId")
+        if k_pid is None:
+            continue
+        kisit_id_indeksi.setdefault(normalize_id(k_pid), k_idx)
+        if isinstance(k_pid, str):
+            kisit_ad_indeksi.setdefault(k_pid.strip(), k_idx)
+
     personeller = []
     for p_data in data.get("personeller", []):
         if not p_data.get("ad"):
@@ -165,19 +177,16 @@ def parse_solver_personeller_coz(data: Dict, gorevler: List[SolverGorev]) -> Lis
         # Görev kısıtlaması
         kisitli_gorev = None
         tasma_gorevi = None
-        for k in data.get("gorevKisitlamalari", []):
-            k_pid = k.get("personelId")
-            k_pid_matches = ids_match(k_pid, pid)
-            if isinstance(k_pid, str) and k_pid.strip() == p_data.get("ad", ""):
-                k_pid_matches = True
-
-            if k_pid_matches:
-                raw_gorev_adi = k.get("gorevAdi")
-                kisitli_gorev = _normalize_gorev_adi(raw_gorev_adi)
-                raw_tasma = k.get("tasmaGorevi")
-                if raw_tasma:
-                    tasma_gorevi = _normalize_gorev_adi(raw_tasma)
-                break
+        eslesen_idx = [
+            i for i in (kisit_id_indeksi.get(pid), kisit_ad_indeksi.get(p_data.get("ad", "")))
+            if i is not None
+        ]
+        if eslesen_idx:
+            k = gorev_kisitlamalari_raw[min(eslesen_idx)]
+            kisitli_gorev = _normalize_gorev_adi(k.get("gorevAdi"))
+            raw_tasma = k.get("tasmaGorevi")
+            if raw_tasma:
+                tasma_gorevi = _normalize_gorev_adi(raw_tasma)
 
         # Gün tipi hedefleri
         hedef_tipler = {}
@@ -217,9 +226,9 @@ def parse_solver_personeller_coz(data: Dict, gorevler: List[SolverGorev]) -> Lis
     return personeller
 
 
-def parse_kurallar(data: Dict, personeller) -> List[SolverKural]:
+def parse_kurallar(data: Dict, personeller, kayit: Optional[IdRegistry] = None) -> List[SolverKural]:
     """OR-Tools çözücü için kuralları parse et (ayri + birlikte)"""
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     kurallar = []
     for k_data in data.get("kurallar", []):
         tur = k_data.get("tur")
@@ -230,13 +239,13 @@ def parse_kurallar(data: Dict, personeller) -> List[SolverKural]:
         kisiler_raw = k_data.get("kisiler", [])
         if isinstance(kisiler_raw, list):
             for v in kisiler_raw:
-                pid = _resolve_personel_id(v, personeller, require_existing=True, _cache=_cache)
+                pid = kayit.cozumle(v)
                 if pid is not None and pid not in kisiler:
                     kisiler.append(pid)
 
         if len(kisiler) == 0:
             for key in ['p1', 'p2', 'p3']:
-                pid = _resolve_personel_id(k_data.get(key), personeller, require_existing=True, _cache=_cache)
+                pid = kayit.cozumle(k_data.get(key))
                 if pid is not None and pid not in kisiler:
                     kisiler.append(pid)
 
@@ -246,9 +255,9 @@ def parse_kurallar(data: Dict, personeller) -> List[SolverKural]:
     return kurallar
 
 
-def parse_birlikte_kurallar(data: Dict, personeller) -> List[SolverKural]:
+def parse_birlikte_kurallar(data: Dict, personeller, kayit: Optional[IdRegistry] = None) -> List[SolverKural]:
     """Sadece birlikte kurallarını parse et (nobet_hedef_hesapla için)"""
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     birlikte_kurallar = []
     for k_data in data.get("kurallar", []):
         if k_data.get("tur") != "birlikte":
@@ -262,7 +271,7 @@ def parse_birlikte_kurallar(data: Dict, personeller) -> List[SolverKural]:
 
             refs = val if (key == 'kisiler' and isinstance(val, list)) else [val]
             for ref in refs:
-                pid = _resolve_personel_id(ref, personeller, require_existing=True, _cache=_cache)
+                pid = kayit.cozumle(ref)
                 if pid is not None and pid not in kisiler:
                     kisiler.append(pid)
 
@@ -275,12 +284,12 @@ def parse_birlikte_kurallar(data: Dict, personeller) -> List[SolverKural]:
     return birlikte_kurallar
 
 
-def parse_gorev_kisitlamalari(data: Dict, personeller) -> Dict[int, dict]:
+def parse_gorev_kisitlamalari(data: Dict, personeller, kayit: Optional[IdRegistry] = None) -> Dict[int, dict]:
     """Görev kısıtlamalarını dict formatında parse et {personel_id: {gorevAdi, tasmaGorevi}}"""
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     gorev_kisitlamalari = {}
     for k_data in data.get("gorevKisitlamalari", []):
-        pid = _resolve_personel_id(k_data.get("personelId"), personeller, require_existing=True, _cache=_cache)
+        pid = kayit.cozumle(k_data.get("personelId"))
         gorev_adi = k_data.get("gorevAdi")
         if pid is not None and gorev_adi:
             gorev_kisitlamalari[pid] = {
@@ -291,16 +300,16 @@ def parse_gorev_kisitlamalari(data: Dict, personeller) -> Dict[int, dict]:
 
 
 def parse_manuel_atamalar(data: Dict, personeller, gorevler: List[SolverGorev],
-                          gun_sayisi: int) -> List[SolverAtama]:
+                          gun_sayisi: int, kayit: Optional[IdRegistry] = None) -> List[SolverAtama]:
     """OR-Tools çözücü için manuel atamaları parse et"""
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     manuel_atamalar = []
     for m_data in data.get("manuelAtamalar", []):
         p_ad = m_data.get("personel") or m_data.get("personelAd")
         p_raw_id = m_data.get("personelId")
-        p_id = _resolve_personel_id(p_raw_id, personeller, require_existing=True, _cache=_cache)
+        p_id = kayit.cozumle(p_raw_id)
         if p_id is None:
-            p_id = _resolve_personel_id(p_ad, personeller, require_existing=True, _cache=_cache)
+            p_id = kayit.cozumle(p_ad)
 
         if p_id is None:
             continue
@@ -381,7 +390,7 @@ def parse_manuel_atamalar(data: Dict, personeller, gorevler: List[SolverGorev],
 
 
 def parse_gorev_havuzlari(data: Dict, gorevler: List[SolverGorev],
-                          personeller) -> Dict[str, Set[int]]:
+                          personeller, kayit: Optional[IdRegistry] = None) -> Dict[str, Set[int]]:
     """nobet_coz için görev havuzlarını parse et.
 
     Önce frontend'den gelen gorevHavuzlari objesini oku (yeni format).
@@ -399,7 +408,7 @@ def parse_gorev_havuzlari(data: Dict, gorevler: List[SolverGorev],
         return raw_gorev_adi
 
     # Kısıtlı kişileri topla; explicit havuz varsa bu kişiler havuzdan dışlanmasın.
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     gorev_kisitlamalari_raw = data.get("gorevKisitlamalari", [])
     kisitlilar_by_role = {}  # { role: set(pid) }
     tasma_by_role = {}       # { tasma_role: set(pid) } — taşma görevi olan kişiler
@@ -407,7 +416,7 @@ def parse_gorev_havuzlari(data: Dict, gorevler: List[SolverGorev],
         role = _normalize_gorev_adi(k_data.get("gorevAdi"))
         if not role:
             continue
-        kisit_pid = _resolve_personel_id(k_data.get("personelId"), personeller, require_existing=True, _cache=_cache)
+        kisit_pid = kayit.cozumle(k_data.get("personelId"))
         if kisit_pid is not None:
             kisitlilar_by_role.setdefault(role, set()).add(kisit_pid)
             # Taşma görevi varsa o role de ekle
@@ -427,7 +436,7 @@ def parse_gorev_havuzlari(data: Dict, gorevler: List[SolverGorev],
             allowed_ids = set()
             if isinstance(ids, list):
                 for raw_id in ids:
-                    pid = _resolve_personel_id(raw_id, personeller, require_existing=True, _cache=_cache)
+                    pid = kayit.cozumle(raw_id)
                     if pid is not None:
                         allowed_ids.add(pid)
             # Açık havuz tanımlıysa kısıtlı / taşma personellerini de dahil et.
@@ -447,32 +456,32 @@ def parse_gorev_havuzlari(data: Dict, gorevler: List[SolverGorev],
         if not role:
             continue
 
-        kayit = gorev_havuz_kayitlari.setdefault(role, {
+        havuz_kaydi = gorev_havuz_kayitlari.setdefault(role, {
             "kisitlilar": set(),
             "havuz": set(),
             "has_pool": False
         })
 
-        kisit_pid = _resolve_personel_id(k_data.get("personelId"), personeller, require_existing=True, _cache=_cache)
+        kisit_pid = kayit.cozumle(k_data.get("personelId"))
         if kisit_pid is not None:
-            kayit["kisitlilar"].add(kisit_pid)
+            havuz_kaydi["kisitlilar"].add(kisit_pid)
 
         havuz_ids_raw = k_data.get("havuzIds", [])
         eklenen_havuz_id = False
         if isinstance(havuz_ids_raw, list):
             for raw_id in havuz_ids_raw:
-                pid = _resolve_personel_id(raw_id, personeller, require_existing=True, _cache=_cache)
+                pid = kayit.cozumle(raw_id)
                 if pid is not None:
-                    kayit["havuz"].add(pid)
+                    havuz_kaydi["havuz"].add(pid)
                     eklenen_havuz_id = True
         if eklenen_havuz_id:
-            kayit["has_pool"] = True
+            havuz_kaydi["has_pool"] = True
 
     gorev_havuzlari = {}
-    for role, kayit in gorev_havuz_kayitlari.items():
-        if not kayit["has_pool"]:
+    for role, havuz_kaydi in gorev_havuz_kayitlari.items():
+        if not havuz_kaydi["has_pool"]:
             continue
-        allowed_ids = kayit["kisitlilar"] | kayit["havuz"]
+        allowed_ids = havuz_kaydi["kisitlilar"] | havuz_kaydi["havuz"]
         if allowed_ids:
             gorev_havuzlari[role] = allowed_ids
 
@@ -480,7 +489,8 @@ def parse_gorev_havuzlari(data: Dict, gorevler: List[SolverGorev],
 
 
 def parse_kisitlama_istisnalari(data: Dict, personeller,
-                                gorevler: List[SolverGorev]) -> List[Dict]:
+                                gorevler: List[SolverGorev],
+                                kayit: Optional[IdRegistry] = None) -> List[Dict]:
     """Kisitlama istisnalarini parse et (manuel atama bazli gun/gorev izinleri)."""
 
     def _normalize_gorev_adi(raw_gorev_adi):
@@ -493,9 +503,9 @@ def parse_kisitlama_istisnalari(data: Dict, personeller,
 
     istisnalar = []
     seen = set()
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     for raw in data.get("kisitlamaIstisnalari", []):
-        pid = _resolve_personel_id(raw.get("personelId"), personeller, require_existing=True, _cache=_cache)
+        pid = kayit.cozumle(raw.get("personelId"))
         gun = _safe_int(raw.get("gun"), 0)
         istisna_gorev = _normalize_gorev_adi(raw.get("istisnaGorev") or raw.get("gorevAdi"))
         kisitli_gorev = _normalize_gorev_adi(raw.get("kisitliGorev"))
@@ -518,13 +528,13 @@ def parse_kisitlama_istisnalari(data: Dict, personeller,
     return istisnalar
 
 
-def parse_birlikte_istisnalari(data: Dict, personeller) -> List[Dict]:
+def parse_birlikte_istisnalari(data: Dict, personeller, kayit: Optional[IdRegistry] = None) -> List[Dict]:
     """Birlikte kurali + ayri bina istisnalarini parse et."""
     istisnalar = []
     seen = set()
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     for raw in data.get("birlikteIstisnalari", []):
-        pid = _resolve_personel_id(raw.get("personelId"), personeller, require_existing=True, _cache=_cache)
+        pid = kayit.cozumle(raw.get("personelId"))
         gun = _safe_int(raw.get("gun"), 0)
         if pid is None or gun < 1:
             continue
@@ -539,13 +549,13 @@ def parse_birlikte_istisnalari(data: Dict, personeller) -> List[Dict]:
     return istisnalar
 
 
-def parse_aragun_istisnalari(data: Dict, personeller) -> List[Dict]:
+def parse_aragun_istisnalari(data: Dict, personeller, kayit: Optional[IdRegistry] = None) -> List[Dict]:
     """Ara gun istisnalarini parse et."""
     istisnalar = []
     seen = set()
-    _cache = build_personel_lookup(personeller)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     for raw in data.get("araGunIstisnalari", []):
-        pid = _resolve_personel_id(raw.get("personelId"), personeller, require_existing=True, _cache=_cache)
+        pid = kayit.cozumle(raw.get("personelId"))
         gun1 = _safe_int(raw.get("gun1"), 0)
         gun2 = _safe_int(raw.get("gun2"), 0)
         if pid is None or gun1 < 1 or gun2 < 1:
@@ -563,6 +573,102 @@ def parse_aragun_istisnalari(data: Dict, personeller) -> List[Dict]:
     return istisnalar
 
 
+# ============================================
+# MODEL SEÇENEKLERİ
+# ============================================
+
+def parse_solver_secenekleri(data: Dict) -> Dict:
+    """NobetSolver model kodlama seçeneklerini parse et (yalnızca gönderilenler).
+    Geçersiz değerler NobetSolver tarafında varsayılana düşer."""
+    secenekler = {}
+    ara_gun_kodlama = data.get("araGunKodlama")
+    if isinstance(ara_gun_kodlama, str) and ara_gun_kodlama.strip():
+        secenekler["ara_gun_kodlama"] = ara_gun_kodlama.strip().lower()
+    homojen_kodlama = data.get("homojenKodlama")
+    if isinstance(homojen_kodlama, str) and homojen_kodlama.strip():
+        secenekler["homojen_kodlama"] = homojen_kodlama.strip().lower()
+    amac_modu = data.get("amacModu")
+    if isinstance(amac_modu, str) and amac_modu.strip():
+        secenekler["amac_modu"] = amac_modu.strip().lower()
+    if data.get("onCozumleme") is not None:
+        secenekler["on_cozumleme"] = bool(data.get("onCozumleme"))
+    if data.get("simetriKirma") is not None:
+        secenekler["simetri_kirma"] = bool(data.get("simetriKirma"))
+    if data.get("rolDegiskenleri") is not None:
+        secenekler["rol_degiskenleri"] = bool(data.get("rolDegiskenleri"))
+    if data.get("ekKesimler") is not None:
+        secenekler["ek_kesimler"] = bool(data.get("ekKesimler"))
+    for anahtar, hedef in (("goreliBoslukSiniri", "goreli_bosluk"), ("mutlakBoslukSiniri", "mutlak_bosluk"),
+                           ("iyilesmesizSure", "iyilesmesiz_sure")):
+        if data.get(anahtar) is not None:
+            secenekler[hedef] = data.get(anahtar)
+    return secenekler
+
+
+def parse_strateji_secenekleri(data: Dict) -> Dict:
+    """solve_with_diagnostics gevşetme stratejisi seçeneklerini parse et."""
+    secenekler = {}
+    if data.get("gevsetmePortfoyu"):
+        secenekler["gevsetme_portfoyu"] = True
+        genislik = _safe_int(data.get("portfoyGenisligi", 4), 4)
+        secenekler["portfoy_genisligi"] = min(max(genislik, 1), 8)
+    if data.get("ikiAsamali"):
+        secenekler["iki_asamali"] = True
+        if data.get("ikiAsamaliEsik") is not None:
+            secenekler["iki_asamali_esik"] = max(_safe_int(data.get("ikiAsamaliEsik"), 0), 0)
+    if data.get("bilesenAyristirma"):
+        secenekler["bilesen_ayristirma"] = True
+    return secenekler
+
+
+def parse_yeniden_coz(data: Dict, personeller, gun_sayisi: int,
+                      kayit: Optional[IdRegistry] = None) -> Optional[Dict]:
+    """nobet_coz artımlı yeniden çözüm girdisini parse et.
+
+    oncekiAtamalar: önceki çözümün atamaları ({personelId|personel_id, gun, slotIdx|slot_idx})
+    degisiklik: {personelIdler: [...], gunler: [...]} — düzenlenen kişi ve günler
+    oncekiAtamalar yoksa None döner (tam çözüm).
+    """
+    onceki_raw = data.get("oncekiAtamalar")
+    if not isinstance(onceki_raw, list) or not onceki_raw:
+        return None
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
+
+    onceki_atamalar = []
+    for a_data in onceki_raw:
+        if not isinstance(a_data, dict):
+            continue
+        p_raw_id = a_data.get("personelId", a_data.get("personel_id"))
+        p_id = kayit.cozumle(p_raw_id)
+        gun = _safe_int(a_data.get("gun"), None)
+        slot_idx = _safe_int(a_data.get("slotIdx", a_data.get("slot_idx")), None)
+        if p_id is None or gun is None or slot_idx is None:
+            continue
+        onceki_atamalar.append((p_id, gun, slot_idx))
+    if not onceki_atamalar:
+        return None
+
+    degisiklik = data.get("degisiklik") or {}
+    kisiler = set()
+    for raw_pid in degisiklik.get("personelIdler", []) or []:
+        p_id = kayit.cozumle(raw_pid)
+        if p_id is not None:
+            kisiler.add(p_id)
+    gunler = set()
+    for raw_gun in degisiklik.get("gunler", []) or []:
+        gun = _safe_int(raw_gun, None)
+        if gun is not None and 1 <= gun <= gun_sayisi:
+            gunler.add(gun)
+
+    sure = _safe_int(data.get("yenidenCozSure", 10), 10)
+    return {
+        "onceki_atamalar": onceki_atamalar,
+        "kisiler": kisiler,
+        "gunler": gunler,
+        "sure": min(max(sure, 1), 60),
+    }
+
+
 # ============================================
 # YARDIMCI (İÇ)
 # ============================================
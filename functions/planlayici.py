@@ -25,7 +25,7 @@ from solver_models import (
     SolverKural,
     SolverPersonel,
 )
-from utils import GUN_TIPLERI, normalize_id
+from utils import GUN_TIPLERI, IdRegistry, normalize_id
 
 
 DEFAULT_PLAN_UYGULAMA = {
@@ -262,8 +262,10 @@ def ortak_plan_uret(
     kaynak: Optional[str] = None,
     uygulama_override: Optional[Dict] = None,
     gorev_havuzlari: Optional[Dict[str, set]] = None,
+    kayit: Optional[IdRegistry] = None,
 ) -> Dict:
     kilitli_hedefler = dict(kilitli_hedefler or {})
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     gorev_kota_overrides = dict(gorev_kota_overrides or {})
     kurallar = list(kurallar or birlikte_kurallar or [])
     birlikte_kurallar = list(
@@ -294,6 +296,7 @@ def ortak_plan_uret(
         ara_gun=ara_gun,
         saat_degerleri=saat_degerleri,
         kilitli_hedefler=kilitli_hedefler,
+        kayit=kayit,
     )
     hedef_sonuc = hesaplayici.hesapla()
     if not hedef_sonuc or not hedef_sonuc.basarili:
@@ -317,6 +320,7 @@ def ortak_plan_uret(
         ara_gun=ara_gun,
         gorev_kisitlamalari=gorev_kisitlamalari or {},
         gorev_havuzlari=gorev_havuzlari or {},
+        kayit=kayit,
     ).planla()
 
     plan_kontrati = plan_kontrati_olustur(
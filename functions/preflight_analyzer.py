@@ -3,8 +3,11 @@
 from typing import Dict, List, Set, Tuple, Optional
 from dataclasses import dataclass
 
-from utils import GUN_TIPLERI, canonicalize_role_name, normalize_id
+import numpy as np
+
+from utils import GUN_TIPLERI, IdRegistry, normalize_id
 from solver_models import SolverPersonel, SolverGorev, SolverKural, SolverAtama
+from aday_motoru import preflight_aday_bitmapi
 
 
 @dataclass
@@ -43,19 +46,19 @@ def _manual_role_fill_counts(manuel_atamalar: List[SolverAtama], gorevler: List[
     return role_full_on_day, role_slots
 
 
-def _build_kisitlama_istisna_map(kisitlama_istisnalari: List[Dict], personeller: List[SolverPersonel], gorevler: List[SolverGorev]):
-    ids = {normalize_id(p.id) for p in personeller or []}
+def _build_kisitlama_istisna_map(kisitlama_istisnalari: List[Dict], personeller: List[SolverPersonel], gorevler: List[SolverGorev], kayit: IdRegistry):
+    ids = {kayit.normalize(p.id) for p in personeller or []}
     roles = set()
     for g in gorevler or []:
         roles.add(g.base_name if getattr(g, 'base_name', None) else g.ad)
     m: Dict[Tuple[int, int], Set[str]] = {}
     for raw in kisitlama_istisnalari or []:
         try:
-            pid = normalize_id(raw.get('personel_id'))
+            pid = kayit.normalize(raw.get('personel_id'))
             gun = int(raw.get('gun', 0) or 0)
             ist = raw.get('istisna_gorev') or raw.get('gorevAdi')
             if ist:
-                ist = canonicalize_role_name(ist)
+                ist = kayit.rol_kanonik(ist)
             if pid in ids and gun >= 1 and ist in roles:
                 m.setdefault((pid, gun), set()).add(ist)
         except Exception:
@@ -102,18 +105,6 @@ def _any_role_available_on_day(p: SolverPersonel, gun: int, roles: List[str], ex
     return False
 
 
-def _max_assignable_with_ara_gun(days: List[int], ara_gun: int) -> int:
-    if not days:
-        return 0
-    sel = 0
-    last = -10_000
-    for g in sorted(days):
-        if g - last > ara_gun:
-            sel += 1
-            last = g
-    return sel
-
-
 def analyze_preflight(
     gun_sayisi: int,
     gun_tipleri: Dict[int, str],
@@ -126,30 +117,41 @@ def analyze_preflight(
     plan_kontrati: Dict,
     kisitlama_istisnalari: Optional[List[Dict]] = None,
     max_preview: int = 30,
+    kayit: Optional[IdRegistry] = None,
 ) -> Dict:
     try:
+        kayit = kayit if kayit is not None else IdRegistry(personeller)
         role_full_on_day, role_slots = _manual_role_fill_counts(manuel_atamalar, gorevler)
         _, exclusive_roles = _role_slots_and_exclusive(gorevler)
-        kisitlama_istisna_map = _build_kisitlama_istisna_map(kisitlama_istisnalari or [], personeller, gorevler)
+        kisitlama_istisna_map = _build_kisitlama_istisna_map(kisitlama_istisnalari or [], personeller, gorevler, kayit)
         roles = list(role_slots.keys())
+        # Rol × gün × kişi aday bitmap'i (bkz. aday_motoru); aşağıdaki tüm aday sorguları buradan
+        adaylar = preflight_aday_bitmapi(gun_sayisi, personeller, gorevler, gorev_havuzlari, kisitlama_istisna_map)
+        gunluk_aday = adaylar.gunluk_aday_sayilari()  # (rol, gun)
 
         # 1) İskelet günleri → solver aday uygunluğu
         skeleton = ((plan_kontrati or {}).get('gun_iskeleti') or {})
         pgun_map = skeleton.get('personel_gunleri') or {}
         gecersiz: List[Dict] = []
         gecersiz_count = 0
-        pid_to_obj = {normalize_id(p.id): p for p in personeller}
+        pid_to_idx = {kayit.normalize(p.id): i for i, p in enumerate(personeller)}
+        # Manuel atamayla dolmuş rol-günler hariç herhangi bir role aday mı: (gun, kişi)
+        rol_dolu = np.array([[role_full_on_day(role, g) for g in range(1, gun_sayisi + 1)] for role in roles],
+                            dtype=bool).reshape(len(roles), gun_sayisi)
+        gun_musait = (adaylar.bitmap & ~rol_dolu[:, :, None]).any(axis=0)
         for raw_pid, days in pgun_map.items():
-            try:
-                pid = normalize_id(int(raw_pid)) if isinstance(raw_pid, str) and raw_pid.isdigit() else normalize_id(raw_pid)
-            except Exception:
-                pid = normalize_id(raw_pid)
-            p = pid_to_obj.get(pid)
-            if p is None:
+            pid = kayit.normalize(raw_pid)
+            i = pid_to_idx.get(pid)
+            if i is None:
                 continue
+            p = personeller[i]
             for g in days or []:
                 g = int(g)
-                if not _any_role_available_on_day(p, g, roles, exclusive_roles, gorev_havuzlari, kisitlama_istisna_map, role_full_on_day):
+                if 1 <= g <= gun_sayisi:
+                    musait = bool(gun_musait[g - 1, i])
+                else:
+                    musait = _any_role_available_on_day(p, g, roles, exclusive_roles, gorev_havuzlari, kisitlama_istisna_map, role_full_on_day)
+                if not musait:
                     if len(gecersiz) < max_preview:
                         gecersiz.append({'personel_id': pid, 'personel_ad': getattr(p, 'ad', ''), 'gun': g})
                     gecersiz_count += 1
@@ -159,22 +161,17 @@ def analyze_preflight(
         # 2) Rol kapasite önizleme (ara_gün dahil kişi-üst sınır)
         role_summaries: List[Dict] = []
         risk_preview: List[Dict] = []
-        # Hazırla: gün → aday id birliği (rol bazında)
-        for role, slots in role_slots.items():
+        # Slot doluluğuna bakma — üst kapasite tahmininde aday birliğini istiyoruz
+        gereken = np.array([len(role_slots[role]) for role in roles], dtype=np.int64)
+        for r, g0 in zip(*np.nonzero(gunluk_aday < gereken[:, None])):
+            if len(risk_preview) >= max_preview:
+                break
+            risk_preview.append({'rol': roles[r], 'gun': int(g0) + 1, 'gereken': int(gereken[r]), 'aday': int(gunluk_aday[r, g0])})
+        # Üst kapasite (ara_gün)
+        ust_kapasiteler = adaylar.ust_kapasite(ara_gun)
+        for r, (role, slots) in enumerate(role_slots.items()):
             demand = gun_sayisi * max(1, len(slots))
-            daily_union: Dict[int, Set[int]] = {g: set() for g in range(1, gun_sayisi + 1)}
-            for g in range(1, gun_sayisi + 1):
-                # Slot doluluğuna bakma — üst kapasite tahmininde aday birliğini istiyoruz
-                for p in personeller:
-                    if _person_can_take_role_day(p, role, g, exclusive_roles, gorev_havuzlari, kisitlama_istisna_map):
-                        daily_union[g].add(normalize_id(p.id))
-                if len(daily_union[g]) < len(slots) and len(risk_preview) < max_preview:
-                    risk_preview.append({'rol': role, 'gun': g, 'gereken': len(slots), 'aday': len(daily_union[g])})
-            # Üst kapasite (ara_gün)
-            upper = 0
-            for p in personeller:
-                uygun = [g for g in range(1, gun_sayisi + 1) if normalize_id(p.id) in daily_union[g]]
-                upper += _max_assignable_with_ara_gun(uygun, ara_gun)
+            upper = int(ust_kapasiteler[r])
             eksik = max(0, demand - upper)
             if eksik > 0:
                 role_summaries.append({'rol': role, 'talep': demand, 'ust_kapasite': upper, 'eksik': eksik})
@@ -197,10 +194,7 @@ def analyze_preflight(
         fallback: List[Dict] = []
         fallback_kisi_sayisi = 0
         for pid, hedef in hedefler_map.items():
-            try:
-                npid = normalize_id(int(pid)) if isinstance(pid, str) and pid.isdigit() else normalize_id(pid)
-            except Exception:
-                npid = normalize_id(pid)
+            npid = kayit.normalize(pid)
             mt = musait_tipler.get(npid, {t: 0 for t in GUN_TIPLERI})
             hedef_tipler = (hedef or {}).get('hedef_tipler', {})
             transferler: List[Dict] = []
@@ -240,18 +234,13 @@ def analyze_preflight(
 
         # 4) Zero-candidate preview (slot/gün)
         zero_preview: List[Dict] = []
-        # Build candidate check quick: for each day and slot
-        for g in range(1, gun_sayisi + 1):
-            for s, gv in enumerate(gorevler or []):
-                role = gv.base_name if getattr(gv, 'base_name', None) else gv.ad
-                cands = 0
-                for p in personeller:
-                    if _person_can_take_role_day(p, role, g, exclusive_roles, gorev_havuzlari, kisitlama_istisna_map):
-                        cands += 1
-                        if cands > 0:
-                            break
-                if cands == 0 and len(zero_preview) < max_preview:
-                    zero_preview.append({'gun': g, 'slot_idx': s, 'rol': role})
+        slot_aday_var = adaylar.slot_aday_var(len(gorevler or []))  # (gun, slot)
+        for g0, s in zip(*np.nonzero(~slot_aday_var)):
+            if len(zero_preview) >= max_preview:
+                break
+            gv = gorevler[s]
+            role = gv.base_name if getattr(gv, 'base_name', None) else gv.ad
+            zero_preview.append({'gun': int(g0) + 1, 'slot_idx': int(s), 'rol': role})
 
         # 5) Parametre kontrolleri (hafif)
         slot_sayisi = len(gorevler or [])
@@ -1,21 +1,26 @@
 """
 Cozum Stratejisi � Akilli teshis tabanli retry + relaxation dongusu.
 Faz 1: Orijinal parametrelerle cozum
-Faz 2: INFEASIBLE ise akilli teshis ve otomatik gevsetme
+Faz 2: INFEASIBLE ise celiski cekirdegi teshisi; yetmezse akilli teshis ve otomatik gevsetme
 """
 
 import time as _time
 import logging
+import multiprocessing
+import os
 
-from solver_models import SolverGorev, SolverSonuc
-from ortools_solver import NobetSolver
-from utils import find_matching_id
+from solver_models import SolverSonuc
+from ortools_solver import NobetSolver, plan_uygulamasini_gevset
+from iki_asamali import IKI_ASAMA_ESIGI, IkiAsamaliCozucu, iki_asama_uygun_mu
+from bilesen_ayristirma import BilesenAyristirici
+from utils import IdRegistry
 
 logger = logging.getLogger(__name__)
 
 
-def _sirala_birlikte_kurallari(kurallar, personeller, hedefler):
+def _sirala_birlikte_kurallari(kurallar, personeller, hedefler, kayit=None):
     personel_map = {p.id: p for p in personeller}
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
     birlikte_kurallari = []
 
     for kural in kurallar:
@@ -24,8 +29,8 @@ def _sirala_birlikte_kurallari(kurallar, personeller, hedefler):
 
         valid_ids = []
         for raw_pid in getattr(kural, 'kisiler', []) or []:
-            matched_id = find_matching_id(raw_pid, personel_map.keys())
-            if matched_id is not None and matched_id not in valid_ids:
+            matched_id = kayit.eslestir(raw_pid)
+            if matched_id in personel_map and matched_id not in valid_ids:
                 valid_ids.append(matched_id)
 
         if len(valid_ids) < 2:
@@ -59,17 +64,184 @@ def _sirala_birlikte_kurallari(kurallar, personeller, hedefler):
     return birlikte_kurallari
 
 
+def _gevsetme_adaylari(aksiyonlar, kurallar, ara_gun, personeller, hedefler, kayit):
+    """Teşhis aksiyonlarını sıralı gevşetme denemelerine aç (en az gevşekten en gevşeğe).
+
+    Gevşetmeler kümülatiftir: her aksiyon öncekilerin üzerine eklenir. Her aday
+    bir NobetSolver denemesini tarif eder: ara_gun, exclusive_aktif, kurallar,
+    başarı halinde gevsetme_bilgisi'ne yazılacak alanlar (bilgi) ve tanı mesajı.
+    """
+    adaylar = []
+    aktif_exclusive = True  # exclusive (H8) + havuz (H10) elemesi
+    aktif_kurallar = kurallar
+    aktif_ara_gun = ara_gun
+
+    for aksiyon_info in aksiyonlar:
+        aksiyon = aksiyon_info['aksiyon']
+
+        def _ekle(dene_ara_gun, bilgi, mesaj):
+            adaylar.append({
+                'aksiyon': aksiyon, 'puan': aksiyon_info['puan'],
+                'ara_gun': dene_ara_gun, 'exclusive_aktif': aktif_exclusive,
+                'kurallar': aktif_kurallar, 'bilgi': bilgi, 'mesaj': mesaj,
+            })
+
+        if aksiyon == 'ara_gun_azalt':
+            # Ara günü kademeli azalt
+            for dene_ara_gun in range(aktif_ara_gun, 0, -1):
+                if dene_ara_gun == aktif_ara_gun and aktif_ara_gun == ara_gun:
+                    continue  # İlk denemede zaten denendi
+                _ekle(dene_ara_gun, {'ara_gun_gevsetildi': True},
+                      f"Ara gun {ara_gun}->{dene_ara_gun} gevsetilerek cozum bulundu")
+            aktif_ara_gun = 1  # Sonraki aksiyonlarda ara gün=1 ile dene
+
+        elif aksiyon == 'exclusive_gevset':
+            aktif_exclusive = False  # H10 havuz kısıtını da gevşet
+            for dene_ara_gun in range(aktif_ara_gun, 0, -1):
+                _ekle(dene_ara_gun, {'exclusive_gevsetildi': True},
+                      "Exclusive kisitlar gevsetilerek cozum bulundu")
+
+        elif aksiyon == 'ayri_gevset':
+            # Ayrı kurallarını kaldır (birlikte korunur)
+            aktif_kurallar = [k for k in aktif_kurallar if k.tur != 'ayri']
+            for dene_ara_gun in range(aktif_ara_gun, 0, -1):
+                _ekle(dene_ara_gun, {'ayri_gevsetildi': True},
+                      "Ayri tutma kurallari kaldirildiktan sonra cozum bulundu")
+
+        elif aksiyon == 'birlikte_kaldir':
+            base_kurallar = [k for k in aktif_kurallar if k.tur != 'birlikte']
+            birlikte_sirali = _sirala_birlikte_kurallari(aktif_kurallar, personeller, hedefler, kayit)
+            for kaldirilan_sayi in range(1, len(birlikte_sirali) + 1):
+                aktif_kurallar = base_kurallar + [
+                    item['kural'] for item in birlikte_sirali[kaldirilan_sayi:]
+                ]
+                for dene_ara_gun in range(aktif_ara_gun, 0, -1):
+                    _ekle(dene_ara_gun,
+                          {'birlikte_kaldirildi': True, 'kaldirilan_birlikte_kural_sayisi': kaldirilan_sayi},
+                          f"{kaldirilan_sayi} birlikte kurali kademeli kaldirilarak cozum bulundu")
+
+        elif aksiyon == 'tum_soft_kaldir':
+            aktif_kurallar = []
+            aktif_exclusive = False
+            for dene_ara_gun in range(max(1, aktif_ara_gun), 0, -1):
+                _ekle(dene_ara_gun, {'tum_soft_kaldirildi': True},
+                      "Tum soft kisitlar kaldirildiktan sonra cozum bulundu")
+
+    return adaylar
+
+
+def _cekirdek_gevsetme_bilgisi(gevsetilen, kisi_ara_gun):
+    """Çekirdekten gevşetilen ögeleri gevsetme_bilgisi alanlarına çevir (kademe alanlarıyla uyumlu)."""
+    turler = {oge['kural_tur'] if oge['tur'] == 'kural' else oge['tur'] for oge in gevsetilen}
+    bilgi = {'cekirdek_gevsetme': True, 'gevsetilen_kisitlar': gevsetilen}
+    if 'ara_gun' in turler:
+        bilgi['ara_gun_gevsetildi'] = True
+        bilgi['kisi_ara_gun'] = {str(pid): d for pid, d in kisi_ara_gun.items()}
+    if turler & {'exclusive', 'havuz'}:
+        bilgi['exclusive_gevsetildi'] = True
+    if 'ayri' in turler:
+        bilgi['ayri_gevsetildi'] = True
+    if 'birlikte' in turler:
+        bilgi['birlikte_kaldirildi'] = True
+        bilgi['kaldirilan_birlikte_kural_sayisi'] = sum(
+            1 for oge in gevsetilen if oge.get('kural_tur') == 'birlikte'
+        )
+    return bilgi
+
+
+def _portfoy_denemesi(solver_kwargs, exclusive_aktif, arama_isci_sayisi, ipucu=None):
+    """Portföy işçisi (ayrı süreç): tek gevşetme adayını kendi modeliyle çöz."""
+    solver = NobetSolver(**solver_kwargs)
+    solver.arama_isci_sayisi = arama_isci_sayisi
+    solver.gevset(exclusive_aktif=exclusive_aktif)
+    if ipucu:
+        solver.ipucu_ver(ipucu)
+    return solver.coz()
+
+
+def _portfoy_penceresi(is_tanimlari, sure, ipucu=None, iptal_olayi=None):
+    """Adayları süreç havuzunda aynı anda çöz; en az gevşek başarılı sonucun indeksini döndür.
+
+    Bir aday başarılı olduğunda ondan daha az gevşek olanların hepsi bitmişse
+    karar verilir ve havuz sonlandırılır (kalan CP-SAT çözümleri iptal edilir).
+    Returns: (kazanan_idx veya None, sonuclar)
+    """
+    cpu = os.cpu_count() or 1
+    arama_isci_sayisi = max(1, cpu // max(len(is_tanimlari), 1))
+    sonuclar = [None] * len(is_tanimlari)
+    kazanan = None
+    # Süreç başlatma + model kurulumu için ek pay
+    son_an = _time.time() + sure + 15
+    havuz = multiprocessing.get_context("spawn").Pool(processes=len(is_tanimlari))
+    try:
+        isler = [
+            havuz.apply_async(_portfoy_denemesi, (kwargs, exclusive_aktif, arama_isci_sayisi, ipucu))
+            for kwargs, exclusive_aktif in is_tanimlari
+        ]
+        while True:
+            for i, is_ in enumerate(isler):
+                if sonuclar[i] is None and is_.ready():
+                    try:
+                        sonuclar[i] = is_.get()
+                    except Exception as exc:
+                        logger.warning("Portfoy denemesi %d hata verdi: %s", i, exc)
+                        sonuclar[i] = SolverSonuc(
+                            basarili=False, atamalar=[],
+                            istatistikler={'status': 'PORTFOY_HATASI', 'hata': str(exc)[:200]},
+                            sure_ms=0, mesaj=f"Portfoy denemesi hata verdi: {str(exc)[:120]}"
+                        )
+            zaman_doldu = _time.time() > son_an or (iptal_olayi is not None and iptal_olayi.is_set())
+            for i, sonuc in enumerate(sonuclar):
+                if sonuc is None:
+                    if not zaman_doldu:
+                        break
+                    continue
+                if sonuc.basarili:
+                    kazanan = i
+                    break
+            if kazanan is not None or zaman_doldu or all(s is not None for s in sonuclar):
+                break
+            _time.sleep(0.05)
+    finally:
+        havuz.terminate()
+        havuz.join()
+    return kazanan, sonuclar
+
+
 def solve_with_diagnostics(
     gun_sayisi, gun_tipleri, personeller, gorevler, kurallar,
     gorev_havuzlari, kisitlama_istisnalari, birlikte_istisnalari,
     aragun_istisnalari, manuel_atamalar, hedefler,
     ara_gun, max_sure, yil, ay, resmi_tatiller, data,
-    ignore_manual_conflicts=False, plan_kontrati=None, plan_yenileyici=None
+    ignore_manual_conflicts=False, plan_kontrati=None, plan_yenileyici=None,
+    kayit=None, solver_secenekleri=None, strateji_secenekleri=None, yeniden_coz=None,
+    ilerleme_dinleyici=None, iptal_olayi=None
 ):
     """Akıllı teşhis tabanlı çözüm stratejisi.
 
+    strateji_secenekleri['gevsetme_portfoyu'] açıksa gevşetme adayları
+    portfoy_genisligi'lik pencerelerle süreç havuzunda aynı anda denenir.
+    strateji_secenekleri['iki_asamali'] açıksa ve personel × gün × slot
+    iki_asamali_esik'i aşıyorsa önce iki aşamalı motor (bkz. iki_asamali.py) denenir;
+    başarısızsa tek parça modele geçilir.
+    strateji_secenekleri['bilesen_ayristirma'] açıksa kişi–rol grafiği bağımsız
+    bileşenlere ayrılıyorsa her bileşen süreç havuzunda ayrı modelle çözülür
+    (bkz. bilesen_ayristirma.py); sert planla çözümsüzse bileşenler gevşek planla bir kez
+    daha denenir, yine çözülemezse tek parça modele geçilir. Ön fazların süresi Faz 1
+    bütçesinden düşülür.
+    yeniden_coz verilirse (bkz. parse_yeniden_coz) önce önceki çizelgenin sadece
+    değişiklik komşuluğu kısa sürede yeniden çözülür; başarısızsa tam çözüme geçilir.
+    ilerleme_dinleyici her denemenin ara çözümlerini alır (bkz. NobetSolver.ilerleme_dinleyici);
+    portföy süreçlerine aktarılmaz. iptal_olayi (threading.Event) set edilince süren
+    deneme durdurulur ve yeni deneme başlatılmaz.
+
     Returns: (sonuc, gevsetme_bilgisi, teshis_bilgisi, kullanilan_ara_gun)
     """
+    # Tüm denemeler aynı kimlik kaydını paylaşır (ID/rol normalizasyonu bir kez)
+    kayit = kayit if kayit is not None else IdRegistry(personeller)
+    # Model kodlama seçenekleri (ara_gun_kodlama vb.) her denemede aynen uygulanır
+    solver_secenekleri = dict(solver_secenekleri or {})
+    strateji_secenekleri = dict(strateji_secenekleri or {})
     baslangic_toplam = _time.time()
     tani_mesajlari = []
     gevsetme_bilgisi = {}
@@ -84,10 +256,17 @@ def solve_with_diagnostics(
     kullanilan_ara_gun = ara_gun
     aktif_plan_kontrati = plan_kontrati
 
-    def _plani_yenile(yeni_ara_gun):
-        nonlocal hedefler, aktif_plan_kontrati
+    # Ara gün başına yenilenen plan: aynı ara gün tekrar denendiğinde aynı
+    # hedef/plan nesneleri döner, böylece kurulu model yeniden kullanılabilir.
+    plan_onbellegi = {}
+
+    def _plan_getir(yeni_ara_gun):
+        """(hedefler, plan_kontrati) veya yenileme yoksa/başarısızsa None."""
         if not plan_yenileyici:
-            return
+            return None
+        if yeni_ara_gun in plan_onbellegi:
+            return plan_onbellegi[yeni_ara_gun]
+        plan_onbellegi[yeni_ara_gun] = None
         try:
             yeni_plan = plan_yenileyici(yeni_ara_gun)
         except Exception as exc:
@@ -95,67 +274,259 @@ def solve_with_diagnostics(
             tani_mesajlari.append(
                 f"Plan kontrati yenilenemedi (ara_gun={yeni_ara_gun}): {str(exc)[:120]}"
             )
-            return
+            return None
         if not yeni_plan or not yeni_plan.get('basarili'):
+            return None
+        yeni_hedefler = yeni_plan.get('hedefler_map') or None
+        pk = yeni_plan.get('plan_kontrati')
+        if pk is not None:
+            pk = pk.to_dict() if hasattr(pk, 'to_dict') else pk
+        plan_onbellegi[yeni_ara_gun] = (yeni_hedefler, pk)
+        tani_mesajlari.append(
+            f"Plan kontrati yenilendi (ara_gun={yeni_ara_gun}, plan_hash="
+            f"{(pk or {}).get('plan_hash', 'yok')})"
+        )
+        return plan_onbellegi[yeni_ara_gun]
+
+    def _plani_yenile(yeni_ara_gun):
+        nonlocal hedefler, aktif_plan_kontrati
+        yeni = _plan_getir(yeni_ara_gun)
+        if yeni is None:
             return
-        yeni_hedefler = yeni_plan.get('hedefler_map')
+        yeni_hedefler, pk = yeni
         if yeni_hedefler:
             hedefler = yeni_hedefler
-        pk = yeni_plan.get('plan_kontrati')
         if pk is not None:
-            aktif_plan_kontrati = pk.to_dict() if hasattr(pk, 'to_dict') else pk
+            aktif_plan_kontrati = pk
+
+    # Tek yeniden kullanılabilir model: gevşetme denemeleri sadece etkinlik
+    # literallerini sabitler. Plan yenilenince (hedefler değişir) ya da ara gün
+    # kurulumdakini aşarsa model yeniden kurulur.
+    solver = None
+    solver_anahtari = None
+    model_kurulum_sayisi = 0
+    # Denemeler arasında taşınan en iyi çözüm (solver.onceki_cozum); sonraki
+    # denemelere uygunlukla süzülerek ipucu olarak verilir.
+    tasinan_ipucu = None
+
+    def _dene(dene_ara_gun, sure, exclusive_aktif=True, aktif_kurallar=None):
+        nonlocal solver, solver_anahtari, model_kurulum_sayisi, tasinan_ipucu
+        anahtar = (id(hedefler), id(aktif_plan_kontrati))
+        if solver is None or solver_anahtari != anahtar or dene_ara_gun > solver.ara_gun_ust:
+            solver = NobetSolver(
+                gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
+                personeller=personeller, gorevler=gorevler,
+                kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
+                kisitlama_istisnalari=kisitlama_istisnalari,
+                birlikte_istisnalari=birlikte_istisnalari,
+                aragun_istisnalari=aragun_istisnalari,
+                manuel_atamalar=manuel_atamalar, hedefler=hedefler,
+                ara_gun=dene_ara_gun, max_sure_saniye=sure,
+                ignore_manual_conflicts=ignore_manual_conflicts,
+                kayit=kayit,
+                **solver_secenekleri,
+                plan_kontrati=aktif_plan_kontrati,
+                yeniden_kullanilabilir=True,
+            )
+            solver_anahtari = anahtar
+            model_kurulum_sayisi += 1
+            solver.ilerleme_dinleyici = ilerleme_dinleyici
+            solver.iptal_olayi = iptal_olayi
+            if tasinan_ipucu:
+                solver.ipucu_ver(tasinan_ipucu)
+        solver.max_sure = sure
+        solver.gevset(
+            ara_gun=dene_ara_gun, exclusive_aktif=exclusive_aktif,
+            kurallar=kurallar if aktif_kurallar is None else aktif_kurallar,
+        )
+        deneme_sonucu = solver.coz()
+        tasinan_ipucu = solver.onceki_cozum or tasinan_ipucu
+        return deneme_sonucu
+
+    # ---- FAZ 0: Artımlı yeniden çözüm (önceki çizelge + değişiklik) ----
+    if yeniden_coz:
+        artimli = NobetSolver(
+            gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
+            personeller=personeller, gorevler=gorevler,
+            kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
+            kisitlama_istisnalari=kisitlama_istisnalari,
+            birlikte_istisnalari=birlikte_istisnalari,
+            aragun_istisnalari=aragun_istisnalari,
+            manuel_atamalar=manuel_atamalar, hedefler=hedefler,
+            ara_gun=ara_gun, max_sure_saniye=yeniden_coz.get('sure', 10),
+            ignore_manual_conflicts=ignore_manual_conflicts,
+            kayit=kayit,
+            **solver_secenekleri,
+            plan_kontrati=aktif_plan_kontrati,
+        )
+        # Sabit hücreler sert plan eşitlemeleriyle çelişebilir; plan yumuşak uygulanır.
+        artimli.gevset(plan_gevsek=True)
+        artimli.ilerleme_dinleyici = ilerleme_dinleyici
+        artimli.iptal_olayi = iptal_olayi
+        komsuluk_ozeti = artimli.komsulugu_sabitle(
+            yeniden_coz['onceki_atamalar'], yeniden_coz.get('kisiler'), yeniden_coz.get('gunler'),
+        )
+        onceki = set(artimli.onceki_cozum or set())
+        sonuc = artimli.coz()
+        if sonuc.basarili:
+            yeni = {(a['personel_id'], a['gun'], a['slot_idx']) for a in sonuc.atamalar}
+            tani_mesajlari.append(
+                f"Artimli yeniden cozum: {komsuluk_ozeti['sabit_atama_sayisi']} atama sabit, "
+                f"{len(yeni - onceki)} yeni atama, {len(onceki - yeni)} atama kaldirildi"
+            )
+            return SolverSonuc(
+                basarili=True, atamalar=sonuc.atamalar,
+                istatistikler={
+                    **sonuc.istatistikler, 'tani_mesajlari': tani_mesajlari,
+                    'yeniden_coz': {
+                        **komsuluk_ozeti,
+                        'eklenen_atama': len(yeni - onceki),
+                        'kaldirilan_atama': len(onceki - yeni),
+                    },
+                },
+                sure_ms=int((_time.time() - baslangic_toplam) * 1000), mesaj=sonuc.mesaj
+            ), {}, teshis_bilgisi, ara_gun
         tani_mesajlari.append(
-            f"Plan kontrati yenilendi (ara_gun={yeni_ara_gun}, plan_hash="
-            f"{(aktif_plan_kontrati or {}).get('plan_hash', 'yok')})"
+            f"Artimli yeniden cozum basarisiz ({sonuc.istatistikler.get('status')}), tam cozume geciliyor"
+        )
+        sonuc = None
+
+    # ---- FAZ 0b: Büyük çizelgede iki aşamalı çözüm (gün ataması, sonra gün bazlı rol ataması) ----
+    if strateji_secenekleri.get('iki_asamali') and iki_asama_uygun_mu(
+        len(personeller), gun_sayisi, len(gorevler),
+        strateji_secenekleri.get('iki_asamali_esik', IKI_ASAMA_ESIGI),
+    ):
+        iki_asama_solver = NobetSolver(
+            gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
+            personeller=personeller, gorevler=gorevler,
+            kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
+            kisitlama_istisnalari=kisitlama_istisnalari,
+            birlikte_istisnalari=birlikte_istisnalari,
+            aragun_istisnalari=aragun_istisnalari,
+            manuel_atamalar=manuel_atamalar, hedefler=hedefler,
+            ara_gun=ara_gun, max_sure_saniye=sure_ilk,
+            ignore_manual_conflicts=ignore_manual_conflicts,
+            kayit=kayit,
+            **solver_secenekleri,
+            plan_kontrati=aktif_plan_kontrati,
         )
+        # Gün ataması sert plan eşitlemelerini rol ataması öncesi karşılayamaz (1. aşama
+        # hep INFEASIBLE); iki aşamalı motor gevşek planla çalışır. Süresi Faz 1'den düşülür.
+        iki_asama_plan_gevsek = iki_asama_solver._plan_aktif_mi()
+        if iki_asama_plan_gevsek:
+            iki_asama_solver.gevset(plan_gevsek=True)
+        iki_asama_solver.iptal_olayi = iptal_olayi
+        sonuc = IkiAsamaliCozucu(
+            iki_asama_solver, max_sure=max(5, min(int(max_sure * 0.3), sure_ilk)),
+        ).coz()
+        if sonuc.basarili:
+            tani_mesajlari.append(
+                f"Iki asamali cozum{' (plan gevsek)' if iki_asama_plan_gevsek else ''}: "
+                f"{sonuc.istatistikler['iki_asama']['tur_sayisi']} tur, "
+                f"{sonuc.istatistikler['iki_asama']['kesim_sayisi']} kesim"
+            )
+            return SolverSonuc(
+                basarili=True, atamalar=sonuc.atamalar,
+                istatistikler={**sonuc.istatistikler, 'tani_mesajlari': tani_mesajlari},
+                sure_ms=int((_time.time() - baslangic_toplam) * 1000), mesaj=sonuc.mesaj
+            ), {}, teshis_bilgisi, ara_gun
+        tani_mesajlari.append(f"{sonuc.mesaj}; tek parca modele geciliyor")
+        sonuc = None
+
+    # ---- FAZ 0c: Bağımsız kişi–rol bileşenleri ayrı modellerle paralel ----
+    # Bileşen özeti ayrıştırma kullanılmasa da (tek bileşen, başarısız) istatistiklere eklenir.
+    bilesen_bilgisi = None
+    if strateji_secenekleri.get('bilesen_ayristirma'):
+        bilesen_girdileri = {
+            'gun_sayisi': gun_sayisi, 'gun_tipleri': gun_tipleri,
+            'personeller': personeller, 'gorevler': gorevler,
+            'kurallar': kurallar, 'gorev_havuzlari': gorev_havuzlari,
+            'kisitlama_istisnalari': kisitlama_istisnalari,
+            'birlikte_istisnalari': birlikte_istisnalari,
+            'aragun_istisnalari': aragun_istisnalari,
+            'manuel_atamalar': manuel_atamalar, 'hedefler': hedefler,
+            'ara_gun': ara_gun,
+            'max_sure_saniye': max(5, int(sure_ilk - (_time.time() - baslangic_toplam))),
+            'ignore_manual_conflicts': ignore_manual_conflicts,
+            'kayit': kayit,
+            **solver_secenekleri,
+            'plan_kontrati': aktif_plan_kontrati,
+        }
+        ayristirici = BilesenAyristirici(bilesen_girdileri)
+        ayristirici.solver.iptal_olayi = iptal_olayi
+        sonuc = ayristirici.coz()
+        bilesen_bilgisi = ayristirici.bilgi
+        # Bileşenler sert planla çözümsüzse tek parça modelde de öyledir (ayrıştırma kesin);
+        # Faz 2'deki plan gevşetmesi burada bileşenlerle denenir.
+        if (sonuc is not None and not sonuc.basarili
+                and sonuc.istatistikler.get('status') == 'INFEASIBLE'
+                and ayristirici.solver._plan_aktif_mi()
+                and not (iptal_olayi is not None and iptal_olayi.is_set())):
+            kalan_sure = max_sure - (_time.time() - baslangic_toplam)
+            ayristirici = BilesenAyristirici({
+                **bilesen_girdileri,
+                'max_sure_saniye': max(5, int(min(max_sure * 0.2, kalan_sure))),
+                'plan_kontrati': {
+                    **aktif_plan_kontrati,
+                    'uygulama': plan_uygulamasini_gevset(aktif_plan_kontrati.get('uygulama', {}) or {}),
+                },
+            })
+            ayristirici.solver.iptal_olayi = iptal_olayi
+            sonuc = ayristirici.coz()
+            bilesen_bilgisi = {**ayristirici.bilgi, 'plan_gevsek': True}
+        if sonuc is not None and sonuc.basarili:
+            tani_mesajlari.append(
+                f"Bilesen ayristirmasi{' (plan gevsek)' if bilesen_bilgisi.get('plan_gevsek') else ''}: "
+                f"{bilesen_bilgisi['bilesen_sayisi']} bagimsiz bilesen paralel cozuldu"
+            )
+            return SolverSonuc(
+                basarili=True, atamalar=sonuc.atamalar,
+                istatistikler={
+                    **sonuc.istatistikler, 'bilesen_ayristirma': bilesen_bilgisi,
+                    'tani_mesajlari': tani_mesajlari,
+                },
+                sure_ms=int((_time.time() - baslangic_toplam) * 1000), mesaj=sonuc.mesaj
+            ), {}, teshis_bilgisi, ara_gun
+        if sonuc is not None:
+            tani_mesajlari.append(f"{sonuc.mesaj}; tek parca modele geciliyor")
+        sonuc = None
+
+    # Ön fazların (artımlı, iki aşamalı, bileşen) harcadığı süre ilk denemeden düşülür;
+    # sonraki fazlar zaten kalan süreye göre bütçelenir.
+    on_faz_suresi = _time.time() - baslangic_toplam
+    if on_faz_suresi >= 1:
+        sure_ilk = max(5, int(sure_ilk - on_faz_suresi))
 
     # ---- FAZ 1: Orijinal parametrelerle çöz ----
     logger.info("Faz 1: Orijinal parametrelerle cozum baslatiliyor (sure=%ds)", sure_ilk)
-    solver = NobetSolver(
-        gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-        personeller=personeller, gorevler=gorevler,
-        kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
-        kisitlama_istisnalari=kisitlama_istisnalari,
-        birlikte_istisnalari=birlikte_istisnalari,
-        aragun_istisnalari=aragun_istisnalari,
-        manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-        ara_gun=ara_gun, max_sure_saniye=sure_ilk,
-        ignore_manual_conflicts=ignore_manual_conflicts,
-        plan_kontrati=aktif_plan_kontrati,
-    )
-    sonuc = solver.coz()
+    sonuc = _dene(ara_gun, sure_ilk)
     logger.info("Faz 1 sonuc: basarili=%s, sure=%dms",
                 sonuc.basarili if sonuc else False,
                 sonuc.sure_ms if sonuc else 0)
 
-    # ---- FAZ 2: INFEASIBLE ise akıllı teşhis ve otomatik gevşetme ----
-    if sonuc and not sonuc.basarili:
+    def _iptal_edildi():
+        return iptal_olayi is not None and iptal_olayi.is_set()
+
+    if _iptal_edildi():
+        tani_mesajlari.append("Cozum iptal edildi")
+
+    # ---- FAZ 2: INFEASIBLE ise çekirdek teşhisi, yetmezse akıllı teşhis ve otomatik gevşetme ----
+    cekirdek_teshisi = None
+    if sonuc and not sonuc.basarili and not _iptal_edildi():
         tani_mesajlari.append("Ilk deneme basarisiz, teshis baslatiliyor...")
         logger.info("Faz 1 basarisiz, teshis baslatiliyor...")
 
         # --- PLAN GEVSETME (erken deneme) ---
         # Plan kontratindaki sert esitlemeler cozumu kilitliyorsa, once yumsatarak tekrar dene.
+        # Kurulu modelde sert plan sınırları plan literaline bağlı; model yeniden kurulmaz.
         try:
             if isinstance(aktif_plan_kontrati, dict) and aktif_plan_kontrati:
-                _uyg = dict(aktif_plan_kontrati.get("uygulama", {}) or {})
-                _uyg["toplam_hard"] = False
-                _uyg["gun_tipi_toleransi"] = max(int(_uyg.get("gun_tipi_toleransi", 0)), 2)
-                _uyg["gorev_kota_toleransi"] = max(int(_uyg.get("gorev_kota_toleransi", 0)), 2)
-                _uyg["gun_iskeleti_toleransi"] = max(int(_uyg.get("gun_iskeleti_toleransi", 0)), 2)
+                _uyg = plan_uygulamasini_gevset(aktif_plan_kontrati.get("uygulama", {}) or {})
                 aktif_plan_kontrati = { **aktif_plan_kontrati, "uygulama": _uyg }
-                solver = NobetSolver(
-                    gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-                    personeller=personeller, gorevler=gorevler,
-                    kurallar=kurallar, gorev_havuzlari=gorev_havuzlari,
-                    kisitlama_istisnalari=kisitlama_istisnalari,
-                    birlikte_istisnalari=birlikte_istisnalari,
-                    aragun_istisnalari=aragun_istisnalari,
-                    manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-                    ara_gun=ara_gun, max_sure_saniye=max(5, int(max_sure*0.2)),
-                    ignore_manual_conflicts=ignore_manual_conflicts,
-                    plan_kontrati=aktif_plan_kontrati,
-                )
-                _relaxed = solver.coz()
+                solver.gevset(plan_gevsek=True)
+                solver_anahtari = (id(hedefler), id(aktif_plan_kontrati))
+                kalan_sure = max_sure - (_time.time() - baslangic_toplam)
+                _relaxed = _dene(ara_gun, max(5, int(min(max_sure * 0.2, kalan_sure))))
                 if _relaxed and _relaxed.basarili:
                     tani_mesajlari.append("Plan gevsetilerek cozum bulundu (toplam_hard=False, tolerans=2)")
                     sonuc = _relaxed
@@ -163,11 +534,58 @@ def solve_with_diagnostics(
                     # Bu noktada basari bulunduysa tanilari kaydederek cikilir
                     return SolverSonuc(
                         basarili=sonuc.basarili, atamalar=sonuc.atamalar,
-                        istatistikler={ **sonuc.istatistikler, 'tani_mesajlari': tani_mesajlari },
+                        istatistikler={
+                            **sonuc.istatistikler, 'tani_mesajlari': tani_mesajlari,
+                            'model_kurulum_sayisi': model_kurulum_sayisi,
+                            **({'bilesen_ayristirma': bilesen_bilgisi} if bilesen_bilgisi is not None else {}),
+                        },
                         sure_ms=sonuc.sure_ms, mesaj=sonuc.mesaj
                     ), {}, teshis_bilgisi, kullanilan_ara_gun
         except Exception as _exc:
             logger.warning("Plan gevsetme denemesi atlandi: %s", _exc)
+
+        # --- CELISKI CEKIRDEGI ---
+        # Aktif gevşetilebilir kısıtlar (kişi ara günü, rol eleme, kural, manuel atama)
+        # varsayım literalleriyle çekirdeklere ayrılır; sadece çekirdeklerden seçilen
+        # kısıtlar gevşetilip tek deneme yapılır. Yetmezse sezgisel kademeye geçilir.
+        if (sonuc.istatistikler or {}).get('status') == 'INFEASIBLE' and not _iptal_edildi():
+            kalan_sure = max_sure - (_time.time() - baslangic_toplam)
+            try:
+                cekirdek_teshisi = solver.cekirdek_bul(max(5, kalan_sure * 0.4))
+            except Exception as exc:
+                logger.warning("Cekirdek teshisi atlandi: %s", exc)
+        if cekirdek_teshisi is not None:
+            tani_mesajlari.append(
+                f"Cekirdek teshisi: {cekirdek_teshisi['durum']}, "
+                f"{len(cekirdek_teshisi['cekirdekler'])} cekirdek, "
+                f"{len(cekirdek_teshisi['gevsetilecek'])} kisit gevsetilecek "
+                f"({cekirdek_teshisi['cozum_sayisi']} deneme, {cekirdek_teshisi['sure_ms']}ms)"
+            )
+            if cekirdek_teshisi['yeterli'] and cekirdek_teshisi['gevsetilecek']:
+                gevsetilen = solver.cekirdegi_gevset(cekirdek_teshisi['gevsetilecek'])
+                kalan_sure = max_sure - (_time.time() - baslangic_toplam)
+                solver.max_sure = max(5, int(kalan_sure * 0.5))
+                cekirdek_sonucu = solver.coz()
+                tasinan_ipucu = solver.onceki_cozum or tasinan_ipucu
+                if cekirdek_sonucu.basarili:
+                    sonuc = cekirdek_sonucu
+                    gevsetme_bilgisi.update(_cekirdek_gevsetme_bilgisi(gevsetilen, solver.kisi_ara_gun))
+                    teshis_bilgisi = {
+                        'kok_neden': 'cekirdek',
+                        'kok_neden_aciklama': ", ".join(
+                            oge['tur'] if oge['tur'] != 'kural' else oge['kural_tur'] for oge in gevsetilen
+                        ),
+                        'cekirdek': cekirdek_teshisi,
+                    }
+                    tani_mesajlari.append(
+                        f"Cekirdek teshisiyle {len(gevsetilen)} kisit gevsetilerek cozum bulundu"
+                    )
+                else:
+                    # Sezgisel kademe kendi gevşetmelerini sıfırdan uygular
+                    solver.gevset(kisi_ara_gun={}, gevsek_eleme=set(), kurallar=kurallar)
+
+    # Çekirdek teşhisi yetmediyse sezgisel teşhis ve kademeli gevşetme
+    if sonuc and not sonuc.basarili and not _iptal_edildi():
         # Teşhis: Neden INFEASIBLE olduğunu analiz et
         diagnostics = solver._build_feasibility_diagnostics()
         aksiyonlar = solver._diagnose_infeasible(diagnostics)
@@ -181,7 +599,8 @@ def solve_with_diagnostics(
                 for a in aksiyonlar
             ],
             'zero_candidate_count': diagnostics.get('slot_day_zero_candidate_count', 0),
-            'kapasite_sorunlari': len(diagnostics.get('role_ara_gun_capacity_issues', []))
+            'kapasite_sorunlari': len(diagnostics.get('role_ara_gun_capacity_issues', [])),
+            **({'cekirdek': cekirdek_teshisi} if cekirdek_teshisi is not None else {}),
         }
         tani_mesajlari.append(
             f"Teshis: Kok neden = {teshis_bilgisi['kok_neden']}, "
@@ -194,174 +613,86 @@ def solve_with_diagnostics(
         aksiyon_sayisi = len(aksiyonlar)
         sure_per_aksiyon = max(int(kalan_sure / max(aksiyon_sayisi, 1)), 3)
 
-        # Hazırlık: exclusive-free görev listesi (gerekirse kullanılacak)
-        gorevler_noexcl = [
-            SolverGorev(
-                id=g.id, ad=g.ad, slot_idx=g.slot_idx,
-                base_name=g.base_name, exclusive=False,
-                ayri_bina=g.ayri_bina
-            ) for g in gorevler
-        ]
-
-        # Kümülatif gevşetme durumu
-        aktif_gorevler = gorevler  # Başlangıçta orijinal görevler
-        aktif_kurallar = kurallar  # Başlangıçta orijinal kurallar
-        aktif_havuzlar = gorev_havuzlari
-        aktif_ara_gun = ara_gun
-
-        # Her aksiyonu sırayla dene
-        for aksiyon_info in aksiyonlar:
-            if sonuc.basarili:
-                break
-
-            aksiyon = aksiyon_info['aksiyon']
-            logger.info("Gevsetme denemesi: %s (puan: %s)", aksiyon, aksiyon_info['puan'])
-            tani_mesajlari.append(
-                f"Gevsetme denemesi: {aksiyon} (puan: {aksiyon_info['puan']})"
-            )
-
-            if aksiyon == 'ara_gun_azalt':
-                # Ara günü kademeli azalt
-                for dene_ara_gun in range(aktif_ara_gun, 0, -1):
-                    if dene_ara_gun == aktif_ara_gun and aktif_ara_gun == ara_gun:
-                        continue  # İlk denemede zaten denendi
-                    _plani_yenile(dene_ara_gun)
-                    solver = NobetSolver(
-                        gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-                        personeller=personeller, gorevler=aktif_gorevler,
-                        kurallar=aktif_kurallar, gorev_havuzlari=aktif_havuzlar,
-                        kisitlama_istisnalari=kisitlama_istisnalari,
-                        birlikte_istisnalari=birlikte_istisnalari,
-                        aragun_istisnalari=aragun_istisnalari,
-                        manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-                        ara_gun=dene_ara_gun, max_sure_saniye=sure_per_aksiyon,
-                        ignore_manual_conflicts=ignore_manual_conflicts,
-                        plan_kontrati=aktif_plan_kontrati,
-                    )
-                    sonuc = solver.coz()
-                    if sonuc.basarili:
-                        kullanilan_ara_gun = dene_ara_gun
-                        gevsetme_bilgisi['ara_gun_gevsetildi'] = True
-                        tani_mesajlari.append(
-                            f"Ara gun {ara_gun}->{dene_ara_gun} gevsetilerek cozum bulundu"
-                        )
-                        break
-                aktif_ara_gun = 1  # Sonraki aksiyonlarda ara gün=1 ile dene
-
-            elif aksiyon == 'exclusive_gevset':
-                aktif_gorevler = gorevler_noexcl
-                aktif_havuzlar = {}  # H10 havuz kısıtını da gevşet
-                for dene_ara_gun in range(aktif_ara_gun, 0, -1):
-                    _plani_yenile(dene_ara_gun)
-                    solver = NobetSolver(
-                        gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-                        personeller=personeller, gorevler=aktif_gorevler,
-                        kurallar=aktif_kurallar, gorev_havuzlari=aktif_havuzlar,
-                        kisitlama_istisnalari=kisitlama_istisnalari,
-                        birlikte_istisnalari=birlikte_istisnalari,
-                        aragun_istisnalari=aragun_istisnalari,
-                        manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-                        ara_gun=dene_ara_gun, max_sure_saniye=sure_per_aksiyon,
-                        ignore_manual_conflicts=ignore_manual_conflicts,
-                        plan_kontrati=aktif_plan_kontrati,
-                    )
-                    sonuc = solver.coz()
-                    if sonuc.basarili:
-                        kullanilan_ara_gun = dene_ara_gun
-                        gevsetme_bilgisi['exclusive_gevsetildi'] = True
-                        tani_mesajlari.append(
-                            "Exclusive kisitlar gevsetilerek cozum bulundu"
-                        )
-                        break
-
-            elif aksiyon == 'ayri_gevset':
-                # Ayrı kurallarını kaldır (birlikte korunur)
-                aktif_kurallar = [k for k in aktif_kurallar if k.tur != 'ayri']
-                for dene_ara_gun in range(aktif_ara_gun, 0, -1):
-                    _plani_yenile(dene_ara_gun)
-                    solver = NobetSolver(
-                        gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-                        personeller=personeller, gorevler=aktif_gorevler,
-                        kurallar=aktif_kurallar, gorev_havuzlari=aktif_havuzlar,
-                        kisitlama_istisnalari=kisitlama_istisnalari,
-                        birlikte_istisnalari=birlikte_istisnalari,
-                        aragun_istisnalari=aragun_istisnalari,
-                        manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-                        ara_gun=dene_ara_gun, max_sure_saniye=sure_per_aksiyon,
-                        ignore_manual_conflicts=ignore_manual_conflicts,
-                        plan_kontrati=aktif_plan_kontrati,
-                    )
-                    sonuc = solver.coz()
-                    if sonuc.basarili:
-                        kullanilan_ara_gun = dene_ara_gun
-                        gevsetme_bilgisi['ayri_gevsetildi'] = True
-                        tani_mesajlari.append(
-                            "Ayri tutma kurallari kaldirildiktan sonra cozum bulundu"
-                        )
-                        break
-
-            elif aksiyon == 'birlikte_kaldir':
-                base_kurallar = [k for k in aktif_kurallar if k.tur != 'birlikte']
-                birlikte_sirali = _sirala_birlikte_kurallari(aktif_kurallar, personeller, hedefler)
-
-                for kaldirilan_sayi in range(1, len(birlikte_sirali) + 1):
-                    kalan_birlikte = [
-                        item['kural'] for item in birlikte_sirali[kaldirilan_sayi:]
-                    ]
-                    aktif_kurallar = base_kurallar + kalan_birlikte
-
-                    for dene_ara_gun in range(aktif_ara_gun, 0, -1):
-                        _plani_yenile(dene_ara_gun)
-                        solver = NobetSolver(
-                            gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-                            personeller=personeller, gorevler=aktif_gorevler,
-                            kurallar=aktif_kurallar, gorev_havuzlari=aktif_havuzlar,
-                            kisitlama_istisnalari=kisitlama_istisnalari,
-                            birlikte_istisnalari=birlikte_istisnalari,
-                            aragun_istisnalari=aragun_istisnalari,
-                            manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-                            ara_gun=dene_ara_gun, max_sure_saniye=sure_per_aksiyon,
-                            ignore_manual_conflicts=ignore_manual_conflicts,
-                            plan_kontrati=aktif_plan_kontrati,
-                        )
-                        sonuc = solver.coz()
-                        if sonuc.basarili:
-                            kullanilan_ara_gun = dene_ara_gun
-                            gevsetme_bilgisi['birlikte_kaldirildi'] = True
-                            gevsetme_bilgisi['kaldirilan_birlikte_kural_sayisi'] = kaldirilan_sayi
-                            tani_mesajlari.append(
-                                f"{kaldirilan_sayi} birlikte kurali kademeli kaldirilarak cozum bulundu"
-                            )
-                            break
-
-                    if sonuc.basarili:
+        adaylar = _gevsetme_adaylari(aksiyonlar, kurallar, ara_gun, personeller, hedefler, kayit)
+        portfoy_genisligi = max(1, int(strateji_secenekleri.get('portfoy_genisligi') or 4))
+
+        if strateji_secenekleri.get('gevsetme_portfoyu') and len(adaylar) > 1:
+            # Portföy: adaylar sırayla portfoy_genisligi'lik pencerelerde aynı anda denenir;
+            # kalan süre pencerelere bölünür, ilk başarılı pencerenin en az gevşek sonucu alınır.
+            pencereler = [
+                adaylar[i:i + portfoy_genisligi]
+                for i in range(0, len(adaylar), portfoy_genisligi)
+            ]
+            for pencere_idx, pencere in enumerate(pencereler):
+                kalan_sure = max_sure - (_time.time() - baslangic_toplam)
+                if kalan_sure < 3 and pencere_idx > 0:
+                    tani_mesajlari.append("Portfoy: sure butcesi doldu, kalan adaylar denenmedi")
+                    break
+                sure_pencere = max(int(kalan_sure / (len(pencereler) - pencere_idx)), 3)
+                tani_mesajlari.append(
+                    "Gevsetme portfoyu: " + ", ".join(
+                        f"{a['aksiyon']}(ara_gun={a['ara_gun']})" for a in pencere
+                    ) + f" paralel deneniyor ({sure_pencere}s)"
+                )
+                is_tanimlari = []
+                aday_planlari = []
+                for aday in pencere:
+                    yeni = _plan_getir(aday['ara_gun'])
+                    aday_hedefleri = (yeni[0] if yeni and yeni[0] else hedefler)
+                    aday_plani = (yeni[1] if yeni and yeni[1] is not None else aktif_plan_kontrati)
+                    aday_planlari.append((aday_hedefleri, aday_plani))
+                    is_tanimlari.append(({
+                        'gun_sayisi': gun_sayisi, 'gun_tipleri': gun_tipleri,
+                        'personeller': personeller, 'gorevler': gorevler,
+                        'kurallar': aday['kurallar'], 'gorev_havuzlari': gorev_havuzlari,
+                        'kisitlama_istisnalari': kisitlama_istisnalari,
+                        'birlikte_istisnalari': birlikte_istisnalari,
+                        'aragun_istisnalari': aragun_istisnalari,
+                        'manuel_atamalar': manuel_atamalar, 'hedefler': aday_hedefleri,
+                        'ara_gun': aday['ara_gun'], 'max_sure_saniye': sure_pencere,
+                        'ignore_manual_conflicts': ignore_manual_conflicts,
+                        'kayit': kayit,
+                        **solver_secenekleri,
+                        'plan_kontrati': aday_plani,
+                    }, aday['exclusive_aktif']))
+
+                kazanan, pencere_sonuclari = _portfoy_penceresi(
+                    is_tanimlari, sure_pencere, tasinan_ipucu, iptal_olayi
+                )
+                son_sonuc = next((s for s in reversed(pencere_sonuclari) if s is not None), None)
+                if kazanan is None:
+                    sonuc = son_sonuc or sonuc
+                    if _iptal_edildi():
+                        tani_mesajlari.append("Cozum iptal edildi")
                         break
-
-            elif aksiyon == 'tum_soft_kaldir':
-                aktif_kurallar = []
-                aktif_havuzlar = {}
-                for dene_ara_gun in range(max(1, aktif_ara_gun), 0, -1):
-                    _plani_yenile(dene_ara_gun)
-                    solver = NobetSolver(
-                        gun_sayisi=gun_sayisi, gun_tipleri=gun_tipleri,
-                        personeller=personeller, gorevler=gorevler_noexcl,
-                        kurallar=[], gorev_havuzlari={},
-                        kisitlama_istisnalari=kisitlama_istisnalari,
-                        birlikte_istisnalari=birlikte_istisnalari,
-                        aragun_istisnalari=aragun_istisnalari,
-                        manuel_atamalar=manuel_atamalar, hedefler=hedefler,
-                        ara_gun=dene_ara_gun, max_sure_saniye=sure_per_aksiyon,
-                        ignore_manual_conflicts=ignore_manual_conflicts,
-                        plan_kontrati=aktif_plan_kontrati,
+                    continue
+                aday = pencere[kazanan]
+                sonuc = pencere_sonuclari[kazanan]
+                hedefler, aktif_plan_kontrati = aday_planlari[kazanan]
+                kullanilan_ara_gun = aday['ara_gun']
+                gevsetme_bilgisi.update(aday['bilgi'])
+                gevsetme_bilgisi['portfoy'] = True
+                tani_mesajlari.append(f"{aday['mesaj']} (portfoy)")
+                break
+        else:
+            son_aksiyon = None
+            for aday in adaylar:
+                if aday['aksiyon'] != son_aksiyon:
+                    son_aksiyon = aday['aksiyon']
+                    logger.info("Gevsetme denemesi: %s (puan: %s)", aday['aksiyon'], aday['puan'])
+                    tani_mesajlari.append(
+                        f"Gevsetme denemesi: {aday['aksiyon']} (puan: {aday['puan']})"
                     )
-                    sonuc = solver.coz()
-                    if sonuc.basarili:
-                        kullanilan_ara_gun = dene_ara_gun
-                        gevsetme_bilgisi['tum_soft_kaldirildi'] = True
-                        tani_mesajlari.append(
-                            "Tum soft kisitlar kaldirildiktan sonra cozum bulundu"
-                        )
-                        break
+                _plani_yenile(aday['ara_gun'])
+                sonuc = _dene(aday['ara_gun'], sure_per_aksiyon, aday['exclusive_aktif'], aday['kurallar'])
+                if sonuc.basarili:
+                    kullanilan_ara_gun = aday['ara_gun']
+                    gevsetme_bilgisi.update(aday['bilgi'])
+                    tani_mesajlari.append(aday['mesaj'])
+                    break
+                if _iptal_edildi():
+                    tani_mesajlari.append("Cozum iptal edildi")
+                    break
 
     # Sonuç yoksa varsayılan hata
     if sonuc is None:
@@ -391,8 +722,10 @@ def solve_with_diagnostics(
                 } if aktif_plan_kontrati else {}),
             },
             'tani_mesajlari': tani_mesajlari,
+            'model_kurulum_sayisi': model_kurulum_sayisi,
             'gevsetme_bilgisi': gevsetme_bilgisi,
             'teshis': teshis_bilgisi,
+            **({'bilesen_ayristirma': bilesen_bilgisi} if bilesen_bilgisi is not None else {}),
             **(
                 {'fallback_ara_gun': kullanilan_ara_gun, 'istenen_ara_gun': ara_gun}
                 if kullanilan_ara_gun != ara_gun else {}
@@ -0,0 +1,122 @@
+"""
+Sonuç önbelleği — aynı istek gövdesi için son çizelgeyi yeniden kullanır.
+Katman 1: sıcak instance içinde süreç belleği (LRU, sıkıştırılmış).
+Katman 2: Firestore sonuc_onbellegi koleksiyonu (sıkıştırılmış, süreli).
+Hata olursa sadece uyarı yazar, isteği asla engellemez.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Çözücü/çıktı formatı değişince artırılır; eski kayıtlar kendiliğinden geçersizleşir
+_ONBELLEK_SURUMU = 1
+_LRU_KAPASITE = 32
+_KALICI_OMUR_SN = 7 * 24 * 3600
+_MAX_KALICI_BYTES = 900_000       # Firestore 1MiB doküman sınırının altı
+_KOLEKSIYON = "sonuc_onbellegi"
+
+# Parmak izine girmeyen (sonucu etkilemeyen) istek alanları
+_HARIC_ALANLAR = {"frontendLoglar", "onbellekKullanma", "istekId"}
+
+_lru: "OrderedDict[str, bytes]" = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def girdi_parmak_izi(endpoint: str, data: dict) -> str:
+    """İstek gövdesinin kanonik parmak izi (_plan_hash_payload ile aynı yöntem).
+
+    Personel, kurallar, manuel atamalar, araGun, maxSure, seed vb. tüm alanlar
+    anahtar sıralı JSON olarak özetlenir; sadece _HARIC_ALANLAR atlanır.
+    """
+    payload = {
+        "surum": _ONBELLEK_SURUMU,
+        "endpoint": endpoint,
+        "girdi": {k: v for k, v in (data or {}).items() if k not in _HARIC_ALANLAR},
+    }
+    ham = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(ham.encode("utf-8")).hexdigest()
+
+
+def onbellek_aktif_mi(data: dict) -> bool:
+    return not bool((data or {}).get("onbellekKullanma", False))
+
+
+def _sikistir(kayit: dict) -> bytes:
+    return zlib.compress(json.dumps(kayit, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def _ac(veri: bytes) -> dict:
+    return json.loads(zlib.decompress(veri).decode("utf-8"))
+
+
+def _lru_koy(parmak_izi: str, veri: bytes):
+    with _lru_lock:
+        _lru[parmak_izi] = veri
+        _lru.move_to_end(parmak_izi)
+        while len(_lru) > _LRU_KAPASITE:
+            _lru.popitem(last=False)
+
+
+def onbellekten_getir(parmak_izi: str) -> dict | None:
+    """Önce süreç belleğine, sonra Firestore'a bak. Bulunamazsa None."""
+    with _lru_lock:
+        veri = _lru.get(parmak_izi)
+        if veri is not None:
+            _lru.move_to_end(parmak_izi)
+    if veri is not None:
+        try:
+            return _ac(veri)
+        except Exception as err:
+            logger.warning("Onbellek kaydi acilamadi (bellek): %s", err)
+            with _lru_lock:
+                _lru.pop(parmak_izi, None)
+
+    try:
+        from firebase_admin import firestore as fs
+        doc = fs.client().collection(_KOLEKSIYON).document(parmak_izi).get()
+        if not doc.exists:
+            return None
+        belge = doc.to_dict() or {}
+        if time.time() - float(belge.get("olusturma_ts", 0)) > _KALICI_OMUR_SN:
+            return None
+        veri = belge.get("veri")
+        kayit = _ac(veri)
+        _lru_koy(parmak_izi, veri)
+        return kayit
+    except Exception as err:
+        logger.warning("Onbellek okunamadi: %s", err)
+        return None
+
+
+def onbellege_yaz(parmak_izi: str, endpoint: str, kayit: dict):
+    """Kaydı iki katmana da yaz. Çok büyük kayıtlar sadece bellekte tutulur."""
+    try:
+        veri = _sikistir(kayit)
+    except Exception as err:
+        logger.warning("Onbellek kaydi sikistirilamadi: %s", err)
+        return
+    _lru_koy(parmak_izi, veri)
+
+    if len(veri) > _MAX_KALICI_BYTES:
+        logger.info("Onbellek kaydi kalici katman icin buyuk (%d byte), atlandi", len(veri))
+        return
+    try:
+        from firebase_admin import firestore as fs
+        fs.client().collection(_KOLEKSIYON).document(parmak_izi).set({
+            "endpoint": endpoint,
+            "olusturma": datetime.now(timezone.utc),
+            "olusturma_ts": time.time(),
+            "surum": _ONBELLEK_SURUMU,
+            "boyut": len(veri),
+            "veri": veri,
+        })
+    except Exception as err:
+        logger.warning("Onbellek yazilamadi: %s", err)
@@ -91,15 +91,6 @@ def ids_match(id1, id2) -> bool:
     return normalize_id(id1) == normalize_id(id2)
 
 
-def find_matching_id(target_id, id_collection):
-    """Bir ID'yi koleksiyonda bul"""
-    target_norm = normalize_id(target_id)
-    for pid in id_collection:
-        if normalize_id(pid) == target_norm:
-            return pid
-    return None
-
-
 def canonicalize_role_name(role_name) -> str:
     """Görev adını birlikte/eşdeğerlik kontrolleri için normalize et."""
     if role_name is None:
@@ -206,66 +197,120 @@ def _extract_mazeret_gunleri(personel_data: Dict) -> Set[int]:
     return mazeretler
 
 
-def build_personel_lookup(personeller) -> Dict:
-    """Personel listesinden ad->id ve normalized_id->id lookup tablosu oluştur.
-    Aynı personel listesi ile çok sayıda _resolve_personel_id çağrısı yapılacaksa
-    bu fonksiyonla önceden cache oluşturup parametre olarak verin."""
-    ad_map = {}
-    id_map = {}
+def _find_duplicate_personel_ids(personeller) -> List[int]:
+    seen = set()
+    duplicates = []
     for p in personeller:
-        ad = getattr(p, "ad", None)
         pid = getattr(p, "id", None)
-        if ad and ad not in ad_map:
-            ad_map[ad] = pid
+        if pid in seen and pid not in duplicates:
+            duplicates.append(pid)
+        seen.add(pid)
+    return duplicates
+
+
+# ============================================
+# KİMLİK KAYIT DEFTERİ
+# ============================================
+
+class IdRegistry:
+    """İstek başına personel ID / ad / görev adı interning tablosu.
+
+    Ham ID'ler, adlar ve görev adları bir kez normalize edilip saklanır; personel
+    ID / ad eşleştirmesi ve canonicalize_role_name O(1) sözlük erişimiyle çalışır.
+    Aynı ad veya aynı normalize ID'de ilk eklenen personel kazanır.
+    """
+
+    def __init__(self, personeller=None):
+        self._id_map: Dict[int, int] = {}
+        self._ad_map: Dict[str, int] = {}
+        self._norm_cache: Dict = {}
+        self._rol_cache: Dict = {}
+        self._aile_cache: Dict = {}
+        for p in personeller or []:
+            self.ekle(getattr(p, "id", None), getattr(p, "ad", None))
+
+    def ekle(self, pid, ad=None):
+        """Personeli kayda ekle; mevcut eşleşmelerin üzerine yazmaz."""
+        if ad and ad not in self._ad_map:
+            self._ad_map[ad] = pid
         if pid is not None:
-            norm = normalize_id(pid)
-            if norm not in id_map:
-                id_map[norm] = pid
-    return {"ad_map": ad_map, "id_map": id_map}
+            norm = self.normalize(pid)
+            if norm not in self._id_map:
+                self._id_map[norm] = pid
 
+    def __len__(self) -> int:
+        return len(self._id_map)
 
-def _resolve_personel_id(raw_ref, personeller, require_existing=True, _cache=None):
-    if raw_ref is None:
-        return None
+    def __contains__(self, raw_id) -> bool:
+        return self.eslestir(raw_id) is not None
+
+    def normalize(self, raw_id):
+        """normalize_id'nin memoize edilmiş hali."""
+        if raw_id is None:
+            return None
+        try:
+            return self._norm_cache[raw_id]
+        except KeyError:
+            norm = normalize_id(raw_id)
+            self._norm_cache[raw_id] = norm
+            return norm
+        except TypeError:
+            return normalize_id(raw_id)
+
+    def eslestir(self, raw_id):
+        """Ham ID'yi normalize ederek kayıttaki orijinal personel ID'sine eşle; yoksa None."""
+        if raw_id is None:
+            return None
+        return self._id_map.get(self.normalize(raw_id))
 
-    if isinstance(raw_ref, str):
-        ref = raw_ref.strip()
-        if not ref:
+    def cozumle(self, raw_ref, require_existing=True):
+        """Personel referansını (ad veya ID) çöz: önce ad, sonra ID eşleşmesi.
+        require_existing=False ise ad bulunamayan referansın normalize ID'si döner."""
+        if raw_ref is None:
             return None
-        # Cache varsa O(1) ad lookup
-        if _cache:
-            found = _cache["ad_map"].get(ref)
+        if isinstance(raw_ref, str):
+            ref = raw_ref.strip()
+            if not ref:
+                return None
+            found = self._ad_map.get(ref)
             if found is not None:
                 return found
-        else:
-            for p in personeller:
-                if getattr(p, "ad", None) == ref:
-                    return getattr(p, "id", None)
-        raw_ref = ref
-
-    normalized = normalize_id(raw_ref)
-    if not require_existing:
-        return normalized
-
-    # Cache varsa O(1) id lookup
-    if _cache:
-        found = _cache["id_map"].get(normalized)
-        if found is not None:
-            return found
-        return None
-
-    for p in personeller:
-        if ids_match(getattr(p, "id", None), normalized):
-            return getattr(p, "id", None)
-    return None
+            raw_ref = ref
+        if not require_existing:
+            return self.normalize(raw_ref)
+        return self.eslestir(raw_ref)
 
-
-def _find_duplicate_personel_ids(personeller) -> List[int]:
-    seen = set()
-    duplicates = []
-    for p in personeller:
-        pid = getattr(p, "id", None)
-        if pid in seen and pid not in duplicates:
-            duplicates.append(pid)
-        seen.add(pid)
-    return duplicates
+    def rol_kanonik(self, role_name) -> str:
+        """canonicalize_role_name'in memoize edilmiş hali."""
+        try:
+            return self._rol_cache[role_name]
+        except KeyError:
+            canonical = canonicalize_role_name(role_name)
+            self._rol_cache[role_name] = canonical
+            return canonical
+        except TypeError:
+            return canonicalize_role_name(role_name)
+
+    def aile_anahtari(self, role_name) -> str:
+        """birlikte_aile_anahtari'nin memoize edilmiş hali."""
+        try:
+            return self._aile_cache[role_name]
+        except KeyError:
+            canonical = self.rol_kanonik(role_name)
+            aile = BIRLIKTE_ESDEGER_GOREV_AILE_ADI if canonical in BIRLIKTE_ESDEGER_GOREV_AILESI else canonical
+            self._aile_cache[role_name] = aile
+            return aile
+        except TypeError:
+            return birlikte_aile_anahtari(role_name)
+
+
+def id_indeksi(id_collection) -> Dict:
+    """Personel dışı ID koleksiyonları (kilitli hedefler, kapasiteler) için
+    normalize_id -> orijinal ID sözlüğü; IdRegistry.eslestir ile aynı kural:
+    aynı normalize ID'de koleksiyondaki ilk eleman kazanır."""
+    indeks = {}
+    for pid in id_collection:
+        norm = normalize_id(pid)
+        if norm not in indeks:
+            indeks[norm] = pid
+    return indeks
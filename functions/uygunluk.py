@@ -0,0 +1,178 @@
+"""
+Uygunluk tensörü — kişi × gün × slot bazında "bu kişi bu slota atanabilir mi?"
+sorusunun tek geçişte hesaplanmış NumPy cevabı.
+
+Mazeret, kısıtlı/taşma görevi, exclusive, havuz, kısıtlama istisnası ve manuel
+atama override bilgisi bir kez işlenir; solver değişken üretimi ve tekli hard
+kısıtlar (H2/H7/H8/H10) bu tensörden okunur.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from solver_models import SolverGorev, SolverPersonel
+
+
+# ============================================
+# NEDEN KODLARI
+# ============================================
+
+UYGUN = 0
+UYGUN_MANUEL = 1        # Manuel atama rol/havuz/exclusive engelini deler
+RED_SIFIR_HEDEF = 2
+RED_MAZERET = 3
+RED_KISITLI = 4         # H7: kısıtlı görev / taşma görevi dışı
+RED_EXCLUSIVE = 5       # H8: exclusive görev, kişi kısıtlı/taşma/havuz değil
+RED_HAVUZ = 6           # H10: görev havuzu dışı
+
+NEDEN_ADLARI = {
+    UYGUN: "uygun",
+    UYGUN_MANUEL: "manuel",
+    RED_SIFIR_HEDEF: "sifir_hedef",
+    RED_MAZERET: "mazeret",
+    RED_KISITLI: "kisitli",
+    RED_EXCLUSIVE: "exclusive",
+    RED_HAVUZ: "havuz",
+}
+
+
+@dataclass
+class UygunlukTensoru:
+    personel_ids: List[int]
+    pid_index: Dict[int, int]
+    gun_sayisi: int
+    slot_sayisi: int
+    # neden[i, g-1, s]: NEDEN KODLARI'ndan biri
+    neden: np.ndarray
+    # aday: rol/mazeret açısından atanabilir (hedef 0 olanlar dahil) — teşhis için
+    aday: np.ndarray
+    # uygun: solver'da serbest değişken olacak hücreler
+    uygun: np.ndarray
+    sifir_hedef_ids: Set[int] = field(default_factory=set)
+
+    def uygun_mu(self, pid: int, gun: int, slot_idx: int) -> bool:
+        i = self.pid_index.get(pid)
+        if i is None or not (1 <= gun <= self.gun_sayisi) or not (0 <= slot_idx < self.slot_sayisi):
+            return False
+        return bool(self.uygun[i, gun - 1, slot_idx])
+
+    def aday_mi(self, pid: int, gun: int, slot_idx: int) -> bool:
+        i = self.pid_index.get(pid)
+        if i is None or not (1 <= gun <= self.gun_sayisi) or not (0 <= slot_idx < self.slot_sayisi):
+            return False
+        return bool(self.aday[i, gun - 1, slot_idx])
+
+    def neden_ozeti(self) -> Dict[str, int]:
+        kodlar, adetler = np.unique(self.neden, return_counts=True)
+        return {NEDEN_ADLARI.get(int(k), str(int(k))): int(a) for k, a in zip(kodlar, adetler)}
+
+
+def _rol_nedeni(p: SolverPersonel, role: str, exclusive_roles: Set[str],
+                gorev_havuzlari: Dict[str, Set[int]], kisitli_kontrol: bool) -> int:
+    """Tek kişi-rol çifti için gün bağımsız ret nedeni (_person_can_take_slot_on_day sırası)."""
+    kisitli = p.kisitli_gorev
+    tasma = p.tasma_gorevi
+
+    if kisitli_kontrol and kisitli and role != kisitli:
+        if not (tasma and role == tasma):
+            return RED_KISITLI
+
+    if role in exclusive_roles and kisitli != role and tasma != role:
+        havuz_ids = gorev_havuzlari.get(role)
+        if havuz_ids is None or p.id not in havuz_ids:
+            return RED_EXCLUSIVE
+
+    allowed_ids = gorev_havuzlari.get(role)
+    if allowed_ids is not None and p.id not in allowed_ids:
+        if not (kisitli and kisitli == role) and not (tasma and tasma == role):
+            return RED_HAVUZ
+
+    return UYGUN
+
+
+def uygunluk_tensoru_olustur(
+    gun_sayisi: int,
+    personel_listesi: List[SolverPersonel],
+    gorevler: List[SolverGorev],
+    exclusive_roles: Set[str],
+    gorev_havuzlari: Dict[str, Set[int]],
+    kisitlama_istisna_map: Dict[Tuple[int, int], Set[str]],
+    manual_mazeret_override_slots: Set[Tuple[int, int, int]],
+    manuel_slotlar: Set[Tuple[int, int, int]],
+    sifir_hedef_ids: Optional[Set[int]] = None,
+) -> UygunlukTensoru:
+    """Kişi × gün × slot uygunluk tensörünü tek geçişte üret.
+
+    Öncelik sırası: sıfır hedef > mazeret (onaylı manuel hariç) > manuel atama >
+    kısıtlı görev (istisna günleri hariç) > exclusive > havuz.
+    """
+    sifir_hedef_ids = set(sifir_hedef_ids or ())
+    personel_ids = [p.id for p in personel_listesi]
+    pid_index = {pid: i for i, pid in enumerate(personel_ids)}
+    P, D, S = len(personel_listesi), gun_sayisi, len(gorevler)
+    roles = [g.base_name if g.base_name else g.ad for g in gorevler]
+
+    # Gün bağımsız rol nedenleri: H7 dahil ve H7 hariç (istisna günleri için)
+    rol_neden = np.zeros((P, S), dtype=np.int8)
+    istisna_rol_neden = np.zeros((P, S), dtype=np.int8)
+    for i, p in enumerate(personel_listesi):
+        for s, role in enumerate(roles):
+            rol_neden[i, s] = _rol_nedeni(p, role, exclusive_roles, gorev_havuzlari, True)
+            istisna_rol_neden[i, s] = _rol_nedeni(p, role, exclusive_roles, gorev_havuzlari, False)
+
+    neden = np.repeat(rol_neden[:, np.newaxis, :], D, axis=1)
+
+    # Kısıtlama istisnaları: o gün o rol için sadece H7 kalkar
+    slots_by_role: Dict[str, List[int]] = {}
+    for s, role in enumerate(roles):
+        slots_by_role.setdefault(role, []).append(s)
+    for (pid, gun), istisna_rolleri in kisitlama_istisna_map.items():
+        i = pid_index.get(pid)
+        if i is None or not (1 <= gun <= D):
+            continue
+        for role in istisna_rolleri:
+            for s in slots_by_role.get(role, []):
+                if neden[i, gun - 1, s] == RED_KISITLI:
+                    neden[i, gun - 1, s] = istisna_rol_neden[i, s]
+
+    # Mazeret (onaylı manuel slotlar hariç)
+    rol_gun_neden = neden.copy()
+    mazeret = np.zeros((P, D), dtype=bool)
+    for i, p in enumerate(personel_listesi):
+        for gun in p.mazeret_gunleri:
+            if 1 <= gun <= D:
+                mazeret[i, gun - 1] = True
+    neden[mazeret] = RED_MAZERET
+    for pid, gun, s in manual_mazeret_override_slots:
+        i = pid_index.get(pid)
+        if i is not None and 1 <= gun <= D and 0 <= s < S:
+            neden[i, gun - 1, s] = rol_gun_neden[i, gun - 1, s]
+
+    # Manuel atama: rol/havuz/exclusive engellerini bu slot için görme
+    for pid, gun, s in manuel_slotlar:
+        i = pid_index.get(pid)
+        if i is None or not (1 <= gun <= D) or not (0 <= s < S):
+            continue
+        if neden[i, gun - 1, s] != RED_MAZERET:
+            neden[i, gun - 1, s] = UYGUN_MANUEL
+
+    aday = (neden == UYGUN) | (neden == UYGUN_MANUEL)
+
+    for pid in sifir_hedef_ids:
+        i = pid_index.get(pid)
+        if i is not None:
+            neden[i, :, :] = RED_SIFIR_HEDEF
+    uygun = (neden == UYGUN) | (neden == UYGUN_MANUEL)
+
+    return UygunlukTensoru(
+        personel_ids=personel_ids,
+        pid_index=pid_index,
+        gun_sayisi=D,
+        slot_sayisi=S,
+        neden=neden,
+        aday=aday,
+        uygun=uygun,
+        sifir_hedef_ids=sifir_hedef_ids,
+    )